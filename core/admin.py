@@ -18,7 +18,7 @@ admin.site.index_title = "OSCE Administration"
 
 from .models import (
     Theme, Course, ILO, Exam, Station, ChecklistItem,
-    ExamSession, SessionStudent, StationScore, ItemScore,
+    ExamSession, SessionStudent, StationScore, ItemScore, FinalStationResult,
     Examiner, ExaminerAssignment, Path, ChecklistLibrary,
     StationVariant, TemplateLibrary, StationTemplate, AuditLog,
     AuditLogArchive,
@@ -460,6 +460,14 @@ class ItemScoreAdmin(admin.ModelAdmin):
     list_display = ('checklist_item', 'station_score', 'score', 'max_points')
 
 
+@admin.register(FinalStationResult)
+class FinalStationResultAdmin(admin.ModelAdmin):
+    list_display = ('session_student', 'station', 'final_score', 'max_score', 'examiner_count', 'both_submitted')
+    list_filter = ('both_submitted',)
+    readonly_fields = ('session', 'session_student', 'station', 'final_score', 'max_score',
+                       'percentage', 'examiner_count', 'both_submitted', 'updated_at')
+
+
 # ── Paths ────────────────────────────────────────────────────────
 @admin.register(Path)
 class PathAdmin(admin.ModelAdmin):
@@ -674,6 +682,84 @@ def _admin_archive_old_logs(modeladmin, request, queryset):
 _admin_archive_old_logs.short_description = 'Archive logs older than 90 days (superuser only)'
 
 
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class _EstimatedCountPaginator(Paginator):
+    """Paginator whose count is the planner's estimate on large querysets."""
+
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        from core.utils.audit_viewer import estimated_count
+        count, self.is_estimate = estimated_count(self.object_list)
+        return count
+
+
+class AuditLogChangeList(ChangeList):
+    """
+    Keyset-paginated changelist: pages on (timestamp, id) from an opaque
+    ``cursor`` parameter instead of OFFSET, and shows an estimated count
+    instead of running COUNT(*).  Sorting by a column header falls back to
+    numbered pages (still with an estimated count).
+    """
+    CURSOR_VAR = 'cursor'
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(self.CURSOR_VAR) or None
+        super().__init__(request, *args, **kwargs)
+        # Keep the cursor out of the search form's hidden inputs
+        self.params.pop(self.CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # A cursor is only valid for the listing it came from: changing a
+        # filter, the search or the ordering starts again from the newest
+        if not new_params or self.CURSOR_VAR not in new_params:
+            remove = [*(remove or []), self.CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        self.keyset = ORDER_VAR not in self.params
+        self.next_cursor = None
+        if not self.keyset:
+            super().get_results(request)
+            self.result_count_estimated = self.paginator.is_estimate
+            return
+
+        from core.utils.audit_viewer import estimated_count, keyset_page
+
+        self.result_list, self.next_cursor = keyset_page(
+            self.queryset, self.cursor, self.list_per_page,
+        )
+        self.result_count, self.result_count_estimated = estimated_count(self.queryset)
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page,
+        )
+
+    @property
+    def next_page_url(self):
+        if self.next_cursor:
+            return self.get_query_string({self.CURSOR_VAR: self.next_cursor})
+        return None
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string()
+
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     """
@@ -684,7 +770,9 @@ class AuditLogAdmin(admin.ModelAdmin):
     - JSON diff widget for old_value / new_value
     - CSV and JSON streaming exports
     - Anomaly flags for suspicious patterns
-    - Checksum verification display
+    - Keyset pagination, estimated counts and full-text search
+      (core.utils.audit_viewer) so the list stays fast on large tables
+    - Checksum verification display (batch-verified for the visible page)
     - Manual archive trigger (button + action, superuser only)
     """
     change_list_template = 'admin/core/auditlog/change_list.html'
@@ -692,7 +780,7 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_display = (
         'timestamp', 'username', 'user_role', 'department_id',
         'action', 'resource_type', 'resource_label', 'status',
-        'ip_address', 'anomaly_flag', 'checksum_status',
+        'ip_address', 'anomaly_flag', 'integrity',
     )
     list_filter = (
         'action', 'user_role', 'resource_type', 'status',
@@ -714,7 +802,9 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_per_page = 50
     list_select_related = ('user',)
     actions = [_export_audit_csv, _export_audit_json, _admin_archive_old_logs]
-    ordering = ('-timestamp',)
+    ordering = ('-timestamp', '-id')
+    show_full_result_count = False
+    paginator = _EstimatedCountPaginator
 
     fieldsets = (
         ('When & Who', {
@@ -815,6 +905,13 @@ class AuditLogAdmin(admin.ModelAdmin):
         return format_html('<span style="color:red;font-weight:bold">✗ TAMPERED</span>')
     checksum_status.short_description = 'Integrity'
 
+    def integrity(self, obj):
+        """Placeholder filled in by the changelist's batch verify request."""
+        return format_html(
+            '<span class="audit-integrity" data-id="{}" style="color:gray">…</span>', obj.pk,
+        )
+    integrity.short_description = 'Integrity'
+
     @staticmethod
     def _format_json(data):
         if not data:
@@ -876,6 +973,13 @@ class AuditLogAdmin(admin.ModelAdmin):
 
         return qs.none()
 
+    def get_changelist(self, request, **kwargs):
+        return AuditLogChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        from core.utils.audit_viewer import search_audit_logs
+        return search_audit_logs(queryset, search_term, self.search_fields), False
+
     def get_actions(self, request):
         """Only show export actions to users who can view logs."""
         actions = super().get_actions(request)
@@ -892,9 +996,33 @@ class AuditLogAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.archive_old_logs_view),
                 name='core_auditlog_archive_old_logs',
             ),
+            _path(
+                'verify-checksums/',
+                self.admin_site.admin_view(self.verify_checksums_view),
+                name='core_auditlog_verify_checksums',
+            ),
         ]
         return custom + urls
 
+    VERIFY_BATCH_LIMIT = 500
+
+    def verify_checksums_view(self, request):
+        """
+        ``GET ?ids=1,2,3`` → ``{"statuses": {"1": "valid", ...}}`` for the
+        visible entries the user may see (one query for the whole page).
+        """
+        from django.http import HttpResponseForbidden, JsonResponse
+        from core.utils.audit_integrity import checksum_statuses
+
+        if not self.has_module_permission(request):
+            return HttpResponseForbidden()
+        ids = [
+            int(pk) for pk in request.GET.get('ids', '').split(',')[:self.VERIFY_BATCH_LIMIT]
+            if pk.strip().isdigit()
+        ]
+        statuses = checksum_statuses(self.get_queryset(request).filter(pk__in=ids)) if ids else {}
+        return JsonResponse({'statuses': {str(pk): status for pk, status in statuses.items()}})
+
     def archive_old_logs_view(self, request):
         """Handle the 'Archive Old Logs' button POST from the changelist."""
         from django.contrib import messages
@@ -970,12 +1098,16 @@ class AuditLogAdmin(admin.ModelAdmin):
             resource_type='AuditLog',
             description=f'{request.user.username} viewed audit log list',
         )
+        from core.utils.audit_viewer import estimated_count
         extra_context = extra_context or {}
+        extra_context['verify_url'] = _rev('admin:core_auditlog_verify_checksums')
         if request.user.is_superuser:
             extra_context['archive_url'] = _rev('admin:core_auditlog_archive_old_logs')
-            extra_context['hot_count'] = AuditLog.objects.count()
-            from core.models.audit import AuditLogArchive
-            extra_context['archive_count'] = AuditLogArchive.objects.count()
+            extra_context['hot_count'], hot_estimated = estimated_count(AuditLog.objects.all())
+            extra_context['archive_count'], archive_estimated = estimated_count(
+                AuditLogArchive.objects.all()
+            )
+            extra_context['counts_estimated'] = hot_estimated or archive_estimated
         return super().changelist_view(request, extra_context=extra_context)
 
 
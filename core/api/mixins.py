@@ -24,9 +24,9 @@ class DepartmentScopedMixin:
             Examples:
                 'department'               (Course)
                 'course__department'        (Exam → Course → Department)
-                'exam__course__department'  (ExamSession → Exam → Course)
-                'session__exam__course__department'  (Path)
-                'path__session__exam__course__department'  (Station)
+                'department'                (ExamSession, Path, Station,
+                                             StationScore — denormalised column)
+                'station__department'       (ExaminerAssignment, ChecklistItem)
 
     Behaviour:
         - Superuser / Admin: no filtering (see all)
@@ -179,7 +179,9 @@ class StationSerializer(serializers.ModelSerializer):
         return obj.get_max_score()
 
     def get_item_count(self, obj):
-        return obj.checklist_items.count()
+        from core.utils.station_catalog import StationCatalog
+        entry = StationCatalog.station(obj.pk)
+        return entry['item_count'] if entry else 0
 
 
 # ── Checklist Item ───────────────────────────────────────────────────
@@ -36,7 +36,7 @@ from rest_framework.response import Response
 from core.models import (
     Department, Course, Exam, ExamSession, Path,
     Station, ChecklistItem, ExaminerAssignment,
-    StationScore, ItemScore, SessionStudent,
+    StationScore, ItemScore, SessionStudent, FinalStationResult,
 )
 from core.api.permissions import (
     IsSuperuserOrAdmin,
@@ -46,6 +46,7 @@ from core.api.permissions import (
 )
 from core.api.mixins import DepartmentScopedMixin, ExaminerAssignmentMixin
 from core.api.guards import SessionStateGuard
+from core.utils.station_progress import invalidate_scores_progress
 from core.api.serializers import (
     DepartmentListSerializer,
     DepartmentDetailSerializer,
@@ -198,7 +199,7 @@ class ExamSessionViewSet(DepartmentScopedMixin,
     """
     serializer_class = ExamSessionSerializer
     queryset = ExamSession.objects.select_related('exam', 'exam__course', 'exam__course__department')
-    department_field = 'exam__course__department'
+    department_field = 'department'
     permission_classes = [IsAuthenticated, IsGlobalOrCoordinator]
 
     def get_queryset(self):
@@ -225,7 +226,7 @@ class PathViewSet(DepartmentScopedMixin,
         'session', 'session__exam', 'session__exam__course',
         'session__exam__course__department',
     ).filter(is_deleted=False)
-    department_field = 'session__exam__course__department'
+    department_field = 'department'
     permission_classes = [IsAuthenticated, IsGlobalOrCoordinator]
 
     def get_queryset(self):
@@ -252,7 +253,7 @@ class StationViewSet(ExaminerAssignmentMixin,
         'path', 'path__session', 'path__session__exam',
         'path__session__exam__course', 'path__session__exam__course__department',
     ).filter(is_deleted=False, active=True)
-    department_field = 'path__session__exam__course__department'
+    department_field = 'department'
 
     def get_permissions(self):
         if self.action == 'list':
@@ -309,7 +310,7 @@ class ChecklistItemViewSet(mixins.ListModelMixin,
             if dept is None:
                 return base_qs.none()
             return base_qs.filter(
-                station__path__session__exam__course__department=dept
+                station__department=dept
             ).order_by('item_number')
 
         if getattr(user, 'role', '') == 'examiner':
@@ -335,7 +336,7 @@ class ExaminerAssignmentViewSet(DepartmentScopedMixin,
     POST /stations/:station_id/assignments/ — Superuser, Admin, Coordinator (own)
     """
     queryset = ExaminerAssignment.objects.select_related('examiner', 'station', 'session')
-    department_field = 'station__path__session__exam__course__department'
+    department_field = 'station__department'
     permission_classes = [IsAuthenticated, IsGlobalOrCoordinator]
 
     def get_serializer_class(self):
@@ -382,7 +383,7 @@ class StationScoreViewSet(SessionStateGuard,
         'station__path__session__exam__course',
         'station__path__session__exam__course__department',
     )
-    department_field = 'station__path__session__exam__course__department'
+    department_field = 'department'
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -524,6 +525,8 @@ class StationScoreViewSet(SessionStateGuard,
 
         score.calculate_total()
         score.save()
+        FinalStationResult.refresh(score.session_student_id, score.station_id)
+        invalidate_scores_progress([(score.session_student_id, score.station_id)])
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -556,7 +559,7 @@ class DepartmentReportViewSet(DepartmentScopedMixin,
 
         courses = Course.objects.filter(department=dept)
         exams = Exam.objects.filter(course__department=dept, is_deleted=False)
-        sessions = ExamSession.objects.filter(exam__course__department=dept)
+        sessions = ExamSession.objects.filter(department=dept)
 
         # Sessions by status
         status_counts = {}
@@ -565,7 +568,7 @@ class DepartmentReportViewSet(DepartmentScopedMixin,
 
         # Total students scored
         total_scored = StationScore.objects.filter(
-            station__path__session__exam__course__department=dept,
+            department=dept,
             status='submitted',
         ).values('session_student').distinct().count()
 
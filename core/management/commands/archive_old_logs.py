@@ -2,7 +2,9 @@
 Management command: archive_old_logs
 
 Moves AuditLog records older than N days to the AuditLogArchive table.
-Never deletes — only archives.
+Never deletes — only archives.  When the audit tables are partitioned
+(AUDIT_LOG_PARTITIONING), whole months older than the cutoff are moved as
+partitions instead of row by row.
 
 Usage:
     python manage.py archive_old_logs --days=365
@@ -38,12 +40,31 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         from core.models.audit import AuditLog, AuditLogArchive
+        from core.utils.audit_partitions import (
+            archivable_months, archive_partitions, audit_logs_partitioned,
+        )
 
         days = options['days']
         batch_size = options['batch_size']
         dry_run = options['dry_run']
         cutoff = timezone.now() - timedelta(days=days)
 
+        if audit_logs_partitioned():
+            if dry_run:
+                names = [name for _, name in archivable_months(cutoff)]
+                self.stdout.write(self.style.WARNING(
+                    f'DRY RUN: Would archive {len(names)} partition(s): {", ".join(names) or "none"}.'
+                ))
+                return
+            moved = archive_partitions(cutoff)
+            for name, rows in moved:
+                self.stdout.write(f'  Archived partition {name} ({rows} rows)')
+            self.stdout.write(self.style.SUCCESS(
+                f'Done. Archived {sum(rows for _, rows in moved)} audit log(s) '
+                f'in {len(moved)} partition(s) to AuditLogArchive.'
+            ))
+            return
+
         qs = AuditLog.objects.filter(timestamp__lt=cutoff)
         total = qs.count()
 
@@ -69,7 +90,7 @@ class Command(BaseCommand):
                 'resource_type', 'resource_id', 'resource_label',
                 'old_value', 'new_value', 'description',
                 'ip_address', 'user_agent', 'request_method', 'request_path',
-                'extra_data',
+                'extra_data', 'checksum',
             ))
 
             if not batch:
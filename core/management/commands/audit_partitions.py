@@ -0,0 +1,77 @@
+"""
+Management command: audit_partitions
+
+Maintains the monthly partitions of audit_logs / audit_logs_archive
+(PostgreSQL, AUDIT_LOG_PARTITIONING).  Does nothing on other databases or
+while the tables are not partitioned.
+
+Usage:
+    python manage.py audit_partitions                     # pre-create upcoming months
+    python manage.py audit_partitions --months-ahead 6
+    python manage.py audit_partitions --convert           # partition the tables now
+    python manage.py audit_partitions --status
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions of the audit tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=getattr(settings, 'AUDIT_PARTITION_MONTHS_AHEAD', 3),
+            help='Months after the current one to pre-create (default: AUDIT_PARTITION_MONTHS_AHEAD)',
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Partition the audit tables first if they are not partitioned yet',
+        )
+        parser.add_argument(
+            '--status',
+            action='store_true',
+            help='List the monthly partitions and exit',
+        )
+
+    def handle(self, *args, **options):
+        from core.utils.audit_partitions import (
+            ARCHIVE_TABLE, AUDIT_TABLE, ensure_partitions, is_partitioned,
+            month_partitions, partition_audit_tables, partitioning_supported,
+        )
+
+        if not partitioning_supported():
+            self.stdout.write(self.style.WARNING('Audit partitioning requires PostgreSQL; nothing to do.'))
+            return
+
+        if options['status']:
+            for table in (AUDIT_TABLE, ARCHIVE_TABLE):
+                if not is_partitioned(table):
+                    self.stdout.write(f'{table}: not partitioned')
+                    continue
+                months = month_partitions(table)
+                self.stdout.write(f'{table}: {len(months)} monthly partition(s)')
+                for month in sorted(months):
+                    self.stdout.write(f'  {months[month]}')
+            return
+
+        months_ahead = options['months_ahead']
+        if options['convert']:
+            for table in partition_audit_tables(months_ahead):
+                self.stdout.write(self.style.SUCCESS(f'Partitioned {table} by month.'))
+
+        if not is_partitioned(AUDIT_TABLE):
+            self.stdout.write(self.style.WARNING(
+                f'{AUDIT_TABLE} is not partitioned (see AUDIT_LOG_PARTITIONING / --convert).'
+            ))
+            return
+
+        created = ensure_partitions(months_ahead)
+        if created:
+            for name in created:
+                self.stdout.write(f'  Created {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {len(created)} partition(s) created, {months_ahead} month(s) ahead covered.'
+        ))
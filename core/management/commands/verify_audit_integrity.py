@@ -1,14 +1,22 @@
 """
 Management command: verify_audit_integrity
 
-Verifies SHA-256 checksums on all AuditLog records to detect tampering.
-Reports tampered, missing-checksum, and valid counts.
+Verifies SHA-256 checksums on all AuditLog and AuditLogArchive records to
+detect tampering.  Reports tampered, missing-checksum, and valid counts.
+
+Ranges of ids are verified in parallel and intact ranges are checkpointed
+(see core.utils.audit_integrity), so later runs only verify new or changed
+ranges.
 
 Usage:
     python manage.py verify_audit_integrity
     python manage.py verify_audit_integrity --fix   # recompute missing checksums
     python manage.py verify_audit_integrity --batch-size 5000
+    python manage.py verify_audit_integrity --workers 8 --range-size 50000
+    python manage.py verify_audit_integrity --full  # ignore checkpoints
+    python manage.py verify_audit_integrity --table audit_logs_archive
 """
+import os
 import sys
 
 from django.core.management.base import BaseCommand
@@ -18,6 +26,8 @@ class Command(BaseCommand):
     help = 'Verify SHA-256 checksums on all audit log records'
 
     def add_arguments(self, parser):
+        from core.utils.audit_integrity import DEFAULT_RANGE_SIZE, audit_models
+
         parser.add_argument(
             '--fix',
             action='store_true',
@@ -29,51 +39,63 @@ class Command(BaseCommand):
             default=2000,
             help='Number of records to process per batch (default: 2000)',
         )
+        parser.add_argument(
+            '--range-size',
+            type=int,
+            default=DEFAULT_RANGE_SIZE,
+            help=f'Ids per verified / checkpointed range (default: {DEFAULT_RANGE_SIZE})',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes (default: CPU count; 1, or no fork support as on Windows, verifies in-process)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Verify every range, ignoring stored checkpoints',
+        )
+        parser.add_argument(
+            '--table',
+            action='append',
+            choices=sorted(audit_models()),
+            help='Only verify this table (repeatable; default: all audit tables)',
+        )
 
     def handle(self, *args, **options):
-        from core.models.audit import AuditLog, compute_checksum
+        from core.utils.audit_integrity import verify_audit_tables
 
         fix = options['fix']
-        batch_size = options['batch_size']
-
-        total = AuditLog.objects.count()
-        self.stdout.write(f'Verifying {total} audit log records...\n')
+        self.stdout.write('Verifying audit log records...\n')
 
-        valid = 0
-        tampered = 0
-        missing = 0
-        fixed = 0
-        tampered_ids = []
-
-        qs = AuditLog.objects.all().order_by('id').iterator(chunk_size=batch_size)
+        summary = verify_audit_tables(
+            options['table'],
+            range_size=options['range_size'],
+            chunk_size=options['batch_size'],
+            workers=options['workers'],
+            fix=fix,
+            full=options['full'],
+            on_range=lambda r: self.stdout.write(
+                f"  {r['table']} [{r['start']}, {r['end']}): {r['valid']} valid"
+                + (f", {len(r['tampered'])} tampered" if r['tampered'] else '')
+                + (f", {len(r['missing'])} missing" if r['missing'] else '')
+            ),
+        )
 
-        for obj in qs:
-            if not obj.checksum:
-                missing += 1
-                if fix:
-                    obj.checksum = compute_checksum(
-                        obj.user_id, obj.action, obj.resource_id,
-                        obj.timestamp, obj.old_value, obj.new_value,
-                    )
-                    AuditLog.objects.filter(pk=obj.pk).update(checksum=obj.checksum)
-                    fixed += 1
-            elif obj.verify_checksum():
-                valid += 1
-            else:
-                tampered += 1
-                tampered_ids.append(obj.pk)
-                if fix:
-                    # Recompute using stored timestamp (correct value is in DB)
-                    obj.checksum = compute_checksum(
-                        obj.user_id, obj.action, obj.resource_id,
-                        obj.timestamp, obj.old_value, obj.new_value,
-                    )
-                    AuditLog.objects.filter(pk=obj.pk).update(checksum=obj.checksum)
-                    fixed += 1
+        valid = sum(t['valid'] for t in summary.values())
+        skipped = sum(t['skipped'] for t in summary.values())
+        missing = sum(len(t['missing']) for t in summary.values())
+        fixed = sum(t['fixed'] for t in summary.values())
+        tampered_ids = [
+            f'{table}:{pk}' for table, t in summary.items() for pk in t['tampered']
+        ]
+        tampered = len(tampered_ids)
 
         # Summary
         self.stdout.write('\n' + '=' * 60)
         self.stdout.write(self.style.SUCCESS(f'  Valid:    {valid}'))
+        self.stdout.write(self.style.SUCCESS(f'  Skipped:  {skipped} (unchanged since last checkpoint)'))
         self.stdout.write(self.style.WARNING(f'  Missing:  {missing}'))
         if fix:
             self.stdout.write(self.style.SUCCESS(f'  Fixed:    {fixed}'))
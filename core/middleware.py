@@ -393,7 +393,12 @@ class RLSSessionMiddleware:
       app.current_user_id  - integer user PK
       app.current_role     - SUPERUSER / ADMIN / COORDINATOR_HEAD / etc.
       app.department_id    - department PK (coordinators only)
-      app.station_ids      - comma-separated station UUIDs (examiners only)
+      app.station_ids      - comma-separated station UUIDs of the examiner's
+                             scheduled / in-progress / finished sessions
+
+    The resolved context is cached per user (cache_utils.RLS_CONTEXT_KEY,
+    invalidated on user, assignment and session-status changes), so a warm
+    request sends one set_config statement and no lookup query.
 
     Automatically skipped on non-PostgreSQL databases.
     """
@@ -415,7 +420,9 @@ class RLSSessionMiddleware:
     def _set_session_vars(self, request):
         """Set PostgreSQL session variables for RLS."""
         import logging
+        from django.core.cache import cache
         from django.db import connection
+        from core.utils.cache_utils import RLS_CONTEXT_TTL, get_rls_context_cache_key
 
         if connection.vendor != 'postgresql':
             return
@@ -424,26 +431,27 @@ class RLSSessionMiddleware:
         user_id, role, dept_id = self._resolve_vars(user)
 
         try:
-            # Set core vars first so RLS policies work for any follow-up queries
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT "
-                    "set_config('app.current_user_id', %s, false), "
-                    "set_config('app.current_role',    %s, false), "
-                    "set_config('app.department_id',   %s, false), "
-                    "set_config('app.station_ids',     %s, false)",
-                    [user_id, role, dept_id, ''],
-                )
-
-            # Now that RLS vars are set, resolve station_ids for examiners
-            if role == 'EXAMINER' and user_id:
-                station_ids = self._resolve_station_ids(user)
+            context = None
+            cache_key = get_rls_context_cache_key(user_id) if user_id else None
+            if cache_key:
+                context = cache.get(cache_key)
+                # Role / department come from the user row; a stale entry is rebuilt
+                if context is not None and context[:3] != (user_id, role, dept_id):
+                    context = None
+
+            if context is None:
+                # Set core vars first so RLS policies work for the station lookup
+                self._apply(connection, (user_id, role, dept_id, ''))
+                station_ids = ''
+                if role == 'EXAMINER' and user_id:
+                    station_ids = self._resolve_station_ids(user)
+                context = (user_id, role, dept_id, station_ids)
                 if station_ids:
-                    with connection.cursor() as cursor:
-                        cursor.execute(
-                            "SELECT set_config('app.station_ids', %s, false)",
-                            [station_ids],
-                        )
+                    self._apply(connection, context)
+                if cache_key:
+                    cache.set(cache_key, context, RLS_CONTEXT_TTL)
+            else:
+                self._apply(connection, context)
         except Exception:
             logger = logging.getLogger('django.request')
             logger.exception(
@@ -451,6 +459,30 @@ class RLSSessionMiddleware:
                 '(user_id=%s, role=%s)', user_id, role,
             )
 
+    @staticmethod
+    def _apply(connection, context):
+        """
+        Send ``context`` in one set_config statement, unless this exact
+        database connection already carries it (persistent connections under
+        CONN_MAX_AGE).  Only trusted outside a transaction: inside one (e.g.
+        tests) a rollback would silently revert the settings.
+        """
+        connection.ensure_connection()
+        raw = connection.connection
+        if not connection.in_atomic_block and getattr(connection, '_rls_context', None) == (raw, context):
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT "
+                "set_config('app.current_user_id', %s, false), "
+                "set_config('app.current_role',    %s, false), "
+                "set_config('app.department_id',   %s, false), "
+                "set_config('app.station_ids',     %s, false)",
+                list(context),
+            )
+        # Holding ``raw`` keeps its identity unique until the next comparison
+        connection._rls_context = (raw, context)
+
     def _resolve_vars(self, user):
         """Resolve (user_id, role, department_id) from user model fields only.
 
@@ -480,18 +512,23 @@ class RLSSessionMiddleware:
 
         return (user_id, role, dept_id)
 
+    # Sessions whose stations an examiner may still read or mark
+    _ACTIVE_SESSION_STATUSES = ('scheduled', 'in_progress', 'finished')
+
     def _resolve_station_ids(self, user):
-        """Resolve station IDs for examiner. Called AFTER set_config."""
+        """Resolve active-session station IDs for examiner. Called AFTER set_config."""
         from core.models import ExaminerAssignment
-        ids = list(
+        ids = (
             ExaminerAssignment.objects.filter(
                 examiner=user,
-            ).values_list('station_id', flat=True)
+                session__status__in=self._ACTIVE_SESSION_STATUSES,
+            )
+            .order_by('station_id')
+            .values_list('station_id', flat=True)
+            .distinct()
         )
         return ','.join(str(s) for s in ids)
 
-        return (user_id, role, dept_id, station_ids)
-
 
 class AuditTrailMiddleware:
     """
@@ -508,6 +545,12 @@ class AuditTrailMiddleware:
       - Static / media file requests
       - Login / logout (already logged by signals)
       - CSRF validation requests
+
+    Each remaining request goes through its AUDIT_HTTP_POLICIES rule
+    (always / sample / coalesce / never — see core.utils.audit_policy).
+    Requests a view or signal already audited only get an entry from a
+    rule matching their path, not from the default policy.
+    The body is captured raw; parsing and masking happen in the writer.
     """
 
     MUTATING_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
@@ -527,6 +570,8 @@ class AuditTrailMiddleware:
         '/api/docs/',
     )
 
+    RAW_BODY_LIMIT = 64 * 1024  # bodies are truncated (and then not parsed) past this
+
     def __init__(self, get_response):
         self.get_response = get_response
 
@@ -535,61 +580,107 @@ class AuditTrailMiddleware:
         # signal-based log calls (which have no request) can read it.
         from core.utils.audit import (
             _reset_request_audit, _is_request_audited, _set_current_user,
+            _begin_audit_buffer, _flush_audit_buffer,
         )
         _reset_request_audit()
+        _begin_audit_buffer()
         user = getattr(request, 'user', None)
         if user is not None and getattr(user, 'is_authenticated', False):
             _set_current_user(user)
 
-        response = self.get_response(request)
+        try:
+            response = self.get_response(request)
 
-        if (
-            request.method in self.MUTATING_METHODS
-            and 200 <= response.status_code < 400
-            and not any(request.path.startswith(p) for p in self.SKIP_PATHS)
-            and not _is_request_audited()
-        ):
-            self._log_request(request, response)
+            if (
+                request.method in self.MUTATING_METHODS
+                and 200 <= response.status_code < 400
+                and not any(request.path.startswith(p) for p in self.SKIP_PATHS)
+            ):
+                self._log_request(request, response, audited=_is_request_audited())
+        finally:
+            # One bulk write for every signal-driven entry of this request,
+            # then drop the thread-local user so it can't leak into work the
+            # thread does next (other requests, tests, background code).
+            _flush_audit_buffer(request)
+            _reset_request_audit()
+            self._flush_coalesced_if_due()
 
         return response
 
-    def _log_request(self, request, response):
-        """Dispatch the audit entry to Celery (or sync fallback)."""
+    @staticmethod
+    def _flush_coalesced_if_due():
+        """
+        Without Celery Beat, write closed coalescing windows from whatever
+        request comes next, so a window's last requests don't wait for
+        another request to the same coalesced path.
+        """
+        try:
+            from core.utils import audit_policy
+            from core.utils.audit import _celery_available
+            if not _celery_available():
+                audit_policy.flush_coalesced_if_due()
+        except Exception:
+            import logging
+            logging.getLogger('osce.audit').error(
+                'Coalesced audit flush failed', exc_info=True,
+            )
+
+    def _raw_body(self, request):
+        """Unparsed request body for the writer to parse and mask (or None)."""
+        if request.method not in ('POST', 'PUT', 'PATCH'):
+            return None
+        content_type = request.content_type or ''
         try:
-            from core.utils.audit import AuditLogService, _get_client_ip, _resolve_user_role, _mask_sensitive
+            if 'multipart' in content_type:
+                # The stream was consumed by the form parser
+                body = dict(request.POST)
+            elif 'json' in content_type or 'form' in content_type:
+                body = request.body[:self.RAW_BODY_LIMIT].decode('utf-8', errors='replace')
+            else:
+                return None
+        except Exception:
+            return None  # Don't fail on unreadable body
+        return {'content_type': content_type, 'body': body}
 
-            user = getattr(request, 'user', None)
-            is_auth = user is not None and getattr(user, 'is_authenticated', False)
+    def _log_request(self, request, response, audited=False):
+        """Apply the path's audit policy and dispatch the entry (or count it)."""
+        try:
+            from core.utils import audit_policy
+            from core.utils.audit import AuditLogService
 
-            # Capture request body for POST/PUT/PATCH (with sensitive masking)
-            request_body = None
-            if request.method in ('POST', 'PUT', 'PATCH'):
-                try:
-                    import json as _json
-                    content_type = request.content_type or ''
-                    if 'json' in content_type:
-                        body = _json.loads(request.body)
-                        request_body = _mask_sensitive(body)
-                    elif 'form' in content_type:
-                        request_body = _mask_sensitive(dict(request.POST))
-                except Exception:
-                    pass  # Don't fail on unparseable body
+            # Checked before the "already audited" shortcut, so rules for
+            # signal-audited paths (item marking) still apply
+            policy = audit_policy.policy_for(request.path, audited=audited)
+            if policy.mode == audit_policy.NEVER:
+                return
+            if policy.mode == audit_policy.SAMPLE and not audit_policy.sampled(policy):
+                return
 
-            AuditLogService.log(
-                action='ADMIN_ACTION',
+            user = getattr(request, 'user', None)
+            is_auth = user is not None and getattr(user, 'is_authenticated', False)
+            extra = {
+                'http_method': request.method,
+                'http_status': response.status_code,
+                'content_type': response.get('Content-Type', ''),
+            }
+            entry = dict(
                 user=user if is_auth else None,
                 request=request,
                 resource_type='HTTP',
                 resource_id='',
                 resource_label_override=request.path[:200],
                 description=f'{request.method} {request.path} → {response.status_code}',
-                extra={
-                    'http_method': request.method,
-                    'http_status': response.status_code,
-                    'content_type': response.get('Content-Type', ''),
-                    'request_body': request_body,
-                },
             )
+
+            if policy.mode == audit_policy.COALESCE:
+                payload = AuditLogService._build_payload('ADMIN_ACTION', extra=extra, **entry)
+                audit_policy.record_coalesced(payload, policy.value)
+                return
+
+            extra['raw_request_body'] = self._raw_body(request)
+            if policy.mode == audit_policy.SAMPLE:
+                extra['sample_rate'] = policy.value
+            AuditLogService.log(action='ADMIN_ACTION', extra=extra, **entry)
         except Exception:
             import logging
             logging.getLogger('osce.audit').error(
@@ -0,0 +1,34 @@
+"""
+Add the FinalStationResult table (examiner-averaged result per student/station).
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0059_fix_rls_cross_table_recursion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinalStationResult',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('final_score', models.FloatField(default=0)),
+                ('max_score', models.FloatField(blank=True, null=True)),
+                ('percentage', models.FloatField(default=0)),
+                ('examiner_count', models.IntegerField(default=0)),
+                ('both_submitted', models.BooleanField(default=False)),
+                ('updated_at', models.IntegerField(blank=True, null=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='final_results', to='core.examsession')),
+                ('session_student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='final_results', to='core.sessionstudent')),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='final_results', to='core.station')),
+            ],
+            options={
+                'db_table': 'final_station_results',
+                'constraints': [models.UniqueConstraint(fields=('session_student', 'station'), name='unique_final_result')],
+            },
+        ),
+    ]
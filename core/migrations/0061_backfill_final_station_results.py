@@ -0,0 +1,62 @@
+"""
+Backfill FinalStationResult from existing submitted StationScore rows.
+
+Aggregates submitted scores per (student, station) in one grouped query and
+applies the same ROUND_HALF_UP averaging as StationScore.get_final_score.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    StationScore = apps.get_model('core', 'StationScore')
+    FinalStationResult = apps.get_model('core', 'FinalStationResult')
+
+    aggregated = (
+        StationScore.objects.filter(status='submitted')
+        .values('session_student_id', 'station_id', 'session_student__session_id')
+        .annotate(
+            total=Sum(Coalesce('total_score', 0.0)),
+            n=Count('id'),
+            max_total=Max('max_score'),
+        )
+    )
+
+    rows = []
+    for agg in aggregated.iterator(chunk_size=2000):
+        avg = Decimal(str(agg['total'] or 0)) / Decimal(agg['n'])
+        final = float(avg.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        percentage = 0
+        if agg['max_total']:
+            pct = Decimal(str(final)) / Decimal(str(agg['max_total'])) * 100
+            percentage = float(pct.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        rows.append(FinalStationResult(
+            session_id=agg['session_student__session_id'],
+            session_student_id=agg['session_student_id'],
+            station_id=agg['station_id'],
+            final_score=final,
+            max_score=agg['max_total'],
+            percentage=percentage,
+            examiner_count=agg['n'],
+            both_submitted=agg['n'] >= 2,
+        ))
+
+    FinalStationResult.objects.bulk_create(rows, batch_size=2000, ignore_conflicts=True)
+
+
+def reverse(apps, schema_editor):
+    apps.get_model('core', 'FinalStationResult').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0060_finalstationresult'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, reverse, elidable=True),
+    ]
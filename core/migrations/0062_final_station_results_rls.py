@@ -0,0 +1,79 @@
+"""
+RLS policies for final_station_results.
+
+Mirrors station_scores: global roles see everything, coordinators see
+their department (inline join to courses — no self-referencing helper),
+and examiners see/maintain rows for stations they are assigned to.
+Examiners need write access because submit/undo refresh the row.
+"""
+import sys
+from django.db import migrations
+
+
+RLS_SQL = """
+ALTER TABLE final_station_results ENABLE ROW LEVEL SECURITY;
+ALTER TABLE final_station_results FORCE  ROW LEVEL SECURITY;
+
+CREATE POLICY final_result_select ON final_station_results FOR SELECT USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = final_station_results.station_id
+  ) = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND examiner_has_station(station_id))
+);
+
+CREATE POLICY final_result_insert ON final_station_results FOR INSERT WITH CHECK (
+  is_global_role() OR is_coordinator() OR
+  (app_role() = 'EXAMINER' AND examiner_has_station(station_id))
+);
+
+CREATE POLICY final_result_update ON final_station_results FOR UPDATE USING (
+  is_global_role() OR is_coordinator() OR
+  (app_role() = 'EXAMINER' AND examiner_has_station(station_id))
+);
+
+CREATE POLICY final_result_delete ON final_station_results FOR DELETE USING (
+  is_global_role() OR is_coordinator() OR
+  (app_role() = 'EXAMINER' AND examiner_has_station(station_id))
+);
+"""
+
+REVERSE_SQL = """
+DROP POLICY IF EXISTS final_result_delete ON final_station_results;
+DROP POLICY IF EXISTS final_result_update ON final_station_results;
+DROP POLICY IF EXISTS final_result_insert ON final_station_results;
+DROP POLICY IF EXISTS final_result_select ON final_station_results;
+ALTER TABLE final_station_results DISABLE ROW LEVEL SECURITY;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0061_backfill_final_station_results'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=RLS_SQL, reverse_sql=REVERSE_SQL),
+    ]
+
+    def apply(self, project_state, schema_editor, collect_sql=False):
+        db_engine = schema_editor.connection.vendor
+        if db_engine != 'postgresql':
+            sys.stdout.write(
+                "\n  [RLS] Skipping 0062 — not PostgreSQL.\n"
+            )
+            return project_state
+        return super().apply(project_state, schema_editor, collect_sql)
+
+    def unapply(self, project_state, schema_editor, collect_sql=False):
+        db_engine = schema_editor.connection.vendor
+        if db_engine != 'postgresql':
+            return project_state
+        return super().unapply(project_state, schema_editor, collect_sql)
@@ -0,0 +1,46 @@
+"""
+Add the ExportJob table (background export jobs with file artifacts).
+"""
+import core.models.export_job
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0062_final_station_results_rls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('created_at', models.IntegerField(blank=True, default=None, help_text='UTC Unix timestamp when created', null=True)),
+                ('updated_at', models.IntegerField(blank=True, default=None, help_text='UTC Unix timestamp when last updated', null=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(db_index=True, max_length=40)),
+                ('dedupe_key', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('error', 'Error'), ('expired', 'Expired')], db_index=True, default='pending', max_length=10)),
+                ('progress', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('file', models.FileField(blank=True, max_length=255, upload_to=core.models.export_job.export_upload_to)),
+                ('filename', models.CharField(blank=True, default='', max_length=255)),
+                ('content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('size', models.BigIntegerField(default=0)),
+                ('started_at', models.IntegerField(blank=True, null=True)),
+                ('finished_at', models.IntegerField(blank=True, null=True)),
+                ('expires_at', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='core.examsession')),
+            ],
+            options={
+                'db_table': 'export_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['dedupe_key', 'status'], name='export_job_dedupe_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('dedupe_key',), name='unique_active_export_job')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+Add a denormalised department_id column to exam_sessions, paths, stations,
+session_students and station_scores (see core.utils.department_scope).
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0063_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsession',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.department'),
+        ),
+        migrations.AddField(
+            model_name='path',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.department'),
+        ),
+        migrations.AddField(
+            model_name='sessionstudent',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.department'),
+        ),
+        migrations.AddField(
+            model_name='station',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.department'),
+        ),
+        migrations.AddField(
+            model_name='stationscore',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.department'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+"""
+Backfill the denormalised department_id columns, top down, with one
+set-based UPDATE per table (correlated subquery on the parent's column).
+
+The tables have FORCE ROW LEVEL SECURITY on PostgreSQL, so the backfill
+runs with the global role set for the migration transaction only.
+"""
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill(apps, schema_editor):
+    Exam = apps.get_model('core', 'Exam')
+    ExamSession = apps.get_model('core', 'ExamSession')
+    Path = apps.get_model('core', 'Path')
+    Station = apps.get_model('core', 'Station')
+    SessionStudent = apps.get_model('core', 'SessionStudent')
+    StationScore = apps.get_model('core', 'StationScore')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('app.current_role', 'SUPERUSER', true)")
+
+    from_exam = Subquery(
+        Exam.objects.filter(pk=OuterRef('exam_id')).values('course__department_id')[:1]
+    )
+    from_session = Subquery(
+        ExamSession.objects.filter(pk=OuterRef('session_id')).values('department_id')[:1]
+    )
+    ExamSession.objects.update(department_id=from_exam)
+    Path.objects.update(department_id=from_session)
+    SessionStudent.objects.update(department_id=from_session)
+    Station.objects.filter(path__isnull=False).update(
+        department_id=Subquery(Path.objects.filter(pk=OuterRef('path_id')).values('department_id')[:1]),
+    )
+    Station.objects.filter(path__isnull=True).update(department_id=from_exam)
+    StationScore.objects.update(
+        department_id=Subquery(Station.objects.filter(pk=OuterRef('station_id')).values('department_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0064_denormalized_department'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,539 @@
+"""
+Switch the department RLS checks to the denormalised department_id column.
+
+Since 0059 every coordinator check walked up to ``courses`` per row —
+four joins for stations, five for checklist items and item scores.  With
+department_id maintained on exam_sessions / paths / stations /
+station_scores (0064, core.utils.department_scope) the SELECT, UPDATE and
+DELETE policies become a single indexed column comparison on those tables,
+and one primary-key hop for checklist_items, examiner_assignments,
+item_scores and final_station_results.
+
+INSERT policies are unchanged: they still validate the parent hierarchy,
+once per inserted row, rather than trusting the column being written.
+
+The *_department_id() helper functions read the column too.
+"""
+import sys
+from django.db import migrations
+
+
+FORWARD_SQL = """
+-- ════════════════════════════════════════════════════════════════
+-- Helper functions — one lookup instead of the walk to courses
+-- ════════════════════════════════════════════════════════════════
+CREATE OR REPLACE FUNCTION station_department_id(p_station_id UUID)
+RETURNS BIGINT AS $$
+  SELECT department_id FROM stations WHERE id = p_station_id
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION session_department_id(p_session_id UUID)
+RETURNS BIGINT AS $$
+  SELECT department_id FROM exam_sessions WHERE id = p_session_id
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION path_department_id(p_path_id UUID)
+RETURNS BIGINT AS $$
+  SELECT department_id FROM paths WHERE id = p_path_id
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+
+-- ════════════════════════════════════════════════════════════════
+-- EXAM_SESSIONS
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS session_select ON exam_sessions;
+CREATE POLICY session_select ON exam_sessions FOR SELECT USING (
+  is_global_role() OR department_id = app_department_id()
+);
+
+DROP POLICY IF EXISTS session_update ON exam_sessions;
+CREATE POLICY session_update ON exam_sessions FOR UPDATE USING (
+  is_global_role() OR (is_coordinator() AND department_id = app_department_id())
+);
+
+DROP POLICY IF EXISTS session_delete ON exam_sessions;
+CREATE POLICY session_delete ON exam_sessions FOR DELETE USING (
+  is_global_role() OR (is_coordinator() AND department_id = app_department_id())
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- PATHS
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS path_select ON paths;
+CREATE POLICY path_select ON paths FOR SELECT USING (
+  is_global_role() OR department_id = app_department_id()
+);
+
+DROP POLICY IF EXISTS path_update ON paths;
+CREATE POLICY path_update ON paths FOR UPDATE USING (
+  is_global_role() OR (is_coordinator() AND department_id = app_department_id())
+);
+
+DROP POLICY IF EXISTS path_delete ON paths;
+CREATE POLICY path_delete ON paths FOR DELETE USING (
+  is_global_role() OR (is_coordinator() AND department_id = app_department_id())
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- STATIONS
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS station_select ON stations;
+CREATE POLICY station_select ON stations FOR SELECT USING (
+  is_global_role() OR department_id = app_department_id()
+);
+
+DROP POLICY IF EXISTS station_update ON stations;
+CREATE POLICY station_update ON stations FOR UPDATE USING (
+  is_global_role() OR (is_coordinator() AND department_id = app_department_id())
+);
+
+DROP POLICY IF EXISTS station_delete ON stations;
+CREATE POLICY station_delete ON stations FOR DELETE USING (
+  is_global_role() OR (is_coordinator() AND department_id = app_department_id())
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- CHECKLIST_ITEMS — one hop to stations
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS checklist_select ON checklist_items;
+CREATE POLICY checklist_select ON checklist_items FOR SELECT USING (
+  is_global_role() OR
+  (SELECT st.department_id FROM stations st WHERE st.id = checklist_items.station_id)
+    = app_department_id()
+);
+
+DROP POLICY IF EXISTS checklist_update ON checklist_items;
+CREATE POLICY checklist_update ON checklist_items FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT st.department_id FROM stations st WHERE st.id = checklist_items.station_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS checklist_delete ON checklist_items;
+CREATE POLICY checklist_delete ON checklist_items FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT st.department_id FROM stations st WHERE st.id = checklist_items.station_id
+  ) = app_department_id())
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- EXAMINER_ASSIGNMENTS — one hop to stations
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS assign_select ON examiner_assignments;
+CREATE POLICY assign_select ON examiner_assignments FOR SELECT USING (
+  is_global_role() OR
+  (SELECT st.department_id FROM stations st WHERE st.id = examiner_assignments.station_id)
+    = app_department_id() OR
+  (app_role() = 'EXAMINER' AND examiner_id = app_user_id())
+);
+
+DROP POLICY IF EXISTS assign_update ON examiner_assignments;
+CREATE POLICY assign_update ON examiner_assignments FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT st.department_id FROM stations st WHERE st.id = examiner_assignments.station_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS assign_delete ON examiner_assignments;
+CREATE POLICY assign_delete ON examiner_assignments FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT st.department_id FROM stations st WHERE st.id = examiner_assignments.station_id
+  ) = app_department_id())
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- STATION_SCORES
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS score_select ON station_scores;
+CREATE POLICY score_select ON station_scores FOR SELECT USING (
+  is_global_role() OR
+  department_id = app_department_id() OR
+  (app_role() = 'EXAMINER' AND examiner_id = app_user_id())
+);
+
+DROP POLICY IF EXISTS score_update ON station_scores;
+CREATE POLICY score_update ON station_scores FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND department_id = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND examiner_id = app_user_id())
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- ITEM_SCORES — one hop to station_scores
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS item_score_select ON item_scores;
+CREATE POLICY item_score_select ON item_scores FOR SELECT USING (
+  is_global_role() OR
+  (SELECT ss.department_id FROM station_scores ss WHERE ss.id = item_scores.station_score_id)
+    = app_department_id() OR
+  (app_role() = 'EXAMINER' AND EXISTS (
+    SELECT 1 FROM station_scores ss
+    WHERE ss.id = item_scores.station_score_id
+      AND ss.examiner_id = app_user_id()
+  ))
+);
+
+DROP POLICY IF EXISTS item_score_update ON item_scores;
+CREATE POLICY item_score_update ON item_scores FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT ss.department_id FROM station_scores ss WHERE ss.id = item_scores.station_score_id
+  ) = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND EXISTS (
+    SELECT 1 FROM station_scores ss
+    WHERE ss.id = item_scores.station_score_id
+      AND ss.examiner_id = app_user_id()
+  ))
+);
+
+
+-- ════════════════════════════════════════════════════════════════
+-- FINAL_STATION_RESULTS — one hop to stations
+-- ════════════════════════════════════════════════════════════════
+DROP POLICY IF EXISTS final_result_select ON final_station_results;
+CREATE POLICY final_result_select ON final_station_results FOR SELECT USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT st.department_id FROM stations st WHERE st.id = final_station_results.station_id
+  ) = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND examiner_has_station(station_id))
+);
+"""
+
+
+REVERSE_SQL = """
+-- Restore the hierarchy walks (0027 helpers, 0059 / 0062 policies)
+CREATE OR REPLACE FUNCTION station_department_id(p_station_id UUID)
+RETURNS BIGINT AS $$
+  SELECT c.department_id
+  FROM   stations      st
+  JOIN   paths         pa ON pa.id = st.path_id
+  JOIN   exam_sessions se ON se.id = pa.session_id
+  JOIN   exams         ex ON ex.id = se.exam_id
+  JOIN   courses       c  ON c.id  = ex.course_id
+  WHERE  st.id = p_station_id
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION session_department_id(p_session_id UUID)
+RETURNS BIGINT AS $$
+  SELECT c.department_id
+  FROM   exam_sessions se
+  JOIN   exams         ex ON ex.id = se.exam_id
+  JOIN   courses       c  ON c.id  = ex.course_id
+  WHERE  se.id = p_session_id
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION path_department_id(p_path_id UUID)
+RETURNS BIGINT AS $$
+  SELECT c.department_id
+  FROM   paths         pa
+  JOIN   exam_sessions se ON se.id = pa.session_id
+  JOIN   exams         ex ON ex.id = se.exam_id
+  JOIN   courses       c  ON c.id  = ex.course_id
+  WHERE  pa.id = p_path_id
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+DROP POLICY IF EXISTS session_select ON exam_sessions;
+CREATE POLICY session_select ON exam_sessions FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM exams e JOIN courses c ON c.id = e.course_id
+   WHERE e.id = exam_sessions.exam_id
+  ) = app_department_id()
+);
+
+DROP POLICY IF EXISTS session_update ON exam_sessions;
+CREATE POLICY session_update ON exam_sessions FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM exams e JOIN courses c ON c.id = e.course_id
+    WHERE e.id = exam_sessions.exam_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS session_delete ON exam_sessions;
+CREATE POLICY session_delete ON exam_sessions FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM exams e JOIN courses c ON c.id = e.course_id
+    WHERE e.id = exam_sessions.exam_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS path_select ON paths;
+CREATE POLICY path_select ON paths FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM exam_sessions es
+   JOIN exams e ON e.id = es.exam_id
+   JOIN courses c ON c.id = e.course_id
+   WHERE es.id = paths.session_id
+  ) = app_department_id()
+);
+
+DROP POLICY IF EXISTS path_update ON paths;
+CREATE POLICY path_update ON paths FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM exam_sessions es
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE es.id = paths.session_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS path_delete ON paths;
+CREATE POLICY path_delete ON paths FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM exam_sessions es
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE es.id = paths.session_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS station_select ON stations;
+CREATE POLICY station_select ON stations FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM paths p
+   JOIN exam_sessions es ON es.id = p.session_id
+   JOIN exams e ON e.id = es.exam_id
+   JOIN courses c ON c.id = e.course_id
+   WHERE p.id = stations.path_id
+  ) = app_department_id()
+);
+
+DROP POLICY IF EXISTS station_update ON stations;
+CREATE POLICY station_update ON stations FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM paths p
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE p.id = stations.path_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS station_delete ON stations;
+CREATE POLICY station_delete ON stations FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM paths p
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE p.id = stations.path_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS checklist_select ON checklist_items;
+CREATE POLICY checklist_select ON checklist_items FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM stations st
+   JOIN paths p ON p.id = st.path_id
+   JOIN exam_sessions es ON es.id = p.session_id
+   JOIN exams e ON e.id = es.exam_id
+   JOIN courses c ON c.id = e.course_id
+   WHERE st.id = checklist_items.station_id
+  ) = app_department_id()
+);
+
+DROP POLICY IF EXISTS checklist_update ON checklist_items;
+CREATE POLICY checklist_update ON checklist_items FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = checklist_items.station_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS checklist_delete ON checklist_items;
+CREATE POLICY checklist_delete ON checklist_items FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = checklist_items.station_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS assign_select ON examiner_assignments;
+CREATE POLICY assign_select ON examiner_assignments FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM stations st
+   JOIN paths p ON p.id = st.path_id
+   JOIN exam_sessions es ON es.id = p.session_id
+   JOIN exams e ON e.id = es.exam_id
+   JOIN courses c ON c.id = e.course_id
+   WHERE st.id = examiner_assignments.station_id
+  ) = app_department_id() OR
+  (app_role() = 'EXAMINER' AND examiner_id = app_user_id())
+);
+
+DROP POLICY IF EXISTS assign_update ON examiner_assignments;
+CREATE POLICY assign_update ON examiner_assignments FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = examiner_assignments.station_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS assign_delete ON examiner_assignments;
+CREATE POLICY assign_delete ON examiner_assignments FOR DELETE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = examiner_assignments.station_id
+  ) = app_department_id())
+);
+
+DROP POLICY IF EXISTS score_select ON station_scores;
+CREATE POLICY score_select ON station_scores FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM stations st
+   JOIN paths p ON p.id = st.path_id
+   JOIN exam_sessions es ON es.id = p.session_id
+   JOIN exams e ON e.id = es.exam_id
+   JOIN courses c ON c.id = e.course_id
+   WHERE st.id = station_scores.station_id
+  ) = app_department_id() OR
+  (app_role() = 'EXAMINER' AND examiner_id = app_user_id())
+);
+
+DROP POLICY IF EXISTS score_update ON station_scores;
+CREATE POLICY score_update ON station_scores FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = station_scores.station_id
+  ) = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND examiner_id = app_user_id())
+);
+
+DROP POLICY IF EXISTS item_score_select ON item_scores;
+CREATE POLICY item_score_select ON item_scores FOR SELECT USING (
+  is_global_role() OR
+  (SELECT c.department_id
+   FROM checklist_items ci
+   JOIN stations st ON st.id = ci.station_id
+   JOIN paths p ON p.id = st.path_id
+   JOIN exam_sessions es ON es.id = p.session_id
+   JOIN exams e ON e.id = es.exam_id
+   JOIN courses c ON c.id = e.course_id
+   WHERE ci.id = item_scores.checklist_item_id
+  ) = app_department_id() OR
+  (app_role() = 'EXAMINER' AND EXISTS (
+    SELECT 1 FROM station_scores ss
+    WHERE ss.id = item_scores.station_score_id
+      AND ss.examiner_id = app_user_id()
+  ))
+);
+
+DROP POLICY IF EXISTS item_score_update ON item_scores;
+CREATE POLICY item_score_update ON item_scores FOR UPDATE USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM checklist_items ci
+    JOIN stations st ON st.id = ci.station_id
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE ci.id = item_scores.checklist_item_id
+  ) = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND EXISTS (
+    SELECT 1 FROM station_scores ss
+    WHERE ss.id = item_scores.station_score_id
+      AND ss.examiner_id = app_user_id()
+  ))
+);
+
+DROP POLICY IF EXISTS final_result_select ON final_station_results;
+CREATE POLICY final_result_select ON final_station_results FOR SELECT USING (
+  is_global_role() OR
+  (is_coordinator() AND (
+    SELECT c.department_id
+    FROM stations st
+    JOIN paths p ON p.id = st.path_id
+    JOIN exam_sessions es ON es.id = p.session_id
+    JOIN exams e ON e.id = es.exam_id
+    JOIN courses c ON c.id = e.course_id
+    WHERE st.id = final_station_results.station_id
+  ) = app_department_id()) OR
+  (app_role() = 'EXAMINER' AND examiner_has_station(station_id))
+);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0065_backfill_department'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=FORWARD_SQL, reverse_sql=REVERSE_SQL),
+    ]
+
+    def apply(self, project_state, schema_editor, collect_sql=False):
+        db_engine = schema_editor.connection.vendor
+        if db_engine != 'postgresql':
+            sys.stdout.write(
+                "\n  [RLS] Skipping 0066 — not PostgreSQL.\n"
+            )
+            return project_state
+        return super().apply(project_state, schema_editor, collect_sql)
+
+    def unapply(self, project_state, schema_editor, collect_sql=False):
+        db_engine = schema_editor.connection.vendor
+        if db_engine != 'postgresql':
+            return project_state
+        return super().unapply(project_state, schema_editor, collect_sql)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0067_audit_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditIntegrityCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50)),
+                ('range_start', models.BigIntegerField()),
+                ('range_end', models.BigIntegerField(help_text='Exclusive upper id bound')),
+                ('row_count', models.IntegerField()),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('signature', models.CharField(max_length=64)),
+                ('verified_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Audit Integrity Checkpoint',
+                'verbose_name_plural': 'Audit Integrity Checkpoints',
+                'db_table': 'audit_integrity_checkpoints',
+                'ordering': ['table', 'range_start'],
+                'default_permissions': ('view',),
+                'constraints': [models.UniqueConstraint(fields=('table', 'range_start'), name='uq_audit_checkpoint_range')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+"""
+Optional monthly partitioning of audit_logs / audit_logs_archive.
+
+Only applied on PostgreSQL with AUDIT_LOG_PARTITIONING enabled; otherwise a
+no-op (enable it later with `manage.py audit_partitions --convert`).
+See core.utils.audit_partitions.
+"""
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_audit_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    if not getattr(settings, 'AUDIT_LOG_PARTITIONING', False):
+        return
+    from core.utils.audit_partitions import partition_audit_tables as convert
+    convert(getattr(settings, 'AUDIT_PARTITION_MONTHS_AHEAD', 3))
+
+
+def unpartition_audit_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from core.utils.audit_partitions import unpartition_audit_tables as revert
+    revert()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0068_audit_integrity_checkpoints'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_tables, unpartition_audit_tables),
+    ]
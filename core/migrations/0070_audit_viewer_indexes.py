@@ -0,0 +1,42 @@
+"""
+Indexes for the audit log viewer (see core.utils.audit_viewer).
+
+idx_audit_ts_id serves keyset pagination on (timestamp, id).  On PostgreSQL
+idx_audit_fts is a GIN index over the full-text document searched by the
+viewer; its expression must stay identical to audit_viewer.FTS_DOCUMENT.
+"""
+from django.db import migrations, models
+
+
+FTS_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_audit_fts ON audit_logs USING gin ("
+    "to_tsvector('simple', coalesce(audit_logs.username, '') || ' ' || "
+    "coalesce(audit_logs.resource_label, '') || ' ' || coalesce(audit_logs.description, '')))"
+)
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(FTS_INDEX_SQL)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS idx_audit_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0069_audit_log_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp', 'id'], name='idx_audit_ts_id'),
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -6,7 +6,7 @@ from .theme import Theme, DEFAULT_THEMES
 from .course import Course, ILO
 from .exam import Exam, Station, ChecklistItem
 from .session import ExamSession, SessionStudent
-from .scoring import StationScore, ItemScore
+from .scoring import StationScore, ItemScore, FinalStationResult
 from .department import Department
 from .examiner import Examiner, ExaminerAssignment
 from .path import Path, StudentPath
@@ -14,10 +14,11 @@ from .library import ChecklistLibrary
 from .station_variant import StationVariant
 from .template_library import TemplateLibrary
 from .station_template import StationTemplate
-from .audit import AuditLog, AuditLogArchive
+from .audit import AuditLog, AuditLogArchive, AuditIntegrityCheckpoint
 from .login_audit import LoginAuditLog
 from .user_session import UserSession
 from .user_profile import UserProfile
+from .export_job import ExportJob
 
 __all__ = [
     # Base
@@ -34,7 +35,7 @@ __all__ = [
     # Paths
     'Path', 'StudentPath',
     # Scoring
-    'StationScore', 'ItemScore',
+    'StationScore', 'ItemScore', 'FinalStationResult',
     # Examiners
     'Examiner', 'ExaminerAssignment',
     # Departments
@@ -42,9 +43,12 @@ __all__ = [
     # Audit
     'AuditLog',
     'AuditLogArchive',
+    'AuditIntegrityCheckpoint',
     'LoginAuditLog',
     # Session tracking
     'UserSession',
     # User profile
     'UserProfile',
+    # Background exports
+    'ExportJob',
 ]
@@ -14,6 +14,7 @@ import json as _json
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -290,7 +291,9 @@ class AuditLog(models.Model):
 
     id = models.BigAutoField(primary_key=True, editable=False)
 
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Assigned in Python (not auto_now_add) so the checksum, which covers
+    # it, is known before the row is inserted
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     # Who performed the action
     user = models.ForeignKey(
@@ -372,20 +375,51 @@ class AuditLog(models.Model):
             models.Index(fields=['department_id', 'timestamp'], name='idx_audit_dept_ts'),
             models.Index(fields=['action', 'timestamp'], name='idx_audit_action_ts'),
             models.Index(fields=['status', 'timestamp'], name='idx_audit_status_ts'),
+            # Keyset pagination of the admin viewer (core.utils.audit_viewer)
+            models.Index(fields=['timestamp', 'id'], name='idx_audit_ts_id'),
         ]
 
-    def save(self, *args, **kwargs):
-        needs_checksum = not self.checksum
-        super().save(*args, **kwargs)
-        # Compute checksum AFTER super().save() so auto_now_add has set
-        # self.timestamp before we hash it. Use a direct UPDATE to avoid
-        # a recursive save() call.
-        if needs_checksum:
+    @classmethod
+    def from_payload(cls, payload):
+        """
+        Build a sealed (timestamped and checksummed) entry from an
+        AuditLogService payload dict, ready for a single INSERT or
+        ``bulk_create``.
+        """
+        return cls(
+            user_id=payload.get('user_id'),
+            username=payload.get('username', ''),
+            user_role=payload.get('user_role', ''),
+            department_id=payload.get('department_id'),
+            action=payload.get('action', ''),
+            status=payload.get('status', STATUS_SUCCESS),
+            resource_type=payload.get('resource_type', ''),
+            resource_id=payload.get('resource_id', ''),
+            resource_label=payload.get('resource_label', ''),
+            old_value=payload.get('old_value'),
+            new_value=payload.get('new_value'),
+            description=payload.get('description', ''),
+            ip_address=payload.get('ip_address'),
+            user_agent=payload.get('user_agent') or '',
+            request_method=payload.get('request_method') or '',
+            request_path=payload.get('request_path') or '',
+            extra_data=payload.get('extra_data'),
+        ).seal()
+
+    def seal(self):
+        """Fill in the timestamp and checksum before the insert; returns self."""
+        if self.timestamp is None:
+            self.timestamp = timezone.now()
+        if not self.checksum:
             self.checksum = compute_checksum(
                 self.user_id, self.action, self.resource_id,
                 self.timestamp, self.old_value, self.new_value,
             )
-            type(self).objects.filter(pk=self.pk).update(checksum=self.checksum)
+        return self
+
+    def save(self, *args, **kwargs):
+        self.seal()
+        super().save(*args, **kwargs)
 
     def verify_checksum(self):
         """Return True if the stored checksum matches the recomputed value."""
@@ -454,3 +488,37 @@ class AuditLogArchive(models.Model):
         verbose_name = 'Audit Log (Archived)'
         verbose_name_plural = 'Audit Logs (Archived)'
         default_permissions = ('add', 'view')  # No change/delete
+
+
+class AuditIntegrityCheckpoint(models.Model):
+    """
+    Signed digest of an id range of an audit table that
+    verify_audit_integrity found intact.
+
+    ``fingerprint`` is a database-side digest of the range's rows; later
+    runs skip the range while it is unchanged.  ``signature`` is an HMAC
+    (SECRET_KEY) over the range, its fingerprint and the signature of the
+    previous checkpoint of the table, so the checkpoints form a hash chain
+    that cannot be edited to hide a tampered row.
+    """
+
+    table = models.CharField(max_length=50)
+    range_start = models.BigIntegerField()
+    range_end = models.BigIntegerField(help_text='Exclusive upper id bound')
+    row_count = models.IntegerField()
+    fingerprint = models.CharField(max_length=64)
+    signature = models.CharField(max_length=64)
+    verified_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'audit_integrity_checkpoints'
+        ordering = ['table', 'range_start']
+        verbose_name = 'Audit Integrity Checkpoint'
+        verbose_name_plural = 'Audit Integrity Checkpoints'
+        default_permissions = ('view',)
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'range_start'], name='uq_audit_checkpoint_range'),
+        ]
+
+    def __str__(self):
+        return f'{self.table} [{self.range_start}, {self.range_end})'
@@ -64,17 +64,15 @@ class Exam(TimestampMixin):
         self.save()
 
     def get_total_marks(self):
-        total = 0
-        for station in self.stations.all():
-            total += sum(item.points for item in station.checklist_items.all())
-        return total
+        from core.utils.station_catalog import StationCatalog
+        return StationCatalog.total_max_score(self.stations.values_list('id', flat=True))
 
     def get_ilo_distribution(self):
+        from core.utils.station_catalog import StationCatalog
         distribution = {}
-        for station in self.stations.all():
-            for item in station.checklist_items.all():
-                ilo_id = item.ilo_id
-                distribution[ilo_id] = distribution.get(ilo_id, 0) + item.points
+        for entry in StationCatalog.stations(self.stations.values_list('id', flat=True)).values():
+            for ilo_id, points in entry['ilo_points'].items():
+                distribution[ilo_id] = distribution.get(ilo_id, 0) + points
         return distribution
 
     def validate_marks(self):
@@ -122,6 +120,12 @@ class Station(TimestampMixin):
         Exam, on_delete=models.CASCADE, null=True, blank=True,
         related_name='stations', db_index=True
     )
+    # Denormalised path.department (exam.course.department when unlinked) (see core.utils.department_scope)
+    department = models.ForeignKey(
+        'core.Department', on_delete=models.SET_NULL,
+        null=True, blank=True, editable=False,
+        related_name='+', db_index=True,
+    )
 
     station_number = models.IntegerField()
     name = models.CharField(max_length=100)
@@ -186,9 +190,14 @@ class Station(TimestampMixin):
         self.save()
 
     def get_max_score(self):
-        return sum(item.points for item in self.checklist_items.all())
+        if 'checklist_items' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(item.points for item in self.checklist_items.all())
+        from core.utils.station_catalog import StationCatalog
+        return StationCatalog.max_score(self.pk)
 
     def to_dict(self, include_items=False):
+        from core.utils.station_catalog import StationCatalog
+        totals = StationCatalog.station(self.pk) or {'max_score': 0, 'item_count': 0}
         data = {
             'id': str(self.id),
             'path_id': str(self.path_id) if self.path_id else None,
@@ -200,8 +209,8 @@ class Station(TimestampMixin):
             'duration_minutes': self.duration_minutes,
             'active': self.active,
             'is_deleted': self.is_deleted,
-            'max_score': self.get_max_score(),
-            'item_count': self.checklist_items.count(),
+            'max_score': totals['max_score'],
+            'item_count': totals['item_count'],
         }
         if include_items:
             data['checklist_items'] = [item.to_dict() for item in self.checklist_items.all()]
@@ -213,7 +213,8 @@ class ExaminerAssignment(TimestampMixin):
 
     @property
     def station_max_score(self):
-        return self.station.get_max_score() if self.station else 0
+        from core.utils.station_catalog import StationCatalog
+        return StationCatalog.max_score(self.station_id) if self.station_id else 0
 
     @property
     def station_scenario(self):
@@ -0,0 +1,83 @@
+"""
+ExportJob model – background report/export generation with file artifacts.
+"""
+import uuid
+
+from django.db import models
+
+from .mixins import TimestampMixin
+
+
+def export_upload_to(instance, filename):
+    """Artifacts live under exports/<job id>/ so names never collide."""
+    return f'exports/{instance.pk}/{filename}'
+
+
+class ExportJob(TimestampMixin):
+    """
+    One requested export (CSV / XLSX / HTML / PDF) for an exam session.
+
+    Created by the creator exports API and run by core.tasks.run_export_job
+    (Celery) or inline when no broker is configured.  Identical requests
+    share a job through ``dedupe_key`` while it is pending, running, or
+    recently finished.  The artifact is written to file storage and removed
+    after ``expires_at`` by core.tasks.cleanup_expired_exports.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_ERROR = 'error'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_ERROR, 'Error'),
+        (STATUS_EXPIRED, 'Expired'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=40, db_index=True)
+    session = models.ForeignKey(
+        'core.ExamSession', on_delete=models.CASCADE,
+        related_name='export_jobs', db_index=True
+    )
+    requested_by = models.ForeignKey(
+        'core.Examiner', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='export_jobs'
+    )
+
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True
+    )
+    progress = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    file = models.FileField(upload_to=export_upload_to, max_length=255, blank=True)
+    filename = models.CharField(max_length=255, blank=True, default='')
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    size = models.BigIntegerField(default=0)
+
+    started_at = models.IntegerField(null=True, blank=True)
+    finished_at = models.IntegerField(null=True, blank=True)
+    expires_at = models.IntegerField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        db_table = 'export_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['dedupe_key', 'status'], name='export_job_dedupe_idx'),
+        ]
+        constraints = [
+            # At most one pending/running job per identical request
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='unique_active_export_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f'ExportJob {self.kind} ({self.status}) for session {self.session_id}'
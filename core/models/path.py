@@ -21,6 +21,12 @@ class Path(TimestampMixin):
         'core.ExamSession', on_delete=models.CASCADE,
         related_name='paths', db_index=True
     )
+    # Denormalised session.department (see core.utils.department_scope)
+    department = models.ForeignKey(
+        'core.Department', on_delete=models.SET_NULL,
+        null=True, blank=True, editable=False,
+        related_name='+', db_index=True,
+    )
 
     name = models.CharField(max_length=50)
 
@@ -57,7 +63,8 @@ class Path(TimestampMixin):
 
     @property
     def total_marks(self):
-        return sum(s.get_max_score() for s in self.stations.filter(active=True))
+        from core.utils.station_catalog import StationCatalog
+        return sum(entry['max_score'] for entry in StationCatalog.path_stations(self.pk))
 
     @property
     def total_duration(self):
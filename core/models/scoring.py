@@ -20,6 +20,12 @@ class StationScore(models.Model):
         'core.Station', on_delete=models.CASCADE,
         related_name='scores', db_index=True
     )
+    # Denormalised station.department (see core.utils.department_scope)
+    department = models.ForeignKey(
+        'core.Department', on_delete=models.SET_NULL,
+        null=True, blank=True, editable=False,
+        related_name='+', db_index=True,
+    )
     examiner = models.ForeignKey(
         'core.Examiner', on_delete=models.SET_NULL,
         null=True, blank=True,
@@ -151,3 +157,154 @@ class ItemScore(models.Model):
 
     def __str__(self):
         return f'ItemScore {self.checklist_item_id} = {self.score}'
+
+
+class FinalStationResult(models.Model):
+    """
+    Materialized examiner-averaged result per (student, station).
+
+    Maintained incrementally from submitted StationScore rows (submit, undo,
+    correction, checklist rescale) so reports read one indexed row instead of
+    re-grouping every examiner's score on each request.
+    """
+
+    id = models.AutoField(primary_key=True)
+    session = models.ForeignKey(
+        'core.ExamSession', on_delete=models.CASCADE,
+        related_name='final_results', db_index=True
+    )
+    session_student = models.ForeignKey(
+        'core.SessionStudent', on_delete=models.CASCADE,
+        related_name='final_results'
+    )
+    station = models.ForeignKey(
+        'core.Station', on_delete=models.CASCADE,
+        related_name='final_results', db_index=True
+    )
+
+    final_score = models.FloatField(default=0)
+    max_score = models.FloatField(null=True, blank=True)
+    percentage = models.FloatField(default=0)
+    examiner_count = models.IntegerField(default=0)
+    both_submitted = models.BooleanField(default=False)
+
+    updated_at = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'final_station_results'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session_student', 'station'],
+                name='unique_final_result'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Final: Student {self.session_student_id} @ Station {self.station_id} = {self.final_score}'
+
+    @staticmethod
+    def compute(total, count, max_score):
+        """Return (final_score, percentage) using StationScore.get_final_score rounding."""
+        avg = Decimal(str(total or 0)) / Decimal(count)
+        final = float(avg.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        percentage = 0
+        if max_score:
+            pct = Decimal(str(final)) / Decimal(str(max_score)) * 100
+            percentage = float(pct.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        return final, percentage
+
+    @classmethod
+    def _rebuild(cls, scores, existing):
+        """
+        Upsert one row per (student, station) aggregated from the submitted
+        ``scores`` queryset, and delete rows in ``existing`` that no longer
+        have any submitted score behind them.
+        """
+        from django.db.models import Count, Max, Sum
+        from django.db.models.functions import Coalesce
+
+        aggregated = (
+            scores.filter(status='submitted')
+            .values('session_student_id', 'station_id', 'session_student__session_id')
+            .annotate(
+                total=Sum(Coalesce('total_score', 0.0)),
+                n=Count('id'),
+                max_total=Max('max_score'),
+            )
+        )
+        now = TimestampMixin.utc_timestamp()
+        rows = []
+        for agg in aggregated:
+            final, percentage = cls.compute(agg['total'], agg['n'], agg['max_total'])
+            rows.append(cls(
+                session_id=agg['session_student__session_id'],
+                session_student_id=agg['session_student_id'],
+                station_id=agg['station_id'],
+                final_score=final,
+                max_score=agg['max_total'],
+                percentage=percentage,
+                examiner_count=agg['n'],
+                both_submitted=agg['n'] >= 2,
+                updated_at=now,
+            ))
+
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['session_student', 'station'],
+                update_fields=[
+                    'final_score', 'max_score', 'percentage',
+                    'examiner_count', 'both_submitted', 'updated_at',
+                ],
+            )
+        keep = {(r.session_student_id, r.station_id) for r in rows}
+        stale = [
+            pk for pk, student_id, station_id
+            in existing.values_list('pk', 'session_student_id', 'station_id')
+            if (student_id, station_id) not in keep
+        ]
+        if stale:
+            cls.objects.filter(pk__in=stale).delete()
+        return len(rows)
+
+    @classmethod
+    def refresh(cls, session_student_id, station_id):
+        """Recompute the final result for one student at one station."""
+        return cls._rebuild(
+            StationScore.objects.filter(session_student_id=session_student_id, station_id=station_id),
+            cls.objects.filter(session_student_id=session_student_id, station_id=station_id),
+        )
+
+    @classmethod
+    def refresh_many(cls, pairs):
+        """
+        Recompute final results for a batch of (session_student_id, station_id)
+        pairs in one aggregate query (offline sync).  Rebuilds the students ×
+        stations cross product, which is a superset of ``pairs``.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return 0
+        student_ids = {student_id for student_id, _ in pairs}
+        station_ids = {station_id for _, station_id in pairs}
+        return cls._rebuild(
+            StationScore.objects.filter(session_student_id__in=student_ids, station_id__in=station_ids),
+            cls.objects.filter(session_student_id__in=student_ids, station_id__in=station_ids),
+        )
+
+    @classmethod
+    def refresh_station(cls, station_id):
+        """Recompute every final result for a station (e.g. after a checklist rescale)."""
+        return cls._rebuild(
+            StationScore.objects.filter(station_id=station_id),
+            cls.objects.filter(station_id=station_id),
+        )
+
+    @classmethod
+    def refresh_session(cls, session_id):
+        """Recompute every final result for a session (backfill / repair)."""
+        return cls._rebuild(
+            StationScore.objects.filter(session_student__session_id=session_id),
+            cls.objects.filter(session_id=session_id),
+        )
@@ -20,6 +20,12 @@ class ExamSession(models.Model):
     exam = models.ForeignKey(
         'core.Exam', on_delete=models.CASCADE, related_name='sessions', db_index=True
     )
+    # Denormalised exam.course.department (see core.utils.department_scope)
+    department = models.ForeignKey(
+        'core.Department', on_delete=models.SET_NULL,
+        null=True, blank=True, editable=False,
+        related_name='+', db_index=True,
+    )
 
     name = models.CharField(max_length=100)
 
@@ -91,6 +97,12 @@ class SessionStudent(models.Model):
         'core.Path', on_delete=models.SET_NULL,
         null=True, blank=True, related_name='students', db_index=True
     )
+    # Denormalised session.department (see core.utils.department_scope)
+    department = models.ForeignKey(
+        'core.Department', on_delete=models.SET_NULL,
+        null=True, blank=True, editable=False,
+        related_name='+', db_index=True,
+    )
 
     student_number = models.CharField(max_length=50, validators=[validate_student_number])
     full_name = models.CharField(max_length=150)
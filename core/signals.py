@@ -7,13 +7,16 @@ Listens to:
     Exam, ExamSession, Path, Station, ChecklistItem, ExaminerAssignment)
 
 Every significant change is recorded in the AuditLog via AuditLogService.
+Hierarchy entries are deferred to commit and flushed once per request
+(AuditLogService.log_deferred); set AUDIT_BUFFER_SIGNALS = False to write
+each entry immediately.
 """
 import logging
 import threading
 
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in, user_login_failed, user_logged_out
-from django.db.models.signals import post_save, pre_save, post_delete
+from django.db.models.signals import post_init, post_save, pre_save, post_delete
 from django.dispatch import receiver
 
 from core.models.login_audit import LoginAuditLog
@@ -330,10 +333,38 @@ def _snapshot(instance, model_name):
     return data
 
 
+# High-volume models whose loaded state is snapshotted in post_init, so the
+# pre_save diff comes from memory instead of an extra SELECT per save.
+# Only with AUDIT_BUFFER_SIGNALS; otherwise pre_save always SELECTs.
+_SNAPSHOT_ON_LOAD = ('StationScore', 'ItemScore')
+
+
+def _audit_post_init(sender, instance, **kwargs):
+    """Remember the tracked-field state of a freshly loaded/constructed instance."""
+    if not getattr(settings, 'AUDIT_BUFFER_SIGNALS', True):
+        return
+    model_name = type(instance).__name__
+    fields = _TRACKED_FIELDS.get(model_name, ())
+    # Touching a deferred field would cost a query per row — fall back to
+    # the pre_save SELECT for .only()/.defer() querysets instead.
+    if any(f not in instance.__dict__ for f in fields):
+        return
+    instance._audit_snapshot = _snapshot(instance, model_name)
+
+
+def _audit_log_fn():
+    """Deferred (buffered, on-commit) logging unless disabled in settings."""
+    from core.utils.audit import AuditLogService
+    if getattr(settings, 'AUDIT_BUFFER_SIGNALS', True):
+        return AuditLogService.log_deferred
+    return AuditLogService.log
+
+
 def _hierarchy_pre_save(sender, instance, **kwargs):
     """
     Capture the database state before save so we can diff in post_save.
-    Only fetches for UPDATE (existing PK).
+    Only fetches for UPDATE (existing PK), and only when the instance was
+    not loaded with an in-memory snapshot (see _audit_post_init).
     """
     model_name = type(instance).__name__
     if model_name not in _HIERARCHY_ACTION_MAP:
@@ -342,13 +373,21 @@ def _hierarchy_pre_save(sender, instance, **kwargs):
     pk = instance.pk
     if pk is None:
         return  # New instance — no old state
+    if instance._state.adding and model_name in _SNAPSHOT_ON_LOAD:
+        return  # UUID/auto PK set at construction, but nothing in the DB yet
+
+    key = f'{model_name}_{pk}'
+    if not hasattr(_pre_save_state, 'snapshots'):
+        _pre_save_state.snapshots = {}
+
+    loaded = getattr(instance, '_audit_snapshot', None)
+    if loaded is not None and getattr(settings, 'AUDIT_BUFFER_SIGNALS', True):
+        _pre_save_state.snapshots[key] = loaded
+        return
 
     try:
         old = type(instance).objects.filter(pk=pk).first()
         if old:
-            key = f'{model_name}_{pk}'
-            if not hasattr(_pre_save_state, 'snapshots'):
-                _pre_save_state.snapshots = {}
             _pre_save_state.snapshots[key] = _snapshot(old, model_name)
     except Exception:
         pass  # Never block the save
@@ -361,12 +400,14 @@ def _hierarchy_post_save(sender, instance, created, **kwargs):
     if not actions:
         return
 
-    from core.utils.audit import AuditLogService
-
     action = actions[0] if created else actions[1]
     new_val = _snapshot(instance, model_name)
     old_val = None
 
+    if model_name in _SNAPSHOT_ON_LOAD and getattr(settings, 'AUDIT_BUFFER_SIGNALS', True):
+        # The saved state is the baseline for the next save of this instance
+        instance._audit_snapshot = new_val
+
     if not created:
         key = f'{model_name}_{instance.pk}'
         old_val = getattr(_pre_save_state, 'snapshots', {}).pop(key, None)
@@ -375,7 +416,7 @@ def _hierarchy_post_save(sender, instance, created, **kwargs):
         if old_val and old_val == new_val:
             return
 
-    AuditLogService.log(
+    _audit_log_fn()(
         action=action,
         resource=instance,
         old_value=old_val,
@@ -391,11 +432,9 @@ def _hierarchy_post_delete(sender, instance, **kwargs):
     if not actions:
         return
 
-    from core.utils.audit import AuditLogService
-
     old_val = _snapshot(instance, model_name)
 
-    AuditLogService.log(
+    _audit_log_fn()(
         action=actions[2],
         resource=instance,
         old_value=old_val,
@@ -423,6 +462,8 @@ def connect_hierarchy_signals():
         pre_save.connect(_hierarchy_pre_save, sender=model, dispatch_uid=f'audit_pre_{model.__name__}')
         post_save.connect(_hierarchy_post_save, sender=model, dispatch_uid=f'audit_post_{model.__name__}')
         post_delete.connect(_hierarchy_post_delete, sender=model, dispatch_uid=f'audit_del_{model.__name__}')
+        if model.__name__ in _SNAPSHOT_ON_LOAD:
+            post_init.connect(_audit_post_init, sender=model, dispatch_uid=f'audit_init_{model.__name__}')
     
     # Connect scoring sync signals for ChecklistItem changes
     post_save.connect(
@@ -436,95 +477,184 @@ def connect_hierarchy_signals():
         dispatch_uid='sync_max_score_on_item_delete',
     )
 
+    # Drop compiled checklist payloads when their source rows change
+    from core.models import Theme
+    for model in (Station, ILO, Theme):
+        post_save.connect(
+            invalidate_checklist_cache, sender=model,
+            dispatch_uid=f'checklist_cache_save_{model.__name__}',
+        )
+        post_delete.connect(
+            invalidate_checklist_cache, sender=model,
+            dispatch_uid=f'checklist_cache_del_{model.__name__}',
+        )
 
-# ── Sync max_score + ItemScore rescaling when checklist item points change ─
-def sync_station_max_score(sender, instance, **kwargs):
-    """
-    Whenever a ChecklistItem is saved or deleted:
+    # Drop cached RLS context when an examiner's visible stations change
+    post_save.connect(
+        invalidate_rls_context_cache, sender=ExaminerAssignment,
+        dispatch_uid='rls_context_assignment_save',
+    )
+    post_delete.connect(
+        invalidate_rls_context_cache, sender=ExaminerAssignment,
+        dispatch_uid='rls_context_assignment_del',
+    )
+    post_save.connect(
+        invalidate_rls_context_cache, sender=ExamSession,
+        dispatch_uid='rls_context_session_save',
+    )
+    post_save.connect(
+        invalidate_rls_context_cache, sender=settings.AUTH_USER_MODEL,
+        dispatch_uid='rls_context_user_save',
+    )
+
+    # Keep the denormalised department_id of the exam hierarchy in step
+    from core.utils.department_scope import fill_department_id, propagate_department_change
+    for model in (ExamSession, Path, Station, SessionStudent, StationScore):
+        pre_save.connect(
+            fill_department_id, sender=model,
+            dispatch_uid=f'department_fill_{model.__name__}',
+        )
+    for model in (Course, Exam):
+        post_save.connect(
+            propagate_department_change, sender=model,
+            dispatch_uid=f'department_sync_{model.__name__}',
+        )
+
+    # Retire StationCatalog entries when stations or checklist items change
+    for model in (Station, ChecklistItem):
+        post_save.connect(
+            invalidate_station_catalog_cache, sender=model,
+            dispatch_uid=f'station_catalog_save_{model.__name__}',
+        )
+        post_delete.connect(
+            invalidate_station_catalog_cache, sender=model,
+            dispatch_uid=f'station_catalog_del_{model.__name__}',
+        )
+
+    # Drop per-session student caches when students are added, moved or removed
+    post_save.connect(
+        invalidate_session_students_cache, sender=SessionStudent,
+        dispatch_uid='session_students_save',
+    )
+    post_delete.connect(
+        invalidate_session_students_cache, sender=SessionStudent,
+        dispatch_uid='session_students_del',
+    )
+
+    # Drop cached session detail aggregates when the session layout changes
+    # (ChecklistItem changes: see sync_station_max_score)
+    for model in (Path, Station, ExaminerAssignment):
+        post_save.connect(
+            invalidate_session_detail_cache, sender=model,
+            dispatch_uid=f'session_detail_save_{model.__name__}',
+        )
+        post_delete.connect(
+            invalidate_session_detail_cache, sender=model,
+            dispatch_uid=f'session_detail_del_{model.__name__}',
+        )
 
-    1. ITEM-LEVEL: For every existing ItemScore for this item, rescale the
-       student's earned score based on the old/new points ratio:
-         - full marks (score == old_max_points)  → award new full points
-         - zero (wrong / not done)               → keep 0, update max_points
-         - partial                               → scale proportionally
-       Then update max_points to the new value.
 
-    2. STATION-LEVEL: Recompute total_score and max_score on every
-       StationScore for this station (including already-submitted rows).
+# ── RLS context cache invalidation ────────────────────────────────────────
+def invalidate_rls_context_cache(sender, instance, **kwargs):
     """
-    from core.models.scoring import StationScore, ItemScore
+    Invalidate the per-user RLS context cached by RLSSessionMiddleware
+    (role / department / station IDs) for the users this row affects.
+    """
+    from core.utils.cache_utils import invalidate_rls_context, invalidate_session_rls_context
 
-    new_item_points = instance.points  # new points value (0 after delete)
+    model_name = type(instance).__name__
+    if model_name == 'ExaminerAssignment':
+        invalidate_rls_context(instance.examiner_id)
+    elif model_name == 'ExamSession':
+        invalidate_session_rls_context(instance.pk)
+    else:
+        invalidate_rls_context(instance.pk)
 
-    # ── Step 1: Rescale ItemScore rows for this checklist item ──────────
-    item_scores = list(
-        ItemScore.objects.filter(checklist_item=instance)
-        if instance.pk else ItemScore.objects.none()
-    )
 
-    is_mcq = instance.rubric_type == 'mcq'
-    if is_mcq:
-        # For MCQ items the student's selected option index is stored in notes.
-        # Re-evaluate: correct index → full marks, anything else → 0.
-        rubric_levels = instance.rubric_levels or {}
-        correct_index = rubric_levels.get('correct_index', -1)
-        try:
-            correct_index = int(correct_index)
-        except (TypeError, ValueError):
-            correct_index = -1
-
-    updated_item_scores = []
-    for item_score in item_scores:
-        old_max = item_score.max_points or 0
-        old_score = item_score.score or 0
-
-        if is_mcq:
-            # Parse the student's saved selected option index from notes
-            try:
-                selected_index = int(item_score.notes)
-            except (TypeError, ValueError):
-                selected_index = -1  # no valid answer recorded
-            new_score = new_item_points if (correct_index >= 0 and selected_index == correct_index) else 0
-        elif old_max > 0:
-            if old_score >= old_max:
-                # Full marks → award new full points
-                new_score = new_item_points
-            elif old_score == 0:
-                # Wrong / not done → stays at 0
-                new_score = 0
-            else:
-                # Partial credit → scale proportionally
-                new_score = round(old_score / old_max * new_item_points, 2)
-        else:
-            new_score = 0
-
-        item_score.score = new_score
-        item_score.max_points = new_item_points
-        updated_item_scores.append(item_score)
-
-    if updated_item_scores:
-        ItemScore.objects.bulk_update(updated_item_scores, ['score', 'max_points'])
-
-    # ── Step 2: Recompute StationScore totals for the whole station ──────
-    station = instance.station
-    new_station_max = station.get_max_score()
-
-    station_scores = list(StationScore.objects.filter(station=station).prefetch_related('item_scores'))
-    updated_station_scores = []
-    for ss in station_scores:
-        ss.total_score = round(sum(i.score or 0 for i in ss.item_scores.all()), 2)
-        ss.max_score = new_station_max
-        if new_station_max and new_station_max > 0:
-            ss.percentage = round((ss.total_score / new_station_max) * 100, 2)
-        else:
-            ss.percentage = 0
-        updated_station_scores.append(ss)
+# ── Session detail aggregates invalidation ────────────────────────────────
+def invalidate_session_detail_cache(sender, instance, **kwargs):
+    """
+    Invalidate the session detail aggregates (core.utils.session_detail) of
+    the session a Path / Station / ExaminerAssignment belongs to.
+    ChecklistItem changes are invalidated once per station at commit, with
+    the rescore (core.utils.rescoring).  Student moves are not covered here:
+    per-path student counts are read live by the view.
+
+    The examiner home snapshots of the session's examiners go with it; an
+    assignment's own examiner is dropped explicitly, since after a delete it
+    is no longer found through the session.
+    """
+    from core.models import Path
+    from core.utils.cache_utils import invalidate_examiner_home, invalidate_session_detail
 
-    if updated_station_scores:
-        StationScore.objects.bulk_update(updated_station_scores, ['total_score', 'max_score', 'percentage'])
-        logger.info(
-            'CHECKLIST_CHANGE | station=%s | rubric=%s | new_item_points=%s | new_station_max=%s '
-            '| item_scores_updated=%d | station_scores_updated=%d',
-            station.id, instance.rubric_type, new_item_points, new_station_max,
-            len(updated_item_scores), len(updated_station_scores),
+    model_name = type(instance).__name__
+    if model_name == 'ExaminerAssignment':
+        invalidate_examiner_home(instance.examiner_id)
+    if model_name in ('Path', 'ExaminerAssignment'):
+        session_id = instance.session_id
+    else:
+        session_id = (
+            Path.objects.filter(pk=instance.path_id).values_list('session_id', flat=True).first()
+            if instance.path_id else None
         )
+    if session_id:
+        invalidate_session_detail(session_id)
+
+
+# ── Session student invalidation ──────────────────────────────────────────
+def invalidate_session_students_cache(sender, instance, **kwargs):
+    """
+    Invalidate the examiner home snapshots (core.utils.examiner_home) and
+    per-station marking progress (core.utils.station_progress) of the
+    session a SessionStudent is added to, moved within or removed from.
+    Bulk writes (bulk_create / bulk_update) send no signals; their callers
+    invalidate explicitly.
+    """
+    from core.utils.cache_utils import invalidate_session_students
+    invalidate_session_students(instance.session_id)
+
+
+# ── Station catalog invalidation ──────────────────────────────────────────
+def invalidate_station_catalog_cache(sender, instance, **kwargs):
+    """Retire the cached station totals / path station lists (core.utils.station_catalog)."""
+    from core.utils.station_catalog import invalidate_station_catalog
+    invalidate_station_catalog()
+
+
+# ── Compiled checklist cache invalidation ─────────────────────────────────
+def invalidate_checklist_cache(sender, instance, **kwargs):
+    """
+    Invalidate the compiled checklist payload (core.utils.checklist_cache)
+    of every station whose items render this Station / ILO / Theme.
+    ChecklistItem changes are handled in sync_station_max_score.
+    """
+    from core.models import ChecklistItem
+    from core.utils.checklist_cache import invalidate_station_checklist
+
+    model_name = type(instance).__name__
+    if model_name == 'Station':
+        station_ids = [instance.pk]
+    elif model_name == 'ILO':
+        station_ids = ChecklistItem.objects.filter(ilo=instance).values_list('station_id', flat=True)
+    else:
+        station_ids = ChecklistItem.objects.filter(ilo__theme=instance).values_list('station_id', flat=True)
+    invalidate_station_checklist(*set(station_ids))
+
+
+# ── Sync max_score + ItemScore rescaling when checklist item points change ─
+def sync_station_max_score(sender, instance, **kwargs):
+    """
+    Whenever a ChecklistItem is saved or deleted, drop the station's
+    compiled checklist payload and mark the station for rescoring, which
+    also drops its session's detail aggregates.
+
+    The rescore (ItemScore rescaling / MCQ re-evaluation of the touched
+    items and StationScore re-totalling, see core.utils.rescoring) runs
+    once per station when the surrounding transaction commits, however
+    many items were touched.
+    """
+    from core.utils.checklist_cache import invalidate_station_checklist
+    from core.utils.rescoring import mark_station_dirty
+
+    invalidate_station_checklist(instance.station_id)
+    mark_station_dirty(instance.station_id, instance.pk)
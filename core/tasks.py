@@ -4,10 +4,15 @@ Celery tasks for the OSCE project.
 Tasks:
   core.write_audit_log         – async audit log write (original)
   core.cleanup_old_audit_logs  – periodic: delete audit entries > 90 days
+  core.ensure_audit_partitions – periodic: pre-create monthly audit partitions
+  core.flush_coalesced_audit   – periodic: write coalesced HTTP audit entries
   core.compute_dashboard_stats – periodic: pre-compute homepage stats
   core.check_session_readiness – one-off: validate session before activation
   core.bulk_import_examiners   – async: process uploaded XLSX in background
-  core.generate_pdf_report     – async: generate session PDF in background
+  core.import_students         – async: bulk student roster import from XLSX
+  core.run_export_job         – async: generate an export artifact (CSV/XLSX/ZIP/PDF)
+  core.cleanup_expired_exports – periodic: delete expired export artifacts
+  core.rescore_station         – async: rescore a large station after a checklist edit
 """
 import logging
 import traceback
@@ -35,27 +40,10 @@ def write_audit_log(self, payload):
     """
     try:
         from core.models.audit import AuditLog
+        from core.utils.audit import _mask_request_body
 
-        obj = AuditLog(
-            user_id=payload.get('user_id'),
-            username=payload.get('username', ''),
-            user_role=payload.get('user_role', ''),
-            department_id=payload.get('department_id'),
-            action=payload.get('action', ''),
-            status=payload.get('status', 'SUCCESS'),
-            resource_type=payload.get('resource_type', ''),
-            resource_id=payload.get('resource_id', ''),
-            resource_label=payload.get('resource_label', ''),
-            old_value=payload.get('old_value'),
-            new_value=payload.get('new_value'),
-            description=payload.get('description', ''),
-            ip_address=payload.get('ip_address'),
-            user_agent=payload.get('user_agent') or '',
-            request_method=payload.get('request_method') or '',
-            request_path=payload.get('request_path') or '',
-            extra_data=payload.get('extra_data'),
-        )
-        obj.save()  # triggers checksum computation
+        # Timestamp and checksum are assigned before the single INSERT
+        AuditLog.from_payload(_mask_request_body(payload)).save(force_insert=True)
 
     except Exception as exc:
         logger.error(
@@ -82,48 +70,14 @@ def write_audit_log_batch(self, payloads):
     Each item in `payloads` is a plain dict (same schema as write_audit_log).
     """
     try:
-        from core.models.audit import AuditLog, compute_checksum
-
-        objs = [
-            AuditLog(
-                user_id=p.get('user_id'),
-                username=p.get('username', ''),
-                user_role=p.get('user_role', ''),
-                department_id=p.get('department_id'),
-                action=p.get('action', ''),
-                status=p.get('status', 'SUCCESS'),
-                resource_type=p.get('resource_type', ''),
-                resource_id=p.get('resource_id', ''),
-                resource_label=p.get('resource_label', ''),
-                old_value=p.get('old_value'),
-                new_value=p.get('new_value'),
-                description=p.get('description', ''),
-                ip_address=p.get('ip_address'),
-                user_agent=p.get('user_agent') or '',
-                request_method=p.get('request_method') or '',
-                request_path=p.get('request_path') or '',
-                extra_data=p.get('extra_data'),
-            )
-            for p in payloads
-        ]
-        # bulk_create skips save(), so auto_now_add hasn't fired yet.
-        # Insert first, then compute checksums using the real timestamps.
-        AuditLog.objects.bulk_create(objs)
-        # Re-fetch timestamps from DB and compute checksums in one UPDATE pass.
-        pk_list = [obj.pk for obj in objs if obj.pk]
-        if pk_list:
-            db_rows = list(
-                AuditLog.objects.filter(pk__in=pk_list, checksum='')
-                .only('pk', 'user_id', 'action', 'resource_id',
-                      'timestamp', 'old_value', 'new_value')
-            )
-            for row in db_rows:
-                row.checksum = compute_checksum(
-                    row.user_id, row.action, row.resource_id,
-                    row.timestamp, row.old_value, row.new_value,
-                )
-            if db_rows:
-                AuditLog.objects.bulk_update(db_rows, ['checksum'])
+        from core.models.audit import AuditLog
+        from core.utils.audit import _mask_request_body
+
+        # Entries are sealed (timestamp + checksum) before the insert, so the
+        # whole batch is a single multi-row INSERT
+        objs = AuditLog.objects.bulk_create(
+            [AuditLog.from_payload(_mask_request_body(p)) for p in payloads]
+        )
         logger.info('Batch audit log: wrote %d entries', len(objs))
 
     except Exception as exc:
@@ -168,6 +122,9 @@ def archive_old_audit_logs(self, days=90, batch_size=2000):
 
     Never deletes — only moves to the archive table.
     Safe to run repeatedly; duplicate PKs are ignored via ignore_conflicts.
+    When the audit tables are partitioned (AUDIT_LOG_PARTITIONING), whole
+    months older than the cutoff are moved as partitions instead
+    (core.utils.audit_partitions); the rest of a month waits for the next run.
 
     Returns a dict: {'archived': int, 'days': int}
     Can be triggered:
@@ -178,8 +135,16 @@ def archive_old_audit_logs(self, days=90, batch_size=2000):
         from datetime import timedelta
         from django.utils import timezone
         from core.models.audit import AuditLog, AuditLogArchive
+        from core.utils.audit_partitions import archive_partitions, audit_logs_partitioned
 
         cutoff = timezone.now() - timedelta(days=days)
+        if audit_logs_partitioned():
+            moved = archive_partitions(cutoff)
+            archived = sum(rows for _, rows in moved)
+            logger.info('archive_old_audit_logs: moved %d partitions, archived=%d, days=%d',
+                        len(moved), archived, days)
+            return {'archived': archived, 'days': days}
+
         total_qs = AuditLog.objects.filter(timestamp__lt=cutoff)
         total = total_qs.count()
 
@@ -226,6 +191,30 @@ def archive_old_audit_logs(self, days=90, batch_size=2000):
         raise self.retry(exc=exc)
 
 
+@shared_task(name='core.ensure_audit_partitions', ignore_result=True)
+def ensure_audit_partitions(months_ahead=None):
+    """Pre-create upcoming monthly audit partitions (no-op when unpartitioned). Scheduled daily."""
+    try:
+        from django.conf import settings
+        from core.utils.audit_partitions import ensure_partitions
+
+        if months_ahead is None:
+            months_ahead = getattr(settings, 'AUDIT_PARTITION_MONTHS_AHEAD', 3)
+        return ensure_partitions(months_ahead)
+    except Exception:
+        logger.error('ensure_audit_partitions failed: %s', traceback.format_exc())
+
+
+@shared_task(name='core.flush_coalesced_audit', ignore_result=True)
+def flush_coalesced_audit():
+    """Write the summarized entries of closed coalescing windows. Scheduled every minute."""
+    try:
+        from core.utils.audit_policy import flush_coalesced
+        return flush_coalesced()
+    except Exception:
+        logger.error('flush_coalesced_audit failed: %s', traceback.format_exc())
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 3. Periodic: pre-compute dashboard statistics (runs every 5 min via Beat)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -319,155 +308,121 @@ def check_session_readiness(self, session_id):
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 5. Async: bulk XLSX examiner import
+# 5. Async: bulk XLSX imports (examiners, student rosters)
 # ══════════════════════════════════════════════════════════════════════════════
 
 @shared_task(
     name='core.bulk_import_examiners',
     bind=True,
     max_retries=1,
-    time_limit=120,
-    soft_time_limit=100,
+    time_limit=600,
+    soft_time_limit=570,
 )
-def bulk_import_examiners(self, file_path, requested_by_id=None):
+def bulk_import_examiners(self, file_name, requested_by_id=None):
     """
-    Process a saved XLSX file and import examiners asynchronously.
-    Stores progress/result in cache under 'osce:bulk_import:<task_id>'.
+    Import examiners from an XLSX saved to default storage (see
+    core.utils.examiner_import).  Stores progress/result in cache under
+    'osce:bulk_import:<task_id>'.
     """
-    import os
-    import openpyxl
-    from django.core.cache import cache
+    from core.utils.examiner_import import run_examiner_import, set_bulk_import_status
 
     task_id = self.request.id
-    result_key = f'osce:bulk_import:{task_id}'
+    try:
+        result = run_examiner_import(task_id, file_name, requested_by_id)
+    except Exception as exc:
+        set_bulk_import_status(task_id, {'status': 'error', 'message': str(exc)})
+        logger.error('bulk_import_examiners failed: %s', traceback.format_exc())
+        raise
+    logger.info(
+        'Bulk import done: %s added, %s errors',
+        result.get('success_count', 0), result.get('error_count', 0),
+    )
+    return result
 
-    def _save(payload):
-        cache.set(result_key, payload, 60 * 30)
 
-    _save({'status': 'running', 'progress': 0})
+@shared_task(
+    name='core.import_students',
+    bind=True,
+    acks_late=True,
+    time_limit=300,
+    soft_time_limit=270,
+)
+def import_students(self, file_name, session_id, path_id='', requested_by_id=None):
+    """
+    Import a student roster XLSX saved to default storage into a session.
+    Progress and the result are stored in the cache under
+    'osce:students_import:<task_id>' (see core.utils.student_import).
+    """
+    from core.utils.student_import import run_student_import, set_student_import_status
 
+    task_id = self.request.id
     try:
-        from core.models import Examiner, Department
-        from core.utils.cache_utils import invalidate_examiner_list
-
-        valid_departments = set(Department.objects.values_list('name', flat=True))
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
-
-        def _sanitize_cell(val):
-            """Strip formula-triggering prefixes from imported cell values."""
-            if not isinstance(val, str):
-                return val
-            if val and val[0] in ('=', '+', '@', '\t', '\r'):
-                return val.lstrip('=+@\t\r')
-            return val
-
-        headers = [str(c.value).strip().lower() for c in ws[1] if c.value]
-        idx = {h: i for i, h in enumerate(headers)}
-        rows = list(ws.iter_rows(min_row=3, values_only=True))
-        total = max(len(rows), 1)
-        success_count = 0
-        errors_list = []
-
-        for offset, row in enumerate(rows):
-            row_num = offset + 3
-            if not any(row):
-                continue
-            try:
-                get = lambda col, default='': _sanitize_cell(str(row[idx[col]]).strip()) if col in idx and idx[col] < len(row) and row[idx[col]] else default
-                username = get('username').lower()
-                full_name = get('full_name')
-                email = get('email').lower()
-                title = get('title')
-                department = get('department')
-
-                if not username or not full_name:
-                    errors_list.append(f'Row {row_num}: Missing username or full_name')
-                    continue
-                if department and department not in valid_departments:
-                    errors_list.append(f"Row {row_num}: Department '{department}' not found")
-                    continue
-                if Examiner.objects.filter(username=username).exists():
-                    errors_list.append(f"Row {row_num}: Username '{username}' already exists")
-                    continue
-                if email and Examiner.objects.filter(email=email).exists():
-                    errors_list.append(f"Row {row_num}: Email '{email}' already exists")
-                    continue
-                Examiner.objects.create(
-                    username=username, email=email, full_name=full_name,
-                    title=title, department=department, is_active=True,
-                )
-                success_count += 1
-            except Exception as e:
-                errors_list.append(f'Row {row_num}: {e}')
-
-            if offset % 10 == 0:
-                _save({'status': 'running', 'progress': int((offset / total) * 100)})
-
-        invalidate_examiner_list()
-        final = {
-            'status': 'done', 'progress': 100,
-            'success_count': success_count,
-            'error_count': len(errors_list),
-            'errors': errors_list[:20],
-        }
-        _save(final)
-        logger.info('Bulk import done: %d added, %d errors', success_count, len(errors_list))
-        return final
-
+        return run_student_import(task_id, file_name, session_id, path_id, requested_by_id)
     except Exception as exc:
-        _save({'status': 'error', 'message': str(exc)})
-        logger.error('bulk_import_examiners failed: %s', traceback.format_exc())
+        set_student_import_status(task_id, {'status': 'error', 'message': str(exc)})
+        logger.error('import_students failed: %s', traceback.format_exc())
         raise
-    finally:
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception:
-            pass
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 6. Async: PDF report generation
+# 6. Async: export jobs (CSV / XLSX / score sheets / PDF → file storage)
 # ══════════════════════════════════════════════════════════════════════════════
 
 @shared_task(
-    name='core.generate_pdf_report',
+    name='core.run_export_job',
     bind=True,
-    max_retries=2,
-    default_retry_delay=5,
-    time_limit=180,
-    soft_time_limit=150,
+    acks_late=True,
+    ignore_result=True,
+    time_limit=900,
+    soft_time_limit=840,
 )
-def generate_pdf_report(self, session_id):
+def run_export_job(self, job_id):
     """
-    Generate student-paths PDF for a session in the background.
-    Stores base64 PDF in cache key 'osce:pdf_status:<session_id>:<task_id>'.
-    Frontend polls GET /creator/sessions/<id>/pdf-status/?task_id=<uuid>
+    Produce the artifact for an ExportJob (see core.utils.export_jobs).
+    Progress and the result are stored on the job row; the file goes to
+    default storage.  Redelivered messages are no-ops once the job is claimed.
     """
-    import base64
-    from django.core.cache import cache
+    from core.utils.export_jobs import run_export_job as _run
 
-    task_id = self.request.id
-    status_key = f'osce:pdf_status:{session_id}:{task_id}'
-    cache.set(status_key, {'status': 'running'}, 60 * 10)
+    job = _run(job_id)
+    if job is not None:
+        return {'status': job.status}
 
+
+@shared_task(name='core.cleanup_expired_exports', ignore_result=True)
+def cleanup_expired_exports():
+    """Delete expired export artifacts and fail stale jobs. Scheduled hourly."""
     try:
-        from core.models import ExamSession
-        from creator.views.sessions import _build_student_paths_pdf
-
-        session = ExamSession.objects.get(pk=session_id)
-        pdf_bytes = _build_student_paths_pdf(session)
-        pdf_b64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        cache.set(status_key, {
-            'status': 'done',
-            'pdf_b64': pdf_b64,
-            'filename': f'student_paths_{session_id}.pdf',
-        }, 60 * 15)
-        logger.info('PDF report generated for session %s', session_id)
-        return {'status': 'done'}
+        from core.utils.export_jobs import cleanup_expired_exports as _cleanup
 
+        expired, failed = _cleanup()
+        return {'expired': expired, 'failed': failed}
+    except Exception:
+        logger.error('cleanup_expired_exports failed: %s', traceback.format_exc())
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 7. Async: checklist rescoring for large stations
+# ══════════════════════════════════════════════════════════════════════════════
+
+@shared_task(
+    name='core.rescore_station',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=10,
+    acks_late=True,
+    ignore_result=True,
+)
+def rescore_station(self, station_id, item_ids=()):
+    """
+    Rescale the edited items' scores and re-total StationScores after a
+    checklist edit (see core.utils.rescoring).  Queued for stations with at
+    least RESCORE_ASYNC_MIN_SCORES scores; the recompute is idempotent.
+    """
+    from core.utils.rescoring import rescore_station as _rescore
+
+    try:
+        _rescore(station_id, item_ids)
     except Exception as exc:
-        cache.set(status_key, {'status': 'error', 'message': str(exc)}, 60 * 5)
-        logger.error('generate_pdf_report failed for %s: %s', session_id, traceback.format_exc())
-        raise self.retry(exc=exc)
\ No newline at end of file
+        logger.error('rescore_station %s failed: %s', station_id, traceback.format_exc())
+        raise self.retry(exc=exc)
@@ -1,14 +1,18 @@
 """
 Core model tests – verify model creation, relationships, and methods.
 """
+import json
 from datetime import date, time
+from unittest import skipUnless
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from core.models import (
     Course, ILO, Theme, Exam, Station, ChecklistItem, ChecklistLibrary,
     ExamSession, SessionStudent, Path, StationScore, ItemScore,
-    Examiner, ExaminerAssignment,
+    Examiner, ExaminerAssignment, Department,
 )
 
 
@@ -112,6 +116,57 @@ class SessionPathTest(TestCase):
         self.assertEqual(path.students.count(), 1)
 
 
+class StationCatalogTest(TestCase):
+    """Test the cached station totals (core.utils.station_catalog)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.course = Course.objects.create(code='MED101', name='Medicine 1', year_level=1)
+        self.ilo = ILO.objects.create(course=self.course, number=1, description='ILO 1')
+        self.exam = Exam.objects.create(name='Test Exam', course=self.course, exam_date=date(2025, 6, 1))
+        self.session = ExamSession.objects.create(
+            exam=self.exam, name='Session A', session_date=date(2025, 6, 1), start_time=time(8, 0),
+            number_of_stations=3, number_of_paths=1,
+        )
+        self.path = Path.objects.create(session=self.session, name='Path 1')
+        self.s1 = Station.objects.create(exam=self.exam, path=self.path, station_number=1, name='S1')
+        self.s2 = Station.objects.create(exam=self.exam, path=self.path, station_number=2, name='S2')
+        Station.objects.create(exam=self.exam, path=self.path, station_number=3, name='Off', active=False)
+        ChecklistItem.objects.create(station=self.s1, ilo=self.ilo, item_number=1, description='A', points=2)
+        self.item = ChecklistItem.objects.create(
+            station=self.s1, ilo=self.ilo, item_number=2, description='B', points=3,
+        )
+        ChecklistItem.objects.create(station=self.s2, item_number=1, description='C', points=4)
+
+    def test_totals(self):
+        from core.utils.station_catalog import StationCatalog
+        self.assertEqual(self.s1.get_max_score(), 5)
+        self.assertEqual(self.s1.to_dict()['item_count'], 2)
+        self.assertEqual(self.exam.get_total_marks(), 9)
+        self.assertEqual(self.exam.get_ilo_distribution(), {self.ilo.id: 5, None: 4})
+        self.assertEqual(self.path.total_marks, 9)
+        self.assertEqual(
+            [st['name'] for st in StationCatalog.path_stations(self.path.id)], ['S1', 'S2'],
+        )
+
+    def test_warm_lookups_skip_the_database(self):
+        from core.utils.station_catalog import StationCatalog
+        StationCatalog.path_stations(self.path.id)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(sum(st['max_score'] for st in StationCatalog.path_stations(self.path.id)), 9)
+            self.assertEqual(self.s2.get_max_score(), 4)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_checklist_edit_retires_entries(self):
+        self.assertEqual(self.s1.get_max_score(), 5)
+        self.item.points = 6
+        self.item.save()
+        self.assertEqual(self.s1.get_max_score(), 8)
+        self.item.delete()
+        self.assertEqual(self.s1.get_max_score(), 2)
+
+
 class ChecklistLibraryTest(TestCase):
     """Test ChecklistLibrary model."""
 
@@ -131,3 +186,543 @@ class ChecklistLibraryTest(TestCase):
             suggested_points=5,
         )
         self.assertEqual(item.suggested_points, 5)
+
+
+class DepartmentDenormalizationTest(TestCase):
+    """Test the denormalised department_id on the exam hierarchy."""
+
+    def setUp(self):
+        self.dept = Department.objects.create(name='Medicine')
+        self.course = Course.objects.create(
+            code='MED101', name='Medicine 1', year_level=1, department=self.dept,
+        )
+        self.exam = Exam.objects.create(
+            name='Test Exam', course=self.course, exam_date=date(2025, 6, 1),
+        )
+        self.session = ExamSession.objects.create(
+            exam=self.exam, name='Session A', session_date=date(2025, 6, 1),
+            start_time=time(8, 0), number_of_stations=1, number_of_paths=1,
+        )
+        self.path = Path.objects.create(session=self.session, name='Path 1')
+        self.station = Station.objects.create(
+            path=self.path, station_number=1, name='Station 1',
+        )
+        self.loose_station = Station.objects.create(
+            exam=self.exam, station_number=2, name='Unlinked',
+        )
+        self.student = SessionStudent.objects.create(
+            session=self.session, student_number='12345',
+            full_name='Test Student', path=self.path,
+        )
+        self.score = StationScore.objects.create(
+            session_student=self.student, station=self.station,
+        )
+        self.rows = [
+            self.session, self.path, self.station, self.loose_station,
+            self.student, self.score,
+        ]
+
+    def _department_ids(self):
+        return {type(r).objects.get(pk=r.pk).department_id for r in self.rows}
+
+    def test_new_rows_inherit_department(self):
+        self.assertEqual(self._department_ids(), {self.dept.pk})
+
+    def test_course_department_change_propagates(self):
+        surgery = Department.objects.create(name='Surgery')
+        self.course.department = surgery
+        self.course.save()
+        self.assertEqual(self._department_ids(), {surgery.pk})
+
+    def test_exam_course_change_propagates(self):
+        surgery = Department.objects.create(name='Surgery')
+        other = Course.objects.create(code='SUR101', name='Surgery 1', department=surgery)
+        self.exam.course = other
+        self.exam.save()
+        self.assertEqual(self._department_ids(), {surgery.pk})
+
+    def test_unchanged_exam_save_writes_no_descendants(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.exam.save()
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertNotIn('UPDATE "exam_sessions"', sql)
+        self.assertNotIn('UPDATE "station_scores"', sql)
+
+    def test_scope_queryset_uses_single_column(self):
+        from core.utils.roles import scope_queryset
+        coordinator = Examiner.objects.create_user(
+            username='coord', password='CoordPass123!', full_name='Coordinator',
+            role='coordinator', department=self.dept, coordinator_position='head',
+        )
+        qs = scope_queryset(coordinator, StationScore.objects.all(), dept_field='department')
+        self.assertNotIn('JOIN', str(qs.query))
+        self.assertEqual(list(qs), [self.score])
+
+    def test_station_check_agrees_with_scope_queryset(self):
+        from core.utils.roles import check_station_department, scope_queryset
+        surgery = Department.objects.create(name='Surgery')
+        for dept, allowed in ((self.dept, True), (surgery, False)):
+            coordinator = Examiner.objects.create_user(
+                username=f'coord-{dept.name}', password='CoordPass123!', full_name='Coordinator',
+                role='coordinator', department=dept, coordinator_position='head',
+            )
+            scoped = set(scope_queryset(coordinator, Station.objects.all(), dept_field='department'))
+            for station in (self.station, self.loose_station):
+                self.assertEqual(check_station_department(coordinator, station), allowed)
+                self.assertEqual(station in scoped, allowed)
+
+    def test_query_plan_benchmark(self):
+        """The scope predicate touches one relation instead of six."""
+        if connection.vendor != 'postgresql':
+            self.skipTest('EXPLAIN (FORMAT JSON) plan comparison needs PostgreSQL')
+
+        def relations(qs):
+            found = set()
+
+            def walk(node):
+                if 'Relation Name' in node:
+                    found.add(node['Relation Name'])
+                for child in node.get('Plans', ()):
+                    walk(child)
+
+            for entry in json.loads(qs.explain(format='json')):
+                walk(entry['Plan'])
+            return found
+
+        joined = StationScore.objects.filter(
+            station__path__session__exam__course__department=self.dept,
+        )
+        denormalised = StationScore.objects.filter(department=self.dept)
+        self.assertEqual(list(joined), list(denormalised))
+        self.assertEqual(
+            relations(joined),
+            {'station_scores', 'stations', 'paths', 'exam_sessions', 'exams', 'courses'},
+        )
+        self.assertEqual(relations(denormalised), {'station_scores'})
+
+
+class AuditLogWriteTest(TestCase):
+    """Test that audit entries are sealed before a single INSERT."""
+
+    def _payload(self, **extra):
+        return dict({
+            'user_id': None, 'username': 'system', 'action': 'ADMIN_ACTION',
+            'resource_type': 'Exam', 'resource_id': '42',
+            'new_value': {'name': 'Midterm', 'stations': [1, 2]},
+        }, **extra)
+
+    def test_sync_write_is_one_insert_with_valid_checksum(self):
+        from core.models import AuditLog
+        from core.utils.audit import _write_audit_log_sync
+        with self.assertNumQueries(1):
+            _write_audit_log_sync(self._payload())
+        entry = AuditLog.objects.get()
+        self.assertTrue(entry.checksum)
+        self.assertTrue(entry.verify_checksum())
+
+    def test_bulk_write_is_one_insert_with_valid_checksums(self):
+        from core.models import AuditLog
+        from core.utils.audit import _write_audit_log_bulk_sync
+        with self.assertNumQueries(1):
+            _write_audit_log_bulk_sync([self._payload(resource_id=str(i)) for i in range(25)])
+        self.assertEqual(AuditLog.objects.count(), 25)
+        self.assertTrue(all(entry.verify_checksum() for entry in AuditLog.objects.all()))
+
+    def test_verify_audit_integrity_accepts_sealed_entries(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from core.models import AuditLog
+        from core.utils.audit import _write_audit_log_bulk_sync
+        _write_audit_log_bulk_sync([self._payload(), self._payload(old_value={'name': 'Quiz'})])
+        AuditLog.from_payload(self._payload(action='EXAM_UPDATED')).save()
+
+        out = StringIO()
+        call_command('verify_audit_integrity', workers=1, stdout=out)
+        self.assertIn('Valid:    3', out.getvalue())
+        self.assertIn('No tampered records found.', out.getvalue())
+
+
+class AuditIntegrityVerifyTest(TestCase):
+    """Test range verification and checkpoints of verify_audit_integrity."""
+
+    def setUp(self):
+        from core.models import AuditLog, AuditLogArchive
+        from core.utils.audit import _write_audit_log_bulk_sync
+        _write_audit_log_bulk_sync([
+            {'action': 'EXAM_UPDATED', 'resource_type': 'Exam', 'resource_id': str(i),
+             'new_value': {'name': f'Exam {i}'}}
+            for i in range(12)
+        ])
+        archived = AuditLog.objects.order_by('id')[:2]
+        AuditLogArchive.objects.bulk_create([
+            AuditLogArchive(**{
+                f.attname: getattr(entry, f.attname)
+                for f in AuditLog._meta.concrete_fields
+            })
+            for entry in archived
+        ])
+        self.logs = list(AuditLog.objects.order_by('id').values_list('id', flat=True))
+
+    def _verify(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        options.setdefault('workers', 1)
+        try:
+            call_command('verify_audit_integrity', range_size=5, stdout=out, **options)
+        except SystemExit as exc:
+            return out.getvalue(), exc.code
+        return out.getvalue(), 0
+
+    def test_all_tables_are_verified_in_ranges(self):
+        output, code = self._verify()
+        self.assertEqual(code, 0)
+        self.assertIn('Valid:    14', output)
+        self.assertIn('audit_logs_archive [', output)
+
+    def test_workers_verify_in_process_without_fork(self):
+        from unittest import mock
+        with mock.patch('multiprocessing.get_all_start_methods', return_value=['spawn']), \
+                mock.patch('concurrent.futures.ProcessPoolExecutor') as pool:
+            output, code = self._verify(workers=4)
+        pool.assert_not_called()
+        self.assertEqual(code, 0)
+        self.assertIn('Valid:    14', output)
+
+    def test_tampered_row_is_reported(self):
+        from core.models import AuditLogArchive
+        AuditLogArchive.objects.filter(pk=self.logs[0]).update(action='EXAM_DELETED')
+        output, code = self._verify()
+        self.assertEqual(code, 1)
+        self.assertIn(f'audit_logs_archive:{self.logs[0]}', output)
+
+    def test_second_run_only_verifies_changed_ranges(self):
+        from core.models import AuditIntegrityCheckpoint, AuditLog
+        self._verify()
+        self.assertTrue(AuditIntegrityCheckpoint.objects.exists())
+
+        output, code = self._verify()
+        self.assertIn('Valid:    0', output)
+        self.assertIn('Skipped:  14', output)
+
+        AuditLog.objects.filter(pk=self.logs[-1]).update(new_value={'name': 'Forged'})
+        output, code = self._verify()
+        self.assertEqual(code, 1)
+        self.assertIn(f'audit_logs:{self.logs[-1]}', output)
+        self.assertNotIn('Skipped:  14', output)
+
+    def test_edited_checkpoint_is_not_trusted(self):
+        from core.models import AuditIntegrityCheckpoint, AuditLog
+        from core.utils.audit_integrity import range_fingerprint
+        self._verify()
+        AuditLog.objects.filter(pk=self.logs[-1]).update(new_value={'name': 'Forged'})
+        cp = AuditIntegrityCheckpoint.objects.filter(table='audit_logs').latest('range_start')
+        cp.row_count, cp.fingerprint = range_fingerprint(AuditLog, cp.range_start, cp.range_end)
+        cp.save()
+
+        output, code = self._verify()
+        self.assertEqual(code, 1)
+        self.assertIn(f'audit_logs:{self.logs[-1]}', output)
+
+
+class AuditLogViewerTest(TestCase):
+    """Test keyset pagination, search and batch verification of the audit viewer."""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from core.models import AuditLog
+        self.superuser = Examiner.objects.create_superuser(
+            username='root', password='RootPass123!', email='root@osce.local',
+        )
+        self.client.force_login(self.superuser)
+        now = timezone.now()
+        descriptions = ['Updated station checklist', 'Exported session marks', 'Deleted rubric']
+        self.logs = []
+        for i in range(7):
+            entry = AuditLog.from_payload({
+                'action': 'EXAM_UPDATED', 'resource_type': 'Exam', 'resource_id': str(i),
+                'description': descriptions[i % 3], 'ip_address': f'10.0.0.{i}',
+            })
+            # Two entries share each timestamp: the id breaks the tie
+            entry.timestamp, entry.checksum = now - timedelta(minutes=i // 2), ''
+            entry.seal().save(force_insert=True)
+            self.logs.append(entry)
+
+    def test_keyset_pages_cover_every_entry_once(self):
+        from core.models import AuditLog
+        from core.utils.audit_viewer import keyset_page
+        expected = list(AuditLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+        seen, cursor = [], None
+        while True:
+            entries, cursor = keyset_page(AuditLog.objects.all(), cursor, 3)
+            seen += [entry.pk for entry in entries]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_search_matches_words_resource_ids_and_ips(self):
+        from core.models import AuditLog
+        from core.utils.audit_viewer import search_audit_logs
+        fields = ('username', 'resource_label', 'resource_id', 'ip_address', 'description')
+
+        def ids(term):
+            return set(search_audit_logs(AuditLog.objects.all(), term, fields).values_list('resource_id', flat=True))
+
+        self.assertEqual(ids('export'), {'1', '4'})
+        self.assertEqual(ids('station checklist'), {'0', '3', '6'})
+        self.assertEqual(ids('10.0.0.5'), {'5'})
+        self.assertEqual(ids('2'), {'2'})
+
+    def test_verify_endpoint_reports_each_visible_entry(self):
+        from django.urls import reverse
+        from core.models import AuditLog
+        AuditLog.objects.filter(pk=self.logs[1].pk).update(action='EXAM_DELETED')
+        AuditLog.objects.filter(pk=self.logs[2].pk).update(checksum='')
+        ids = ','.join(str(entry.pk) for entry in self.logs[:3])
+        r = self.client.get(reverse('admin:core_auditlog_verify_checksums'), {'ids': ids})
+        self.assertEqual(r.json()['statuses'], {
+            str(self.logs[0].pk): 'valid',
+            str(self.logs[1].pk): 'tampered',
+            str(self.logs[2].pk): 'missing',
+        })
+
+    def test_changelist_uses_keyset_pages_and_estimated_count(self):
+        from unittest import mock
+        from django.urls import reverse
+        from core.admin import AuditLogAdmin
+        from core.models import AuditLog
+        url = reverse('admin:core_auditlog_changelist')
+        seen, query = [], ''
+        with mock.patch.object(AuditLogAdmin, 'list_per_page', 4), \
+                mock.patch('core.utils.audit_viewer.EXACT_COUNT_BELOW', 0), \
+                CaptureQueriesContext(connection) as ctx:
+            while query is not None:
+                r = self.client.get(url + query)
+                cl = r.context['cl']
+                self.assertTrue(cl.keyset)
+                self.assertLessEqual(len(cl.result_list), 4)
+                seen += [entry.pk for entry in cl.result_list]
+                query = cl.next_page_url
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()])
+
+        # Entries logged while paging (each view is audited) are newer than page one
+        newest = AuditLog.objects.get(pk=seen[0]).timestamp
+        expected = AuditLog.objects.filter(timestamp__lte=newest).order_by('-timestamp', '-id')
+        self.assertGreater(len(seen), 4)
+        self.assertEqual(seen, list(expected.values_list('id', flat=True)))
+
+
+@override_settings(
+    CELERY_BROKER_URL='',
+    AUDIT_HTTP_POLICIES=[
+        (r'^/api/score/[^/]+/items?/$', 'coalesce:60'),
+        (r'^/api/sync/status/$', 'never'),
+        (r'^/creator/sampled/$', 'sample:0'),
+    ],
+    AUDIT_HTTP_DEFAULT_POLICY='always',
+    AUDIT_COALESCE_ON_LOCAL_CACHE=True,
+)
+class AuditTrailPolicyTest(TestCase):
+    """Test the per-path policies of AuditTrailMiddleware's HTTP-level entries."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from core.middleware import AuditTrailMiddleware
+        from core.utils import audit_policy
+        cache.clear()
+        self.addCleanup(cache.clear)
+        audit_policy._next_due_check = 0.0
+        self.addCleanup(setattr, audit_policy, '_next_due_check', 0.0)
+        self.user = Examiner.objects.create_user(
+            username='tablet1', password='Tablet123!', role='examiner',
+        )
+        self.factory = RequestFactory()
+        self.middleware = AuditTrailMiddleware(lambda request: HttpResponse('ok'))
+
+    def _post(self, path, data=None):
+        request = self.factory.post(path, json.dumps(data or {}), content_type='application/json')
+        request.user = self.user
+        return self.middleware(request)
+
+    def _http_entries(self):
+        from core.models import AuditLog
+        return AuditLog.objects.filter(resource_type='HTTP').order_by('id')
+
+    def test_policy_rules(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from core.utils.audit_policy import Policy, parse_policy, policy_for
+        self.assertEqual(policy_for('/api/score/abc/items/'), Policy('coalesce', 60))
+        self.assertEqual(policy_for('/api/score/abc/item/'), Policy('coalesce', 60))
+        self.assertEqual(policy_for('/creator/exams/'), Policy('always', None))
+        self.assertEqual(policy_for('/creator/exams/', audited=True), Policy('never', None))
+        self.assertEqual(policy_for('/api/score/abc/item/', audited=True), Policy('coalesce', 60))
+        self.assertEqual(parse_policy('sample:12.5'), Policy('sample', 12.5))
+        for rule in ('sometimes', 'sample:150', 'coalesce:0', 'never:1'):
+            with self.assertRaises(ImproperlyConfigured):
+                parse_policy(rule)
+
+    def test_always_masks_body_in_the_writer(self):
+        self._post('/creator/exams/', {'name': 'Midterm', 'password': 'hunter2'})
+        entry = self._http_entries().get()
+        self.assertEqual(entry.extra_data['request_body'], {'name': 'Midterm', 'password': '***REDACTED***'})
+        self.assertNotIn('raw_request_body', entry.extra_data)
+
+    def test_never_and_sample_skip_entries(self):
+        self._post('/api/sync/status/')
+        self._post('/creator/sampled/')
+        self.assertFalse(self._http_entries().exists())
+        with override_settings(AUDIT_HTTP_POLICIES=[(r'^/creator/sampled/$', 'sample:100')]):
+            self._post('/creator/sampled/')
+        self.assertEqual(self._http_entries().get().extra_data['sample_rate'], 100)
+
+    def test_coalesced_requests_become_one_entry_per_window(self):
+        from unittest import mock
+        from core.utils.audit_policy import COALESCE_GRACE, flush_coalesced
+        now = 1_800_000_010  # 10s into a 60s window
+        with mock.patch('core.utils.audit_policy.time.time', return_value=now):
+            for _ in range(5):
+                self._post('/api/score/s1/items/', {'items': [1, 2]})
+            for _ in range(2):
+                self._post('/api/score/s2/item/', {'checklist_item_id': 3})
+        self.assertFalse(self._http_entries().exists())
+        self.assertEqual(flush_coalesced(now=now + 30), 0)  # window still open
+
+        self.assertEqual(flush_coalesced(now=now + 50 + COALESCE_GRACE), 2)
+        counts = {e.request_path: e.extra_data['count'] for e in self._http_entries()}
+        self.assertEqual(counts, {'/api/score/s1/items/': 5, '/api/score/s2/item/': 2})
+        entry = self._http_entries().first()
+        self.assertTrue(entry.extra_data['coalesced'])
+        self.assertEqual(entry.user_id, self.user.pk)
+        self.assertIn('× 5', entry.description)
+        self.assertEqual(flush_coalesced(now=now + 120), 0)
+
+    def test_closed_window_is_flushed_by_any_later_request(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from core.utils.audit_policy import COALESCE_DUE_KEY
+        now = 1_800_000_010
+        with mock.patch('core.utils.audit_policy.time.time', return_value=now):
+            for _ in range(3):
+                self._post('/api/score/s1/items/')
+        self.assertFalse(self._http_entries().exists())
+
+        cache.delete(COALESCE_DUE_KEY)  # the flush interval has passed
+        with mock.patch('core.utils.audit_policy.time.time', return_value=now + 120):
+            self._post('/api/sync/status/')   # 'never' — audits nothing itself
+        self.assertEqual(self._http_entries().get().extra_data['count'], 3)
+
+    def test_mark_item_requests_are_coalesced(self):
+        from unittest import mock
+        from django.test import Client
+        from django.urls import reverse
+        from core.models.user_profile import UserProfile
+        from core.utils.audit_policy import COALESCE_GRACE, flush_coalesced
+        course = Course.objects.create(code='MED101', name='Medicine 1', year_level=1)
+        exam = Exam.objects.create(name='Test Exam', course=course, exam_date=date(2025, 6, 1))
+        session = ExamSession.objects.create(
+            exam=exam, name='Session A', status='in_progress', session_date=date(2025, 6, 1),
+            start_time=time(8, 0), number_of_stations=1, number_of_paths=1,
+        )
+        path = Path.objects.create(session=session, name='Path 1')
+        station = Station.objects.create(exam=exam, path=path, station_number=1, name='S1')
+        item = ChecklistItem.objects.create(station=station, item_number=1, description='A', points=2)
+        student = SessionStudent.objects.create(
+            session=session, student_number='12345', full_name='Student', path=path,
+        )
+        score = StationScore.objects.create(
+            session_student=student, station=station, examiner=self.user, status='in_progress',
+        )
+        UserProfile.objects.filter(user=self.user).update(must_change_password=False)
+        client = Client()
+        client.force_login(self.user)
+
+        url = reverse('examiner_api:mark_item', args=[score.pk])
+        now = 1_800_000_010
+        with mock.patch('core.utils.audit_policy.time.time', return_value=now):
+            for value in (1, 2, 0):
+                r = client.post(
+                    url, data=json.dumps({'checklist_item_id': item.pk, 'score': value}),
+                    content_type='application/json',
+                )
+                self.assertEqual(r.status_code, 200)
+        # The ItemScore / StationScore saves audited each request already
+        self.assertFalse(self._http_entries().exists())
+
+        self.assertEqual(flush_coalesced(now=now + 50 + COALESCE_GRACE), 1)
+        entry = self._http_entries().get()
+        self.assertEqual(entry.request_path, url)
+        self.assertEqual(entry.extra_data['count'], 3)
+
+    def test_coalesce_falls_back_to_always_on_local_cache(self):
+        from core.utils.audit_policy import Policy, policy_for
+        with override_settings(AUDIT_COALESCE_ON_LOCAL_CACHE=False):
+            self.assertEqual(policy_for('/api/score/abc/items/'), Policy('always', None))
+            self._post('/api/score/s1/items/')
+            self._post('/api/score/s1/items/')
+            # ...except for requests that were audited already
+            self.assertEqual(policy_for('/api/score/abc/item/', audited=True), Policy('never', None))
+        self.assertEqual(self._http_entries().count(), 2)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Declarative partitioning needs PostgreSQL')
+class AuditPartitioningTest(TransactionTestCase):
+    """Test monthly partitioning and partition-based archival of the audit tables."""
+
+    serialized_rollback = True
+
+    def setUp(self):
+        from core.utils.audit_partitions import partition_audit_tables, unpartition_audit_tables
+        self.assertEqual(partition_audit_tables(), ['audit_logs', 'audit_logs_archive'])
+        self.addCleanup(unpartition_audit_tables)
+
+    def _log(self, timestamp, resource_id):
+        from core.models import AuditLog
+        entry = AuditLog.from_payload({
+            'action': 'EXAM_UPDATED', 'resource_type': 'Exam', 'resource_id': resource_id,
+        })
+        entry.timestamp, entry.checksum = timestamp, ''
+        entry.seal().save(force_insert=True)
+        return entry
+
+    def test_months_move_to_archive_as_partitions(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from core.models import AuditLog, AuditLogArchive
+        from core.utils.audit_partitions import (
+            ARCHIVE_TABLE, AUDIT_TABLE, ensure_partitions, month_partitions, month_start,
+        )
+
+        now = timezone.now()
+        old = [self._log(now - timedelta(days=200), str(i)) for i in range(3)]
+        recent = self._log(now, 'recent')
+        # Old rows landed in the default partition until their month exists
+        created = ensure_partitions(now=now - timedelta(days=200))
+        self.assertIn(month_start(old[0].timestamp), month_partitions(AUDIT_TABLE))
+        self.assertTrue(created)
+
+        out = StringIO()
+        call_command('archive_old_logs', days=90, stdout=out)
+        self.assertEqual(set(AuditLog.objects.values_list('pk', flat=True)), {recent.pk})
+        self.assertEqual(
+            set(AuditLogArchive.objects.values_list('pk', flat=True)), {e.pk for e in old},
+        )
+        self.assertIn(month_start(old[0].timestamp), month_partitions(ARCHIVE_TABLE))
+        self.assertNotIn(month_start(old[0].timestamp), month_partitions(AUDIT_TABLE))
+
+        # Ids keep coming from the sequence; every row still verifies
+        self.assertGreater(self._log(now, 'new').pk, recent.pk)
+        out = StringIO()
+        call_command('verify_audit_integrity', workers=1, stdout=out)
+        self.assertIn('Valid:    5', out.getvalue())
+
+    def test_indexes_survive_partitioning(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'audit_logs'")
+            names = {row[0] for row in cursor.fetchall()}
+        self.assertIn('idx_audit_dept_ts', names)
+        self.assertIn('audit_logs_pkey', names)
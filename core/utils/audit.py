@@ -60,6 +60,49 @@ def _get_current_user():
     return getattr(_audit_local, 'current_user', None)
 
 
+# ── Request-scoped audit buffer (thread-local) ───────────────────────
+# Signal-driven entries (AuditLogService.log_deferred) are queued here once
+# their transaction commits and written in a single log_bulk() call when
+# AuditTrailMiddleware finishes the request.  Outside a request the buffer
+# is inactive and deferred entries are written straight after commit.
+
+def _begin_audit_buffer():
+    """Start collecting deferred entries for the current request thread."""
+    _audit_local.buffer = []
+
+
+def _enqueue_deferred(payload):
+    """on_commit target: add a committed entry to the buffer (or write it)."""
+    buffer = getattr(_audit_local, 'buffer', None)
+    if buffer is None:
+        AuditLogService.log_bulk([payload])
+    else:
+        buffer.append(payload)
+
+
+def _flush_audit_buffer(request=None):
+    """
+    Write every buffered entry in one log_bulk() call and stop buffering.
+
+    Entries recorded from signals carry no request metadata; fill it in
+    from ``request`` so the audit trail still shows IP / path / method.
+    """
+    buffer = getattr(_audit_local, 'buffer', None)
+    _audit_local.buffer = None
+    if not buffer:
+        return
+    if request is not None:
+        ip = _get_client_ip(request)
+        ua = request.META.get('HTTP_USER_AGENT', '')[:500]
+        for payload in buffer:
+            if not payload.get('request_path'):
+                payload['ip_address'] = ip
+                payload['user_agent'] = ua
+                payload['request_method'] = request.method or ''
+                payload['request_path'] = request.path[:500]
+    AuditLogService.log_bulk(buffer)
+
+
 # ── Sensitive field masking ──────────────────────────────────────────
 
 SENSITIVE_FIELDS = frozenset({
@@ -87,6 +130,33 @@ def _mask_sensitive(data):
     return data
 
 
+def _mask_request_body(payload):
+    """
+    Parse and mask the raw HTTP body an AuditTrailMiddleware entry carries
+    (``extra_data['raw_request_body']``) into ``extra_data['request_body']``.
+    Runs in the writer (Celery task or sync fallback), off the request thread.
+    """
+    extra = payload.get('extra_data')
+    if not isinstance(extra, dict) or 'raw_request_body' not in extra:
+        return payload
+    raw = extra.pop('raw_request_body') or {}
+    body = raw.get('body')
+    content_type = raw.get('content_type', '')
+    parsed = None
+    try:
+        if not isinstance(body, str):
+            parsed = body
+        elif 'json' in content_type:
+            parsed = json.loads(body)
+        elif 'form' in content_type:
+            from urllib.parse import parse_qs
+            parsed = parse_qs(body, keep_blank_values=True)
+    except ValueError:
+        pass  # Don't fail on unparseable body
+    extra['request_body'] = _mask_sensitive(parsed)
+    return payload
+
+
 def _get_client_ip(request):
     """Extract client IP from request, respecting X-Forwarded-For."""
     if request is None:
@@ -117,6 +187,13 @@ def _resolve_department_id(resource):
     if isinstance(resource, Department):
         return resource.pk
 
+    # Has department_id integer field (Examiner, Course and the denormalised
+    # column on sessions / paths / stations / students / scores) — checked
+    # before .department so the FK is never loaded just to read its pk
+    dept_id = getattr(resource, 'department_id', None)
+    if dept_id and isinstance(dept_id, int):
+        return dept_id
+
     # Has .department FK that points to Department
     dept_fk = getattr(resource, 'department', None)
     if dept_fk is not None:
@@ -126,11 +203,6 @@ def _resolve_department_id(resource):
         if isinstance(dept_fk, str):
             pass  # Fall through to other resolution
 
-    # Has department_id integer field
-    dept_id = getattr(resource, 'department_id', None)
-    if dept_id and isinstance(dept_id, int):
-        return dept_id
-
     # Has coordinator_department FK (Examiner model) — now renamed to department
     # (handled above via getattr .department)
 
@@ -245,58 +317,15 @@ class AuditLogService:
             Override the department ID resolution.
         """
         try:
-            from core.models.audit import STATUS_SUCCESS
-
-            # Resolve user from request if not provided
-            if user is None and request is not None:
-                u = getattr(request, 'user', None)
-                if u is not None and getattr(u, 'is_authenticated', False):
-                    user = u
-
-            # Last-resort fallback: use the thread-local user stored by
-            # AuditTrailMiddleware (covers signal-based calls with no request)
-            if user is None:
-                u = _get_current_user()
-                if u is not None and getattr(u, 'is_authenticated', False):
-                    user = u
-
-            # Build the log payload (all primitive types for Celery serialisation)
-            payload = {
-                'user_id': user.pk if user and hasattr(user, 'pk') else None,
-                'username': getattr(user, 'username', '') if user else '',
-                'user_role': _resolve_user_role(user),
-                'action': action,
-                'status': status or STATUS_SUCCESS,
-                'resource_type': resource_type or (
-                    type(resource).__name__ if resource else ''
-                ),
-                'resource_id': str(resource_id or (
-                    getattr(resource, 'pk', '') if resource else ''
-                )),
-                'resource_label': resource_label_override or (
-                    str(resource)[:200] if resource else ''
-                ),
-                'department_id': department_id or (
-                    _resolve_department_id(resource) if resource else None
-                ),
-                'old_value': _mask_sensitive(_make_serialisable(old_value)),
-                'new_value': _mask_sensitive(_make_serialisable(new_value)),
-                'description': description[:1000] if description else '',
-                'ip_address': _get_client_ip(request) if request else None,
-                'user_agent': (
-                    request.META.get('HTTP_USER_AGENT', '')[:500]
-                    if request else ''
-                ),
-                'request_method': (
-                    getattr(request, 'method', '') or ''
-                    if request else ''
-                ),
-                'request_path': (
-                    getattr(request, 'path', '')[:500]
-                    if request else ''
-                ),
-                'extra_data': _mask_sensitive(_make_serialisable(extra)),
-            }
+            payload = AuditLogService._build_payload(
+                action, resource,
+                user=user, request=request,
+                resource_type=resource_type, resource_id=resource_id,
+                resource_label_override=resource_label_override,
+                old_value=old_value, new_value=new_value,
+                description=description, status=status,
+                extra=extra, department_id=department_id,
+            )
 
             # Dispatch to Celery if available, else write synchronously
             if _celery_available():
@@ -315,6 +344,100 @@ class AuditLogService:
                 traceback.format_exc(),
             )
 
+    @staticmethod
+    def _build_payload(
+        action,
+        resource=None,
+        *,
+        user=None,
+        request=None,
+        resource_type=None,
+        resource_id=None,
+        resource_label_override=None,
+        old_value=None,
+        new_value=None,
+        description='',
+        status=None,
+        extra=None,
+        department_id=None,
+    ):
+        """Build the primitive-typed payload dict shared by log() / log_deferred()."""
+        from core.models.audit import STATUS_SUCCESS
+
+        # Resolve user from request if not provided
+        if user is None and request is not None:
+            u = getattr(request, 'user', None)
+            if u is not None and getattr(u, 'is_authenticated', False):
+                user = u
+
+        # Last-resort fallback: use the thread-local user stored by
+        # AuditTrailMiddleware (covers signal-based calls with no request)
+        if user is None:
+            u = _get_current_user()
+            if u is not None and getattr(u, 'is_authenticated', False):
+                user = u
+
+        # Build the log payload (all primitive types for Celery serialisation)
+        payload = {
+            'user_id': user.pk if user and hasattr(user, 'pk') else None,
+            'username': getattr(user, 'username', '') if user else '',
+            'user_role': _resolve_user_role(user),
+            'action': action,
+            'status': status or STATUS_SUCCESS,
+            'resource_type': resource_type or (
+                type(resource).__name__ if resource else ''
+            ),
+            'resource_id': str(resource_id or (
+                getattr(resource, 'pk', '') if resource else ''
+            )),
+            'resource_label': resource_label_override or (
+                str(resource)[:200] if resource else ''
+            ),
+            'department_id': department_id or (
+                _resolve_department_id(resource) if resource else None
+            ),
+            'old_value': _mask_sensitive(_make_serialisable(old_value)),
+            'new_value': _mask_sensitive(_make_serialisable(new_value)),
+            'description': description[:1000] if description else '',
+            'ip_address': _get_client_ip(request) if request else None,
+            'user_agent': (
+                request.META.get('HTTP_USER_AGENT', '')[:500]
+                if request else ''
+            ),
+            'request_method': (
+                getattr(request, 'method', '') or ''
+                if request else ''
+            ),
+            'request_path': (
+                getattr(request, 'path', '')[:500]
+                if request else ''
+            ),
+            'extra_data': _mask_sensitive(_make_serialisable(extra)),
+        }
+        return payload
+
+    @staticmethod
+    def log_deferred(action, resource=None, **kwargs):
+        """
+        Record an audit entry once the current transaction commits.
+
+        Same parameters as log().  Used by the hierarchy model signals so a
+        request that saves many rows (e.g. marking items) produces one
+        bulk write at the end instead of one write per save.  Entries from
+        a rolled-back transaction are dropped with it.
+        """
+        try:
+            from django.db import transaction
+
+            payload = AuditLogService._build_payload(action, resource, **kwargs)
+            transaction.on_commit(lambda: _enqueue_deferred(payload))
+            _mark_request_audited()
+        except Exception:
+            logger.error(
+                'AuditLogService.log_deferred failed: %s',
+                traceback.format_exc(),
+            )
+
     @staticmethod
     def log_bulk(entries):
         """
@@ -378,30 +501,13 @@ def _celery_available():
 def _write_audit_log_sync(payload):
     """
     Synchronous fallback — writes the audit log directly to the DB.
-    Used when Celery is not available.
+    Used when Celery is not available.  One INSERT: the timestamp and
+    checksum are assigned before it.
     """
     try:
         from core.models.audit import AuditLog
 
-        AuditLog.objects.create(
-            user_id=payload.get('user_id'),
-            username=payload.get('username', ''),
-            user_role=payload.get('user_role', ''),
-            department_id=payload.get('department_id'),
-            action=payload.get('action', ''),
-            status=payload.get('status', 'SUCCESS'),
-            resource_type=payload.get('resource_type', ''),
-            resource_id=payload.get('resource_id', ''),
-            resource_label=payload.get('resource_label', ''),
-            old_value=payload.get('old_value'),
-            new_value=payload.get('new_value'),
-            description=payload.get('description', ''),
-            ip_address=payload.get('ip_address'),
-            user_agent=payload.get('user_agent') or '',
-            request_method=payload.get('request_method') or '',
-            request_path=payload.get('request_path') or '',
-            extra_data=payload.get('extra_data'),
-        )
+        AuditLog.from_payload(_mask_request_body(payload)).save(force_insert=True)
     except Exception:
         logger.error(
             'Sync audit log write failed: %s',
@@ -410,48 +516,11 @@ def _write_audit_log_sync(payload):
 
 
 def _write_audit_log_bulk_sync(payloads):
-    """Synchronous bulk fallback — writes multiple audit logs in one DB call."""
+    """Synchronous bulk fallback — writes multiple audit logs in one INSERT."""
     try:
-        from core.models.audit import AuditLog, compute_checksum
-
-        objs = [
-            AuditLog(
-                user_id=p.get('user_id'),
-                username=p.get('username', ''),
-                user_role=p.get('user_role', ''),
-                department_id=p.get('department_id'),
-                action=p.get('action', ''),
-                status=p.get('status', 'SUCCESS'),
-                resource_type=p.get('resource_type', ''),
-                resource_id=p.get('resource_id', ''),
-                resource_label=p.get('resource_label', ''),
-                old_value=p.get('old_value'),
-                new_value=p.get('new_value'),
-                description=p.get('description', ''),
-                ip_address=p.get('ip_address'),
-                user_agent=p.get('user_agent') or '',
-                request_method=p.get('request_method') or '',
-                request_path=p.get('request_path') or '',
-                extra_data=p.get('extra_data'),
-            )
-            for p in payloads
-        ]
-        # Insert first so auto_now_add sets timestamps, then compute checksums.
-        AuditLog.objects.bulk_create(objs)
-        pk_list = [obj.pk for obj in objs if obj.pk]
-        if pk_list:
-            db_rows = list(
-                AuditLog.objects.filter(pk__in=pk_list, checksum='')
-                .only('pk', 'user_id', 'action', 'resource_id',
-                      'timestamp', 'old_value', 'new_value')
-            )
-            for row in db_rows:
-                row.checksum = compute_checksum(
-                    row.user_id, row.action, row.resource_id,
-                    row.timestamp, row.old_value, row.new_value,
-                )
-            if db_rows:
-                AuditLog.objects.bulk_update(db_rows, ['checksum'])
+        from core.models.audit import AuditLog
+
+        AuditLog.objects.bulk_create([AuditLog.from_payload(_mask_request_body(p)) for p in payloads])
     except Exception:
         logger.error(
             'Sync bulk audit log write failed: %s',
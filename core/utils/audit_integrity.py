@@ -0,0 +1,260 @@
+"""
+Audit integrity verification — the engine behind ``verify_audit_integrity``.
+
+The id space of each audit table (AuditLog and AuditLogArchive) is split
+into aligned ranges of ``range_size`` ids.  Each range is verified by
+streaming raw value tuples (no model instances) and recomputing their
+checksums; ranges can be spread over a process pool.
+
+On PostgreSQL every range also gets a database-side fingerprint (an md5
+over the md5 of each row's text).  Intact ranges are stored as signed
+AuditIntegrityCheckpoint rows; a later run recomputes only the
+fingerprint of a checkpointed range and skips it while it matches, so
+only new or changed ranges are verified again.  Other databases verify
+every range on every run.
+
+Checkpoint signatures are chained (each covers the previous checkpoint's
+signature) and keyed with SECRET_KEY, so editing a row together with its
+checkpoint breaks the chain and the range is verified again.
+"""
+import hmac
+import logging
+
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+from django.utils.crypto import salted_hmac
+
+logger = logging.getLogger('osce.audit')
+
+DEFAULT_RANGE_SIZE = 100_000
+CHECKPOINT_SALT = 'core.audit_integrity.checkpoint'
+
+CHECKSUM_FIELDS = (
+    'id', 'checksum', 'user_id', 'action', 'resource_id',
+    'timestamp', 'old_value', 'new_value',
+)
+
+
+def audit_models():
+    """``{table: model}`` of the audit tables covered by the verifier."""
+    from core.models import AuditLog, AuditLogArchive
+    return {m._meta.db_table: m for m in (AuditLog, AuditLogArchive)}
+
+
+def id_ranges(model, range_size=DEFAULT_RANGE_SIZE):
+    """Aligned ``(start, end)`` id ranges covering the current rows of ``model``."""
+    bounds = model.objects.aggregate(lo=Min('id'), hi=Max('id'))
+    if bounds['lo'] is None:
+        return []
+    first = bounds['lo'] // range_size * range_size
+    return [
+        (start, min(start + range_size, bounds['hi'] + 1))
+        for start in range(first, bounds['hi'] + 1, range_size)
+    ]
+
+
+def supports_fingerprints():
+    return connection.vendor == 'postgresql'
+
+
+def range_fingerprint(model, start, end):
+    """``(row_count, fingerprint)`` of ``[start, end)``, computed in the database."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT count(*), md5(coalesce(string_agg(md5(t::text), \'\' ORDER BY t.id), \'\')) '
+            f'FROM {table} t WHERE t.id >= %s AND t.id < %s',
+            [start, end],
+        )
+        return cursor.fetchone()
+
+
+def verify_range(table, start, end, chunk_size=2000, fix=False):
+    """
+    Verify the rows of ``table`` in ``[start, end)``.  Returns a plain dict
+    (it crosses process boundaries): counts, the tampered / missing ids,
+    recomputed checksums when ``fix`` and, when the range was stable while
+    it was read, its ``fingerprint``.
+    """
+    from core.models.audit import compute_checksum
+
+    model = audit_models()[table]
+    fingerprinted = supports_fingerprints()
+    before = range_fingerprint(model, start, end) if fingerprinted else None
+
+    result = {
+        'table': table, 'start': start, 'end': end,
+        'valid': 0, 'missing': [], 'tampered': [], 'fixes': {}, 'fingerprint': None,
+    }
+    rows = (
+        model.objects.filter(id__gte=start, id__lt=end).order_by('id')
+        .values_list(*CHECKSUM_FIELDS).iterator(chunk_size=chunk_size)
+    )
+    for pk, checksum, user_id, action, resource_id, timestamp, old_value, new_value in rows:
+        expected = compute_checksum(user_id, action, resource_id, timestamp, old_value, new_value)
+        if not checksum:
+            result['missing'].append(pk)
+        elif hmac.compare_digest(checksum, expected):
+            result['valid'] += 1
+            continue
+        else:
+            result['tampered'].append(pk)
+        if fix:
+            result['fixes'][pk] = expected
+
+    # A row committed mid-read (ids are not committed in order) changes the
+    # fingerprint; the range is then left without a checkpoint this run
+    if fingerprinted and not result['missing'] and not result['tampered']:
+        after = range_fingerprint(model, start, end)
+        if after == before:
+            result['row_count'], result['fingerprint'] = after
+    return result
+
+
+def _verify_range_task(args):
+    return verify_range(*args)
+
+
+def _can_fork():
+    # Workers inherit the configured Django (and, under tests, the test
+    # database) only when forked; spawned ones would start unconfigured.
+    import multiprocessing
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def checksum_statuses(queryset):
+    """``{id: 'valid' | 'tampered' | 'missing'}`` for the rows of ``queryset`` (one query)."""
+    from core.models.audit import compute_checksum
+
+    statuses = {}
+    for pk, checksum, user_id, action, resource_id, timestamp, old_value, new_value in (
+        queryset.order_by().values_list(*CHECKSUM_FIELDS)
+    ):
+        if not checksum:
+            statuses[pk] = 'missing'
+        else:
+            expected = compute_checksum(user_id, action, resource_id, timestamp, old_value, new_value)
+            statuses[pk] = 'valid' if hmac.compare_digest(checksum, expected) else 'tampered'
+    return statuses
+
+
+# ── Checkpoints ─────────────────────────────────────────────────────────────
+def sign_checkpoint(table, start, end, row_count, fingerprint, previous_signature):
+    value = f'{table}:{start}:{end}:{row_count}:{fingerprint}:{previous_signature}'
+    return salted_hmac(CHECKPOINT_SALT, value, algorithm='sha256').hexdigest()
+
+
+def trusted_checkpoints(table):
+    """
+    ``{range_start: checkpoint}`` of the checkpoints of ``table`` whose
+    signature chain is intact.  The chain stops at the first bad signature:
+    that checkpoint and every later one are distrusted.
+    """
+    from core.models import AuditIntegrityCheckpoint
+
+    trusted = {}
+    previous = ''
+    for cp in AuditIntegrityCheckpoint.objects.filter(table=table).order_by('range_start'):
+        expected = sign_checkpoint(table, cp.range_start, cp.range_end, cp.row_count,
+                                   cp.fingerprint, previous)
+        if not hmac.compare_digest(cp.signature, expected):
+            logger.warning('Audit checkpoint chain broken at %s [%s, %s)',
+                           table, cp.range_start, cp.range_end)
+            break
+        trusted[cp.range_start] = cp
+        previous = cp.signature
+    return trusted
+
+
+def save_checkpoints(table, entries):
+    """Replace the checkpoints of ``table`` with ``entries`` (re-signing the chain)."""
+    from core.models import AuditIntegrityCheckpoint
+
+    previous = ''
+    objs = []
+    for start, end, row_count, fingerprint in sorted(entries):
+        signature = sign_checkpoint(table, start, end, row_count, fingerprint, previous)
+        objs.append(AuditIntegrityCheckpoint(
+            table=table, range_start=start, range_end=end,
+            row_count=row_count, fingerprint=fingerprint, signature=signature,
+        ))
+        previous = signature
+    with transaction.atomic():
+        AuditIntegrityCheckpoint.objects.filter(table=table).delete()
+        AuditIntegrityCheckpoint.objects.bulk_create(objs)
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────
+def verify_audit_tables(tables=None, *, range_size=DEFAULT_RANGE_SIZE, chunk_size=2000,
+                        workers=1, fix=False, full=False, on_range=None):
+    """
+    Verify ``tables`` (default: every audit table).  Ranges whose trusted
+    checkpoint still matches are skipped unless ``full``.  ``workers`` > 1
+    verifies ranges in a pool of forked processes; where fork is not
+    available (Windows) ranges are verified in-process.  ``on_range(result)``
+    is called as each range finishes.
+
+    Returns ``{table: {'valid', 'skipped', 'missing', 'tampered', 'fixed'}}``
+    where ``missing`` / ``tampered`` are id lists.
+    """
+    models = audit_models()
+    tables = list(tables or models)
+    fingerprinted = supports_fingerprints()
+
+    summary = {}
+    pending = []
+    kept = {}
+    for table in tables:
+        model = models[table]
+        summary[table] = {'valid': 0, 'skipped': 0, 'missing': [], 'tampered': [], 'fixed': 0}
+        checkpoints = {} if full or not fingerprinted else trusted_checkpoints(table)
+        kept[table] = []
+        for start, end in id_ranges(model, range_size):
+            cp = checkpoints.get(start)
+            if cp is not None and cp.range_end == end:
+                row_count, fingerprint = range_fingerprint(model, start, end)
+                if row_count == cp.row_count and fingerprint == cp.fingerprint:
+                    summary[table]['skipped'] += row_count
+                    kept[table].append((start, end, row_count, fingerprint))
+                    continue
+            pending.append((table, start, end, chunk_size, fix))
+
+    def collect(result):
+        totals = summary[result['table']]
+        totals['valid'] += result['valid']
+        totals['missing'] += result['missing']
+        totals['tampered'] += result['tampered']
+        if result['fingerprint']:
+            kept[result['table']].append(
+                (result['start'], result['end'], result['row_count'], result['fingerprint'])
+            )
+        if result['fixes']:
+            model = models[result['table']]
+            for pk, checksum in result['fixes'].items():
+                model.objects.filter(pk=pk).update(checksum=checksum)
+            totals['fixed'] += len(result['fixes'])
+        if on_range:
+            on_range(result)
+
+    if workers > 1 and len(pending) > 1 and not _can_fork():
+        logger.info('Audit verification: fork is unavailable, verifying ranges in-process')
+        workers = 1
+
+    if workers > 1 and len(pending) > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Forked workers must open their own connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('fork')) as pool:
+            for result in pool.map(_verify_range_task, pending):
+                collect(result)
+    else:
+        for args in pending:
+            collect(verify_range(*args))
+
+    if fingerprinted:
+        for table in tables:
+            save_checkpoints(table, kept[table])
+    return summary
@@ -0,0 +1,338 @@
+"""
+Monthly range partitioning of the audit tables (PostgreSQL only).
+
+With AUDIT_LOG_PARTITIONING on, migration 0069 (or ``manage.py
+audit_partitions --convert`` later) turns ``audit_logs`` and
+``audit_logs_archive`` into tables partitioned by ``timestamp``, one
+partition per calendar month (UTC) named ``<table>_yYYYYmMM``, plus a
+``<table>_default`` partition that catches rows outside every month (so an
+insert never fails if upcoming partitions were not created in time).  The
+primary key becomes ``(id, timestamp)`` as PostgreSQL requires; ids still
+come from one sequence.
+
+``ensure_partitions`` pre-creates the upcoming months (the
+``audit_partitions`` command and the daily ``core.ensure_audit_partitions``
+task).  Rows that already landed in the default partition are moved into
+the new month as it is attached.
+
+``archive_partitions`` archives whole months: the month is detached from
+``audit_logs``, given the archive's ``archived_at`` column and attached to
+``audit_logs_archive`` — no row copies, no long DELETE.
+
+Every function is a no-op (returns nothing done) on other databases or
+while the tables are not partitioned; callers fall back to row copies.
+"""
+import logging
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+logger = logging.getLogger('osce.audit')
+
+AUDIT_TABLE = 'audit_logs'
+ARCHIVE_TABLE = 'audit_logs_archive'
+PARTITION_KEY = 'timestamp'
+DEFAULT_MONTHS_AHEAD = 3
+
+_MONTH_SUFFIX = re.compile(r'_y(\d{4})m(\d{2})$')
+
+
+# ── Months ──────────────────────────────────────────────────────────────────
+def month_start(value):
+    """First instant (UTC) of the month of ``value``."""
+    if value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(table, month):
+    return f'{table}_y{month.year:04d}m{month.month:02d}'
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+# ── Introspection ───────────────────────────────────────────────────────────
+def partitioning_supported():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(table):
+    if not partitioning_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid '
+            'WHERE c.relname = %s AND pg_table_is_visible(c.oid)',
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def audit_logs_partitioned():
+    return is_partitioned(AUDIT_TABLE)
+
+
+def month_partitions(table):
+    """``{month_start: partition_name}`` of the monthly partitions of ``table``."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = %s AND pg_table_is_visible(p.oid)',
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        match = _MONTH_SUFFIX.search(name)
+        if match:
+            months[datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)] = name
+    return months
+
+
+def _columns(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT a.attname FROM pg_attribute a WHERE a.attrelid = %s::regclass '
+            'AND a.attnum > 0 AND NOT a.attisdropped ORDER BY a.attnum',
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _table_definition(table):
+    """Indexes, constraints and the id sequence of ``table``, for rebuilding it."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'f', 'c')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        constraint_names = {name for name, _, _ in constraints}
+        cursor.execute(
+            'SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s',
+            [table],
+        )
+        indexes = [
+            definition.replace(' ON ONLY ', ' ON ')
+            for name, definition in cursor.fetchall() if name not in constraint_names
+        ]
+        cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id'])
+        has_sequence = cursor.fetchone()[0] is not None
+        cursor.execute(f'SELECT coalesce(max(id), 0), min({_q(PARTITION_KEY)}) FROM {_q(table)}')
+        max_id, first = cursor.fetchone()
+    return {
+        'pk': next((name for name, kind, _ in constraints if kind == 'p'), f'{table}_pkey'),
+        'constraints': [(name, definition) for name, kind, definition in constraints if kind != 'p'],
+        'indexes': indexes,
+        'has_sequence': has_sequence,
+        'max_id': max_id,
+        'first': first,
+    }
+
+
+def _rebuild(table, old, definition, pk_columns):
+    """Move the rows of ``old`` into the new ``table`` and restore its definition."""
+    columns = ', '.join(_q(c) for c in _columns(old))
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {_q(table)} ({columns}) SELECT {columns} FROM {_q(old)}')
+        cursor.execute(f'DROP TABLE {_q(old)} CASCADE')
+        cursor.execute(
+            f'ALTER TABLE {_q(table)} ADD CONSTRAINT {_q(definition["pk"])} '
+            f'PRIMARY KEY ({", ".join(_q(c) for c in pk_columns)})'
+        )
+        for name, constraint in definition['constraints']:
+            cursor.execute(f'ALTER TABLE {_q(table)} ADD CONSTRAINT {_q(name)} {constraint}')
+        for index in definition['indexes']:
+            cursor.execute(index)
+
+
+# ── Conversion ──────────────────────────────────────────────────────────────
+def partition_table(table, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Convert ``table`` into a monthly partitioned table.  Returns True if converted."""
+    if not partitioning_supported() or is_partitioned(table):
+        return False
+    old = f'{table}_unpartitioned'
+    with transaction.atomic():
+        definition = _table_definition(table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {_q(table)} RENAME TO {_q(old)}')
+            cursor.execute(
+                f'CREATE TABLE {_q(table)} (LIKE {_q(old)}) '
+                f'PARTITION BY RANGE ({_q(PARTITION_KEY)})'
+            )
+            cursor.execute(f'CREATE TABLE {_q(table + "_default")} PARTITION OF {_q(table)} DEFAULT')
+        now = month_start(datetime.now(dt_timezone.utc))
+        month = month_start(definition['first']) if definition['first'] else now
+        while month <= add_months(now, months_ahead):
+            _create_partition(table, month)
+            month = add_months(month, 1)
+        _rebuild(table, old, definition, ['id', PARTITION_KEY])
+        if definition['has_sequence']:
+            _attach_sequence(table, definition['max_id'])
+    logger.info('Partitioned %s by month', table)
+    return True
+
+
+def unpartition_table(table):
+    """Turn a partitioned ``table`` back into a plain table.  Returns True if converted."""
+    if not is_partitioned(table):
+        return False
+    old = f'{table}_partitioned'
+    with transaction.atomic():
+        definition = _table_definition(table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {_q(table)} RENAME TO {_q(old)}')
+            cursor.execute(f'CREATE TABLE {_q(table)} (LIKE {_q(old)})')
+            if definition['has_sequence']:
+                cursor.execute(f'ALTER TABLE {_q(old)} ALTER COLUMN id DROP DEFAULT')
+        _rebuild(table, old, definition, ['id'])
+        if definition['has_sequence']:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE {_q(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY'
+                )
+                cursor.execute(
+                    'SELECT setval(pg_get_serial_sequence(%s, %s), %s, %s)',
+                    [table, 'id', max(definition['max_id'], 1), definition['max_id'] > 0],
+                )
+    logger.info('Removed the partitioning of %s', table)
+    return True
+
+
+def _attach_sequence(table, max_id):
+    sequence = f'{table}_id_seq'
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE SEQUENCE {_q(sequence)} OWNED BY {_q(table)}.id')
+        cursor.execute(f"ALTER TABLE {_q(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute('SELECT setval(%s, %s, %s)', [sequence, max(max_id, 1), max_id > 0])
+
+
+def partition_audit_tables(months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Partition ``audit_logs`` and ``audit_logs_archive``; returns the converted tables."""
+    return [t for t in (AUDIT_TABLE, ARCHIVE_TABLE) if partition_table(t, months_ahead)]
+
+
+def unpartition_audit_tables():
+    return [t for t in (AUDIT_TABLE, ARCHIVE_TABLE) if unpartition_table(t)]
+
+
+# ── Upcoming partitions ─────────────────────────────────────────────────────
+def _bounds(month):
+    return month.isoformat(), add_months(month, 1).isoformat()
+
+
+def _create_partition(table, month, rows_from=None):
+    """
+    Create the partition of ``month`` as a standalone table, move that
+    month's rows into it (from the default partition, or ``rows_from``)
+    and attach it.
+    """
+    name = partition_name(table, month)
+    start, end = _bounds(month)
+    source = rows_from or f'{table}_default'
+    key = _q(PARTITION_KEY)
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {_q(name)} (LIKE {_q(table)})')
+        cursor.execute(
+            'SELECT 1 FROM pg_class WHERE relname = %s AND pg_table_is_visible(oid)', [source],
+        )
+        if cursor.fetchone():
+            columns = ', '.join(_q(c) for c in _columns(table))
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {_q(source)} WHERE {key} >= %s AND {key} < %s '
+                f'RETURNING {columns}) INSERT INTO {_q(name)} ({columns}) SELECT {columns} FROM moved',
+                [start, end],
+            )
+        cursor.execute(
+            f"ALTER TABLE {_q(table)} ATTACH PARTITION {_q(name)} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    return name
+
+
+def ensure_partitions(months_ahead=DEFAULT_MONTHS_AHEAD, now=None):
+    """Create the missing monthly partitions up to ``months_ahead``; returns their names."""
+    created = []
+    current = month_start(now or datetime.now(dt_timezone.utc))
+    for table in (AUDIT_TABLE, ARCHIVE_TABLE):
+        if not is_partitioned(table):
+            continue
+        existing = month_partitions(table)
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                with transaction.atomic():
+                    created.append(_create_partition(table, month))
+    if created:
+        logger.info('Created audit partitions: %s', ', '.join(created))
+    return created
+
+
+# ── Archival ────────────────────────────────────────────────────────────────
+def archivable_months(cutoff):
+    """Months of ``audit_logs`` that end on or before ``cutoff``, oldest first."""
+    if not audit_logs_partitioned():
+        return []
+    return sorted(
+        (month, name) for month, name in month_partitions(AUDIT_TABLE).items()
+        if add_months(month, 1) <= cutoff
+    )
+
+
+def archive_partitions(cutoff):
+    """
+    Move every whole month of ``audit_logs`` older than ``cutoff`` to
+    ``audit_logs_archive`` by detaching and re-attaching its partition.
+    Returns ``[(month_partition, rows)]``; empty when not partitioned.
+    """
+    if not is_partitioned(ARCHIVE_TABLE):
+        return []
+    archived = []
+    archive_columns = _columns(ARCHIVE_TABLE)
+    for month, name in archivable_months(cutoff):
+        target = partition_name(ARCHIVE_TABLE, month)
+        start, end = _bounds(month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {_q(name)}')
+            rows = cursor.fetchone()[0]
+            cursor.execute(f'ALTER TABLE {_q(AUDIT_TABLE)} DETACH PARTITION {_q(name)}')
+            cursor.execute(
+                f'ALTER TABLE {_q(name)} ADD COLUMN archived_at timestamp with time zone '
+                f'NOT NULL DEFAULT now()'
+            )
+            cursor.execute(f'ALTER TABLE {_q(name)} ALTER COLUMN archived_at DROP DEFAULT')
+            if target in month_partitions(ARCHIVE_TABLE).values():
+                # Month already archived (row copies before partitioning): merge
+                columns = ', '.join(_q(c) for c in archive_columns)
+                cursor.execute(
+                    f'INSERT INTO {_q(target)} ({columns}) SELECT {columns} FROM {_q(name)}'
+                )
+                cursor.execute(f'DROP TABLE {_q(name)}')
+            else:
+                # Archived rows of this month that sit in the default partition
+                columns = ', '.join(_q(c) for c in archive_columns)
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {_q(ARCHIVE_TABLE + "_default")} '
+                    f'WHERE {_q(PARTITION_KEY)} >= %s AND {_q(PARTITION_KEY)} < %s '
+                    f'RETURNING {columns}) INSERT INTO {_q(name)} ({columns}) '
+                    f'SELECT {columns} FROM moved',
+                    [start, end],
+                )
+                cursor.execute(f'ALTER TABLE {_q(name)} RENAME TO {_q(target)}')
+                cursor.execute(
+                    f"ALTER TABLE {_q(ARCHIVE_TABLE)} ATTACH PARTITION {_q(target)} "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+        archived.append((name, rows))
+        logger.info('Archived audit partition %s (%d rows)', name, rows)
+    return archived
@@ -0,0 +1,257 @@
+"""
+Audit policies for AuditTrailMiddleware's HTTP-level entries.
+
+The middleware adds an ``ADMIN_ACTION`` entry for every successful mutating
+request that no view or signal audited.  High-frequency tablet calls
+(item marking, autosave) would produce thousands of near-identical rows, so
+each request path is matched against ``settings.AUDIT_HTTP_POLICIES`` — a
+list of ``(path regex, rule)`` pairs, first match wins, unmatched paths use
+``AUDIT_HTTP_DEFAULT_POLICY``.  A matching rule also applies to requests
+that were audited already (``mark_item``'s ItemScore and StationScore
+saves are), so a coalesced path gets its per-window summary either way.
+Rules:
+
+  always          one entry per request (the historical behaviour)
+  never           no entry
+  sample:<pct>    an entry for roughly <pct>% of requests (``sample_rate``
+                  is recorded in extra_data)
+  coalesce:<sec>  one summarized entry per user, method and path per
+                  <sec>-second window, carrying the request ``count``
+
+Coalesced requests only bump cache counters (``cache.incr``, so concurrent
+workers never lose a hit):
+
+  osce:audit:coalesce:<end>:<digest>       requests seen in the window
+  osce:audit:coalesce:<end>:<digest>:meta  entry payload of the first request
+  osce:audit:coalesce:slots                registration counter
+  osce:audit:coalesce:slot:<n>             counter key registered as slot n
+  osce:audit:coalesce:flushed              last slot written out
+
+``flush_coalesced`` writes every closed window in one ``log_bulk`` call.  It
+runs from Celery Beat (``core.flush_coalesced_audit``); without Celery the
+middleware checks after every request (not only coalesced ones) and runs it
+inline at most once per ``AUDIT_COALESCE_FLUSH_INTERVAL``.  Slots are
+flushed in registration order, so an open window holds back the slots
+registered after it until it closes.
+
+Coalescing needs a cache shared by every worker (Redis): with a per-process
+cache (LocMem, the default without REDIS_URL) each process would hold its
+own counters and a process that stops receiving requests would never write
+its last window.  ``coalesce`` rules therefore fall back to ``always`` on a
+per-process cache unless ``AUDIT_COALESCE_ON_LOCAL_CACHE`` is set (single
+process development and tests).
+"""
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger('osce.audit')
+
+ALWAYS = 'always'
+NEVER = 'never'
+SAMPLE = 'sample'
+COALESCE = 'coalesce'
+
+Policy = namedtuple('Policy', 'mode value')
+
+COALESCE_GRACE = 5               # seconds a closed window waits for late increments
+COALESCE_TTL = 60 * 60 * 6       # counters outlive their window by this much
+COALESCE_FLUSH_BATCH = 5000      # max slots written per flush
+COALESCE_LOCK_TTL = 60
+
+COALESCE_KEY = 'osce:audit:coalesce:{window_end}:{digest}'
+COALESCE_SLOTS_KEY = 'osce:audit:coalesce:slots'
+COALESCE_SLOT_KEY = 'osce:audit:coalesce:slot:{n}'
+COALESCE_FLUSHED_KEY = 'osce:audit:coalesce:flushed'
+COALESCE_LOCK_KEY = 'osce:audit:coalesce:lock'
+COALESCE_DUE_KEY = 'osce:audit:coalesce:due'
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.',
+    'django.core.cache.backends.dummy.',
+)
+
+_next_due_check = 0.0   # per process, so most requests skip the cache round trip
+
+
+# ── Rules ──────────────────────────────────────────────────────────────────
+def parse_policy(rule):
+    """``'sample:10'`` → ``Policy('sample', 10.0)``; raises ImproperlyConfigured."""
+    mode, _, value = str(rule).strip().lower().partition(':')
+    if mode in (ALWAYS, NEVER) and not value:
+        return Policy(mode, None)
+    try:
+        if mode == SAMPLE:
+            rate = float(value)
+            if 0 <= rate <= 100:
+                return Policy(SAMPLE, rate)
+        elif mode == COALESCE:
+            window = int(value)
+            if window > 0:
+                return Policy(COALESCE, window)
+    except ValueError:
+        pass
+    raise ImproperlyConfigured(
+        f'Invalid audit policy {rule!r}: expected always, never, '
+        f'sample:<0-100> or coalesce:<seconds>'
+    )
+
+
+@lru_cache(maxsize=8)
+def _compile(rules, default):
+    return [(re.compile(pattern), parse_policy(rule)) for pattern, rule in rules], parse_policy(default)
+
+
+def policy_for(path, audited=False):
+    """
+    The Policy of the first AUDIT_HTTP_POLICIES rule matching ``path``.
+
+    For a request a view or signal already ``audited``, only a rule matching
+    its path applies: the default policy, and a ``coalesce`` rule falling
+    back to ``always``, become ``never``.
+    """
+    compiled, default = _compile(
+        tuple(tuple(rule) for rule in getattr(settings, 'AUDIT_HTTP_POLICIES', ())),
+        getattr(settings, 'AUDIT_HTTP_DEFAULT_POLICY', ALWAYS),
+    )
+    policy = next((policy for pattern, policy in compiled if pattern.search(path)), None)
+    if policy is None:
+        policy = Policy(NEVER, None) if audited else default
+    if policy.mode == COALESCE and not coalescing_supported():
+        return Policy(NEVER if audited else ALWAYS, None)
+    return policy
+
+
+def coalescing_supported():
+    """False on a per-process cache, unless AUDIT_COALESCE_ON_LOCAL_CACHE is set."""
+    if getattr(settings, 'AUDIT_COALESCE_ON_LOCAL_CACHE', False):
+        return True
+    return not settings.CACHES['default']['BACKEND'].startswith(LOCAL_CACHE_BACKENDS)
+
+
+def sampled(policy):
+    """True when a request under a ``sample`` policy should be logged."""
+    return random.random() * 100 < policy.value
+
+
+# ── Coalescing ─────────────────────────────────────────────────────────────
+def record_coalesced(payload, window, now=None):
+    """
+    Count one request towards its coalesced entry.  ``payload`` (an
+    AuditLogService payload) is stored only for the first request of the
+    window; later requests just increment the counter.
+    """
+    now = time.time() if now is None else now
+    window_end = (int(now) // window + 1) * window
+    identity = f"{payload.get('user_id')}|{payload.get('request_method')}|{payload.get('request_path')}"
+    digest = hashlib.sha1(identity.encode()).hexdigest()[:20]
+    key = COALESCE_KEY.format(window_end=window_end, digest=digest)
+    ttl = window + COALESCE_TTL
+
+    if not cache.add(key, 1, ttl):
+        try:
+            cache.incr(key)
+            return
+        except ValueError:
+            # Evicted between add() and incr() — register it again
+            cache.set(key, 1, ttl)
+
+    payload['extra_data'] = dict(payload.get('extra_data') or {}, first_seen=now)
+    cache.set(f'{key}:meta', {'payload': payload, 'window': window, 'window_end': window_end}, ttl)
+    cache.add(COALESCE_SLOTS_KEY, 0, None)
+    try:
+        slot = cache.incr(COALESCE_SLOTS_KEY)
+    except ValueError:
+        cache.set(COALESCE_SLOTS_KEY, 1, None)
+        slot = 1
+    cache.set(COALESCE_SLOT_KEY.format(n=slot), key, ttl)
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc).isoformat()
+
+
+def _summary_entry(meta, count):
+    payload = dict(meta['payload'])
+    extra = dict(payload.get('extra_data') or {})
+    window_end = meta['window_end']
+    first_seen = extra.pop('first_seen', window_end - meta['window'])
+    extra.update({
+        'coalesced': True,
+        'count': count,
+        'window_seconds': meta['window'],
+        'first_seen': _iso(first_seen),
+        'window_end': _iso(window_end),
+    })
+    payload['extra_data'] = extra
+    payload['description'] = (
+        f"{payload.get('request_method', '')} {payload.get('request_path', '')} "
+        f"× {count} (coalesced over {meta['window']}s)"
+    )[:1000]
+    return payload
+
+
+def flush_coalesced(now=None):
+    """
+    Write one summarized entry for every closed coalescing window.
+    Returns the number of entries written (0 when another flush is running).
+    """
+    from core.utils.audit import AuditLogService
+
+    if not cache.add(COALESCE_LOCK_KEY, 1, COALESCE_LOCK_TTL):
+        return 0
+    try:
+        now = time.time() if now is None else now
+        flushed = cache.get(COALESCE_FLUSHED_KEY, 0)
+        top = min(cache.get(COALESCE_SLOTS_KEY, 0), flushed + COALESCE_FLUSH_BATCH)
+        if top <= flushed:
+            return 0
+
+        slot_keys = [COALESCE_SLOT_KEY.format(n=n) for n in range(flushed + 1, top + 1)]
+        keys = cache.get_many(slot_keys)
+        counters = cache.get_many(
+            [k for key in keys.values() for k in (key, f'{key}:meta')]
+        )
+
+        entries, done = [], []
+        for n, slot_key in enumerate(slot_keys, start=flushed + 1):
+            key = keys.get(slot_key)
+            meta = counters.get(f'{key}:meta') if key else None
+            if meta is not None:
+                if meta['window_end'] + COALESCE_GRACE > now:
+                    break
+                entries.append(_summary_entry(meta, counters.get(key, 1)))
+                done += [key, f'{key}:meta']
+            done.append(slot_key)
+            flushed = n
+
+        cache.set(COALESCE_FLUSHED_KEY, flushed, None)
+        if done:
+            cache.delete_many(done)
+        if entries:
+            AuditLogService.log_bulk(entries)
+            logger.info('Flushed %d coalesced audit entries', len(entries))
+        return len(entries)
+    finally:
+        cache.delete(COALESCE_LOCK_KEY)
+
+
+def flush_coalesced_if_due():
+    """Inline flush for deployments without Celery Beat (rate-limited)."""
+    global _next_due_check
+    interval = getattr(settings, 'AUDIT_COALESCE_FLUSH_INTERVAL', 60)
+    now = time.time()
+    if now < _next_due_check:
+        return
+    _next_due_check = now + interval
+    if cache.add(COALESCE_DUE_KEY, 1, interval):
+        flush_coalesced()
@@ -0,0 +1,113 @@
+"""
+Query helpers for the audit log viewer (AuditLogAdmin).
+
+The audit tables reach tens of millions of rows, so the viewer avoids the
+three things that made the default admin slow:
+
+  * ``COUNT(*)`` — ``estimated_count`` reads the planner's row estimate on
+    PostgreSQL and only counts exactly when that estimate is small;
+  * ``OFFSET`` pages — ``keyset_page`` pages on ``(timestamp, id)``
+    (newest first) from an opaque cursor, served by ``idx_audit_ts_id``;
+  * ``icontains`` over ``description`` — ``search_audit_logs`` matches a
+    ``tsvector`` over username / resource label / description, backed by
+    the ``idx_audit_fts`` GIN index (migration 0070).  Other databases
+    fall back to ``icontains``.
+"""
+import ipaddress
+import json
+import re
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+EXACT_COUNT_BELOW = 10_000
+
+# Must stay identical to the idx_audit_fts expression for the index to be used
+FTS_DOCUMENT = (
+    "to_tsvector('simple', coalesce({t}.username, '') || ' ' || "
+    "coalesce({t}.resource_label, '') || ' ' || coalesce({t}.description, ''))"
+)
+
+
+def estimated_count(queryset, exact_below=None):
+    """
+    Row count of ``queryset``: the planner's estimate on PostgreSQL, made
+    exact when it is below ``exact_below`` (default EXACT_COUNT_BELOW;
+    counting is then cheap).  Returns ``(count, is_estimate)``.
+    """
+    if exact_below is None:
+        exact_below = EXACT_COUNT_BELOW
+    if connection.vendor == 'postgresql':
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= exact_below:
+            return estimate, True
+    return queryset.count(), False
+
+
+# ── Keyset pagination ───────────────────────────────────────────────────────
+def encode_cursor(entry):
+    return f'{entry.timestamp.isoformat()}~{entry.pk}'
+
+
+def decode_cursor(cursor):
+    """``(timestamp, id)`` of a cursor, or None when it is malformed."""
+    try:
+        timestamp, pk = cursor.rsplit('~', 1)
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, cursor, size):
+    """
+    Entries after ``cursor`` (newest first) and the cursor of the next page
+    (None on the last page).  One query of ``size + 1`` rows.
+    """
+    queryset = queryset.order_by('-timestamp', '-id')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        timestamp, pk = position
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+    entries = list(queryset[:size + 1])
+    if len(entries) > size:
+        return entries[:size], encode_cursor(entries[size - 1])
+    return entries, None
+
+
+# ── Search ──────────────────────────────────────────────────────────────────
+def _ts_query(term):
+    """Prefix query matching every word of ``term`` (``ab:* & cd:*``)."""
+    words = re.findall(r'\w+', term)
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def search_audit_logs(queryset, term, fallback_fields=()):
+    """
+    Filter ``queryset`` by ``term``: full-text over username, resource
+    label and description, plus exact resource id / IP address matches.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    if connection.vendor != 'postgresql':
+        condition = Q()
+        for field in fallback_fields:
+            condition |= Q(**{f'{field}__icontains': term})
+        return queryset.filter(condition)
+
+    condition = Q(resource_id=term[:36])
+    ts_query = _ts_query(term)
+    if ts_query:
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        condition |= Q(RawSQL(
+            f"{FTS_DOCUMENT.format(t=table)} @@ to_tsquery('simple', %s)",
+            [ts_query], output_field=BooleanField(),
+        ))
+    try:
+        condition |= Q(ip_address=str(ipaddress.ip_address(term)))
+    except ValueError:
+        pass
+    return queryset.filter(condition)
@@ -6,11 +6,14 @@ Keys & timeouts:
   examiner_stats    → 5 min   (counts, assigned-today)
   examiner_list     → 5 min   (full queryset list)
   session_detail_<id> → 2 min (paths, assignments for one session)
+  rls_context_<user>  → 10 min (RLS role / department / station IDs)
+  examiner_home_<examiner>_<day> → 12 h (examiner home cards, see examiner_home)
 
 All cache keys are invalidated explicitly when the underlying data changes
 (signals + view-level invalidation helpers below).
 """
 import logging
+from datetime import date
 
 from django.core.cache import cache
 
@@ -22,6 +25,8 @@ EXAMINER_STATS_TTL   = 60 * 5    # 5 minutes
 EXAMINER_LIST_TTL    = 60 * 5    # 5 minutes
 SESSION_DETAIL_TTL   = 60 * 2    # 2 minutes
 DASHBOARD_STATS_TTL  = 60 * 5    # 5 minutes
+RLS_CONTEXT_TTL      = 60 * 10   # 10 minutes
+EXAMINER_HOME_TTL    = 60 * 60 * 12  # 12 hours (one exam day)
 
 # ── Cache key builders ──────────────────────────────────────────────────────
 DEPT_LIST_KEY            = 'osce:dept_list'
@@ -30,6 +35,8 @@ EXAMINER_LIST_KEY        = 'osce:examiner_list'
 SESSION_DETAIL_KEY       = 'osce:session_detail:{session_id}'
 DASHBOARD_STATS_KEY      = 'osce:dashboard_stats'
 EXAM_DETAIL_KEY          = 'exam_detail_{exam_id}'
+RLS_CONTEXT_KEY          = 'osce:rls_context:{user_id}'
+EXAMINER_HOME_KEY        = 'osce:examiner_home:{examiner_id}:{day}'
 
 
 # ── Department helpers ─────────────────────────────────────────────────────
@@ -64,10 +71,22 @@ def get_session_detail_cache_key(session_id):
 
 def invalidate_session_detail(session_id):
     """Call when session, its paths, assignments or students change."""
+    from core.utils.live_progress import invalidate_live_progress
+    from core.utils.station_progress import invalidate_session_station_progress
     cache.delete(get_session_detail_cache_key(session_id))
+    invalidate_live_progress(session_id)
+    invalidate_session_examiner_home(session_id)
+    invalidate_session_station_progress(session_id)
     logger.debug('Cache INVALIDATED: session_detail %s', session_id)
 
 
+def invalidate_session_students(session_id):
+    """Call when students are added to, moved within or removed from a session."""
+    from core.utils.station_progress import invalidate_session_station_progress
+    invalidate_session_examiner_home(session_id)
+    invalidate_session_station_progress(session_id)
+
+
 def invalidate_exam_detail(exam_id):
     """Call when sessions are created, deleted, or status-changed for an exam."""
     cache.delete(EXAM_DETAIL_KEY.format(exam_id=exam_id))
@@ -78,3 +97,54 @@ def invalidate_exam_detail(exam_id):
 def invalidate_dashboard_stats():
     cache.delete(DASHBOARD_STATS_KEY)
     logger.debug('Cache INVALIDATED: dashboard_stats')
+
+
+# ── RLS context helpers ─────────────────────────────────────────────────────
+def get_rls_context_cache_key(user_id):
+    return RLS_CONTEXT_KEY.format(user_id=user_id)
+
+
+def invalidate_rls_context(*user_ids):
+    """Call when a user's role/department or examiner assignments change."""
+    if not user_ids:
+        return
+    cache.delete_many([get_rls_context_cache_key(uid) for uid in user_ids])
+    logger.debug('Cache INVALIDATED: rls_context %s', ', '.join(map(str, user_ids)))
+
+
+def invalidate_session_rls_context(*session_ids):
+    """Call when session status changes (their stations enter/leave the active set)."""
+    from core.models import ExaminerAssignment
+    if not session_ids:
+        return
+    examiner_ids = set(
+        ExaminerAssignment.objects.filter(session_id__in=session_ids)
+        .values_list('examiner_id', flat=True)
+    )
+    invalidate_rls_context(*examiner_ids)
+
+
+# ── Examiner home snapshot helpers ──────────────────────────────────────────
+def get_examiner_home_cache_key(examiner_id, day):
+    return EXAMINER_HOME_KEY.format(examiner_id=examiner_id, day=day.isoformat())
+
+
+def invalidate_examiner_home(*examiner_ids):
+    """Call when an examiner's assignments change."""
+    if not examiner_ids:
+        return
+    today = date.today()
+    cache.delete_many([get_examiner_home_cache_key(eid, today) for eid in examiner_ids])
+    logger.debug('Cache INVALIDATED: examiner_home %s', ', '.join(map(str, examiner_ids)))
+
+
+def invalidate_session_examiner_home(*session_ids):
+    """Call when a session's layout or students change (drops its examiners' home cards)."""
+    from core.models import ExaminerAssignment
+    if not session_ids:
+        return
+    examiner_ids = set(
+        ExaminerAssignment.objects.filter(session_id__in=session_ids)
+        .values_list('examiner_id', flat=True)
+    )
+    invalidate_examiner_home(*examiner_ids)
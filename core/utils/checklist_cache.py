@@ -0,0 +1,130 @@
+"""
+Compiled station checklist payloads for the examiner marking screens.
+
+Every tablet fetches ``/api/station/<id>/checklist/`` at the start of each
+rotation.  The payload (items, ILO/theme labels, default rubric levels,
+max score) only changes when a coordinator edits the station, so it is
+compiled once and cached together with a content hash:
+
+    osce:station_checklist:<station_id> → {'etag': <sha256>, 'payload': {...}}
+
+The hash is served as a strong ETag; clients revalidating with a matching
+``If-None-Match`` get a 304 without the payload being rebuilt or re-sent.
+
+Image URLs are stored site-relative and made absolute per response.
+
+Invalidated from core.signals (station / checklist item / ILO / theme
+saves and ``sync_station_max_score``).
+"""
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger('osce.cache')
+
+STATION_CHECKLIST_TTL = 60 * 60        # 1 hour — signals invalidate earlier
+STATION_CHECKLIST_KEY = 'osce:station_checklist:{station_id}'
+
+
+def _default_rubric_levels(rubric_type, max_pts):
+    if rubric_type == 'binary':
+        return [
+            {'score': 0, 'label': 'Not Done', 'color': 'danger'},
+            {'score': max_pts, 'label': 'Done', 'color': 'success'},
+        ]
+    if rubric_type == 'partial':
+        return [
+            {'score': 0, 'label': 'Not Done', 'color': 'danger'},
+            {'score': max_pts * 0.5, 'label': 'Partial', 'color': 'warning'},
+            {'score': max_pts, 'label': 'Complete', 'color': 'success'},
+        ]
+    if rubric_type == 'scale':
+        return [
+            {'score': i, 'label': str(i), 'color': 'secondary'}
+            for i in range(int(max_pts) + 1)
+        ]
+    return None
+
+
+def _compile_item(item):
+    try:
+        image_url = item.image.url if item.image and item.image.name else None
+    except Exception:
+        image_url = None
+
+    rubric_levels = None
+    if item.rubric_levels:
+        if isinstance(item.rubric_levels, (list, dict)):
+            # JSONField already deserialized to Python object
+            rubric_levels = item.rubric_levels
+        else:
+            try:
+                rubric_levels = json.loads(item.rubric_levels)
+            except (json.JSONDecodeError, TypeError):
+                pass
+
+    rubric_type = item.rubric_type or 'binary'
+    return {
+        'id': item.id,
+        'item_number': item.item_number,
+        'description': item.description,
+        'points': item.points,
+        'category': item.category or 'General',
+        'expected_response': item.expected_response,
+        'rubric_type': rubric_type,
+        'rubric_levels': rubric_levels or _default_rubric_levels(rubric_type, item.points),
+        'ilo_name': item.ilo.theme_name if item.ilo else None,
+        'ilo_number': item.ilo.number if item.ilo else None,
+        'image_url': image_url,
+    }
+
+
+def compile_station_checklist(station):
+    """Build the checklist payload for ``station`` (one query for the items)."""
+    from core.models import ChecklistItem
+
+    items = [
+        _compile_item(item)
+        for item in ChecklistItem.objects.filter(station_id=station.pk)
+        .select_related('ilo', 'ilo__theme').order_by('item_number')
+    ]
+    return {
+        'station': {
+            'id': str(station.id),
+            'name': station.name,
+            'scenario': station.scenario,
+            'instructions': station.instructions,
+            'duration_minutes': station.duration_minutes,
+            'max_score': sum(item['points'] for item in items),
+        },
+        'items': items,
+    }
+
+
+def get_station_checklist(station):
+    """
+    Return ``(etag, payload)`` for ``station``, compiling on a cache miss.
+
+    ``etag`` is a quoted strong ETag derived from the payload content.
+    """
+    key = STATION_CHECKLIST_KEY.format(station_id=station.pk)
+    entry = cache.get(key)
+    if entry is None:
+        payload = compile_station_checklist(station)
+        digest = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+        entry = {'etag': f'"{digest}"', 'payload': payload}
+        cache.set(key, entry, STATION_CHECKLIST_TTL)
+        logger.debug('Cache MISS: station checklist %s compiled', station.pk)
+    return entry['etag'], entry['payload']
+
+
+def invalidate_station_checklist(*station_ids):
+    """Call when a station, its checklist items or their ILO/theme change."""
+    if not station_ids:
+        return
+    cache.delete_many([STATION_CHECKLIST_KEY.format(station_id=sid) for sid in station_ids])
+    logger.debug('Cache INVALIDATED: station checklist %s', ', '.join(map(str, station_ids)))
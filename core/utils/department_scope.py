@@ -0,0 +1,144 @@
+"""
+Denormalised ``department_id`` on the exam hierarchy.
+
+ExamSession, Path, Station, SessionStudent and StationScore carry the
+department of the course they belong to, so coordinator scoping
+(``scope_queryset``, ``DepartmentScopedMixin``) and the RLS policies filter
+on one indexed column instead of joining up to ``courses``:
+
+    Station.objects.filter(department=dept)      # was path__session__exam__course__department
+
+How the column is maintained:
+
+  * new rows copy it from their parent in pre_save (``fill_department_id``)
+    — the parent's own department_id, so one primary-key lookup at most,
+    none when the parent instance is already attached;
+  * ``bulk_create`` callers set ``department_id`` themselves;
+  * when a course changes department or an exam changes course, every
+    row below it is re-derived set-based (``sync_exam_departments``).
+
+Moving a station between paths or a student between paths never changes
+the department (both stay within one exam), so those saves cost nothing.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+logger = logging.getLogger('osce.audit')
+
+# model name -> FK fields to take the department from, in order of preference
+_PARENTS = {
+    'ExamSession':    ('exam',),
+    'Path':           ('session',),
+    'Station':        ('path', 'exam'),
+    'SessionStudent': ('session',),
+    'StationScore':   ('station',),
+}
+
+
+def _department_of(parent_model, parent_id):
+    from core.models import Exam
+    if parent_model is Exam:
+        return Exam.objects.filter(pk=parent_id).values_list('course__department_id', flat=True).first()
+    return parent_model.objects.filter(pk=parent_id).values_list('department_id', flat=True).first()
+
+
+def parent_department_id(instance):
+    """Department id ``instance`` inherits from its parent row (or None)."""
+    from core.models import Exam
+
+    for name in _PARENTS.get(type(instance).__name__, ()):
+        field = instance._meta.get_field(name)
+        parent_id = getattr(instance, field.attname)
+        if parent_id is None:
+            continue
+        if field.is_cached(instance):
+            parent = getattr(instance, name)
+            if isinstance(parent, Exam):
+                return parent.course.department_id
+            return parent.department_id
+        return _department_of(field.related_model, parent_id)
+    return None
+
+
+def fill_department_id(sender, instance, raw=False, **kwargs):
+    """pre_save: set ``department_id`` from the parent when it is missing."""
+    if raw or instance.department_id is not None:
+        return
+    instance.department_id = parent_department_id(instance)
+
+
+# ── Re-derivation after a course / exam move ─────────────────────────────────
+def refresh_department_ids(exam_ids):
+    """
+    Re-derive ``department_id`` for everything under ``exam_ids``, top down.
+    Returns the number of rows written.
+    """
+    from core.models import Exam, ExamSession, Path, SessionStudent, Station, StationScore
+
+    exam_ids = list(exam_ids)
+    if not exam_ids:
+        return 0
+    from_exam = Subquery(
+        Exam.objects.filter(pk=OuterRef('exam_id')).values('course__department_id')[:1]
+    )
+    from_session = Subquery(
+        ExamSession.objects.filter(pk=OuterRef('session_id')).values('department_id')[:1]
+    )
+    in_exams = Q(path__session__exam_id__in=exam_ids) | Q(path__isnull=True, exam_id__in=exam_ids)
+
+    with transaction.atomic():
+        rows = ExamSession.objects.filter(exam_id__in=exam_ids).update(department_id=from_exam)
+        rows += Path.objects.filter(session__exam_id__in=exam_ids).update(department_id=from_session)
+        rows += SessionStudent.objects.filter(session__exam_id__in=exam_ids).update(
+            department_id=from_session,
+        )
+        rows += Station.objects.filter(path__session__exam_id__in=exam_ids).update(
+            department_id=Subquery(Path.objects.filter(pk=OuterRef('path_id')).values('department_id')[:1]),
+        )
+        rows += Station.objects.filter(path__isnull=True, exam_id__in=exam_ids).update(
+            department_id=from_exam,
+        )
+        rows += StationScore.objects.filter(
+            station__in=Station.objects.filter(in_exams).values('pk'),
+        ).update(
+            department_id=Subquery(Station.objects.filter(pk=OuterRef('station_id')).values('department_id')[:1]),
+        )
+    logger.info('DEPARTMENT_SYNC | exams=%d | rows_updated=%d', len(exam_ids), rows)
+    return rows
+
+
+def sync_exam_departments(exams, department_id):
+    """
+    Re-derive the rows under ``exams`` (an Exam queryset) if any of them no
+    longer carries ``department_id``.  The staleness check is two indexed
+    EXISTS queries, so saves that do not move anything stay cheap.
+    """
+    from core.models import ExamSession, Station
+
+    stale = (
+        ExamSession.objects.filter(exam__in=exams).exclude(department_id=department_id).exists()
+        or Station.objects.filter(exam__in=exams, path__isnull=True)
+        .exclude(department_id=department_id).exists()
+    )
+    if stale:
+        refresh_department_ids(exams.values_list('pk', flat=True))
+
+
+def propagate_department_change(sender, instance, created=False, raw=False, **kwargs):
+    """post_save on Course / Exam: push a department move down the hierarchy."""
+    from core.models import Course, Exam
+
+    if created or raw:
+        return
+    if isinstance(instance, Course):
+        sync_exam_departments(Exam.objects.filter(course=instance), instance.department_id)
+    else:
+        if Exam.course.field.is_cached(instance):
+            department_id = instance.course.department_id
+        else:
+            department_id = Course.objects.filter(pk=instance.course_id).values_list(
+                'department_id', flat=True,
+            ).first()
+        sync_exam_departments(Exam.objects.filter(pk=instance.pk), department_id)
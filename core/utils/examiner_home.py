@@ -0,0 +1,142 @@
+"""
+Per-examiner, per-day assignment snapshot for the examiner home page.
+
+The home page lists an examiner's running stations (today's in_progress
+sessions) and upcoming ones (scheduled sessions from today on), each with
+its path and student count.  Building that from the ORM costs a query for
+the assignments plus a ``SessionStudent`` count per card, on every visit.
+
+Instead the cards are built once into a snapshot cached under
+EXAMINER_HOME_KEY (one per examiner and day):
+
+    [{'assignment': {'id'}, 'assignment_id', 'station_number', 'station_name',
+      'station_duration', 'path_name', 'total_students',
+      'session': {'id', 'name', 'label', 'status', 'session_date',
+                  'start_time', 'exam': {'name'}}}]
+
+Snapshots are rebuilt for every examiner of a session when it is activated
+(``rebuild_session_examiner_homes``) and dropped whenever the session, its
+paths or assignments change (``invalidate_session_detail``) or students are
+added, moved or removed (``invalidate_session_students``, from the
+SessionStudent signals and after bulk writes).
+Session status is cheap to check and changes most often, so the home page
+re-reads it live (``get_examiner_home``) rather than trusting the snapshot.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.utils.cache_utils import EXAMINER_HOME_TTL, get_examiner_home_cache_key
+
+logger = logging.getLogger('osce.cache')
+
+
+def build_examiner_snapshots(examiner_ids, day):
+    """
+    Build the snapshots of ``examiner_ids`` for ``day`` (two queries in
+    total, however many examiners).  Returns ``{examiner_id: [card, ...]}``.
+    """
+    from core.models import ExaminerAssignment, SessionStudent
+
+    examiner_ids = list(examiner_ids)
+    snapshots = {examiner_id: [] for examiner_id in examiner_ids}
+    if not examiner_ids:
+        return snapshots
+
+    rows = list(
+        ExaminerAssignment.objects.filter(
+            examiner_id__in=examiner_ids,
+            session__session_date__gte=day,
+            station__isnull=False,
+        )
+        .order_by('session__session_date', 'session__start_time', 'station__station_number')
+        .values(
+            'id', 'examiner_id', 'session_id', 'station__path_id',
+            'station__station_number', 'station__name', 'station__duration_minutes',
+            'station__path__name', 'session__name', 'session__status',
+            'session__session_date', 'session__start_time', 'session__exam__name',
+        )
+    )
+    student_counts = {
+        (c['session_id'], c['path_id']): c['n']
+        for c in SessionStudent.objects.filter(
+            session_id__in={r['session_id'] for r in rows},
+            path_id__isnull=False,
+        ).values('session_id', 'path_id').annotate(n=Count('id'))
+    }
+
+    for r in rows:
+        snapshots[r['examiner_id']].append({
+            'assignment': {'id': r['id']},
+            'assignment_id': str(r['id']),
+            'station_number': r['station__station_number'],
+            'station_name': r['station__name'],
+            'station_duration': r['station__duration_minutes'],
+            'path_name': r['station__path__name'] or '',
+            'total_students': student_counts.get((r['session_id'], r['station__path_id']), 0),
+            'session': {
+                'id': r['session_id'],
+                'name': r['session__name'],
+                'label': f"{r['session__name']} on {r['session__session_date']}",
+                'status': r['session__status'],
+                'session_date': r['session__session_date'],
+                'start_time': r['session__start_time'],
+                'exam': {'name': r['session__exam__name']},
+            },
+        })
+    return snapshots
+
+
+def get_examiner_snapshot(examiner_id, day):
+    """Return the cached snapshot of ``examiner_id`` for ``day``, building it on a miss."""
+    key = get_examiner_home_cache_key(examiner_id, day)
+    cards = cache.get(key)
+    if cards is None:
+        cards = build_examiner_snapshots([examiner_id], day)[examiner_id]
+        cache.set(key, cards, EXAMINER_HOME_TTL)
+        logger.debug('Cache MISS: examiner_home %s built from DB', examiner_id)
+    return cards
+
+
+def get_examiner_home(examiner_id, day):
+    """
+    Split the snapshot into ``(running, upcoming)`` cards using the live
+    session statuses (one query; none when the examiner has no assignments).
+    """
+    from core.models import ExamSession
+
+    cards = get_examiner_snapshot(examiner_id, day)
+    if not cards:
+        return [], []
+    statuses = dict(
+        ExamSession.objects.filter(pk__in={c['session']['id'] for c in cards})
+        .values_list('id', 'status')
+    )
+    running, upcoming = [], []
+    for card in cards:
+        status = statuses.get(card['session']['id'])
+        card['session']['status'] = status
+        if status == 'in_progress' and card['session']['session_date'] == day:
+            running.append(card)
+        elif status == 'scheduled':
+            upcoming.append(card)
+    return running, upcoming
+
+
+def rebuild_session_examiner_homes(session_id, day):
+    """Rebuild and cache the snapshots of every examiner assigned to ``session_id``."""
+    from core.models import ExaminerAssignment
+
+    examiner_ids = set(
+        ExaminerAssignment.objects.filter(session_id=session_id).values_list('examiner_id', flat=True)
+    )
+    snapshots = build_examiner_snapshots(examiner_ids, day)
+    cache.set_many(
+        {get_examiner_home_cache_key(eid, day): cards for eid, cards in snapshots.items()},
+        EXAMINER_HOME_TTL,
+    )
+    logger.debug('Cache REBUILT: examiner_home for %d examiners of session %s',
+                 len(snapshots), session_id)
+    return snapshots
+
@@ -0,0 +1,329 @@
+"""
+Bulk examiner provisioning from an XLSX upload.
+
+Usage:
+    from core.utils.examiner_import import read_examiner_rows, provision_examiners
+
+    rows, errors = read_examiner_rows(uploaded_file)   # raises ExaminerImportError
+    result = provision_examiners(rows, errors, user=request.user)
+
+Creating examiners one by one costs two ``exists()`` checks, a department
+lookup, a full-cost password hash and the ``provision_new_user`` /
+``sync_role_permissions`` signal queries per row.  Here:
+
+  * usernames, emails and departments are resolved with one set query each;
+  * the default passwords are hashed in parallel by PASSWORD_HASH_WORKERS
+    threads — or processes in the Celery task (never from a web worker,
+    whose threads a fork would copy mid-request);
+  * examiners, their UserProfiles and role permission rows are inserted
+    with ``bulk_create`` — bypassing the per-user post_save signals, whose
+    effects (default password, profile with must_change_password, role
+    permissions, examiner list cache, audit) are applied once per batch.
+
+Used by ``examiner_bulk_upload`` (inline) and the ``core.bulk_import_examiners``
+Celery task.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from core.models import Department, Examiner
+from core.models.audit import EXAMINER_BULK_IMPORT
+from core.models.mixins import TimestampMixin
+from core.models.user_profile import UserProfile
+
+logger = logging.getLogger('osce.auth')
+
+BULK_IMPORT_KEY = 'osce:bulk_import:{task_id}'
+BULK_IMPORT_TTL = 60 * 30
+
+REQUIRED_COLUMNS = ('full_name', 'username')
+FIRST_DATA_ROW = 3          # row 2 of the template holds example / help text
+INSERT_CHUNK_SIZE = 500
+PARALLEL_HASH_MIN = 16      # fewer passwords than this are hashed serially
+MAX_LENGTHS = {
+    field: Examiner._meta.get_field(field).max_length
+    for field in ('username', 'email', 'full_name', 'title')
+}
+
+
+class ExaminerImportError(Exception):
+    """The upload cannot be processed at all (bad file / missing columns)."""
+
+
+def _sanitize_cell(val):
+    """Strip formula-triggering prefixes from imported cell values."""
+    if not isinstance(val, str):
+        return val
+    if val and val[0] in ('=', '+', '@', '\t', '\r'):
+        return val.lstrip('=+@\t\r')
+    return val
+
+
+def read_examiner_rows(source):
+    """
+    Stream the first sheet of an examiner XLSX (path or file object).
+
+    Returns ``(rows, errors)``: ``rows`` are dicts with ``row_num``,
+    ``username``, ``email``, ``full_name``, ``title`` and ``department``;
+    ``errors`` are messages for rows that are missing required data.
+    """
+    import openpyxl
+
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ExaminerImportError(f'Error processing file: {exc}')
+
+    try:
+        rows_iter = wb.active.iter_rows(values_only=True)
+        header = next(rows_iter, None) or ()
+        headers = [str(c).strip().lower() for c in header if c]
+        for field in REQUIRED_COLUMNS:
+            if field not in headers:
+                raise ExaminerImportError(f'Missing required column: {field}')
+        idx = {h: i for i, h in enumerate(headers)}
+
+        def get(row, col):
+            i = idx.get(col)
+            if i is None or i >= len(row) or row[i] is None:
+                return ''
+            return str(_sanitize_cell(row[i])).strip()
+
+        rows, errors = [], []
+        for row_num, row in enumerate(rows_iter, 2):
+            if row_num < FIRST_DATA_ROW or not row or not any(row):
+                continue
+            data = {
+                'row_num': row_num,
+                'username': get(row, 'username').lower(),
+                'email': get(row, 'email').lower(),
+                'full_name': get(row, 'full_name'),
+                'title': get(row, 'title'),
+                'department': get(row, 'department'),
+            }
+            if not data['username'] or not data['full_name']:
+                errors.append(f'Row {row_num}: Missing required data')
+                continue
+            rows.append(data)
+    finally:
+        wb.close()
+    return rows, errors
+
+
+# ── Password hashing ────────────────────────────────────────────────────────
+def _init_hash_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _hash_workers():
+    return getattr(settings, 'PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1))
+
+
+def _map_hashes(results, total, progress):
+    hashes = []
+    for hashed in results:
+        hashes.append(hashed)
+        if progress and len(hashes) % 10 == 0:
+            progress(len(hashes), total)
+    return hashes
+
+
+def hash_passwords(raw_passwords, progress=None, use_processes=False):
+    """
+    Hash ``raw_passwords`` (each with its own salt) in a thread pool — the
+    bcrypt and PBKDF2 hashers release the GIL.  Small batches are hashed
+    serially.
+
+    ``use_processes`` (the Celery task only) tries a process pool first;
+    where child processes cannot be started (e.g. inside a daemonic Celery
+    worker process) it falls back to threads.
+    """
+    total = len(raw_passwords)
+    workers = _hash_workers()
+    if workers <= 1 or total < PARALLEL_HASH_MIN:
+        return _map_hashes(map(make_password, raw_passwords), total, progress)
+    if use_processes:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker) as pool:
+                return _map_hashes(pool.map(make_password, raw_passwords, chunksize=8), total, progress)
+        except Exception:
+            logger.info('Process pool unavailable for password hashing; using threads', exc_info=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return _map_hashes(pool.map(make_password, raw_passwords), total, progress)
+
+
+# ── Role permissions (batched sync_role_permissions) ────────────────────────
+def role_permission_codenames(user):
+    """Permission codenames ``sync_role_permissions`` grants to ``user``."""
+    if user.is_superuser:
+        return []
+    is_admin = user.role == 'admin'
+    is_coordinator = user.role == 'coordinator'
+    codenames = []
+    if is_admin or (is_coordinator and user.coordinator_position == 'head'):
+        codenames.append(('sessionstudent', 'can_view_student_list'))
+    if is_admin or (is_coordinator and user.coordinator_position in ('head', 'organizer')):
+        codenames.append(('examsession', 'can_open_dry_grading'))
+    return codenames
+
+
+def grant_role_permissions(users):
+    """Insert the role permission rows for freshly created ``users`` in one query."""
+    from django.contrib.auth.models import Permission
+
+    wanted = {(user.pk, perm) for user in users for perm in role_permission_codenames(user)}
+    if not wanted:
+        return 0
+    perms = {
+        (p.content_type.model, p.codename): p.pk
+        for p in Permission.objects.filter(
+            content_type__app_label='core',
+            codename__in={codename for _, (_, codename) in wanted},
+        ).select_related('content_type')
+    }
+    through = Examiner.user_permissions.through
+    links = [
+        through(examiner_id=user_id, permission_id=perms[perm])
+        for user_id, perm in wanted if perm in perms
+    ]
+    through.objects.bulk_create(links, ignore_conflicts=True)
+    return len(links)
+
+
+# ── Provisioning ────────────────────────────────────────────────────────────
+def provision_examiners(rows, errors=None, user=None, request=None, progress=None,
+                        use_processes=False):
+    """
+    Create examiners for ``rows`` (from ``read_examiner_rows``).
+
+    Rows whose username or email already exists (in the database or
+    earlier in the file), or whose department is unknown, are reported in
+    ``errors``.  ``use_processes`` is passed to ``hash_passwords``.
+    Returns ``{'success_count', 'error_count', 'errors'}``.
+    """
+    from core.utils.audit import AuditLogService
+    from core.utils.cache_utils import invalidate_examiner_list
+
+    errors = list(errors or [])
+    departments = dict(Department.objects.values_list('name', 'id'))
+    taken_usernames = set(
+        Examiner.objects.filter(username__in={r['username'] for r in rows})
+        .values_list('username', flat=True)
+    )
+    taken_emails = set(
+        Examiner.objects.filter(email__in={r['email'] for r in rows if r['email']})
+        .values_list('email', flat=True)
+    )
+
+    accepted = []
+    for row in rows:
+        row_num = row['row_num']
+        too_long = [f for f, limit in MAX_LENGTHS.items() if len(row[f]) > limit]
+        if too_long:
+            errors.append(f"Row {row_num}: {', '.join(too_long)} too long")
+            continue
+        if row['department'] and row['department'] not in departments:
+            errors.append(f"Row {row_num}: Department '{row['department']}' does not exist.")
+            continue
+        if row['username'] in taken_usernames:
+            errors.append(f"Row {row_num}: Username '{row['username']}' already exists")
+            continue
+        if row['email'] and row['email'] in taken_emails:
+            errors.append(f"Row {row_num}: Email '{row['email']}' already exists")
+            continue
+        taken_usernames.add(row['username'])
+        if row['email']:
+            taken_emails.add(row['email'])
+        accepted.append(row)
+
+    if accepted:
+        default_pw = getattr(settings, 'DEFAULT_USER_PASSWORD', '12345678F')
+        hashes = hash_passwords(
+            [default_pw] * len(accepted), progress=progress, use_processes=use_processes,
+        )
+        now = TimestampMixin.utc_timestamp()
+        examiners = [
+            Examiner(
+                username=row['username'],
+                email=row['email'],
+                full_name=row['full_name'],
+                title=row['title'],
+                department_id=departments.get(row['department']),
+                password=hashed,
+                is_active=True,
+                created_at=now,
+                updated_at=now,
+            )
+            for row, hashed in zip(accepted, hashes)
+        ]
+        with transaction.atomic():
+            Examiner.objects.bulk_create(examiners, batch_size=INSERT_CHUNK_SIZE)
+            UserProfile.objects.bulk_create(
+                [UserProfile(user=examiner, must_change_password=True) for examiner in examiners],
+                batch_size=INSERT_CHUNK_SIZE,
+            )
+            grant_role_permissions(examiners)
+
+        invalidate_examiner_list()
+        AuditLogService.log(
+            action=EXAMINER_BULK_IMPORT,
+            user=user,
+            request=request,
+            resource_type='Examiner',
+            description=f'Bulk imported {len(examiners)} examiners from XLSX',
+            extra={'success_count': len(examiners), 'error_count': len(errors)},
+        )
+        logger.info('Bulk examiner import: %d created, %d errors', len(examiners), len(errors))
+
+    return {'success_count': len(accepted), 'error_count': len(errors), 'errors': errors}
+
+
+# ── Async (Celery) import ───────────────────────────────────────────────────
+def get_bulk_import_cache_key(task_id):
+    return BULK_IMPORT_KEY.format(task_id=task_id)
+
+
+def set_bulk_import_status(task_id, payload):
+    from django.core.cache import cache
+    cache.set(get_bulk_import_cache_key(task_id), payload, BULK_IMPORT_TTL)
+
+
+def run_examiner_import(task_id, file_name, requested_by_id=None):
+    """
+    Import examiners from an XLSX saved to default storage as ``file_name``
+    and publish progress / the result for ``bulk_import_status``.
+    The stored file is deleted afterwards.
+    """
+    from django.core.files.storage import default_storage
+
+    def _progress(done, total):
+        # Hashing is the slow part; keep the bar below 100 until inserted
+        set_bulk_import_status(task_id, {
+            'status': 'running', 'progress': int(done * 90 / total) if total else 90,
+        })
+
+    set_bulk_import_status(task_id, {'status': 'running', 'progress': 0})
+    try:
+        user = Examiner.objects.filter(pk=requested_by_id).first() if requested_by_id else None
+        with default_storage.open(file_name, 'rb') as fh:
+            rows, errors = read_examiner_rows(fh)
+        result = provision_examiners(rows, errors, user=user, progress=_progress, use_processes=True)
+    except ExaminerImportError as exc:
+        result = {'status': 'error', 'message': str(exc)}
+    else:
+        result = dict(result, status='done', progress=100, errors=result['errors'][:20])
+    finally:
+        try:
+            default_storage.delete(file_name)
+        except Exception:
+            pass
+    set_bulk_import_status(task_id, result)
+    return result
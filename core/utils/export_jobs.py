@@ -0,0 +1,281 @@
+"""
+Background export jobs — run report exports outside the web request.
+
+Usage:
+    from core.utils.export_jobs import request_export
+
+    job, created = request_export('students_csv', session, user)
+    # poll GET /api/creator/exports/<job.id>, then download the artifact
+
+Each export kind below writes its artifact into a temporary file, which is
+then saved to default file storage (``exports/<job id>/<filename>``).
+Nothing is kept in the cache.  Jobs run through the ``core.run_export_job``
+Celery task, or inline when CELERY_BROKER_URL is unset.
+
+Identical requests (same kind + session) share one job while it is pending
+or running, and reuse a finished artifact for EXPORT_JOB_REUSE_SECONDS.
+Artifacts expire after EXPORT_ARTIFACT_TTL seconds and are deleted by the
+periodic ``core.cleanup_expired_exports`` task.
+
+Downloads are always served through the access-checked download endpoint,
+never through a public storage URL.
+"""
+import hashlib
+import logging
+import tempfile
+import traceback
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from core.models import ExportJob
+from core.models.mixins import TimestampMixin
+
+logger = logging.getLogger('osce.exports')
+
+STALE_JOB_SECONDS = 60 * 60   # pending/running longer than this → error
+
+ExportKind = namedtuple('ExportKind', 'label extension content_type requires_completed')
+
+CSV = 'text/csv'
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+EXPORT_KINDS = {
+    'students_csv':      ExportKind('Student results (CSV)', 'csv', CSV, False),
+    'students_xlsx':     ExportKind('Student results (XLSX)', 'xlsx', XLSX, False),
+    'raw_csv':           ExportKind('Raw item scores (CSV)', 'csv', CSV, False),
+    'ilo_xlsx':          ExportKind('ILO scores (XLSX)', 'xlsx', XLSX, True),
+    'scoresheets':       ExportKind('Student score sheets (ZIP)', 'zip', 'application/zip', True),
+    'scoresheets_pdf':   ExportKind('Student score sheets (PDF)', 'pdf', 'application/pdf', True),
+    'student_paths_pdf': ExportKind('Student paths (PDF)', 'pdf', 'application/pdf', False),
+}
+
+
+class ExportError(Exception):
+    """Raised by a writer when the export cannot be produced (shown to the user)."""
+
+
+def _artifact_ttl():
+    return getattr(settings, 'EXPORT_ARTIFACT_TTL', 60 * 60 * 24)
+
+
+def _reuse_window():
+    return getattr(settings, 'EXPORT_JOB_REUSE_SECONDS', 60 * 5)
+
+
+def dedupe_key(kind, session_id):
+    return hashlib.sha256(f'{kind}:{session_id}'.encode()).hexdigest()
+
+
+# ── Writers: (session, out, progress) → filename ─────────────────────────────
+def _write_lines(out, lines):
+    for line in lines:
+        out.write(line.encode('utf-8'))
+
+
+def _write_students_csv(session, out, progress):
+    from creator.api.reports import _safe_filename, students_csv_lines
+    _write_lines(out, students_csv_lines(session, progress))
+    return _safe_filename(f'{session.name}_students_{session.pk}.csv')
+
+
+def _write_students_xlsx(session, out, progress):
+    from creator.api.reports import _safe_filename, build_students_workbook
+    build_students_workbook(session, progress).save(out)
+    return _safe_filename(f'{session.name}_students_{session.pk}.xlsx')
+
+
+def _write_raw_csv(session, out, progress):
+    from creator.api.reports import _safe_filename, raw_csv_lines
+    _write_lines(out, raw_csv_lines(session, progress))
+    return _safe_filename(f'{session.name}_raw_{session.pk}.csv')
+
+
+def _write_ilo_xlsx(session, out, progress):
+    from creator.api.reports import _safe_filename
+    from creator.views.reports import build_ilo_scores_workbook
+    wb = build_ilo_scores_workbook(session)
+    if wb is None:
+        raise ExportError('No ILOs defined for this course.')
+    wb.save(out)
+    return _safe_filename(f'ILO_Scores_{session.exam.name}_{session.name}.xlsx')
+
+
+def _write_scoresheets(session, out, progress):
+    """One print-ready HTML score sheet per student, zipped."""
+    import zipfile
+    from django.template.loader import render_to_string
+    from core.utils.scoresheets import iter_session_scoresheets
+    from creator.api.reports import _safe_filename
+
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for sheet in iter_session_scoresheets(session, progress):
+            student = sheet['student']
+            html = render_to_string('creator/reports/student_scoresheet.html', {
+                'session': session,
+                'student_info': sheet,
+            })
+            zf.writestr(_safe_filename(f'{student.student_number}_{student.full_name}.html'), html)
+    return _safe_filename(f'{session.name}_scoresheets_{session.pk}.zip')
+
+
+def _write_scoresheets_pdf(session, out, progress):
+    """Every student's score sheet in one printable PDF, one page each."""
+    from core.utils.scoresheets import iter_session_scoresheets, render_scoresheets_pdf
+    from creator.api.reports import _safe_filename
+
+    render_scoresheets_pdf(session, iter_session_scoresheets(session, progress), out)
+    return _safe_filename(f'{session.name}_scoresheets_{session.pk}.pdf')
+
+
+def _write_student_paths_pdf(session, out, progress):
+    from creator.views.sessions import _build_student_paths_pdf
+    out.write(_build_student_paths_pdf(session))
+    return f'student_paths_{session.pk}.pdf'
+
+
+WRITERS = {
+    'students_csv': _write_students_csv,
+    'students_xlsx': _write_students_xlsx,
+    'raw_csv': _write_raw_csv,
+    'ilo_xlsx': _write_ilo_xlsx,
+    'scoresheets': _write_scoresheets,
+    'scoresheets_pdf': _write_scoresheets_pdf,
+    'student_paths_pdf': _write_student_paths_pdf,
+}
+
+
+# ── Requesting ──────────────────────────────────────────────────────────────
+def _reusable_job(key):
+    now = TimestampMixin.utc_timestamp()
+    active = Q(status__in=(ExportJob.STATUS_PENDING, ExportJob.STATUS_RUNNING))
+    recent = Q(
+        status=ExportJob.STATUS_DONE,
+        finished_at__gte=now - _reuse_window(),
+        expires_at__gt=now,
+    )
+    return (
+        ExportJob.objects
+        .filter(active | recent, dedupe_key=key)
+        .order_by('-created_at')
+        .first()
+    )
+
+
+def request_export(kind, session, user=None, fresh=False):
+    """
+    Return ``(job, created)`` for an export of ``kind`` for ``session``.
+
+    An identical pending/running job — or, unless ``fresh``, a recently
+    finished one — is returned instead of starting a new job.
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f'Unknown export kind: {kind}')
+
+    key = dedupe_key(kind, session.pk)
+    job = _reusable_job(key)
+    if job is not None and not (fresh and job.status == ExportJob.STATUS_DONE):
+        return job, False
+
+    try:
+        # The partial unique index on active jobs settles concurrent requests
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                kind=kind, session=session, dedupe_key=key,
+                requested_by=user if getattr(user, 'is_authenticated', False) else None,
+            )
+    except IntegrityError:
+        return _reusable_job(key), False
+
+    _dispatch(job)
+    job.refresh_from_db()
+    return job, True
+
+
+def _dispatch(job):
+    if getattr(settings, 'CELERY_BROKER_URL', ''):
+        from core.tasks import run_export_job as run_export_job_task
+        job_id = str(job.pk)
+        transaction.on_commit(lambda: run_export_job_task.delay(job_id))
+    else:
+        run_export_job(job.pk)
+
+
+# ── Running ─────────────────────────────────────────────────────────────────
+def _progress_updater(job_id):
+    last = [0]
+
+    def progress(done, total):
+        pct = min(int(done * 100 / total), 99) if total else 0
+        if pct >= last[0] + 5:
+            last[0] = pct
+            ExportJob.objects.filter(pk=job_id).update(progress=pct)
+    return progress
+
+
+def run_export_job(job_id):
+    """
+    Produce the artifact for a pending job.  Safe to call twice: only a
+    job still in ``pending`` is claimed.
+    """
+    now = TimestampMixin.utc_timestamp()
+    claimed = ExportJob.objects.filter(
+        pk=job_id, status=ExportJob.STATUS_PENDING,
+    ).update(status=ExportJob.STATUS_RUNNING, started_at=now, updated_at=now)
+    if not claimed:
+        return None
+
+    job = ExportJob.objects.select_related('session__exam__course').get(pk=job_id)
+    try:
+        with tempfile.TemporaryFile() as out:
+            filename = WRITERS[job.kind](job.session, out, _progress_updater(job.pk))
+            out.seek(0, 2)
+            job.size = out.tell()
+            out.seek(0)
+            job.file.save(filename, File(out), save=False)
+    except Exception as exc:
+        job.status = ExportJob.STATUS_ERROR
+        job.error = str(exc) if isinstance(exc, ExportError) else 'Export failed.'
+        job.finished_at = TimestampMixin.utc_timestamp()
+        job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+        logger.error('Export job %s (%s) failed: %s', job.pk, job.kind, traceback.format_exc())
+        return job
+
+    now = TimestampMixin.utc_timestamp()
+    job.filename = filename
+    job.content_type = EXPORT_KINDS[job.kind].content_type
+    job.status = ExportJob.STATUS_DONE
+    job.progress = 100
+    job.finished_at = now
+    job.expires_at = now + _artifact_ttl()
+    job.save()
+    logger.info('Export job %s (%s) done: %s, %d bytes', job.pk, job.kind, filename, job.size)
+    return job
+
+
+# ── Expiry ──────────────────────────────────────────────────────────────────
+def cleanup_expired_exports():
+    """
+    Delete artifacts past ``expires_at`` and fail jobs stuck pending/running
+    (e.g. a worker died) so they no longer block deduplication.
+    Returns ``(expired, failed)`` counts.
+    """
+    now = TimestampMixin.utc_timestamp()
+    expired = 0
+    for job in ExportJob.objects.filter(status=ExportJob.STATUS_DONE, expires_at__lte=now).iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.status = ExportJob.STATUS_EXPIRED
+        job.save(update_fields=['file', 'status', 'updated_at'])
+        expired += 1
+
+    failed = ExportJob.objects.filter(
+        status__in=(ExportJob.STATUS_PENDING, ExportJob.STATUS_RUNNING),
+        created_at__lt=now - STALE_JOB_SECONDS,
+    ).update(status=ExportJob.STATUS_ERROR, error='Export timed out.', finished_at=now, updated_at=now)
+    if expired or failed:
+        logger.info('Export cleanup: %d artifact(s) expired, %d stale job(s) failed', expired, failed)
+    return expired, failed
@@ -0,0 +1,52 @@
+"""
+Bounded-memory file exports — streaming CSV and write-only XLSX responses.
+
+CSV exports are generators written through a pseudo-buffer into a
+``StreamingHttpResponse`` (same pattern as the audit log CSV export in
+core/admin.py), so rows leave the worker as soon as they are produced.
+
+XLSX exports use openpyxl write-only workbooks: rows are appended once and
+flushed to a temporary file, then streamed back with ``FileResponse``.
+Write-only sheets cannot be edited after a row is appended, so column
+widths, merged title cells and freeze panes must be set up front.
+
+Usage:
+    from core.utils.exports import Echo, streaming_csv_response, xlsx_response
+
+    writer = csv.writer(Echo())
+    return streaming_csv_response(
+        (writer.writerow(row) for row in rows), 'export.csv',
+    )
+"""
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class Echo:
+    """Pseudo-buffer for StreamingHttpResponse CSV writer."""
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(lines, filename):
+    """Wrap an iterator of encoded CSV lines in an attachment response."""
+    response = StreamingHttpResponse(lines, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(wb, filename):
+    """
+    Save workbook ``wb`` to a temporary file and stream it as an attachment.
+
+    The file is closed (and deleted) by Django once the response is sent.
+    """
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+    response = FileResponse(tmp, content_type=XLSX_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
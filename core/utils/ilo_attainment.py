@@ -0,0 +1,132 @@
+"""
+ILO attainment matrix — set-based per-student ILO scores for a session.
+
+One grouped query returns, per (student, station, ILO), the examiner-
+averaged earned and possible points: each examiner's StationScore is one
+group member, so ``SUM(points) / COUNT(DISTINCT station_score)`` is the
+average over examiners.  Summing those rows over stations fills dense
+students × ILOs columns; nothing is nested per examiner in Python.
+
+The ILO XLSX export and the ILO attainment JSON endpoint both render from
+this matrix, so they always agree.
+
+Usage:
+    from core.utils.ilo_attainment import build_ilo_attainment
+
+    matrix = build_ilo_attainment(session)
+    for row in matrix.rows():
+        ...
+"""
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast
+
+
+class ILOAttainment:
+    """
+    Dense student × ILO results for one session.
+
+    Attributes:
+        ilos       ILO instances of the session's course, ordered by number
+        students   SessionStudent instances, ordered by name
+        earned     per student, list aligned with ``ilos`` (examiner-averaged,
+                   summed over stations, rounded to 2 places)
+        possible   same shape — maximum points actually marked
+        totals     per-student sum of ``earned``
+    """
+
+    def __init__(self, session, ilos, students, earned, possible):
+        self.session = session
+        self.ilos = ilos
+        self.students = students
+        self.earned = earned
+        self.possible = possible
+        self.totals = [round(sum(row), 2) for row in earned]
+
+    def __len__(self):
+        return len(self.students)
+
+    def rows(self):
+        """Yield one dict per student (row view over the columns)."""
+        for i, student in enumerate(self.students):
+            yield {
+                'student': student,
+                'earned': self.earned[i],
+                'possible': self.possible[i],
+                'total': self.totals[i],
+            }
+
+    def ilo_summary(self):
+        """
+        Per-ILO cohort figures over students who were marked on that ILO:
+        mean earned, mean attainment %, and the mean scaled to the ILO's
+        ``osce_marks`` weight.
+        """
+        summary = []
+        for j, ilo in enumerate(self.ilos):
+            marked = [i for i in range(len(self.students)) if self.possible[i][j] > 0]
+            n = len(marked)
+            mean_earned = sum(self.earned[i][j] for i in marked) / n if n else 0
+            mean_pct = (
+                sum(self.earned[i][j] / self.possible[i][j] for i in marked) / n * 100
+                if n else 0
+            )
+            summary.append({
+                'id': ilo.id,
+                'number': ilo.number,
+                'description': ilo.description,
+                'osce_marks': ilo.osce_marks,
+                'students_marked': n,
+                'mean_earned': round(mean_earned, 2),
+                'mean_percentage': round(mean_pct, 2),
+                'mean_weighted': round(mean_pct / 100 * ilo.osce_marks, 2),
+            })
+        return summary
+
+
+def build_ilo_attainment(session):
+    """
+    Build an ILOAttainment matrix for ``session`` from submitted scores.
+    Runs three queries (ILOs, students, grouped item scores).
+    """
+    from core.models import ILO, ItemScore, SessionStudent
+
+    ilos = list(ILO.objects.filter(course_id=session.exam.course_id).order_by('number'))
+    students = list(SessionStudent.objects.filter(session=session).order_by('full_name'))
+
+    ilo_col = {ilo.id: j for j, ilo in enumerate(ilos)}
+    student_row = {student.id: i for i, student in enumerate(students)}
+    earned = [[0.0] * len(ilos) for _ in students]
+    possible = [[0.0] * len(ilos) for _ in students]
+
+    if ilos and students:
+        examiners = Cast(Count('station_score', distinct=True), FloatField())
+        per_station = (
+            ItemScore.objects
+            .filter(
+                station_score__session_student__session=session,
+                station_score__status='submitted',
+                checklist_item__ilo_id__in=list(ilo_col),
+            )
+            .values(
+                student_id=F('station_score__session_student_id'),
+                ilo_id=F('checklist_item__ilo_id'),
+                station_id=F('station_score__station_id'),
+            )
+            .annotate(
+                earned=Sum('score') / examiners,
+                possible=Sum('max_points') / examiners,
+            )
+            .values_list('student_id', 'ilo_id', 'earned', 'possible')
+            .order_by()
+        )
+        for student_id, ilo_id, station_earned, station_possible in per_station:
+            i = student_row.get(student_id)
+            if i is None:
+                continue
+            j = ilo_col[ilo_id]
+            earned[i][j] += station_earned or 0
+            possible[i][j] += station_possible or 0
+
+    earned = [[round(v, 2) for v in row] for row in earned]
+    possible = [[round(v, 2) for v in row] for row in possible]
+    return ILOAttainment(session, ilos, students, earned, possible)
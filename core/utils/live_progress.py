@@ -0,0 +1,314 @@
+"""
+Live session progress — cache-held counters for the coordinator feed.
+
+Coordinators watching an in-progress session used to reload
+``session_detail`` / ``get_session_status``, which walk every
+SessionStudent and re-run the submitted-score queries on each refresh.
+This module keeps the numbers the live panel needs in the cache instead:
+
+  osce:live:<sid>:layout        paths, stations and assigned examiners
+                                (built from the DB once, on a cache miss)
+  osce:live:<sid>:st:<id>       students with a submitted score at a station
+  osce:live:<sid>:path:<id>     students who completed every station of a path
+  osce:live:<sid>:ex:<id>       examiner last-activity timestamp
+  osce:live:<sid>:ver           monotonically increasing change counter
+  osce:live:<sid>:ev:<n>        delta for change ``n`` (short-lived)
+
+Scoring views call ``record_submission`` / ``record_undo`` /
+``touch_examiner``; counters are bumped with ``cache.incr`` so concurrent
+workers never lose an update.  Readers (SSE stream and long-poll endpoint
+in ``creator.api.live``) call ``changes_since`` and only touch the cache.
+
+The layout and counters are reseeded from the DB whenever the session
+detail cache is invalidated (paths, assignments or students changed).
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models.mixins import TimestampMixin
+
+logger = logging.getLogger('osce.cache')
+
+LIVE_TTL        = 60 * 60 * 12   # 12 hours — longer than any exam day
+LIVE_EVENT_TTL  = 60 * 10        # deltas older than this fall back to a snapshot
+LIVE_MAX_EVENTS = 200            # max deltas replayed to one reader
+
+LIVE_LAYOUT_KEY  = 'osce:live:{session_id}:layout'
+LIVE_STATION_KEY = 'osce:live:{session_id}:st:{station_id}'
+LIVE_PATH_KEY    = 'osce:live:{session_id}:path:{path_id}'
+LIVE_EXAMINER_KEY = 'osce:live:{session_id}:ex:{examiner_id}'
+LIVE_VERSION_KEY = 'osce:live:{session_id}:ver'
+LIVE_EVENT_KEY   = 'osce:live:{session_id}:ev:{version}'
+
+
+def _idle_after():
+    return getattr(settings, 'LIVE_PROGRESS_IDLE_SECONDS', 60 * 15)
+
+
+# ── Layout / seeding ────────────────────────────────────────────────────────
+def _build_layout(session_id):
+    """Load the static shape of a session and seed its counters from the DB."""
+    from django.db.models import Count, Max
+    from core.models import (
+        ExaminerAssignment, FinalStationResult, Path, SessionStudent, Station, StationScore,
+    )
+
+    student_counts = dict(
+        SessionStudent.objects
+        .filter(session_id=session_id, path__isnull=False)
+        .values('path_id')
+        .annotate(n=Count('id'))
+        .values_list('path_id', 'n')
+    )
+    paths = [
+        {'id': str(pk), 'name': name, 'total_students': student_counts.get(pk, 0)}
+        for pk, name in (
+            Path.objects
+            .filter(session_id=session_id, is_deleted=False)
+            .order_by('name')
+            .values_list('id', 'name')
+        )
+    ]
+    stations = [
+        {'id': str(pk), 'path_id': str(path_id), 'number': number, 'name': name}
+        for pk, path_id, number, name in (
+            Station.objects
+            .filter(path__session_id=session_id, path__is_deleted=False,
+                    active=True, is_deleted=False)
+            .order_by('path__name', 'station_number')
+            .values_list('id', 'path_id', 'station_number', 'name')
+        )
+    ]
+    examiners = [
+        {'id': str(examiner_id), 'name': name or '', 'station_id': str(station_id)}
+        for examiner_id, name, station_id in (
+            ExaminerAssignment.objects
+            .filter(session_id=session_id)
+            .order_by('examiner__full_name')
+            .values_list('examiner_id', 'examiner__full_name', 'station_id')
+        )
+    ]
+
+    station_done = dict(
+        FinalStationResult.objects
+        .filter(session_id=session_id)
+        .values('station_id')
+        .annotate(n=Count('id'))
+        .values_list('station_id', 'n')
+    )
+    path_done = dict(
+        SessionStudent.objects
+        .filter(session_id=session_id, status='completed', path__isnull=False)
+        .values('path_id')
+        .annotate(n=Count('id'))
+        .values_list('path_id', 'n')
+    )
+    activity = dict(
+        StationScore.objects
+        .filter(session_student__session_id=session_id, examiner__isnull=False)
+        .values('examiner_id')
+        .annotate(last=Max('updated_at'))
+        .values_list('examiner_id', 'last')
+    )
+
+    station_done = {str(k): n for k, n in station_done.items()}
+    path_done = {str(k): n for k, n in path_done.items()}
+    activity = {str(k): last for k, last in activity.items()}
+
+    counters = {}
+    for st in stations:
+        key = LIVE_STATION_KEY.format(session_id=session_id, station_id=st['id'])
+        counters[key] = station_done.get(st['id'], 0)
+    for p in paths:
+        key = LIVE_PATH_KEY.format(session_id=session_id, path_id=p['id'])
+        counters[key] = path_done.get(p['id'], 0)
+    for ex in examiners:
+        if activity.get(ex['id']):
+            key = LIVE_EXAMINER_KEY.format(session_id=session_id, examiner_id=ex['id'])
+            counters[key] = activity[ex['id']]
+    cache.set_many(counters, LIVE_TTL)
+
+    layout = {'paths': paths, 'stations': stations, 'examiners': examiners}
+    cache.set(LIVE_LAYOUT_KEY.format(session_id=session_id), layout, LIVE_TTL)
+    logger.debug('Cache MISS: live progress layout seeded for session %s', session_id)
+    return layout
+
+
+def get_layout(session_id):
+    """Return the cached layout for a session, seeding it from the DB on a miss."""
+    layout = cache.get(LIVE_LAYOUT_KEY.format(session_id=session_id))
+    if layout is None:
+        layout = _build_layout(session_id)
+    return layout
+
+
+def _seeded_now(session_id):
+    """
+    Make sure the session is seeded; return True if that just happened.
+
+    Writers run after their DB change, so a fresh seed already includes it
+    and the counter must not be bumped a second time.
+    """
+    if cache.get(LIVE_LAYOUT_KEY.format(session_id=session_id)) is None:
+        _build_layout(session_id)
+        return True
+    return False
+
+
+def invalidate_live_progress(session_id):
+    """Drop the layout so the next reader or writer reseeds from the DB."""
+    cache.delete(LIVE_LAYOUT_KEY.format(session_id=session_id))
+    _bump(session_id, {'reset': True})
+    logger.debug('Cache INVALIDATED: live progress %s', session_id)
+
+
+# ── Writers ────────────────────────────────────────────────────────────────
+def _incr(session_id, key, delta, seeded=False):
+    """Atomically add ``delta`` to a counter; reseed the session if it was evicted."""
+    if seeded:
+        return cache.get(key, 0)
+    try:
+        return max(cache.incr(key, delta), 0)
+    except ValueError:
+        _build_layout(session_id)
+        return cache.get(key, 0)
+
+
+def _bump(session_id, event):
+    """Store ``event`` under the next version number and return that number."""
+    ver_key = LIVE_VERSION_KEY.format(session_id=session_id)
+    cache.add(ver_key, 0, LIVE_TTL)
+    try:
+        version = cache.incr(ver_key)
+    except ValueError:
+        # Evicted between add() and incr() — restart the sequence
+        cache.set(ver_key, 1, LIVE_TTL)
+        version = 1
+    event['v'] = version
+    cache.set(LIVE_EVENT_KEY.format(session_id=session_id, version=version), event, LIVE_EVENT_TTL)
+    return version
+
+
+def touch_examiner(session_id, examiner_id, bump=True):
+    """Record examiner activity (marking started / score submitted)."""
+    get_layout(session_id)
+    now = TimestampMixin.utc_timestamp()
+    cache.set(
+        LIVE_EXAMINER_KEY.format(session_id=session_id, examiner_id=examiner_id),
+        now, LIVE_TTL,
+    )
+    if bump:
+        _bump(session_id, {'examiner': {'id': str(examiner_id), 'last_active': now}})
+
+
+def record_submission(session_id, station_id, examiner_id, path_id=None,
+                      first_for_station=True, student_completed=False):
+    """
+    Apply the deltas for one submitted score.
+
+    ``first_for_station`` — no other examiner had submitted this student at
+    this station yet (the station's completed count goes up by one).
+    ``student_completed`` — the student just finished every station of
+    ``path_id``.
+    """
+    seeded = _seeded_now(session_id)
+    event = {}
+    if first_for_station:
+        key = LIVE_STATION_KEY.format(session_id=session_id, station_id=station_id)
+        event['station'] = {'id': str(station_id), 'completed': _incr(session_id, key, 1, seeded)}
+    if student_completed and path_id:
+        key = LIVE_PATH_KEY.format(session_id=session_id, path_id=path_id)
+        event['path'] = {'id': str(path_id), 'completed': _incr(session_id, key, 1, seeded)}
+    touch_examiner(session_id, examiner_id, bump=False)
+    event['examiner'] = {'id': str(examiner_id), 'last_active': TimestampMixin.utc_timestamp()}
+    return _bump(session_id, event)
+
+
+def record_undo(session_id, station_id, examiner_id, station_cleared=True):
+    """Apply the deltas for an undone submission (station count goes back down)."""
+    seeded = _seeded_now(session_id)
+    event = {'examiner': {'id': str(examiner_id), 'last_active': TimestampMixin.utc_timestamp()}}
+    if station_cleared:
+        key = LIVE_STATION_KEY.format(session_id=session_id, station_id=station_id)
+        event['station'] = {'id': str(station_id), 'completed': _incr(session_id, key, -1, seeded)}
+    touch_examiner(session_id, examiner_id, bump=False)
+    return _bump(session_id, event)
+
+
+# ── Readers ────────────────────────────────────────────────────────────────
+def current_version(session_id):
+    return cache.get(LIVE_VERSION_KEY.format(session_id=session_id), 0)
+
+
+def _idle_examiners(session_id, examiners):
+    keys = {
+        LIVE_EXAMINER_KEY.format(session_id=session_id, examiner_id=ex['id']): ex
+        for ex in examiners
+    }
+    last_seen = cache.get_many(list(keys))
+    cutoff = TimestampMixin.utc_timestamp() - _idle_after()
+    idle = []
+    for key, ex in keys.items():
+        last = last_seen.get(key)
+        if last is None or last < cutoff:
+            idle.append({'id': ex['id'], 'name': ex['name'],
+                         'station_id': ex['station_id'], 'last_active': last})
+    return idle
+
+
+def snapshot(session_id):
+    """Full progress state for a session, read from the cache only."""
+    layout = get_layout(session_id)
+    station_keys = {
+        LIVE_STATION_KEY.format(session_id=session_id, station_id=st['id']): st
+        for st in layout['stations']
+    }
+    path_keys = {
+        LIVE_PATH_KEY.format(session_id=session_id, path_id=p['id']): p
+        for p in layout['paths']
+    }
+    values = cache.get_many(list(station_keys) + list(path_keys))
+    return {
+        'version': current_version(session_id),
+        'full': True,
+        'paths': [
+            dict(p, completed=values.get(key, 0)) for key, p in path_keys.items()
+        ],
+        'stations': [
+            dict(st, completed=values.get(key, 0)) for key, st in station_keys.items()
+        ],
+        'idle_examiners': _idle_examiners(session_id, layout['examiners']),
+    }
+
+
+def changes_since(session_id, since):
+    """
+    Return the deltas recorded after version ``since``.
+
+    Falls back to a full ``snapshot`` when ``since`` is missing, too far
+    behind, or when any of the intervening deltas has expired or is a reset.
+    """
+    version = current_version(session_id)
+    if since is None or since > version or version - since > LIVE_MAX_EVENTS:
+        return snapshot(session_id)
+    if since == version:
+        return {'version': version, 'full': False, 'events': []}
+
+    keys = [
+        LIVE_EVENT_KEY.format(session_id=session_id, version=v)
+        for v in range(since + 1, version + 1)
+    ]
+    found = cache.get_many(keys)
+    events = [found.get(k) for k in keys]
+    if any(e is None or e.get('reset') for e in events):
+        return snapshot(session_id)
+
+    layout = get_layout(session_id)
+    return {
+        'version': version,
+        'full': False,
+        'events': events,
+        'idle_examiners': _idle_examiners(session_id, layout['examiners']),
+    }
@@ -0,0 +1,212 @@
+"""
+Deferred, coalesced checklist rescoring.
+
+Editing a station's checklist changes item points (and MCQ answer keys),
+so existing ItemScores must be rescaled and every StationScore of the
+station re-totalled.  Doing that on each ChecklistItem save repeats the
+station-wide recompute once per item, so the checklist signals only mark
+the station (and the edited item) dirty:
+
+    from core.utils.rescoring import mark_station_dirty
+
+    mark_station_dirty(item.station_id, item.pk)
+
+The recompute runs once per dirty station when the surrounding transaction
+commits (immediately under autocommit).  Wrap multi-item edits in
+``transaction.atomic()`` to get one recompute for the whole edit.  The
+same flush drops the session detail aggregates (core.utils.session_detail)
+of the dirty stations' sessions, once per session.
+
+Stations with at least RESCORE_ASYNC_MIN_SCORES StationScores are handed
+to the ``core.rescore_station`` Celery task when a broker is configured.
+
+The recompute itself is a handful of set-based UPDATEs:
+
+  1. non-MCQ ItemScores of the edited items whose ``max_points`` differs
+     from the item's points are rescaled (full → new points, zero → 0,
+     partial → scaled);
+  2. MCQ ItemScores of the edited items are re-evaluated from the selected
+     option index in ``notes`` against ``rubric_levels.correct_index``;
+  3. StationScore total / max / percentage are set from ``SUM`` aggregates;
+  4. the station's FinalStationResults are rebuilt.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger('osce.audit')
+
+_pending = threading.local()
+
+
+def _pending_ids():
+    """``{station_id: {edited checklist item ids}}`` awaiting a rescore."""
+    ids = getattr(_pending, 'stations', None)
+    if ids is None:
+        ids = _pending.stations = {}
+    return ids
+
+
+def mark_station_dirty(station_id, item_id=None):
+    """
+    Schedule one rescore of ``station_id`` for when the transaction commits;
+    ItemScores are only rescaled for the ``item_id``s marked with it.
+    """
+    if station_id is None:
+        return
+    item_ids = _pending_ids().setdefault(station_id, set())
+    if item_id is not None:
+        item_ids.add(item_id)
+    # Every mark registers a flush, but the first one to run drains the whole
+    # set so the rest are no-ops.  Ids left behind by a rolled-back
+    # transaction are simply rescored on the next flush.
+    transaction.on_commit(flush_dirty_stations)
+
+
+def flush_dirty_stations():
+    """Rescore every station marked dirty on this thread."""
+    ids = _pending_ids()
+    if not ids:
+        return
+    stations = list(ids.items())
+    ids.clear()
+    _invalidate_sessions([station_id for station_id, _ in stations])
+    for station_id, item_ids in stations:
+        _dispatch(station_id, sorted(item_ids))
+
+
+def _invalidate_sessions(station_ids):
+    """Drop the session detail aggregates of the sessions ``station_ids`` belong to."""
+    from core.models import Station
+    from core.utils.cache_utils import invalidate_session_detail
+
+    session_ids = set(
+        Station.objects.filter(pk__in=station_ids, path__isnull=False)
+        .values_list('path__session_id', flat=True)
+    )
+    for session_id in session_ids:
+        invalidate_session_detail(session_id)
+
+
+def _async_threshold():
+    return getattr(settings, 'RESCORE_ASYNC_MIN_SCORES', 500)
+
+
+def _dispatch(station_id, item_ids):
+    from core.models import StationScore
+
+    threshold = _async_threshold()
+    if getattr(settings, 'CELERY_BROKER_URL', '') and threshold and \
+            StationScore.objects.filter(station_id=station_id).count() >= threshold:
+        from core.tasks import rescore_station as rescore_station_task
+        rescore_station_task.delay(str(station_id), item_ids)
+    else:
+        rescore_station(station_id, item_ids)
+
+
+_RESCALE_ITEM_SCORES = """
+    UPDATE item_scores i
+       SET score = CASE
+                       WHEN COALESCE(i.max_points, 0) <= 0 THEN 0
+                       WHEN i.score >= i.max_points THEN ci.points
+                       WHEN i.score = 0 THEN 0
+                       ELSE ROUND((i.score / i.max_points * ci.points)::numeric, 2)::double precision
+                   END,
+           max_points = ci.points
+      FROM checklist_items ci
+     WHERE i.checklist_item_id = ci.id
+       AND ci.station_id = %s
+       AND ci.id = ANY(%s)
+       AND ci.rubric_type <> 'mcq'
+       AND i.max_points IS DISTINCT FROM ci.points
+"""
+
+_REEVALUATE_MCQ_SCORES = """
+    UPDATE item_scores i
+       SET score = v.new_score,
+           max_points = v.points
+      FROM (
+            SELECT i2.id,
+                   ci.points,
+                   CASE
+                       WHEN btrim(i2.notes) ~ '^-?[0-9]+$'
+                        AND (ci.rubric_levels ->> 'correct_index') ~ '^-?[0-9]+$'
+                       THEN CASE
+                                WHEN (ci.rubric_levels ->> 'correct_index')::numeric >= 0
+                                 AND btrim(i2.notes)::numeric
+                                     = (ci.rubric_levels ->> 'correct_index')::numeric
+                                THEN ci.points
+                                ELSE 0
+                            END
+                       ELSE 0
+                   END AS new_score
+              FROM item_scores i2
+              JOIN checklist_items ci ON ci.id = i2.checklist_item_id
+             WHERE ci.station_id = %s
+               AND ci.id = ANY(%s)
+               AND ci.rubric_type = 'mcq'
+           ) v
+     WHERE i.id = v.id
+       AND (i.score IS DISTINCT FROM v.new_score OR i.max_points IS DISTINCT FROM v.points)
+"""
+
+_RETOTAL_STATION_SCORES = """
+    UPDATE station_scores ss
+       SET total_score = agg.total,
+           max_score = m.max_score,
+           percentage = CASE
+                            WHEN m.max_score > 0
+                            THEN ROUND((agg.total / m.max_score * 100)::numeric, 2)::double precision
+                            ELSE 0
+                        END
+      FROM (
+            SELECT s.id,
+                   ROUND(COALESCE(SUM(i.score), 0)::numeric, 2)::double precision AS total
+              FROM station_scores s
+              LEFT JOIN item_scores i ON i.station_score_id = s.id
+             WHERE s.station_id = %s
+             GROUP BY s.id
+           ) agg,
+           (
+            SELECT COALESCE(SUM(points), 0)::double precision AS max_score
+              FROM checklist_items
+             WHERE station_id = %s
+           ) m
+     WHERE ss.id = agg.id
+"""
+
+
+def rescore_station(station_id, item_ids=()):
+    """
+    Rescale the item scores of the checklist items ``item_ids`` and
+    re-total every StationScore of ``station_id``.
+    Returns ``(item_scores_updated, station_scores_updated)``.
+    """
+    from core.models import FinalStationResult, Station
+    from core.utils.station_progress import invalidate_station_progress
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            item_scores_updated = 0
+            if item_ids:
+                item_ids = list(item_ids)
+                cursor.execute(_RESCALE_ITEM_SCORES, [station_id, item_ids])
+                item_scores_updated = cursor.rowcount
+                cursor.execute(_REEVALUATE_MCQ_SCORES, [station_id, item_ids])
+                item_scores_updated += cursor.rowcount
+            cursor.execute(_RETOTAL_STATION_SCORES, [station_id, station_id])
+            station_scores_updated = cursor.rowcount
+
+        if station_scores_updated:
+            FinalStationResult.refresh_station(station_id)
+            invalidate_station_progress(
+                Station.objects.filter(pk=station_id).values_list('path__session_id', flat=True).first(),
+                station_id,
+            )
+            logger.info(
+                'CHECKLIST_CHANGE | station=%s | item_scores_updated=%d | station_scores_updated=%d',
+                station_id, item_scores_updated, station_scores_updated,
+            )
+    return item_scores_updated, station_scores_updated
@@ -0,0 +1,229 @@
+"""
+Session results matrix — set-based scoring engine for reports and exports.
+
+Loads every submitted score for a session in a constant number of queries
+(stations, max scores, examiner-averaged finals from FinalStationResult)
+instead of one ``StationScore.get_final_score`` call per student × station.
+
+The result is a columnar structure: one list per column, aligned with
+``students``.  CSV, XLSX and JSON summary endpoints all render from it so
+the pass/fail rules stay identical across every output format.
+
+Usage:
+    from core.utils.results import build_session_results
+
+    matrix = build_session_results(session)
+    for row in matrix.rows():
+        ...
+
+    # Exports: one bounded matrix per chunk of students
+    for matrix in iter_session_results(session, chunk_size=500):
+        ...
+"""
+from django.db.models import Sum
+
+
+class SessionResults:
+    """
+    Columnar student × station results for one session.
+
+    Attributes:
+        station_headers   [{'number', 'name'}] sorted by station number
+        students          SessionStudent instances, in caller order
+        path_names        {path_id: name}
+        scores            per student, list aligned with station_headers
+                          (float final score, or None when not scored / not in path)
+        total_scores, max_scores, percentages, weighted_scores,
+        passed, completed — per-student columns aligned with ``students``
+    """
+
+    def __init__(self, session, station_headers, students, path_names):
+        self.session = session
+        self.exam_weight = float(session.exam.exam_weight or 0)
+        self.pass_threshold = session.exam.course.pass_threshold
+        self.station_headers = station_headers
+        self.students = students
+        self.path_names = path_names
+        self.scores = []
+        self.total_scores = []
+        self.max_scores = []
+        self.percentages = []
+        self.weighted_scores = []
+        self.passed = []
+        self.completed = []
+
+    def _append(self, scores, total, max_total):
+        percentage = (total / max_total * 100) if max_total > 0 else 0
+        weighted = (
+            round(total / max_total * self.exam_weight, 2)
+            if self.exam_weight and max_total > 0 else None
+        )
+        # Pass if weighted score >= threshold% of exam_weight, or raw percentage >= threshold%
+        if self.exam_weight and weighted is not None:
+            passed = weighted >= self.exam_weight * (self.pass_threshold / 100)
+        else:
+            passed = percentage >= self.pass_threshold
+
+        self.scores.append(scores)
+        self.total_scores.append(total)
+        self.max_scores.append(max_total)
+        self.percentages.append(percentage)
+        self.weighted_scores.append(weighted)
+        self.passed.append(passed)
+        # "Completed" only when every station column has a submitted score
+        self.completed.append(bool(scores) and all(v is not None for v in scores))
+
+    def __len__(self):
+        return len(self.students)
+
+    def rows(self):
+        """Yield one dict per student (row view over the columns)."""
+        for i, student in enumerate(self.students):
+            yield {
+                'student': student,
+                'path_name': self.path_names.get(student.path_id) if student.path_id else None,
+                'station_scores': self.scores[i],
+                'total_score': self.total_scores[i],
+                'max_score': self.max_scores[i],
+                'percentage': self.percentages[i],
+                'weighted_score': self.weighted_scores[i],
+                'passed': self.passed[i],
+                'completed': self.completed[i],
+            }
+
+    def completed_summary(self):
+        """Return (completed_count, average_percentage, pass_rate) over completed students."""
+        completed = [i for i, done in enumerate(self.completed) if done]
+        if not completed:
+            return 0, 0, 0
+        avg = sum(self.percentages[i] for i in completed) / len(completed)
+        passed = sum(1 for i in completed if self.passed[i])
+        return len(completed), avg, passed / len(completed) * 100
+
+    def comments_by_student(self):
+        """
+        Return {session_student_id: [(examiner_name, station_name, comments)]}
+        for submitted scores of the loaded students — one query.
+        """
+        from core.models import StationScore
+
+        result = {}
+        rows = (
+            StationScore.objects
+            .filter(
+                session_student_id__in=[s.id for s in self.students],
+                status='submitted',
+                total_score__isnull=False,
+            )
+            .exclude(comments='')
+            .values_list('session_student_id', 'examiner__full_name', 'station__name', 'comments')
+        )
+        for student_id, examiner_name, station_name, comments in rows:
+            if comments and comments.strip():
+                result.setdefault(student_id, []).append((
+                    examiner_name or 'Unknown Examiner',
+                    station_name or 'Unknown Station',
+                    comments,
+                ))
+        return result
+
+
+def build_session_results(session, students=None):
+    """
+    Build a SessionResults matrix for ``session``.
+
+    ``students`` may be any iterable of SessionStudent (e.g. one page of a
+    paginator); defaults to every student in the session ordered by name.
+    Runs a fixed number of queries regardless of student or station count.
+    """
+    from core.models import ChecklistItem, FinalStationResult, Path, SessionStudent, Station
+
+    if students is None:
+        students = SessionStudent.objects.filter(session=session).order_by('full_name')
+    students = list(students)
+
+    path_names = dict(Path.objects.filter(session=session).values_list('id', 'name'))
+
+    stations = list(
+        Station.objects
+        .filter(path__session=session, active=True, is_deleted=False)
+        .order_by('station_number', 'path__name')
+        .values_list('id', 'path_id', 'station_number', 'name')
+    )
+    station_headers = []
+    seen = set()
+    station_by_slot = {}   # (path_id, station_number) -> station_id
+    for station_id, path_id, number, name in stations:
+        station_by_slot[(path_id, number)] = station_id
+        if number not in seen:
+            station_headers.append({'number': number, 'name': name})
+            seen.add(number)
+
+    station_ids = [s[0] for s in stations]
+    max_by_station = dict(
+        ChecklistItem.objects
+        .filter(station_id__in=station_ids)
+        .values('station_id')
+        .annotate(total=Sum('points'))
+        .values_list('station_id', 'total')
+    ) if station_ids else {}
+
+    # Examiner-averaged final score per (student, station) — materialized on submit
+    finals = {}
+    if students and station_ids:
+        finals = {
+            (student_id, station_id): final
+            for student_id, station_id, final in (
+                FinalStationResult.objects
+                .filter(
+                    session_student_id__in=[s.id for s in students],
+                    station_id__in=station_ids,
+                )
+                .values_list('session_student_id', 'station_id', 'final_score')
+            )
+        }
+
+    matrix = SessionResults(session, station_headers, students, path_names)
+    for student in students:
+        scores = []
+        total = 0
+        max_total = 0
+        for header in station_headers:
+            station_id = station_by_slot.get((student.path_id, header['number']))
+            if station_id is None:
+                scores.append(None)
+                continue
+            max_total += max_by_station.get(station_id) or 0
+            final = finals.get((student.id, station_id))
+            scores.append(final)
+            if final is not None:
+                total += final
+        matrix._append(scores, total, max_total)
+    return matrix
+
+
+def iter_session_results(session, chunk_size=500):
+    """
+    Yield SessionResults matrices for consecutive chunks of ``chunk_size``
+    students (ordered by name), so exports never hold the whole session.
+
+    Always yields at least one matrix, so ``station_headers`` are available
+    even for a session without students.
+    """
+    from core.models import SessionStudent
+
+    students = (
+        SessionStudent.objects.filter(session=session)
+        .order_by('full_name', 'id')
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    yielded = False
+    for student in students:
+        chunk.append(student)
+        if len(chunk) == chunk_size:
+            yield build_session_results(session, chunk)
+            yielded = True
+            chunk = []
+    if chunk or not yielded:
+        yield build_session_results(session, chunk)
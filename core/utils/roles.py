@@ -112,7 +112,8 @@ def scope_queryset(user, qs, dept_field='department'):
     Department FK.  Examples:
         - Course: dept_field='department'
         - Exam:   dept_field='course__department'
-        - Session: dept_field='exam__course__department'
+        - Session / Path / Station / SessionStudent / StationScore:
+                  dept_field='department' (denormalised, single indexed column)
     """
     if is_global(user):
         return qs
@@ -180,29 +181,32 @@ def check_exam_department(user, exam):
     return False
 
 
+def _check_denormalised_department(user, obj):
+    """Compare the denormalised ``department_id`` column with the user's department."""
+    if is_global(user):
+        return True
+    if is_coordinator(user):
+        user_dept_id = getattr(user, 'department_id', None)
+        return bool(obj.department_id and user_dept_id) and obj.department_id == user_dept_id
+    return False
+
+
 def check_session_department(user, session):
-    """Check if user can access an ExamSession (via exam.course.department)."""
-    return check_exam_department(user, session.exam)
+    """Check if user can access an ExamSession (denormalised exam.course.department)."""
+    return _check_denormalised_department(user, session)
 
 
 def check_path_department(user, path):
-    """Check if user can access a Path (via path.session.exam.course.department or path.exam.course.department)."""
-    if is_global(user):
-        return True
-    exam = getattr(path, 'exam', None) or (path.session.exam if hasattr(path, 'session') and path.session else None)
-    if exam:
-        return check_exam_department(user, exam)
-    return False
+    """Check if user can access a Path (denormalised session department)."""
+    return _check_denormalised_department(user, path)
 
 
 def check_station_department(user, station):
-    """Check if user can access a Station (via station.path.exam.course.department)."""
-    if is_global(user):
-        return True
-    path = getattr(station, 'path', None)
-    if path:
-        return check_path_department(user, path)
-    return False
+    """
+    Check if user can access a Station (denormalised path department, or
+    the exam's for stations not linked to a path — as scope_queryset does).
+    """
+    return _check_denormalised_department(user, station)
 
 
 # ── Decorators ───────────────────────────────────────────────────────
@@ -0,0 +1,158 @@
+"""
+Score submission — the write path behind the examiner ``submit_score`` API.
+
+Submitting used to recalculate the total by loading every item score,
+save the StationScore (pre_save SELECT + audit diff signal), load the
+student and its Path, count the path's stations and the student's
+submitted stations, and save the student (signals again) — each in its
+own autocommit.  ``submit_station_score`` instead:
+
+  * takes the path's required stations from the cached session aggregates
+    (core.utils.session_detail) instead of counting them;
+  * inside one ``transaction.atomic`` block, locks the student row, sums
+    the item scores with one aggregate, writes the score and the student
+    status with conditional ``UPDATE``s and refreshes the
+    FinalStationResult.
+
+Locking the student row serialises concurrent submissions for the same
+student (two stations finishing at once), so the last one always sees
+the other's score and marks the student completed.
+
+The per-save audit signals are bypassed; the view records the submission
+itself (SCORE_SUBMITTED / SCORE_AMENDED).
+"""
+from django.db import transaction
+from django.db.models import Sum
+
+from core.models.mixins import TimestampMixin
+
+
+def path_station_ids(session, path_id):
+    """Active, non-deleted station ids of ``path_id`` (cached; DB fallback)."""
+    from core.models import Station
+    from core.utils.session_detail import get_session_aggregates
+
+    for path in get_session_aggregates(session)['paths']:
+        if path['id'] == path_id:
+            return path['required_station_ids']
+    # Deleted paths are not in the aggregates
+    return set(
+        Station.objects.filter(path_id=path_id, active=True, is_deleted=False)
+        .values_list('id', flat=True)
+    )
+
+
+def _status_changes(done, required, now):
+    """Status for ``done`` submitted stations out of ``required`` (None: leave it)."""
+    if required and done >= len(required):
+        return {'status': 'completed', 'completed_at': now}
+    return {'status': 'in_progress'} if done else None
+
+
+def _student_status(student, now):
+    """Status the student should have after a submission (None: leave it)."""
+    from core.models import StationScore
+
+    submitted = StationScore.objects.filter(session_student_id=student.pk, status='submitted')
+    if student.path_id:
+        required = path_station_ids(student.session, student.path_id)
+        done = submitted.filter(station_id__in=required).values('station_id').distinct().count()
+        return _status_changes(done, required, now)
+    return _status_changes(submitted.values('station_id').distinct().count(), None, now)
+
+
+def refresh_student_statuses(student_ids, now):
+    """
+    Apply the status rule of ``submit_station_score`` to several students
+    after a bulk write of submitted scores (offline sync).  Locks the
+    students' rows; call inside the writing transaction.  Returns the ids
+    of the students now completed.
+    """
+    from core.models import ExamSession, SessionStudent, StationScore
+
+    students = list(
+        SessionStudent.objects.select_for_update().filter(pk__in=student_ids)
+        .order_by('pk').values_list('pk', 'session_id', 'path_id', 'status')
+    )
+    if not students:
+        return set()
+    sessions = ExamSession.objects.in_bulk({session_id for _, session_id, _, _ in students})
+    submitted = {}
+    for student_id, station_id in (
+        StationScore.objects.filter(session_student_id__in=[pk for pk, _, _, _ in students],
+                                    status='submitted')
+        .values_list('session_student_id', 'station_id').distinct()
+    ):
+        submitted.setdefault(student_id, set()).add(station_id)
+
+    by_status = {}
+    for pk, session_id, path_id, status in students:
+        done = submitted.get(pk, set())
+        required = path_station_ids(sessions[session_id], path_id) if path_id else None
+        changes = _status_changes(len(done & set(required)) if path_id else len(done), required, now)
+        if changes and changes['status'] != status:
+            by_status.setdefault(changes['status'], (changes, []))[1].append(pk)
+    for changes, pks in by_status.values():
+        SessionStudent.objects.filter(pk__in=pks).update(**changes)
+    return set(by_status['completed'][1]) if 'completed' in by_status else set()
+
+
+def submit_station_score(score, global_rating=None, comments=''):
+    """
+    Submit ``score`` (a StationScore loaded with
+    ``select_related('session_student__session')``).
+
+    Updates ``score`` in memory and returns ``(first_for_station,
+    student_completed)`` for the live progress feed.
+    """
+    from core.models import FinalStationResult, ItemScore, SessionStudent, StationScore
+
+    student = score.session_student
+    now = TimestampMixin.utc_timestamp()
+    was_submitted = score.status == 'submitted'
+
+    with transaction.atomic():
+        SessionStudent.objects.select_for_update().filter(pk=student.pk).values_list('pk').first()
+        # Summed under the lock, so an item write racing the submission is either
+        # in the total or lands after the score is submitted
+        total = ItemScore.objects.filter(station_score_id=score.pk).aggregate(t=Sum('score'))['t']
+        score.total_score = round(total or 0, 2)
+        if score.max_score and score.max_score > 0:
+            score.percentage = round((score.total_score / score.max_score) * 100, 2)
+        score.global_rating = global_rating
+        score.comments = comments
+        score.completed_at = now
+        score.status = 'submitted'
+        score.unlocked_for_correction = False
+        score.updated_at = now
+
+        # The live station count only moves on the first submission for this student
+        first_for_station = not was_submitted and not StationScore.objects.filter(
+            session_student_id=student.pk,
+            station_id=score.station_id,
+            status='submitted',
+        ).exclude(pk=score.pk).exists()
+
+        StationScore.objects.filter(pk=score.pk).update(
+            total_score=score.total_score,
+            percentage=score.percentage,
+            global_rating=score.global_rating,
+            comments=score.comments,
+            completed_at=now,
+            status='submitted',
+            unlocked_for_correction=False,
+            updated_at=now,
+        )
+        FinalStationResult.refresh(student.pk, score.station_id)
+
+        student_completed = False
+        changes = _student_status(student, now)
+        if changes:
+            updated = SessionStudent.objects.filter(pk=student.pk).exclude(
+                status=changes['status'],
+            ).update(**changes)
+            if updated:
+                for field, value in changes.items():
+                    setattr(student, field, value)
+                student_completed = changes['status'] == 'completed'
+    return first_for_station, student_completed
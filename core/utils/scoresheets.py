@@ -0,0 +1,244 @@
+"""
+Score sheets — batch builder behind the score sheet reports and exports.
+
+A score sheet used to be assembled per student: the path's stations, the
+student's submitted scores, the station of every commented score and the
+examiner-averaged total, each with its own queries.  ``build_scoresheets``
+assembles the sheets of any number of students from a fixed number of
+queries:
+
+  * one StationScore query (submitted scores of every student, with the
+    examiner);
+  * one grouped FinalStationResult total per student;
+  * the path stations and max scores from the StationCatalog (cached; two
+    more queries per cold path set).
+
+Each sheet is the ``student_info`` dict of student_scoresheet.html, plus
+the per-station score lists and comments of scoresheets.html:
+
+    {'student', 'stations', 'scores': {station_id: [StationScore]},
+     'station_rows': [{'number', 'name', 'examiner', 'score', 'max_score',
+                       'comment', 'marked'}],
+     'comments_with_examiner', 'total_score', 'max_score',
+     'percentage_display', 'passed', 'exam_weight', 'weighted_score'}
+
+``iter_session_scoresheets`` walks a whole session in batches for the
+bulk exports; ``render_scoresheets_pdf`` prints sheets one per page.
+"""
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Sum
+
+from core.utils.station_catalog import StationCatalog
+
+logger = logging.getLogger('osce.exports')
+
+SCORESHEET_BATCH_SIZE = 200
+PASS_PERCENTAGE = 60
+
+
+def build_scoresheets(session, students):
+    """Assemble the score sheets of ``students`` (all of ``session``), in order."""
+    from core.models import FinalStationResult, StationScore
+
+    students = list(students)
+    if not students:
+        return []
+    student_ids = [s.pk for s in students]
+
+    scores = defaultdict(lambda: defaultdict(list))
+    commented = defaultdict(list)
+    for score in (
+        StationScore.objects.filter(session_student_id__in=student_ids, status='submitted')
+        .exclude(total_score__isnull=True)
+        .select_related('examiner')
+    ):
+        scores[score.session_student_id][score.station_id].append(score)
+        if score.comments and score.comments.strip():
+            commented[score.session_student_id].append(score)
+
+    totals = dict(
+        FinalStationResult.objects.filter(session_student_id__in=student_ids)
+        .order_by().values('session_student_id').annotate(total=Sum('final_score'))
+        .values_list('session_student_id', 'total')
+    )
+    path_stations = StationCatalog.paths_stations({s.path_id for s in students})
+    comment_stations = StationCatalog.stations({
+        score.station_id for student_scores in commented.values() for score in student_scores
+    })
+    exam_weight = float(session.exam.exam_weight or 1)
+
+    sheets = []
+    for student in students:
+        stations = path_stations.get(student.path_id, [])
+        score_map = dict(scores.get(student.pk, {}))
+        max_possible = sum(st['max_score'] for st in stations)
+        total = totals.get(student.pk) or 0
+        pct = (total / max_possible * 100) if max_possible > 0 else 0
+
+        comments_with_examiner = []
+        for score in commented.get(student.pk, []):
+            examiner_name = score.examiner.full_name if score.examiner else 'Unknown Examiner'
+            comments_with_examiner.append({
+                'station': comment_stations.get(score.station_id),
+                'examiner_name': examiner_name,
+                'comment_text': score.comments,
+                'formatted': f'{examiner_name}:\n{score.comments}',
+            })
+
+        sheets.append({
+            'student': student,
+            'stations': stations,
+            'scores': score_map,
+            'station_rows': [_station_row(st, score_map.get(st['id'], [])) for st in stations],
+            'comments_with_examiner': comments_with_examiner,
+            'total_score': round(total, 2),
+            'max_score': max_possible,
+            'percentage_display': round(pct, 2),
+            'passed': pct >= PASS_PERCENTAGE,
+            'exam_weight': exam_weight,
+            'weighted_score': (
+                round(total / max_possible * exam_weight, 2) if exam_weight and max_possible else None
+            ),
+        })
+    return sheets
+
+
+def _station_row(station, station_scores):
+    """One row of the printed sheet; several examiners are averaged."""
+    if not station_scores:
+        return {
+            'number': station['station_number'],
+            'name': station['name'],
+            'examiner': '—',
+            'score': None,
+            'max_score': station['max_score'],
+            'comment': '',
+            'marked': False,
+        }
+    avg = sum(s.total_score or 0 for s in station_scores) / len(station_scores)
+    return {
+        'number': station['station_number'],
+        'name': station['name'],
+        'examiner': '\n'.join(
+            (s.examiner.full_name if s.examiner else 'Unknown') for s in station_scores
+        ),
+        'score': round(avg, 2),
+        'max_score': station['max_score'],
+        'comment': ' | '.join(
+            s.comments.strip() for s in station_scores if s.comments and s.comments.strip()
+        ),
+        'marked': True,
+    }
+
+
+def iter_session_scoresheets(session, progress=None, batch_size=SCORESHEET_BATCH_SIZE):
+    """Yield the score sheet of every student of ``session`` (by name), in batches."""
+    from core.models import SessionStudent
+
+    students = list(SessionStudent.objects.filter(session=session).order_by('full_name', 'id'))
+    for start in range(0, len(students), batch_size):
+        for done, sheet in enumerate(
+            build_scoresheets(session, students[start:start + batch_size]), start + 1,
+        ):
+            yield sheet
+            if progress:
+                progress(done, len(students))
+
+
+# ── PDF ─────────────────────────────────────────────────────────────────────
+PDF_FONT = 'Amiri'
+PDF_FONT_PATH = settings.BASE_DIR / 'static' / 'js' / 'fonts' / 'amiri-regular.ttf'
+
+
+def _pdf_font():
+    """Register the bundled Arabic-capable font (Helvetica when it is missing)."""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if PDF_FONT in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT
+    try:
+        pdfmetrics.registerFont(TTFont(PDF_FONT, str(PDF_FONT_PATH)))
+    except Exception:
+        logger.warning('Score sheet PDF: %s not found, falling back to Helvetica', PDF_FONT_PATH)
+        return 'Helvetica'
+    return PDF_FONT
+
+
+def _ra(text):
+    """Shape Arabic text for reportlab (which draws glyphs left to right)."""
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+
+    if not text:
+        return ''
+    try:
+        return get_display(arabic_reshaper.reshape(str(text)))
+    except Exception:
+        return str(text)
+
+
+def render_scoresheets_pdf(session, sheets, out):
+    """Write ``sheets`` to ``out`` as a PDF, one page per student."""
+    from xml.sax.saxutils import escape
+
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    font = _pdf_font()
+    title = ParagraphStyle('title', fontName=font, fontSize=14, leading=18, alignment=1)
+    text = ParagraphStyle('text', fontName=font, fontSize=9, leading=12)
+    cell = ParagraphStyle('cell', fontName=font, fontSize=8, leading=10)
+
+    def para(value, style=cell):
+        return Paragraph(escape(_ra(value)).replace('\n', '<br/>'), style)
+
+    heading = f'{session.exam.name} — {session.name} ({session.session_date})'
+    doc = SimpleDocTemplate(
+        out, pagesize=A4, title=heading,
+        leftMargin=1.5 * cm, rightMargin=1.5 * cm, topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+    )
+    story = []
+    for sheet in sheets:
+        student = sheet['student']
+        if story:
+            story.append(PageBreak())
+        story += [
+            para(heading, title),
+            Spacer(1, 0.3 * cm),
+            para(f'{student.full_name} — {student.student_number}', text),
+            Spacer(1, 0.3 * cm),
+        ]
+        rows = [['#', 'Station', 'Examiner', 'Score', 'Comment']]
+        for row in sheet['station_rows']:
+            score = f"{row['score']} / {row['max_score']}" if row['marked'] else f"— / {row['max_score']}"
+            rows.append([
+                row['number'], para(row['name']), para(row['examiner']), score, para(row['comment']),
+            ])
+        rows.append(['', para('Total'), '', f"{sheet['total_score']} / {sheet['max_score']}",
+                     para(f"{sheet['percentage_display']}% — {'Pass' if sheet['passed'] else 'Fail'}")])
+        table = Table(rows, colWidths=[1 * cm, 5 * cm, 4 * cm, 2.2 * cm, 5.8 * cm], repeatRows=1)
+        table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0F3460')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#E8EEF7')),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CBD5E1')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        story.append(table)
+        if sheet['weighted_score'] is not None:
+            story += [
+                Spacer(1, 0.3 * cm),
+                para(f"Weighted score: {sheet['weighted_score']} / {sheet['exam_weight']}", text),
+            ]
+    if not story:
+        story.append(para(heading, title))
+    doc.build(story)
@@ -0,0 +1,117 @@
+"""
+Session-level aggregates for the coordinator session detail page.
+
+The page shows, per path, the station count, total marks and the stations
+without an examiner, plus session metrics (rotation / station summary).
+None of that depends on the student page being viewed, so it is computed
+once and cached under SESSION_DETAIL_KEY:
+
+    {
+        'paths': [{'id', 'name', 'rotation_minutes', 'station_count',
+                   'total_marks', 'required_station_ids', 'unassigned_stations'}],
+        'total_unassigned': int,
+        'session_metrics': {'rotation_display', 'rotation_detail',
+                            'station_display', 'station_detail'},
+    }
+
+``required_station_ids`` (a path's active, non-deleted stations) is the
+completion set: a student is completed once every one of them has a
+submitted score.  Scores and students are deliberately not cached here —
+the view loads them for the current page only.
+
+Invalidated through ``invalidate_session_detail`` whenever paths,
+stations or examiner assignments change (core.signals), and once per
+station when its checklist items change (core.utils.rescoring).
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from core.utils.cache_utils import SESSION_DETAIL_TTL, get_session_detail_cache_key
+
+logger = logging.getLogger('osce.cache')
+
+
+def _session_metrics(session, paths):
+    rotation_display = 'Not set'
+    rotation_detail = None
+
+    path_rotations = [(p['name'], p['rotation_minutes']) for p in paths if p['rotation_minutes']]
+    if path_rotations:
+        rotation_values = {m for _, m in path_rotations}
+        if len(rotation_values) == 1:
+            rotation_display = f'{rotation_values.pop()} minutes'
+        else:
+            rotation_display = 'Varies by path'
+            rotation_detail = ', '.join(f'Path {n}: {m} min' for n, m in path_rotations)
+    elif session.exam and session.exam.station_duration_minutes:
+        rotation_display = f'{session.exam.station_duration_minutes} minutes (exam default)'
+
+    total_station_count = sum(p['station_count'] for p in paths)
+    station_detail = None
+    if paths:
+        station_detail = ', '.join(f'Path {p["name"]}: {p["station_count"]}' for p in paths)
+    station_display = str(total_station_count)
+    if total_station_count == 0 and session.exam and session.exam.number_of_stations:
+        station_display = f'{session.exam.number_of_stations} (exam default)'
+
+    return {
+        'rotation_display': rotation_display,
+        'rotation_detail': rotation_detail,
+        'station_display': station_display,
+        'station_detail': station_detail,
+    }
+
+
+def build_session_aggregates(session):
+    """Compute the aggregates from the DB (three queries)."""
+    from core.models import ExaminerAssignment, Path, Station
+
+    paths = list(
+        Path.objects.filter(session=session, is_deleted=False)
+        .order_by('name').values('id', 'name', 'rotation_minutes')
+    )
+    by_path = {}
+    for p in paths:
+        p.update(station_count=0, total_marks=0, required_station_ids=set(), unassigned_stations=[])
+        by_path[p['id']] = p
+
+    assigned_station_ids = set(
+        ExaminerAssignment.objects.filter(session=session).values_list('station_id', flat=True)
+    )
+    stations = (
+        Station.objects
+        .filter(path_id__in=list(by_path), active=True)
+        .order_by('station_number')
+        .values('id', 'name', 'path_id', 'is_deleted')
+        .annotate(max_score=Sum('checklist_items__points'))
+    )
+    total_unassigned = 0
+    for station in stations:
+        p = by_path[station['path_id']]
+        p['station_count'] += 1
+        p['total_marks'] += station['max_score'] or 0
+        if station['is_deleted']:
+            continue
+        p['required_station_ids'].add(station['id'])
+        if station['id'] not in assigned_station_ids:
+            p['unassigned_stations'].append({'id': station['id'], 'name': station['name']})
+            total_unassigned += 1
+
+    return {
+        'paths': paths,
+        'total_unassigned': total_unassigned,
+        'session_metrics': _session_metrics(session, paths),
+    }
+
+
+def get_session_aggregates(session):
+    """Return the cached aggregates for ``session``, building them on a miss."""
+    key = get_session_detail_cache_key(session.pk)
+    data = cache.get(key)
+    if data is None:
+        data = build_session_aggregates(session)
+        cache.set(key, data, SESSION_DETAIL_TTL)
+        logger.debug('Cache MISS: session_detail %s built from DB', session.pk)
+    return data
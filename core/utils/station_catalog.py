@@ -0,0 +1,177 @@
+"""
+StationCatalog — per-station checklist totals and per-path station lists.
+
+Max scores used to be summed from ChecklistItem rows wherever they were
+shown: ``Station.get_max_score()`` / ``to_dict()``,
+``ExaminerAssignment.station_max_score``, ``Exam.get_total_marks()``,
+``Path.total_marks`` and the score sheet reports (once per station per
+student).  The catalog holds, per station:
+
+    {'id', 'path_id', 'station_number', 'name', 'active', 'is_deleted',
+     'max_score', 'item_count', 'ilo_points': {ilo_id: points}}
+
+and per path the ids of its active stations in station order.
+
+Entries live in the shared cache under a catalog version and are mirrored
+in a per-thread dict, so repeated lookups in one worker cost a single
+cache read (the version).  Station and checklist item saves/deletes bump
+the version (core.signals), which retires every entry at once — checklist
+edits are rare outside exam setup.  The bump is repeated on commit, so
+entries rebuilt from the uncommitted rows mid-transaction are retired too.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+
+logger = logging.getLogger('osce.cache')
+
+STATION_CATALOG_TTL         = 60 * 60 * 12   # 12 hours — the version retires entries earlier
+STATION_CATALOG_VERSION_KEY = 'osce:station_catalog:version'
+STATION_CATALOG_STATION_KEY = 'osce:station_catalog:{version}:st:{station_id}'
+STATION_CATALOG_PATH_KEY    = 'osce:station_catalog:{version}:path:{path_id}'
+
+_local = threading.local()
+
+
+def _init_version():
+    # Seeded from the clock so a flushed cache never reissues a version
+    # that a process still holds entries for
+    cache.add(STATION_CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+def _version():
+    version = cache.get(STATION_CATALOG_VERSION_KEY)
+    if version is None:
+        _init_version()
+        version = cache.get(STATION_CATALOG_VERSION_KEY)
+    return version
+
+
+def _local_store(version):
+    """In-process mirror of the entries of ``version`` (one per thread)."""
+    store = getattr(_local, 'store', None)
+    if store is None or store['version'] != version:
+        store = _local.store = {'version': version, 'stations': {}, 'paths': {}}
+    return store
+
+
+def _build_stations(station_ids):
+    """Load catalog entries for ``station_ids`` (two queries)."""
+    from core.models import ChecklistItem, Station
+
+    entries = {
+        row['id']: dict(row, max_score=row['max_score'] or 0, ilo_points={})
+        for row in Station.objects.filter(pk__in=station_ids).order_by()
+        .values('id', 'path_id', 'station_number', 'name', 'active', 'is_deleted')
+        .annotate(max_score=Sum('checklist_items__points'), item_count=Count('checklist_items'))
+    }
+    for station_id, ilo_id, points in (
+        ChecklistItem.objects.filter(station_id__in=list(entries))
+        .order_by().values('station_id', 'ilo_id').annotate(points=Sum('points'))
+        .values_list('station_id', 'ilo_id', 'points')
+    ):
+        entries[station_id]['ilo_points'][ilo_id] = points
+    return entries
+
+
+class StationCatalog:
+    """Cached station totals; see the module docstring."""
+
+    @classmethod
+    def stations(cls, station_ids):
+        """``{station_id: entry}`` for ``station_ids`` (unknown ids are omitted)."""
+        station_ids = [sid for sid in station_ids if sid is not None]
+        version = _version()
+        local = _local_store(version)['stations']
+        missing = [sid for sid in station_ids if sid not in local]
+        if missing:
+            keys = {
+                STATION_CATALOG_STATION_KEY.format(version=version, station_id=sid): sid
+                for sid in missing
+            }
+            found = cache.get_many(list(keys))
+            local.update({keys[key]: entry for key, entry in found.items()})
+            unbuilt = [sid for key, sid in keys.items() if key not in found]
+            if unbuilt:
+                built = _build_stations(unbuilt)
+                cache.set_many(
+                    {
+                        STATION_CATALOG_STATION_KEY.format(version=version, station_id=sid): entry
+                        for sid, entry in built.items()
+                    },
+                    STATION_CATALOG_TTL,
+                )
+                local.update(built)
+                logger.debug('Cache MISS: station_catalog built %d stations', len(built))
+        return {sid: local[sid] for sid in station_ids if sid in local}
+
+    @classmethod
+    def station(cls, station_id):
+        return cls.stations([station_id]).get(station_id)
+
+    @classmethod
+    def max_score(cls, station_id):
+        entry = cls.station(station_id)
+        return entry['max_score'] if entry else 0
+
+    @classmethod
+    def paths_stations(cls, path_ids):
+        """``{path_id: [entry, ...]}`` — the active stations of each path, in station order."""
+        path_ids = {pid for pid in path_ids if pid is not None}
+        version = _version()
+        paths = _local_store(version)['paths']
+        missing = [pid for pid in path_ids if pid not in paths]
+        if missing:
+            keys = {STATION_CATALOG_PATH_KEY.format(version=version, path_id=pid): pid for pid in missing}
+            found = cache.get_many(list(keys))
+            paths.update({keys[key]: station_ids for key, station_ids in found.items()})
+            unbuilt = [pid for key, pid in keys.items() if key not in found]
+            if unbuilt:
+                from core.models import Station
+                built = {pid: [] for pid in unbuilt}
+                for station_id, path_id in (
+                    Station.objects.filter(path_id__in=unbuilt, active=True)
+                    .order_by('station_number').values_list('id', 'path_id')
+                ):
+                    built[path_id].append(station_id)
+                cache.set_many(
+                    {
+                        STATION_CATALOG_PATH_KEY.format(version=version, path_id=pid): station_ids
+                        for pid, station_ids in built.items()
+                    },
+                    STATION_CATALOG_TTL,
+                )
+                paths.update(built)
+        entries = cls.stations([sid for pid in path_ids for sid in paths[pid]])
+        return {
+            pid: [entries[sid] for sid in paths[pid] if sid in entries]
+            for pid in path_ids
+        }
+
+    @classmethod
+    def path_stations(cls, path_id):
+        """Entries of the active stations of ``path_id``, in station order."""
+        return cls.paths_stations([path_id]).get(path_id, [])
+
+    @classmethod
+    def total_max_score(cls, station_ids):
+        return sum(entry['max_score'] for entry in cls.stations(station_ids).values())
+
+
+# ── Invalidation ────────────────────────────────────────────────────────────
+def _bump_version():
+    try:
+        cache.incr(STATION_CATALOG_VERSION_KEY)
+    except ValueError:
+        _init_version()
+
+
+def invalidate_station_catalog():
+    """Call when stations or checklist items change (retires every entry)."""
+    _bump_version()
+    transaction.on_commit(_bump_version)
+    logger.debug('Cache INVALIDATED: station_catalog')
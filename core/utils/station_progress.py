@@ -0,0 +1,155 @@
+"""
+Per-station marking progress for the examiner station dashboard.
+
+Tablets reload ``station_dashboard`` after every student, for every
+examiner of every station.  The page needs, per student on the station's
+path, the submitted score of each examiner and the averaged final result.
+That is loaded with one query (students LEFT JOINed to their submitted
+scores and final result at the station) and cached per (session, station)
+under STATION_PROGRESS_KEY:
+
+    [{'id', 'full_name', 'student_number', 'photo_url', 'sequence_number',
+      'path_name', 'scores': {examiner_id: total_score},
+      'final_score', 'both_submitted'}]
+
+Both examiners of a station share the entry; ``examiner_progress`` turns
+it into one examiner's view (my score / other examiner / counts).
+
+Dropped by ``invalidate_station_progress`` whenever a submitted score at
+the station changes (submit, undo, offline sync, coordinator correction,
+checklist rescale) and, for the whole session, by
+``invalidate_session_detail`` when its paths change and by
+``invalidate_session_students`` when students are added, moved or removed
+(SessionStudent signals, plus explicit calls after bulk writes).
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import FilteredRelation, Q
+
+logger = logging.getLogger('osce.cache')
+
+STATION_PROGRESS_TTL = 60 * 60 * 12   # 12 hours — longer than any exam day
+STATION_PROGRESS_KEY = 'osce:station_progress:{session_id}:{station_id}'
+
+
+def get_station_progress_cache_key(session_id, station_id):
+    return STATION_PROGRESS_KEY.format(session_id=session_id, station_id=station_id)
+
+
+def build_station_progress(session_id, station_id, path_id):
+    """Load the per-student state of ``station_id`` from the DB (one query)."""
+    from core.models import SessionStudent
+
+    rows = (
+        SessionStudent.objects
+        .filter(session_id=session_id, path_id=path_id)
+        .annotate(
+            submitted=FilteredRelation(
+                'station_scores',
+                condition=Q(station_scores__station_id=station_id, station_scores__status='submitted'),
+            ),
+            final=FilteredRelation('final_results', condition=Q(final_results__station_id=station_id)),
+        )
+        .order_by('sequence_number', 'student_number', 'id')
+        .values_list(
+            'id', 'full_name', 'student_number', 'photo_url', 'sequence_number', 'path__name',
+            'submitted__examiner_id', 'submitted__total_score',
+            'final__final_score', 'final__both_submitted',
+        )
+    )
+    students = {}
+    for (pk, full_name, student_number, photo_url, sequence_number, path_name,
+         examiner_id, total_score, final_score, both_submitted) in rows:
+        student = students.get(pk)
+        if student is None:
+            student = students[pk] = {
+                'id': pk,
+                'full_name': full_name,
+                'student_number': student_number,
+                'photo_url': photo_url,
+                'sequence_number': sequence_number,
+                'path_name': path_name,
+                'scores': {},
+                'final_score': final_score,
+                'both_submitted': bool(both_submitted),
+            }
+        if examiner_id is not None:
+            student['scores'][examiner_id] = total_score
+    return list(students.values())
+
+
+def get_station_progress(session_id, station_id, path_id):
+    """Return the cached progress of ``station_id``, building it on a miss."""
+    key = get_station_progress_cache_key(session_id, station_id)
+    students = cache.get(key)
+    if students is None:
+        students = build_station_progress(session_id, station_id, path_id)
+        cache.set(key, students, STATION_PROGRESS_TTL)
+        logger.debug('Cache MISS: station_progress %s built from DB', station_id)
+    return students
+
+
+def examiner_progress(students, examiner_id):
+    """
+    One examiner's view of the station progress: ``student_list`` entries
+    (``student``, ``my_score``, ``other_examiner_score``, ``final_score``,
+    ``both_submitted``, ``is_scored``) and the scored / remaining counts.
+    """
+    student_list = []
+    for s in students:
+        others = [total for eid, total in s['scores'].items() if eid != examiner_id]
+        student_list.append({
+            'student': s,
+            'my_score': s['scores'].get(examiner_id),
+            'other_examiner_score': others[0] if others else None,
+            'final_score': s['final_score'] if s['both_submitted'] else None,
+            'both_submitted': s['both_submitted'],
+            'is_scored': examiner_id in s['scores'],
+        })
+    total_count = len(student_list)
+    scored_count = sum(1 for entry in student_list if entry['is_scored'])
+    return {
+        'student_list': student_list,
+        'scored_count': scored_count,
+        'remaining_count': total_count - scored_count,
+        'total_count': total_count,
+        'progress_pct': round((scored_count / total_count * 100), 2) if total_count else 0,
+    }
+
+
+# ── Invalidation ────────────────────────────────────────────────────────────
+def invalidate_station_progress(session_id, *station_ids):
+    """Call when submitted scores at ``station_ids`` of ``session_id`` change."""
+    if not station_ids:
+        return
+    cache.delete_many([get_station_progress_cache_key(session_id, sid) for sid in station_ids])
+    logger.debug('Cache INVALIDATED: station_progress %s', ', '.join(map(str, station_ids)))
+
+
+def invalidate_scores_progress(pairs):
+    """
+    Invalidate the stations of ``(session_student_id, station_id)`` pairs,
+    resolving their sessions in one query (callers without the session).
+    """
+    from core.models import SessionStudent
+
+    pairs = list(pairs)
+    if not pairs:
+        return
+    sessions = dict(
+        SessionStudent.objects.filter(pk__in={student_id for student_id, _ in pairs})
+        .values_list('pk', 'session_id')
+    )
+    cache.delete_many([
+        get_station_progress_cache_key(sessions[student_id], station_id)
+        for student_id, station_id in set(pairs) if student_id in sessions
+    ])
+
+
+def invalidate_session_station_progress(session_id):
+    """Call when a session's students or paths change (drops every station's entry)."""
+    from core.models import Station
+
+    station_ids = Station.objects.filter(path__session_id=session_id).values_list('id', flat=True)
+    invalidate_station_progress(session_id, *station_ids)
@@ -0,0 +1,232 @@
+"""
+Bulk student roster import (XLSX) for an exam session.
+
+Usage:
+    from core.utils.student_import import read_roster, import_students
+
+    roster = read_roster(uploaded_file)          # raises RosterError
+    summary = import_students(session, roster, user=request.user)
+
+The workbook is streamed with openpyxl read-only mode, numbers already in
+the session are fetched with one query, and new students are inserted with
+``bulk_create(ignore_conflicts=True)`` in chunks of IMPORT_CHUNK_SIZE, so a
+roster costs a handful of queries however long it is.  ``bulk_create``
+skips the per-row hierarchy audit signals; one STUDENT_BULK_IMPORT record
+summarises the import instead.
+
+Large uploads are run by the ``core.import_students`` Celery task (when a
+broker is configured), which reports progress in the cache under
+STUDENT_IMPORT_KEY for the ``students_upload_status`` endpoint.
+"""
+import logging
+
+from django.core.cache import cache
+
+from core.models import Path, SessionStudent
+from core.models.audit import STUDENT_BULK_IMPORT
+from core.models.mixins import TimestampMixin
+
+logger = logging.getLogger('osce.audit')
+
+IMPORT_CHUNK_SIZE = 500
+STUDENT_IMPORT_KEY = 'osce:students_import:{task_id}'
+STUDENT_IMPORT_TTL = 60 * 30
+
+HEADER_LABELS = ('student_number', 'id', 'number', 'student_id')
+NUMBER_MAX_LENGTH = SessionStudent._meta.get_field('student_number').max_length
+NAME_MAX_LENGTH = SessionStudent._meta.get_field('full_name').max_length
+
+
+class RosterError(Exception):
+    """The roster cannot be imported; ``errors`` lists offending rows."""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def _sanitize_cell(val):
+    """Strip formula-triggering prefixes from imported cell values."""
+    if not isinstance(val, str):
+        return val
+    if val and val[0] in ('=', '+', '@', '\t', '\r'):
+        return val.lstrip('=+@\t\r')
+    return val
+
+
+def validate_registration_number(number):
+    """Validate that registration number contains only digits."""
+    if not number.isdigit():
+        return False, 'Registration number must contain numbers only.'
+    return True, None
+
+
+def read_roster(source):
+    """
+    Read ``(student_number, full_name)`` pairs from the first sheet of an
+    XLSX file (path or file object).  An optional header row is skipped.
+    Raises RosterError if any row is invalid or no student was found.
+    """
+    import openpyxl
+
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as exc:
+        raise RosterError(f'Error reading XLSX: {exc}')
+
+    roster = []
+    errors = []
+    first_row = True
+    try:
+        for row_num, row in enumerate(wb.active.iter_rows(values_only=True), 1):
+            if not row or not any(row):
+                continue
+            number = str(row[0]).strip() if row[0] is not None else ''
+            name = _sanitize_cell(str(row[1]).strip()) if len(row) > 1 and row[1] is not None else ''
+
+            if first_row:
+                first_row = False
+                if number.lower() in HEADER_LABELS:
+                    continue
+
+            if not (number and name):
+                continue
+            is_valid, error_msg = validate_registration_number(number)
+            if not is_valid:
+                errors.append(f'Row {row_num}: {error_msg}')
+            elif len(number) > NUMBER_MAX_LENGTH:
+                errors.append(f'Row {row_num}: Registration number is longer than {NUMBER_MAX_LENGTH} digits.')
+            elif len(name) > NAME_MAX_LENGTH:
+                errors.append(f'Row {row_num}: Name is longer than {NAME_MAX_LENGTH} characters.')
+            else:
+                roster.append((number, name))
+    finally:
+        wb.close()
+
+    if errors:
+        raise RosterError('Validation errors found in XLSX:', errors)
+    if not roster:
+        raise RosterError('No valid student data found in XLSX.')
+    return roster
+
+
+def import_students(session, roster, path_id='', user=None, request=None, progress=None):
+    """
+    Add the ``roster`` students to ``session``.
+
+    Students are put on ``path_id`` or, when it is empty, spread round-robin
+    over the session's paths.  Numbers already in the session (or repeated
+    in the roster) are skipped.  Returns ``{'added', 'skipped'}``.
+    """
+    from core.utils.audit import AuditLogService
+    from core.utils.cache_utils import invalidate_session_detail
+
+    paths = list(
+        Path.objects.filter(session=session, is_deleted=False)
+        .order_by('name').values_list('id', flat=True)
+    )
+    if path_id and str(path_id) not in {str(p) for p in paths}:
+        raise RosterError('Selected path does not belong to this session.')
+
+    existing = set(
+        SessionStudent.objects.filter(session=session).values_list('student_number', flat=True)
+    )
+    seen = set(existing)
+    now = TimestampMixin.utc_timestamp()
+    new_students = []
+    for i, (number, name) in enumerate(roster):
+        if number in seen:
+            continue
+        seen.add(number)
+        new_students.append(SessionStudent(
+            session=session,
+            department_id=session.department_id,
+            student_number=number,
+            full_name=name,
+            path_id=path_id or (paths[i % len(paths)] if paths else None),
+            status='registered',
+            created_at=now,
+        ))
+
+    total = len(new_students)
+    for start in range(0, total, IMPORT_CHUNK_SIZE):
+        SessionStudent.objects.bulk_create(
+            new_students[start:start + IMPORT_CHUNK_SIZE], ignore_conflicts=True,
+        )
+        if progress:
+            progress(min(start + IMPORT_CHUNK_SIZE, total), total)
+
+    # ignore_conflicts hides rows a concurrent import got to first
+    added = SessionStudent.objects.filter(session=session).count() - len(existing) if total else 0
+    skipped = len(roster) - added
+
+    if added:
+        invalidate_session_detail(session.pk)
+        AuditLogService.log(
+            action=STUDENT_BULK_IMPORT,
+            resource=session,
+            user=user,
+            request=request,
+            description=(
+                f'Uploaded {added} students from XLSX to session {session.name}'
+                + (f', {skipped} skipped' if skipped else '')
+            ),
+            extra={'added': added, 'skipped': skipped, 'source': 'xlsx'},
+        )
+    logger.info('Student import for session %s: %d added, %d skipped', session.pk, added, skipped)
+    return {'added': added, 'skipped': skipped}
+
+
+# ── Async (Celery) import ───────────────────────────────────────────────────
+def get_student_import_cache_key(task_id):
+    return STUDENT_IMPORT_KEY.format(task_id=task_id)
+
+
+def set_student_import_status(task_id, payload):
+    cache.set(get_student_import_cache_key(task_id), payload, STUDENT_IMPORT_TTL)
+
+
+def run_student_import(task_id, file_name, session_id, path_id='', user_id=None):
+    """
+    Import a roster saved to default storage as ``file_name`` and publish
+    progress / the result for ``students_upload_status``.  The stored file
+    is deleted afterwards.
+    """
+    from django.core.files.storage import default_storage
+    from core.models import Examiner, ExamSession
+
+    def _progress(done, total):
+        set_student_import_status(task_id, {
+            'status': 'running', 'progress': int(done * 100 / total) if total else 100,
+        })
+
+    set_student_import_status(task_id, {'status': 'running', 'progress': 0})
+    try:
+        session = ExamSession.objects.get(pk=session_id)
+        user = Examiner.objects.filter(pk=user_id).first() if user_id else None
+        with default_storage.open(file_name, 'rb') as fh:
+            roster = read_roster(fh)
+        summary = import_students(session, roster, path_id=path_id, user=user, progress=_progress)
+    except RosterError as exc:
+        result = {
+            'status': 'done', 'progress': 100,
+            'message': f'{exc.message} nothing was imported.' if exc.errors else exc.message,
+            'success_count': 0, 'error_count': len(exc.errors), 'errors': exc.errors[:20],
+        }
+    else:
+        message = f'Uploaded {summary["added"]} student(s) from XLSX.'
+        if summary['skipped']:
+            message += f' {summary["skipped"]} duplicate(s) were skipped.'
+        result = {
+            'status': 'done', 'progress': 100, 'message': message,
+            'success_count': summary['added'], 'skipped_count': summary['skipped'],
+            'error_count': 0, 'errors': [],
+        }
+    finally:
+        try:
+            default_storage.delete(file_name)
+        except Exception:
+            pass
+    set_student_import_status(task_id, result)
+    return result
@@ -88,7 +88,7 @@ def create_examiner_api(request):
 def get_session_assignments(request, session_id):
     """GET /api/creator/sessions/<id>/assignments"""
     session = get_object_or_404(
-        scope_queryset(request.user, ExamSession.objects.all(), dept_field='exam__course__department'),
+        scope_queryset(request.user, ExamSession.objects.all(), dept_field='department'),
         pk=session_id,
     )
     assignments = ExaminerAssignment.objects.filter(
@@ -110,7 +110,7 @@ def get_session_assignments(request, session_id):
 def create_assignment(request, session_id):
     """POST /api/creator/sessions/<id>/assignments"""
     session = get_object_or_404(
-        scope_queryset(request.user, ExamSession.objects.all(), dept_field='exam__course__department'),
+        scope_queryset(request.user, ExamSession.objects.all(), dept_field='department'),
         pk=session_id,
     )
     try:
@@ -12,7 +12,9 @@ from core.models import (
     Course, Exam, Station, ChecklistItem, ILO, ExamSession, ItemScore,
 )
 from core.utils.audit import AuditLogService
+from core.utils.cache_utils import invalidate_session_rls_context
 from core.utils.roles import scope_queryset
+from core.utils.station_catalog import StationCatalog
 
 
 @login_required
@@ -53,20 +55,17 @@ def get_exam_stations(request, exam_id):
         scope_queryset(request.user, Exam.objects.all(), dept_field='course__department'),
         pk=exam_id,
     )
-    # P2: Use annotate to eliminate N+1 per station
-    stations = Station.objects.filter(
-        exam_id=exam_id
-    ).annotate(
-        _item_count=Count('checklist_items'),
-    ).order_by('station_number')
+    # Checklist totals from the StationCatalog — no per-station queries
+    stations = list(Station.objects.filter(exam_id=exam_id).order_by('station_number'))
+    totals = StationCatalog.stations([s.id for s in stations])
     return JsonResponse([{
         'id': str(s.id),
         'station_number': s.station_number,
         'name': s.name,
         'scenario': (s.scenario[:100] + '...') if s.scenario and len(s.scenario) > 100 else s.scenario,
         'duration_minutes': s.duration_minutes,
-        'max_score': s.get_max_score(),
-        'item_count': s._item_count,
+        'max_score': totals[s.id]['max_score'],
+        'item_count': totals[s.id]['item_count'],
     } for s in stations], safe=False)
 
 
@@ -76,7 +75,7 @@ def get_station_items(request, station_id):
     """GET /api/creator/stations/<id>/items"""
     # Verify user can access this station's department
     station = get_object_or_404(
-        scope_queryset(request.user, Station.objects.select_related('path__session__exam__course__department'), dept_field='path__session__exam__course__department'),
+        scope_queryset(request.user, Station.objects.select_related('path__session__exam__course__department'), dept_field='department'),
         pk=station_id,
     )
     ILO_THEMES = getattr(settings, 'ILO_THEMES', {})
@@ -268,9 +267,13 @@ def complete_exam(request, exam_id):
         )
 
     # Mark all non-archived/cancelled sessions as completed
-    updated = ExamSession.objects.filter(exam=exam).exclude(
+    to_complete = ExamSession.objects.filter(exam=exam).exclude(
         status__in=['archived', 'cancelled', 'completed']
-    ).update(status='completed')
+    )
+    session_ids = list(to_complete.values_list('id', flat=True))
+    updated = to_complete.update(status='completed')
+    # .update() skips post_save — drop examiners' cached station visibility
+    invalidate_session_rls_context(*session_ids)
 
     exam.status = 'completed'
     exam.save(update_fields=['status'])
@@ -321,7 +324,10 @@ def revert_exam_completion(request, exam_id):
         )
 
     # Revert sessions that were completed back to finished
-    reverted = ExamSession.objects.filter(exam=exam, status='completed').update(status='finished')
+    to_revert = ExamSession.objects.filter(exam=exam, status='completed')
+    session_ids = list(to_revert.values_list('id', flat=True))
+    reverted = to_revert.update(status='finished')
+    invalidate_session_rls_context(*session_ids)
 
     exam.status = 'in_progress'
     exam.save(update_fields=['status'])
@@ -0,0 +1,122 @@
+"""
+Creator API – Background export jobs.
+
+  POST /api/creator/exports                       {kind, session_id, fresh?}
+  GET  /api/creator/exports/<id>                  status / progress
+  GET  /api/creator/exports/<id>/download         the artifact
+  GET  /api/creator/sessions/<id>/exports         recent jobs for a session
+
+Jobs are created and run by core.utils.export_jobs; identical requests
+share a job.  Without a Celery broker the job runs inside the POST and the
+response is already ``done``.
+"""
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+
+from core.models import ExportJob
+from core.models.audit import REPORT_EXPORTED
+from core.utils.audit import AuditLogService
+from core.utils.export_jobs import EXPORT_KINDS, request_export
+
+from .reports import _scoped_session
+
+RECENT_JOBS_LIMIT = 20
+
+
+def job_payload(job):
+    """JSON representation of an ExportJob."""
+    payload = {
+        'id': str(job.pk),
+        'kind': job.kind,
+        'label': EXPORT_KINDS[job.kind].label if job.kind in EXPORT_KINDS else job.kind,
+        'session_id': str(job.session_id),
+        'status': job.status,
+        'progress': job.progress,
+        'filename': job.filename,
+        'size': job.size,
+        'error': job.error,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+        'expires_at': job.expires_at,
+    }
+    if job.status == ExportJob.STATUS_DONE:
+        payload['download_url'] = reverse('creator_api:download_export', args=[job.pk])
+    return payload
+
+
+def _scoped_job(user, job_id):
+    return get_object_or_404(
+        ExportJob.objects.filter(session__in=_scoped_session(user)), pk=job_id
+    )
+
+
+@login_required
+@require_POST
+def create_export(request):
+    """POST /api/creator/exports"""
+    try:
+        data = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    kind = data.get('kind')
+    if kind not in EXPORT_KINDS:
+        return JsonResponse(
+            {'error': f'Unknown export kind. Choose one of: {", ".join(EXPORT_KINDS)}'},
+            status=400,
+        )
+    session = get_object_or_404(_scoped_session(request.user), pk=data.get('session_id'))
+    if EXPORT_KINDS[kind].requires_completed and not request.user.is_superuser \
+            and session.status != 'completed':
+        return JsonResponse(
+            {'error': 'Only superusers can export non-completed sessions.'}, status=403,
+        )
+
+    job, created = request_export(kind, session, request.user, fresh=bool(data.get('fresh')))
+    return JsonResponse({'job': job_payload(job), 'created': created}, status=202 if created else 200)
+
+
+@login_required
+@require_GET
+def get_export(request, job_id):
+    """GET /api/creator/exports/<id>"""
+    return JsonResponse({'job': job_payload(_scoped_job(request.user, job_id))})
+
+
+@login_required
+@require_GET
+def download_export(request, job_id):
+    """GET /api/creator/exports/<id>/download"""
+    job = _scoped_job(request.user, job_id)
+    if job.status == ExportJob.STATUS_EXPIRED:
+        return JsonResponse({'error': 'This export has expired. Request it again.'}, status=410)
+    if job.status != ExportJob.STATUS_DONE or not job.file:
+        return JsonResponse({'error': 'Export is not ready.', 'job': job_payload(job)}, status=409)
+
+    AuditLogService.log(
+        action=REPORT_EXPORTED,
+        resource=job.session,
+        request=request,
+        description=f'Downloaded export "{job.filename}" ({job.kind}).',
+        new_value={'export_job': str(job.pk), 'kind': job.kind},
+    )
+    return FileResponse(
+        job.file.open('rb'),
+        as_attachment=True,
+        filename=job.filename,
+        content_type=job.content_type or 'application/octet-stream',
+    )
+
+
+@login_required
+@require_GET
+def session_exports(request, session_id):
+    """GET /api/creator/sessions/<id>/exports"""
+    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
+    jobs = ExportJob.objects.filter(session=session)[:RECENT_JOBS_LIMIT]
+    return JsonResponse({'jobs': [job_payload(job) for job in jobs]})
@@ -0,0 +1,115 @@
+"""
+Creator API – Live session progress feed (SSE stream + long-poll fallback).
+
+Both endpoints read only the cache-held counters in core.utils.live_progress;
+nothing is recomputed from the database while a coordinator is watching.
+
+  GET /api/creator/sessions/<id>/live?since=<v>&wait=<s>   long-poll (JSON)
+  GET /api/creator/sessions/<id>/live/stream                server-sent events
+
+The SSE endpoint needs an ASGI server (osce_project.asgi:application, e.g.
+``gunicorn -k uvicorn.workers.UvicornWorker``).  Under WSGI it answers with a
+``fallback_url`` pointing at the long-poll endpoint instead of pinning a
+worker thread for the lifetime of the stream.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from core.utils.live_progress import changes_since, current_version
+
+from .sessions import _scoped_session
+
+LONG_POLL_MAX_WAIT = 25      # seconds — stays under proxy/gunicorn timeouts
+LONG_POLL_INTERVAL = 1       # seconds between version checks while waiting
+STREAM_INTERVAL = 1          # seconds between version checks on the SSE stream
+STREAM_HEARTBEAT = 15        # seconds of silence before a keep-alive comment
+STREAM_LIFETIME = 60 * 5     # seconds — the browser reconnects with Last-Event-ID
+STREAM_RETRY_MS = 3000       # EventSource reconnect delay
+
+
+def _int_param(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@login_required
+@require_GET
+def session_live_progress(request, session_id):
+    """
+    GET /api/creator/sessions/<id>/live
+
+    Without ``since`` returns a full snapshot.  With ``since`` returns the
+    deltas recorded after that version, waiting up to ``wait`` seconds for
+    the first one.
+    """
+    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
+    sid = str(session.id)
+    since = _int_param(request.GET.get('since'))
+    wait = min(max(_int_param(request.GET.get('wait'), 0), 0), LONG_POLL_MAX_WAIT)
+
+    deadline = time.monotonic() + wait
+    while since is not None and current_version(sid) == since and time.monotonic() < deadline:
+        time.sleep(LONG_POLL_INTERVAL)
+
+    return JsonResponse(changes_since(sid, since))
+
+
+def _sse(payload):
+    return f"id: {payload['version']}\nevent: progress\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _progress_events(sid, since):
+    read_changes = sync_to_async(changes_since)
+    read_version = sync_to_async(current_version)
+
+    yield f'retry: {STREAM_RETRY_MS}\n\n'
+    payload = await read_changes(sid, since)
+    yield _sse(payload)
+    since = payload['version']
+
+    started = last_sent = time.monotonic()
+    while time.monotonic() - started < STREAM_LIFETIME:
+        await asyncio.sleep(STREAM_INTERVAL)
+        if await read_version(sid) != since:
+            payload = await read_changes(sid, since)
+            yield _sse(payload)
+            since = payload['version']
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= STREAM_HEARTBEAT:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+
+
+@login_required
+@require_GET
+async def session_live_stream(request, session_id):
+    """GET /api/creator/sessions/<id>/live/stream (text/event-stream)"""
+    user = await request.auser()
+    session = await sync_to_async(get_object_or_404)(_scoped_session(user), pk=session_id)
+    sid = str(session.id)
+
+    if not isinstance(request, ASGIRequest):
+        # WSGI worker — a held-open stream would block a thread; use long-poll
+        fallback_url = reverse('creator_api:session_live_progress', args=[session_id])
+        return JsonResponse({'fallback_url': fallback_url})
+
+    since = _int_param(
+        request.headers.get('Last-Event-ID', request.GET.get('since'))
+    )
+    response = StreamingHttpResponse(
+        _progress_events(sid, since), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # disable nginx proxy buffering
+    return response
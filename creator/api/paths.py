@@ -11,13 +11,14 @@ from django.views.decorators.http import require_GET, require_POST
 from core.models import ExamSession, Path, Station
 from core.models.mixins import TimestampMixin
 from core.utils.roles import scope_queryset
+from core.utils.station_catalog import invalidate_station_catalog
 
 
 def _scoped_session(user):
     return scope_queryset(
         user,
         ExamSession.objects.select_related('exam', 'exam__course', 'exam__course__department'),
-        dept_field='exam__course__department',
+        dept_field='department',
     )
 
 
@@ -25,7 +26,7 @@ def _scoped_path(user):
     return scope_queryset(
         user,
         Path.objects.select_related('session__exam__course__department'),
-        dept_field='session__exam__course__department',
+        dept_field='department',
     )
 
 
@@ -232,5 +233,7 @@ def reorder_path_stations(request, path_id):
 
     for seq, sid in enumerate(data['station_order'], start=1):
         Station.objects.filter(path_id=path_id, pk=sid).update(station_number=seq)
+    # .update() skips the Station post_save that retires the catalog
+    invalidate_station_catalog()
 
     return JsonResponse({'message': 'Stations reordered successfully'})
@@ -4,22 +4,26 @@ Creator API – Reports & export endpoints.
 import csv
 import re
 from datetime import datetime
-from io import BytesIO, StringIO
+from itertools import chain
 
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, JsonResponse
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
 
 from core.models import (
     ChecklistItem,
     ExamSession,
     Examiner,
     ItemScore,
-    Path,
     SessionStudent,
     Station,
-    StationScore,
 )
+from core.utils.exports import Echo, streaming_csv_response, xlsx_response
+from core.utils.ilo_attainment import build_ilo_attainment
+from core.utils.results import build_session_results, iter_session_results
 from core.utils.roles import scope_queryset
 
 
@@ -27,7 +31,7 @@ def _scoped_session(user):
     return scope_queryset(
         user,
         ExamSession.objects.select_related('exam', 'exam__course', 'exam__course__department'),
-        dept_field='exam__course__department',
+        dept_field='department',
     )
 
 
@@ -59,7 +63,6 @@ def get_session_summary(request, session_id):
             _scoped_session(request.user), pk=session_id
         )
         exam_weight = float(session.exam.exam_weight or 0)
-        pass_threshold = session.exam.course.pass_threshold
 
         # Get all students and apply search filter
         search_query = request.GET.get('search', '').strip()
@@ -81,94 +84,28 @@ def get_session_summary(request, session_id):
         except (PageNotAnInteger, EmptyPage):
             page_obj = paginator.page(1)
         
-        students = list(page_obj.object_list)
-
-        # Unique station numbers across all paths
-        paths = list(Path.objects.filter(session=session))
-        station_headers = []
-        seen_nums = set()
-        for p in paths:
-            for s in p.stations.filter(active=True, is_deleted=False):
-                if s.station_number not in seen_nums:
-                    station_headers.append({'number': s.station_number, 'name': s.name})
-                    seen_nums.add(s.station_number)
-        station_headers.sort(key=lambda x: x['number'])
-
-        # Pre-calculate station info
-        station_info_map = {}
-        for p in paths:
-            for s in p.stations.filter(active=True, is_deleted=False):
-                station_info_map[(p.id, s.station_number)] = {
-                    'id': s.id,
-                    'max_score': s.get_max_score(),
-                }
-
-        total_students = len(students)
-        completed_students = 0
-        total_percentage = 0
-        passed_count = 0
+        matrix = build_session_results(session, page_obj.object_list)
 
         student_data = []
-        # P3: Pre-fetch all paths to avoid N+1 per student
-        path_ids = set(s.path_id for s in students if s.path_id)
-        path_map = {p.id: p for p in Path.objects.filter(pk__in=path_ids)} if path_ids else {}
-
-        for student in students:
-            student_scores = {}
-            total_score = 0
-            max_score = 0
-
-            for header in station_headers:
-                s_info = station_info_map.get((student.path_id, header['number']))
-                if s_info:
-                    st_max = s_info['max_score']
-                    max_score += st_max
-                    final = StationScore.get_final_score(student.id, s_info['id'])
-                    if final:
-                        student_scores[header['number']] = final['final_score']
-                        total_score += final['final_score']
-                    else:
-                        student_scores[header['number']] = None
-                else:
-                    student_scores[header['number']] = None
-
-            percentage = (total_score / max_score * 100) if max_score > 0 else 0
-
-            # A student is "completed" only if ALL their stations have a submitted score
-            scored_stations = sum(1 for v in student_scores.values() if v is not None)
-            total_stations = len(student_scores)
-            is_completed = total_stations > 0 and scored_stations == total_stations
-
-            path = path_map.get(student.path_id) if student.path_id else None
-
-            weighted_score = round(total_score / max_score * exam_weight, 2) if exam_weight and max_score > 0 else None
-            threshold_ratio = pass_threshold / 100
-            if exam_weight and weighted_score is not None:
-                passed = weighted_score >= exam_weight * threshold_ratio
-            else:
-                passed = percentage >= pass_threshold
-
-            if is_completed:
-                completed_students += 1
-                total_percentage += percentage
-                if passed:
-                    passed_count += 1
-
+        for row in matrix.rows():
+            student = row['student']
             student_data.append({
                 'id': str(student.id),
                 'student_number': student.student_number,
                 'full_name': student.full_name,
-                'path_name': path.name if path else None,
-                'station_scores': student_scores,
-                'total_score': round(total_score, 2),
-                'max_score': round(max_score, 2),
-                'percentage': round(percentage, 2),
-                'weighted_score': weighted_score,
-                'passed': passed,
+                'path_name': row['path_name'],
+                'station_scores': {
+                    h['number']: score
+                    for h, score in zip(matrix.station_headers, row['station_scores'])
+                },
+                'total_score': round(row['total_score'], 2),
+                'max_score': round(row['max_score'], 2),
+                'percentage': round(row['percentage'], 2),
+                'weighted_score': row['weighted_score'],
+                'passed': row['passed'],
             })
 
-        avg_percentage = (total_percentage / completed_students) if completed_students > 0 else 0
-        pass_rate = (passed_count / completed_students * 100) if completed_students > 0 else 0
+        completed_students, avg_percentage, pass_rate = matrix.completed_summary()
 
         return JsonResponse({
             'success': True,
@@ -180,7 +117,7 @@ def get_session_summary(request, session_id):
                 'completed_students': completed_students,
                 'average_percentage': round(avg_percentage, 2),
                 'pass_rate': round(pass_rate, 2),
-                'station_headers': station_headers,
+                'station_headers': matrix.station_headers,
                 'students': sorted(student_data, key=lambda x: x['full_name']),
                 'pagination': {
                     'current_page': page_obj.number,
@@ -202,226 +139,141 @@ def get_session_summary(request, session_id):
         }, status=500)
 
 
-# ── helpers ─────────────────────────────────────────────────────────────────
-def _build_station_info(session_id):
-    """Return (paths, station_headers, station_info_map) for a session."""
-    paths = list(Path.objects.filter(session_id=session_id))
-    station_headers = []
-    seen = set()
-    station_info_map = {}
-
-    for p in paths:
-        for s in p.stations.filter(active=True, is_deleted=False):
-            station_info_map[(p.id, s.station_number)] = {
-                'id': s.id,
-                'max_score': s.get_max_score(),
-            }
-            if s.station_number not in seen:
-                station_headers.append({'number': s.station_number, 'name': s.name})
-                seen.add(s.station_number)
+@login_required
+@require_GET
+def get_ilo_attainment(request, session_id):
+    """
+    GET /api/creator/reports/session/<id>/ilo-attainment[?students=0]
 
-    station_headers.sort(key=lambda x: x['number'])
-    return paths, station_headers, station_info_map
+    Per-ILO cohort summary plus per-student ILO vectors (omitted with
+    ``students=0``), from the same matrix as the ILO XLSX export.
+    """
+    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
+    if not request.user.is_superuser and session.status != 'completed':
+        return JsonResponse(
+            {'error': 'Only superusers can view non-completed sessions.'}, status=403,
+        )
+
+    matrix = build_ilo_attainment(session)
+    data = {
+        'session_id': str(session.id),
+        'session_name': session.name,
+        'total_students': len(matrix),
+        'ilos': matrix.ilo_summary(),
+    }
+    if request.GET.get('students', '1') != '0':
+        data['students'] = [
+            {
+                'id': str(row['student'].id),
+                'student_number': row['student'].student_number,
+                'full_name': row['student'].full_name,
+                'earned': row['earned'],
+                'possible': row['possible'],
+                'total': row['total'],
+            }
+            for row in matrix.rows()
+        ]
+    return JsonResponse({'success': True, 'data': data})
 
 
-def _student_rows(students, station_headers, station_info_map, pass_threshold=70):
+# ── helpers ─────────────────────────────────────────────────────────────────
+def _student_rows(matrix):
     """Yield (row_list, total_score, max_score, percentage, pass_fail) for each student."""
-    # P3: Pre-fetch paths
-    path_ids = set(s.path_id for s in students if s.path_id)
-    path_map = {p.id: p for p in Path.objects.filter(pk__in=path_ids)} if path_ids else {}
-
-    for student in students:
-        row = [_csv_safe(student.student_number), _csv_safe(student.full_name)]
-        path = path_map.get(student.path_id) if student.path_id else None
-        row.append(_csv_safe(path.name) if path else '')
-
-        total_score = 0
-        max_score = 0
-
-        for header in station_headers:
-            s_info = station_info_map.get((student.path_id, header['number']))
-            score_val = ''
-            if s_info:
-                st_max = s_info['max_score']
-                max_score += st_max
-                final = StationScore.get_final_score(student.id, s_info['id'])
-                if final:
-                    score_val = round(final['final_score'], 2)
-                    total_score += final['final_score']
-                else:
-                    score_val = ''
-            row.append(score_val)
-
-        percentage = (total_score / max_score * 100) if max_score > 0 else 0
-        pass_fail = 'PASS' if percentage >= pass_threshold else 'FAIL'
-        row.extend([round(total_score, 2), round(max_score, 2), pass_fail])
-        yield row, total_score, max_score, percentage, pass_fail
+    for row in matrix.rows():
+        student = row['student']
+        out = [
+            _csv_safe(student.student_number),
+            _csv_safe(student.full_name),
+            _csv_safe(row['path_name']) if row['path_name'] else '',
+        ]
+        out.extend('' if v is None else round(v, 2) for v in row['station_scores'])
+        pass_fail = 'PASS' if row['passed'] else 'FAIL'
+        out.extend([round(row['total_score'], 2), round(row['max_score'], 2), pass_fail])
+        yield out, row['total_score'], row['max_score'], row['percentage'], pass_fail
 
 
 # ── CSV exports ─────────────────────────────────────────────────────────────
+# Exports stream: CSV rows are generated from chunked querysets and
+# written straight to the response; XLSX uses openpyxl write-only mode.
+EXPORT_CHUNK_SIZE = 500
 
-@login_required
-def export_students_csv(request, session_id):
-    """GET /api/creator/reports/session/<id>/students/csv"""
-    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
-    course_threshold = session.exam.course.pass_threshold
-    students = SessionStudent.objects.filter(session=session).order_by('full_name')
-    _, station_headers, station_info_map = _build_station_info(session_id)
 
-    output = StringIO()
-    writer = csv.writer(output)
+def _report_progress(progress, done, total):
+    if progress is not None:
+        progress(done, total)
 
-    headers = ['Student Number', 'Full Name', 'Path']
-    headers.extend([f"St.{h['number']}: {h['name']}" for h in station_headers])
-    headers.extend(['Total Score', 'Max Score', 'Pass/Fail'])
-    writer.writerow(headers)
 
-    for row, *_ in _student_rows(students, station_headers, station_info_map, pass_threshold=course_threshold):
-        writer.writerow(row)
+def students_csv_lines(session, progress=None):
+    """
+    Yield the students CSV for ``session`` line by line.
 
-    filename = _safe_filename(f"{session.name}_students_{session_id}.csv")
-    response = HttpResponse(output.getvalue(), content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    ``progress(done, total)`` is called after each chunk of students
+    (used by background export jobs).
+    """
+    writer = csv.writer(Echo())
+    total = SessionStudent.objects.filter(session=session).count() if progress else 0
+    done = 0
+    for i, matrix in enumerate(iter_session_results(session, EXPORT_CHUNK_SIZE)):
+        if i == 0:
+            headers = ['Student Number', 'Full Name', 'Path']
+            headers.extend([f"St.{h['number']}: {h['name']}" for h in matrix.station_headers])
+            headers.extend(['Total Score', 'Max Score', 'Pass/Fail'])
+            yield writer.writerow(headers)
+        for row, *_ in _student_rows(matrix):
+            yield writer.writerow(row)
+        done += len(matrix)
+        _report_progress(progress, done, total)
 
 
 @login_required
-def export_students_xlsx(request, session_id):
-    """GET /api/creator/reports/session/<id>/students/xlsx"""
+def export_students_csv(request, session_id):
+    """GET /api/creator/reports/session/<id>/students/csv"""
+    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
+    filename = _safe_filename(f"{session.name}_students_{session_id}.csv")
+    return streaming_csv_response(students_csv_lines(session), filename)
+
+
+def build_students_workbook(session, progress=None):
+    """Build the write-only student results workbook for ``session``."""
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Alignment, Font, PatternFill
     from openpyxl.utils import get_column_letter
 
-    session = get_object_or_404(
-        _scoped_session(request.user), pk=session_id
-    )
-    exam_weight = float(session.exam.exam_weight or 0)
-    course_threshold = session.exam.course.pass_threshold
-    students = list(SessionStudent.objects.filter(session=session).order_by('full_name'))
-    _, station_headers, station_info_map = _build_station_info(session_id)
+    total = SessionStudent.objects.filter(session=session).count() if progress else 0
+    done = 0
+    chunks = iter_session_results(session, EXPORT_CHUNK_SIZE)
+    first = next(chunks)
+    exam_weight = first.exam_weight
+    station_headers = first.station_headers
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Student Results'
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Student Results')
 
     header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+    weighted_fill = PatternFill(start_color='1A3A5C', end_color='1A3A5C', fill_type='solid')
     header_font = Font(bold=True, color='FFFFFF', size=11)
     header_alignment = Alignment(horizontal='center', vertical='center')
+    cell_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+    pass_font = Font(color='006100', bold=True)
+    pass_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
+    fail_font = Font(color='9C0006', bold=True)
+    fail_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
+    weighted_font = Font(bold=True, color='1A1A2E')
+    weighted_cell_fill = PatternFill(start_color='E8F4FD', end_color='E8F4FD', fill_type='solid')
 
     base_headers = ['Student Number', 'Full Name', 'Path']
     station_cols = [f"St.{h['number']}: {h['name']}" for h in station_headers]
     weighted_header = [f'Weighted Score (/{exam_weight})'] if exam_weight else []
     end_headers = ['Total Score', 'Max Score'] + weighted_header + ['Pass/Fail', 'Comments']
     all_headers = base_headers + station_cols + end_headers
+    pf_col_idx = len(all_headers) - 2        # 0-based: Pass/Fail is before Comments
+    ws_col_idx = pf_col_idx - 1              # Weighted Score is just before Pass/Fail
 
-    # Title rows
-    last_col_letter = chr(64 + min(len(all_headers), 26))
-    ws.merge_cells(f'A1:{last_col_letter}1')
-    ws['A1'] = f"{session.name} - Student Results"
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal='center')
-
-    ws.merge_cells(f'A2:{last_col_letter}2')
-    ws['A2'] = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    ws['A2'].alignment = Alignment(horizontal='center')
-
-    weighted_fill = PatternFill(start_color='1A3A5C', end_color='1A3A5C', fill_type='solid')
-    for col_num, header in enumerate(all_headers, 1):
-        cell = ws.cell(row=4, column=col_num)
-        cell.value = header
-        cell.fill = weighted_fill if exam_weight and header.startswith('Weighted') else header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-
-    row_num = 5
-    # P3: Pre-fetch paths and stations to avoid N+1
-    path_ids = set(s.path_id for s in students if s.path_id)
-    path_map = {p.id: p for p in Path.objects.filter(pk__in=path_ids)} if path_ids else {}
-    station_id_set = set()
-    for info in station_info_map.values():
-        station_id_set.add(info['id'])
-    station_obj_map = {s.id: s for s in Station.objects.filter(pk__in=station_id_set)} if station_id_set else {}
-
-    for student in students:
-        # Get all scores for this student
-        # Only count submitted scores, ignore abandoned/in-progress evaluations
-        scores_qs = StationScore.objects.filter(
-            session_student=student,
-            status='submitted'
-        ).exclude(
-            total_score__isnull=True
-        ).select_related('examiner')
-        
-        # Build row with station scores
-        row = [student.student_number, student.full_name]
-        path = path_map.get(student.path_id) if student.path_id else None
-        row.append(path.name if path else '')
-
-        total_score = 0
-        max_score = 0
-
-        for header in station_headers:
-            s_info = station_info_map.get((student.path_id, header['number']))
-            score_val = ''
-            if s_info:
-                st_max = s_info['max_score']
-                max_score += st_max
-                final = StationScore.get_final_score(student.id, s_info['id'])
-                if final:
-                    score_val = round(final['final_score'], 2)
-                    total_score += final['final_score']
-                else:
-                    score_val = ''
-            row.append(score_val)
-
-        percentage = (total_score / max_score * 100) if max_score > 0 else 0
-        weighted_score = round(total_score / max_score * exam_weight, 2) if exam_weight and max_score > 0 else None
-        # Pass if weighted score >= threshold% of exam_weight, or raw percentage >= threshold%
-        threshold_ratio = course_threshold / 100
-        if exam_weight and weighted_score is not None:
-            passed = weighted_score >= exam_weight * threshold_ratio
-        else:
-            passed = percentage >= course_threshold
-        pass_fail = 'PASS' if passed else 'FAIL'
-        
-        # Build comments with examiner names
-        comments_list = []
-        for score in scores_qs:
-            if score.comments and score.comments.strip():
-                examiner_name = score.examiner.full_name if score.examiner else "Unknown Examiner"
-                station_obj = station_obj_map.get(score.station_id)
-                station_name = station_obj.name if station_obj else "Unknown Station"
-                comments_list.append(f"{examiner_name} ({station_name}):\n{score.comments}")
-        
-        comments_text = "\n---\n".join(comments_list) if comments_list else ""
-        
-        weighted_cols = [weighted_score] if exam_weight else []
-        row.extend([round(total_score, 2), round(max_score, 2)] + weighted_cols + [pass_fail, comments_text])
-        
-        # Write row to worksheet
-        for col_idx, value in enumerate(row, 1):
-            cell = ws.cell(row=row_num, column=col_idx)
-            cell.value = value
-            cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-        
-        # Color-code pass/fail
-        pf_col_idx = len(all_headers) - 1  # Pass/Fail is second-to-last (before Comments)
-        pf_cell = ws.cell(row=row_num, column=pf_col_idx)
-        if pass_fail == 'PASS':
-            pf_cell.font = Font(color='006100', bold=True)
-            pf_cell.fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
-        else:
-            pf_cell.font = Font(color='9C0006', bold=True)
-            pf_cell.fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
-
-        # Highlight weighted score column
-        if exam_weight:
-            ws_col_idx = pf_col_idx - 1  # Weighted Score is just before Pass/Fail
-            ws_cell = ws.cell(row=row_num, column=ws_col_idx)
-            ws_cell.font = Font(bold=True, color='1A1A2E')
-            ws_cell.fill = PatternFill(start_color='E8F4FD', end_color='E8F4FD', fill_type='solid')
-        
-        row_num += 1
+    # Write-only sheets need layout set before the first row is appended
+    last_col_letter = get_column_letter(len(all_headers))
+    ws.merged_cells.add(f'A1:{last_col_letter}1')
+    ws.merged_cells.add(f'A2:{last_col_letter}2')
 
     # Column widths: fixed per column type
     num_base = len(base_headers)          # Student #, Full Name, Path
@@ -445,113 +297,180 @@ def export_students_xlsx(request, session_id):
         ws.column_dimensions[get_column_letter(end_start + 2)].width = 10  # Pass/Fail
         ws.column_dimensions[get_column_letter(end_start + 3)].width = 50  # Comments
 
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
+    def styled(value, font=None, fill=None, alignment=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if alignment:
+            cell.alignment = alignment
+        return cell
 
-    filename = _safe_filename(f"{session.name}_students_{session_id}.xlsx")
-    response = HttpResponse(
-        buf.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    # Title rows
+    ws.append([styled(
+        f"{session.name} - Student Results",
+        font=Font(bold=True, size=14), alignment=Alignment(horizontal='center'),
+    )])
+    ws.append([styled(
+        f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        alignment=Alignment(horizontal='center'),
+    )])
+    ws.append([])
+    ws.append([
+        styled(
+            header,
+            font=header_font,
+            fill=weighted_fill if exam_weight and header.startswith('Weighted') else header_fill,
+            alignment=header_alignment,
+        )
+        for header in all_headers
+    ])
+
+    for matrix in chain([first], chunks):
+        comments_map = matrix.comments_by_student()
+        for result in matrix.rows():
+            student = result['student']
+            row = [student.student_number, student.full_name, result['path_name'] or '']
+            row.extend('' if v is None else round(v, 2) for v in result['station_scores'])
+            pass_fail = 'PASS' if result['passed'] else 'FAIL'
+
+            # Build comments with examiner names
+            comments_text = "\n---\n".join(
+                f"{examiner_name} ({station_name}):\n{comments}"
+                for examiner_name, station_name, comments in comments_map.get(student.id, [])
+            )
+
+            weighted_cols = [result['weighted_score']] if exam_weight else []
+            row.extend(
+                [round(result['total_score'], 2), round(result['max_score'], 2)]
+                + weighted_cols + [pass_fail, comments_text]
+            )
+
+            cells = [styled(value, alignment=cell_alignment) for value in row]
+            # Color-code pass/fail
+            if pass_fail == 'PASS':
+                cells[pf_col_idx].font, cells[pf_col_idx].fill = pass_font, pass_fill
+            else:
+                cells[pf_col_idx].font, cells[pf_col_idx].fill = fail_font, fail_fill
+            # Highlight weighted score column
+            if exam_weight:
+                cells[ws_col_idx].font, cells[ws_col_idx].fill = weighted_font, weighted_cell_fill
+            ws.append(cells)
+        done += len(matrix)
+        _report_progress(progress, done, total)
+
+    return wb
+
+
+@login_required
+def export_students_xlsx(request, session_id):
+    """GET /api/creator/reports/session/<id>/students/xlsx"""
+    session = get_object_or_404(
+        _scoped_session(request.user), pk=session_id
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    filename = _safe_filename(f"{session.name}_students_{session_id}.xlsx")
+    return xlsx_response(build_students_workbook(session), filename)
 
 
 @login_required
 def export_stations_csv(request, session_id):
     """GET /api/creator/reports/session/<id>/stations/csv"""
     session = get_object_or_404(_scoped_session(request.user), pk=session_id)
-    # P5: Prefetch paths and stations in one query
-    stations = Station.objects.filter(
-        path__session_id=session_id, active=True
-    ).select_related('path')
-
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        'Station Name', 'Path', 'Max Score', 'Avg Score', 'Avg %',
-        'Min Score', 'Max Achieved', 'Students Marked',
-    ])
+    # One grouped query for every station's score statistics
+    stats = (
+        Station.objects
+        .filter(path__session_id=session_id, active=True)
+        .annotate(
+            marked=Count('scores'),
+            avg_max=Avg(Coalesce('scores__max_score', 0.0)),
+            avg_score=Avg(Coalesce('scores__total_score', 0.0)),
+            min_score=Min(Coalesce('scores__total_score', 0.0)),
+            max_achieved=Max(Coalesce('scores__total_score', 0.0)),
+        )
+        .filter(marked__gt=0)
+        .order_by('path__name', 'station_number')
+        .values_list(
+            'name', 'path__name', 'marked', 'avg_max', 'avg_score', 'min_score', 'max_achieved',
+        )
+    )
+    writer = csv.writer(Echo())
 
-    for station in stations:
-        scores = StationScore.objects.filter(station=station)
-        if scores.exists():
-            total_scores = [s.total_score or 0 for s in scores]
-            max_scores = [s.max_score or 0 for s in scores]
-            avg_score = sum(total_scores) / len(total_scores)
-            avg_max = sum(max_scores) / len(max_scores) if max_scores else 0
+    def rows():
+        yield writer.writerow([
+            'Station Name', 'Path', 'Max Score', 'Avg Score', 'Avg %',
+            'Min Score', 'Max Achieved', 'Students Marked',
+        ])
+        for name, path_name, marked, avg_max, avg_score, min_score, max_achieved in (
+            stats.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        ):
             avg_pct = (avg_score / avg_max * 100) if avg_max > 0 else 0
-            writer.writerow([
-                _csv_safe(station.name),
-                _csv_safe(station.path.name) if station.path else '',
+            yield writer.writerow([
+                _csv_safe(name),
+                _csv_safe(path_name) if path_name else '',
                 round(avg_max, 2),
                 round(avg_score, 2),
                 round(avg_pct, 2),
-                round(min(total_scores), 2),
-                round(max(total_scores), 2),
-                len(total_scores),
+                round(min_score, 2),
+                round(max_achieved, 2),
+                marked,
             ])
 
     filename = _safe_filename(f"{session.name}_stations_{session_id}.csv")
-    response = HttpResponse(output.getvalue(), content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    return streaming_csv_response(rows(), filename)
 
 
-@login_required
-def export_raw_csv(request, session_id):
-    """GET /api/creator/reports/session/<id>/raw/csv"""
-    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
+RAW_CHUNK_SIZE = 2000
 
-    # P1: Eliminate N+1 queries — prefetch everything in a single query chain
+
+def raw_csv_lines(session, progress=None):
+    """Yield the item-level raw CSV for ``session`` line by line."""
+    # Flat value rows over a server-side cursor — no model instances held
     item_scores = ItemScore.objects.filter(
         station_score__session_student__session=session
-    ).select_related(
-        'station_score__session_student',
-        'station_score__examiner',
-        'station_score__station',
-        'checklist_item',
     ).order_by(
         'station_score__session_student__student_number',
         'station_score__station__station_number',
         'checklist_item__item_number',
+    ).values_list(
+        'station_score__session_student__student_number',
+        'station_score__session_student__full_name',
+        'station_score__session_student__path__name',
+        'station_score__station__name',
+        'checklist_item__description',
+        'score',
+        'max_points',
+        'station_score__examiner__full_name',
+        'marked_at',
     )
+    writer = csv.writer(Echo())
+    total = item_scores.count() if progress else 0
 
-    # Pre-fetch path names for all students in one query
-    path_map = {}
-    student_path_ids = set(
-        SessionStudent.objects.filter(session=session)
-        .exclude(path_id__isnull=True)
-        .values_list('path_id', flat=True)
-    )
-    if student_path_ids:
-        for p in Path.objects.filter(pk__in=student_path_ids):
-            path_map[p.id] = p.name
-
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
+    yield writer.writerow([
         'Student Number', 'Student Name', 'Path', 'Station',
         'Item', 'Score', 'Max Score', 'Examiner', 'Timestamp',
     ])
-
-    for iscore in item_scores:
-        ss = iscore.station_score
-        student = ss.session_student
-        writer.writerow([
-            _csv_safe(student.student_number),
-            _csv_safe(student.full_name),
-            _csv_safe(path_map.get(student.path_id, '')),
-            _csv_safe(ss.station.name) if ss.station else '',
-            _csv_safe(iscore.checklist_item.description) if iscore.checklist_item else '',
-            iscore.score or 0,
-            iscore.max_points or 0,       # S8: was iscore.max_score (wrong field)
-            _csv_safe(ss.examiner.full_name) if ss.examiner else '',
-            iscore.marked_at or '',        # S8: was iscore.scored_at (wrong field)
+    for done, (student_number, full_name, path_name, station_name, item_description,
+               score, max_points, examiner_name, marked_at) in enumerate(
+            item_scores.iterator(chunk_size=RAW_CHUNK_SIZE), 1):
+        yield writer.writerow([
+            _csv_safe(student_number),
+            _csv_safe(full_name),
+            _csv_safe(path_name or ''),
+            _csv_safe(station_name) if station_name else '',
+            _csv_safe(item_description) if item_description else '',
+            score or 0,
+            max_points or 0,
+            _csv_safe(examiner_name) if examiner_name else '',
+            marked_at or '',
         ])
+        if done % RAW_CHUNK_SIZE == 0:
+            _report_progress(progress, done, total)
 
+
+@login_required
+def export_raw_csv(request, session_id):
+    """GET /api/creator/reports/session/<id>/raw/csv"""
+    session = get_object_or_404(_scoped_session(request.user), pk=session_id)
     filename = _safe_filename(f"{session.name}_raw_{session_id}.csv")
-    response = HttpResponse(output.getvalue(), content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    return streaming_csv_response(raw_csv_lines(session), filename)
@@ -2,9 +2,11 @@
 Creator API – Session endpoints (status, activate, deactivate, complete, delete, restore, revert).
 """
 import logging
+from datetime import date
 
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
+from django.db.models import Count
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_GET, require_POST
@@ -16,6 +18,7 @@ from core.models.mixins import TimestampMixin
 from core.utils.audit import AuditLogService
 from core.utils.roles import scope_queryset
 from core.utils.cache_utils import invalidate_session_detail, invalidate_exam_detail
+from core.utils.examiner_home import rebuild_session_examiner_homes
 
 audit_logger = logging.getLogger('osce.audit')
 
@@ -25,7 +28,7 @@ def _scoped_session(user):
     return scope_queryset(
         user,
         ExamSession.objects.select_related('exam', 'exam__course', 'exam__course__department'),
-        dept_field='exam__course__department',
+        dept_field='department',
     )
 
 
@@ -75,17 +78,20 @@ def _sync_exam_status(exam, session_id):
 def get_session_status(request, session_id):
     """GET /api/creator/sessions/<id>/status"""
     session = get_object_or_404(_scoped_session(request.user), pk=session_id)
-    students = SessionStudent.objects.filter(session=session)
-
     status_counts = {}
-    for s in students:
-        st = s.status or 'registered'
-        status_counts[st] = status_counts.get(st, 0) + 1
+    for st, n in (
+        SessionStudent.objects.filter(session=session)
+        .values('status')
+        .annotate(n=Count('id'))
+        .values_list('status', 'n')
+    ):
+        st = st or 'registered'
+        status_counts[st] = status_counts.get(st, 0) + n
 
     return JsonResponse({
         'id': str(session.id),
         'status': session.status,
-        'total_students': students.count(),
+        'total_students': sum(status_counts.values()),
         'student_status': status_counts,
         'exam_name': session.exam.name if session.exam else None,
     })
@@ -128,6 +134,8 @@ def activate_session(request, session_id):
         session.actual_start = TimestampMixin.utc_timestamp()
         session.save()
         _sync_exam_status(session.exam, session_id)
+        # Examiners land on their home page right after activation
+        rebuild_session_examiner_homes(session.pk, date.today())
 
         AuditLogService.log(
             action='SESSION_ACTIVATED',
@@ -17,7 +17,7 @@ def delete_station_api(request, station_id):
         return JsonResponse({'error': 'DELETE required'}, status=405)
 
     station = get_object_or_404(
-        scope_queryset(request.user, Station.objects.select_related('path__session__exam__course__department'), dept_field='path__session__exam__course__department'),
+        scope_queryset(request.user, Station.objects.select_related('path__session__exam__course__department'), dept_field='department'),
         pk=station_id,
     )
 
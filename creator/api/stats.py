@@ -31,14 +31,14 @@ def get_stats_overview(request):
             active=True,
             is_deleted=False,
             path__session__exam__is_deleted=False,
-        ), dept_field='path__session__exam__course__department').count(),
+        ), dept_field='department').count(),
         'library_items': scope_queryset(user, ChecklistLibrary.objects.all(), dept_field='ilo__course__department').count(),
         'examiners': scope_queryset(user, Examiner.objects.filter(role='examiner', is_deleted=False), dept_field='department').count(),
         'sessions': scope_queryset(user, ExamSession.objects.filter(
             exam__is_deleted=False,
-        ), dept_field='exam__course__department').count(),
+        ), dept_field='department').count(),
         'students_registered': scope_queryset(user, SessionStudent.objects.filter(
             session__exam__is_deleted=False,
-        ), dept_field='session__exam__course__department').count(),
-        'scores_recorded': scope_queryset(user, StationScore.objects.all(), dept_field='station__path__session__exam__course__department').count(),
+        ), dept_field='department').count(),
+        'scores_recorded': scope_queryset(user, StationScore.objects.all(), dept_field='department').count(),
     })
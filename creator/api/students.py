@@ -10,6 +10,7 @@ from django.views.decorators.http import require_POST
 
 from core.models import ExamSession, SessionStudent, Path, StationScore
 from core.utils.audit import AuditLogService
+from core.utils.cache_utils import invalidate_session_students
 from core.utils.roles import scope_queryset
 
 
@@ -18,7 +19,7 @@ def _scoped_session(user):
     return scope_queryset(
         user,
         ExamSession.objects.select_related('exam', 'exam__course', 'exam__course__department'),
-        dept_field='exam__course__department',
+        dept_field='department',
     )
 
 
@@ -27,7 +28,7 @@ def _scoped_student(user):
     return scope_queryset(
         user,
         SessionStudent.objects.select_related('session__exam__course__department'),
-        dept_field='session__exam__course__department',
+        dept_field='department',
     )
 
 
@@ -135,6 +136,7 @@ def redistribute_students(request, session_id):
 
     # P7: Bulk update instead of save() per student
     SessionStudent.objects.bulk_update(students, ['path_id'])
+    invalidate_session_students(session.pk)
 
     AuditLogService.log(
         action='BULK_OPERATION',
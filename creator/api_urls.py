@@ -1,7 +1,9 @@
 """Creator API URLs – all JSON endpoints under /api/creator/."""
 from django.urls import path
 
-from .api import courses, examiners, exams, library, paths, reports, sessions, stations, stats, students
+from .api import (
+    courses, examiners, exams, exports, library, live, paths, reports, sessions, stations, stats, students,
+)
 
 app_name = 'creator_api'
 
@@ -34,6 +36,8 @@ urlpatterns = [
     path('sessions/<uuid:session_id>/restore', sessions.restore_session_api, name='restore_session'),
     path('sessions/<uuid:session_id>/hard-delete', sessions.hard_delete_session_api, name='hard_delete_session'),
     path('sessions/<uuid:session_id>/revert-to-scheduled', sessions.revert_session_to_scheduled, name='revert_session'),
+    path('sessions/<uuid:session_id>/live', live.session_live_progress, name='session_live_progress'),
+    path('sessions/<uuid:session_id>/live/stream', live.session_live_stream, name='session_live_stream'),
 
     # ── Paths ────────────────────────────────────────────────────────────────
     path('sessions/<uuid:session_id>/paths', paths.get_session_paths, name='get_session_paths'),
@@ -74,4 +78,11 @@ urlpatterns = [
     path('reports/session/<uuid:session_id>/students/xlsx', reports.export_students_xlsx, name='export_students_xlsx'),
     path('reports/session/<uuid:session_id>/stations/csv', reports.export_stations_csv, name='export_stations_csv'),
     path('reports/session/<uuid:session_id>/raw/csv', reports.export_raw_csv, name='export_raw_csv'),
+    path('reports/session/<uuid:session_id>/ilo-attainment', reports.get_ilo_attainment, name='ilo_attainment'),
+
+    # ── Background exports ───────────────────────────────────────────────────
+    path('exports', exports.create_export, name='create_export'),
+    path('exports/<uuid:job_id>', exports.get_export, name='get_export'),
+    path('exports/<uuid:job_id>/download', exports.download_export, name='download_export'),
+    path('sessions/<uuid:session_id>/exports', exports.session_exports, name='session_exports'),
 ]
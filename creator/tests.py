@@ -2,14 +2,21 @@
 Creator app tests – route smoke tests, API endpoint tests, and security tests.
 """
 import json
+import os
+import tempfile
 from datetime import date, time
+from unittest import mock
 
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from core.models import (
     Course, ILO, Exam, ExamSession, Path, Station, ChecklistItem,
-    ChecklistLibrary, Examiner, ExaminerAssignment, SessionStudent,
+    ChecklistLibrary, Examiner, ExaminerAssignment, SessionStudent, StationScore,
+    FinalStationResult, ItemScore, AuditLog, Department,
 )
 from core.models.user_profile import UserProfile
 
@@ -321,6 +328,26 @@ class CreatorAPIMutationTests(CreatorTestBase):
         )
         self.assertEqual(r.status_code, 200)
 
+    def test_reorder_stations_refreshes_catalog(self):
+        from core.utils.station_catalog import StationCatalog
+        Station.objects.filter(pk=self.station.pk).update(station_number=3)
+        second = Station.objects.create(
+            exam=self.exam, path=self.path, station_number=2, name='Station 2',
+        )
+        self.assertEqual(
+            [(st['station_number'], st['name']) for st in StationCatalog.path_stations(self.path.id)],
+            [(2, 'Station 2'), (3, 'Station 1')],
+        )
+        self.client.post(
+            reverse('creator_api:reorder_stations', args=[self.path.id]),
+            data=json.dumps({'station_order': [str(self.station.id), str(second.id)]}),
+            content_type='application/json',
+        )
+        self.assertEqual(
+            [(st['station_number'], st['name']) for st in StationCatalog.path_stations(self.path.id)],
+            [(1, 'Station 1'), (2, 'Station 2')],
+        )
+
 
 # ── Export tests ──────────────────────────────────────────────────────────
 
@@ -347,6 +374,680 @@ class CreatorExportTests(CreatorTestBase):
         self.assertEqual(r.status_code, 200)
         self.assertIn('spreadsheetml', r['Content-Type'])
 
+    def test_students_csv_streams_across_chunks(self):
+        from unittest import mock
+        SessionStudent.objects.bulk_create([
+            SessionStudent(session=self.session, student_number=f'8{i:04d}',
+                           full_name=f'Chunked {i}', path=self.path)
+            for i in range(5)
+        ])
+        with mock.patch('creator.api.reports.EXPORT_CHUNK_SIZE', 2):
+            r = self.client.get(reverse('creator_api:export_students_csv', args=[self.session.id]))
+        self.assertTrue(r.streaming)
+        lines = b''.join(r.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('Student Number,Full Name,Path,St.1: Station 1'))
+        self.assertEqual(len(lines), 1 + 6)
+
+    def test_raw_csv_streams_item_rows(self):
+        score = StationScore.objects.create(
+            session_student=self.student, station=self.station,
+            examiner=self.examiner, total_score=3, status='submitted',
+        )
+        ItemScore.objects.create(
+            station_score=score, checklist_item=self.checklist_item, score=3, max_points=5,
+        )
+        r = self.client.get(reverse('creator_api:export_raw_csv', args=[self.session.id]))
+        self.assertTrue(r.streaming)
+        lines = b''.join(r.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Path 1', lines[1])
+
+    def test_students_xlsx_write_only_layout(self):
+        from io import BytesIO
+        from openpyxl import load_workbook
+        r = self.client.get(reverse('creator_api:export_students_xlsx', args=[self.session.id]))
+        ws = load_workbook(BytesIO(b''.join(r.streaming_content))).active
+        self.assertEqual(ws.title, 'Student Results')
+        self.assertEqual(ws.cell(row=4, column=1).value, 'Student Number')
+        self.assertEqual(ws.cell(row=5, column=1).value, self.student.student_number)
+        self.assertIn('A1', ws.merged_cells)
+
+    def test_ilo_scores_xlsx_write_only_layout(self):
+        from io import BytesIO
+        from openpyxl import load_workbook
+        ExamSession.objects.filter(pk=self.session.pk).update(status='completed')
+        r = self.client.get(reverse('creator:export_ilo_scores_xlsx', args=[self.session.id]))
+        self.assertEqual(r.status_code, 200)
+        ws = load_workbook(BytesIO(b''.join(r.streaming_content))).active
+        self.assertEqual(ws.cell(row=4, column=4).value, f'ILO #{self.ilo.number}')
+        self.assertEqual(ws.cell(row=5, column=2).value, self.student.student_number)
+        self.assertEqual(ws.freeze_panes, 'D5')
+
+
+class SessionResultsEngineTests(CreatorTestBase):
+    """Test the set-based session results matrix used by reports/exports."""
+
+    def _submit(self, student, examiner, total):
+        # bulk_create skips the audit signals — only the scores matter here
+        StationScore.objects.bulk_create([StationScore(
+            session_student=student, station=self.station, examiner=examiner,
+            total_score=total, max_score=5, status='submitted',
+        )])
+        FinalStationResult.refresh(student.id, self.station.id)
+
+    def test_examiner_average_and_pass(self):
+        from core.utils.results import build_session_results
+        self._submit(self.student, self.examiner, 4)
+        self._submit(self.student, self.user, 3)
+
+        matrix = build_session_results(self.session)
+        self.assertEqual(matrix.station_headers, [{'number': 1, 'name': 'Station 1'}])
+        self.assertEqual(matrix.scores, [[3.5]])
+        self.assertEqual(matrix.max_scores, [5])
+        self.assertEqual(matrix.percentages, [70.0])
+        self.assertEqual(matrix.completed, [True])
+
+    def test_query_count_independent_of_students(self):
+        from core.utils.results import build_session_results
+        students = [
+            SessionStudent(session=self.session, student_number=f'9{i:04d}',
+                           full_name=f'Student {i}', path=self.path)
+            for i in range(30)
+        ]
+        SessionStudent.objects.bulk_create(students)
+        for student in students:
+            self._submit(student, self.examiner, 5)
+
+        # students, paths, stations, max scores, aggregated finals
+        with self.assertNumQueries(5):
+            matrix = build_session_results(self.session)
+        self.assertEqual(len(matrix), 31)
+        self.assertEqual(sum(matrix.completed), 30)
+
+    def test_summary_renders_from_matrix(self):
+        self._submit(self.student, self.examiner, 5)
+        r = self.client.get(reverse('creator_api:session_summary', args=[self.session.id]))
+        data = json.loads(r.content)['data']
+        self.assertEqual(data['students'][0]['station_scores'], {'1': 5.0})
+        self.assertEqual(data['completed_students'], 1)
+
+
+class ILOAttainmentTests(CreatorTestBase):
+    """Test the dense ILO attainment matrix and its JSON endpoint."""
+
+    def _score(self, examiner, points, station=None, item=None):
+        station = station or self.station
+        score = StationScore.objects.create(
+            session_student=self.student, station=station, examiner=examiner,
+            total_score=points, status='submitted',
+        )
+        ItemScore.objects.create(
+            station_score=score, checklist_item=item or self.checklist_item,
+            score=points, max_points=5,
+        )
+
+    def test_examiners_averaged_and_stations_summed(self):
+        from core.utils.ilo_attainment import build_ilo_attainment
+        self._score(self.examiner, 4)
+        self._score(self.user, 3)
+        station2 = Station.objects.create(
+            exam=self.exam, path=self.path, station_number=2, name='Station 2',
+        )
+        item2 = ChecklistItem.objects.create(
+            station=station2, ilo=self.ilo, item_number=1, description='Palpate', points=5,
+        )
+        self._score(self.examiner, 2, station=station2, item=item2)
+
+        with self.assertNumQueries(3):
+            matrix = build_ilo_attainment(self.session)
+        self.assertEqual(matrix.earned, [[5.5]])
+        self.assertEqual(matrix.possible, [[10.0]])
+        self.assertEqual(matrix.totals, [5.5])
+        self.assertEqual(matrix.ilo_summary()[0]['mean_percentage'], 55.0)
+
+    def test_json_endpoint(self):
+        self._score(self.examiner, 4)
+        ExamSession.objects.filter(pk=self.session.pk).update(status='completed')
+        r = self.client.get(reverse('creator_api:ilo_attainment', args=[self.session.id]))
+        self.assertEqual(r.status_code, 200)
+        data = json.loads(r.content)['data']
+        self.assertEqual(data['ilos'][0]['students_marked'], 1)
+        self.assertEqual(data['students'][0]['earned'], [4.0])
+
+        r = self.client.get(
+            reverse('creator_api:ilo_attainment', args=[self.session.id]), {'students': '0'},
+        )
+        self.assertNotIn('students', json.loads(r.content)['data'])
+
+
+@override_settings(CELERY_BROKER_URL='')
+class ChecklistRescoringTests(CreatorTestBase):
+    """Test deferred, per-station checklist rescoring at commit."""
+
+    def setUp(self):
+        super().setUp()
+        self.item2 = ChecklistItem.objects.create(
+            station=self.station, ilo=self.ilo, item_number=2, description='Check HR', points=2,
+        )
+        self.score = StationScore.objects.create(
+            session_student=self.student, station=self.station, examiner=self.examiner,
+            total_score=6, max_score=7, status='submitted',
+        )
+        self.full = ItemScore.objects.create(
+            station_score=self.score, checklist_item=self.checklist_item, score=5, max_points=5,
+        )
+        self.partial = ItemScore.objects.create(
+            station_score=self.score, checklist_item=self.item2, score=1, max_points=2,
+        )
+
+    def _rescore_calls(self, mocked):
+        return [c for c in mocked.call_args_list if c.args[0] == self.station.id]
+
+    def test_multi_item_edit_rescores_station_once_at_commit(self):
+        from core.utils import rescoring
+        from django.db import transaction
+        with mock.patch.object(rescoring, 'rescore_station', wraps=rescoring.rescore_station) as m:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.checklist_item.points = 10
+                    self.checklist_item.save()
+                    self.item2.points = 4
+                    self.item2.save()
+                    self.assertEqual(self._rescore_calls(m), [])
+            self.assertEqual(len(self._rescore_calls(m)), 1)
+
+        self.full.refresh_from_db()
+        self.partial.refresh_from_db()
+        self.score.refresh_from_db()
+        self.assertEqual((self.full.score, self.full.max_points), (10, 10))
+        self.assertEqual((self.partial.score, self.partial.max_points), (2, 4))
+        self.assertEqual(self.score.total_score, 12)
+        self.assertEqual(self.score.max_score, 14)
+        self.assertEqual(self.score.percentage, 85.71)
+        self.assertEqual(
+            FinalStationResult.objects.get(station=self.station, session_student=self.student).max_score, 14,
+        )
+
+    def test_only_edited_items_are_rescaled(self):
+        from core.utils.rescoring import flush_dirty_stations
+        flush_dirty_stations()  # the fixtures' own marks
+        ItemScore.objects.filter(pk=self.partial.pk).update(max_points=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.checklist_item.points = 10
+            self.checklist_item.save()
+        self.full.refresh_from_db()
+        self.partial.refresh_from_db()
+        self.assertEqual((self.full.score, self.full.max_points), (10, 10))
+        self.assertEqual((self.partial.score, self.partial.max_points), (1, 3))
+
+    def test_item_delete_retotals_station(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item2.delete()
+        self.score.refresh_from_db()
+        self.assertEqual(self.score.total_score, 5)
+        self.assertEqual(self.score.max_score, 5)
+        self.assertEqual(self.score.percentage, 100)
+
+    def test_mcq_answer_key_change_reevaluates(self):
+        mcq = ChecklistItem.objects.create(
+            station=self.station, ilo=self.ilo, item_number=3, description='Q1', points=1,
+            rubric_type='mcq', rubric_levels={'options': ['a', 'b'], 'correct_index': 0},
+        )
+        answer = ItemScore.objects.create(
+            station_score=self.score, checklist_item=mcq, score=0, max_points=1, notes=' 1 ',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            mcq.rubric_levels = {'options': ['a', 'b'], 'correct_index': 1}
+            mcq.points = 3
+            mcq.save()
+        answer.refresh_from_db()
+        self.score.refresh_from_db()
+        self.assertEqual((answer.score, answer.max_points), (3, 3))
+        self.assertEqual(self.score.total_score, 9)
+        self.assertEqual(self.score.max_score, 10)
+
+    def test_large_station_rescored_in_task(self):
+        from core.utils.rescoring import flush_dirty_stations
+        with self.captureOnCommitCallbacks():
+            self.item2.points = 4
+            self.item2.save()
+        broker = self.settings(CELERY_BROKER_URL='redis://broker', RESCORE_ASYNC_MIN_SCORES=1)
+        with broker, mock.patch('core.tasks.rescore_station.delay') as delay:
+            flush_dirty_stations()
+        delay.assert_called_once_with(str(self.station.id), [self.item2.id])
+        self.partial.refresh_from_db()
+        self.assertEqual(self.partial.max_points, 2)
+
+
+@override_settings(CELERY_BROKER_URL='')
+class StudentRosterImportTests(CreatorTestBase):
+    """Test the bulk XLSX student roster import."""
+
+    def setUp(self):
+        super().setUp()
+        self.path2 = Path.objects.create(session=self.session, name='Path 2')
+        self.url = reverse('creator:upload_students_xlsx', args=[self.session.id])
+
+    def _xlsx(self, rows):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from openpyxl import Workbook
+        import io
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        buf = io.BytesIO()
+        wb.save(buf)
+        return SimpleUploadedFile('roster.xlsx', buf.getvalue())
+
+    def test_bulk_import_skips_existing_and_duplicates(self):
+        rows = [('student_number', 'full_name'), ('12345', 'Already Here')]
+        rows += [(str(1000 + i), f'Student {i}') for i in range(30)]
+        rows.append(('1000', 'Repeated'))
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.post(self.url, {'file': self._xlsx(rows), 'path_id': 'auto'})
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "session_students"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertLess(len(ctx.captured_queries), 20)
+        data = json.loads(r.content)
+        self.assertTrue(data['success'])
+        self.assertIn('Uploaded 30 students', data['message'])
+        self.assertIn('2 duplicate', data['warning'])
+        imported = SessionStudent.objects.filter(session=self.session).exclude(pk=self.student.pk)
+        self.assertEqual(imported.count(), 30)
+        self.assertEqual(imported.filter(path=self.path).count(), 15)
+        self.assertFalse(imported.filter(created_at__isnull=True).exists())
+        self.assertEqual(
+            AuditLog.objects.filter(action='STUDENT_BULK_IMPORT', resource_id=str(self.session.id)).count(), 1,
+        )
+
+    def test_invalid_rows_import_nothing(self):
+        r = self.client.post(self.url, {'file': self._xlsx([('1001', 'Ok'), ('A12', 'Bad')])})
+        data = json.loads(r.content)
+        self.assertFalse(data['success'])
+        self.assertEqual(data['errors'], ['Row 2: Registration number must contain numbers only.'])
+        self.assertEqual(SessionStudent.objects.filter(session=self.session).count(), 1)
+
+    def test_async_import_reports_through_status_endpoint(self):
+        from core.utils.student_import import run_student_import
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        with self.settings(CELERY_BROKER_URL='redis://broker', MEDIA_ROOT=media.name), \
+                mock.patch('core.tasks.write_audit_log.delay'), \
+                mock.patch('core.tasks.import_students.apply_async') as apply_async:
+            r = self.client.post(self.url, {'file': self._xlsx([('2001', 'A'), ('2002', 'B')]),
+                                            'path_id': str(self.path2.id)})
+            task_id = json.loads(r.content)['task_id']
+            status_url = reverse('creator:students_upload_status', args=[self.session.id])
+            pending = json.loads(self.client.get(status_url, {'task_id': task_id}).content)
+            self.assertEqual(pending['status'], 'pending')
+
+        args = apply_async.call_args.kwargs['args']
+        self.assertEqual(apply_async.call_args.kwargs['task_id'], task_id)
+        with self.settings(MEDIA_ROOT=media.name):
+            run_student_import(task_id, *args)
+
+        done = json.loads(self.client.get(status_url, {'task_id': task_id}).content)
+        self.assertEqual(done['status'], 'done')
+        self.assertEqual(done['success_count'], 2)
+        self.assertEqual(SessionStudent.objects.filter(path=self.path2).count(), 2)
+        self.assertFalse(os.listdir(os.path.join(media.name, 'imports', 'students')))
+
+
+@override_settings(CELERY_BROKER_URL='')
+class ExaminerBulkImportTests(CreatorTestBase):
+    """Test bulk examiner provisioning from XLSX."""
+
+    def setUp(self):
+        super().setUp()
+        self.superuser = Examiner.objects.create_superuser(
+            username='root', password='RootPass123!', email='root@osce.local',
+        )
+        self.client.force_login(self.superuser)
+        self.dept = Department.objects.create(name='Surgery')
+
+    def _xlsx(self, rows):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from openpyxl import Workbook
+        import io
+        wb = Workbook()
+        wb.active.append(('username', 'email', 'full_name', 'title', 'department'))
+        wb.active.append(('e.g. jdoe', 'jdoe@example.com', 'John Doe', 'Dr.', 'Surgery'))
+        for row in rows:
+            wb.active.append(row)
+        buf = io.BytesIO()
+        wb.save(buf)
+        return SimpleUploadedFile('examiners.xlsx', buf.getvalue())
+
+    def test_bulk_provisioning(self):
+        from django.conf import settings
+        rows = [(f'new{i}', f'New{i}@osce.local', f'New Examiner {i}', 'Dr.', '') for i in range(3)]
+        rows += [
+            ('EXAMINER1', '', 'Taken Username', '', ''),
+            ('other', 'ex1@osce.local', 'Taken Email', '', ''),
+            ('nodept', '', 'No Dept', '', 'Cardiology'),
+            ('new0', '', 'Repeated', '', ''),
+            ('', '', 'Missing Username', '', ''),
+        ]
+        r = self.client.post(reverse('creator:examiner_bulk_upload'), {'file': self._xlsx(rows)})
+        data = json.loads(r.content)
+        self.assertEqual(data['status'], 'done')
+        self.assertEqual(data['success_count'], 3)
+        self.assertEqual(data['error_count'], 5)
+
+        created = Examiner.objects.filter(username__startswith='new').order_by('username')
+        self.assertEqual([e.email for e in created], ['new0@osce.local', 'new1@osce.local', 'new2@osce.local'])
+        self.assertTrue(created[0].check_password(settings.DEFAULT_USER_PASSWORD))
+        for examiner in created:
+            self.assertTrue(examiner.profile.must_change_password)
+            self.assertIsNotNone(examiner.created_at)
+        self.assertEqual(AuditLog.objects.filter(action='EXAMINER_BULK_IMPORT').count(), 1)
+
+    def test_non_superuser_forbidden(self):
+        self.client.force_login(self.user)
+        r = self.client.post(reverse('creator:examiner_bulk_upload'), {'file': self._xlsx([])})
+        self.assertEqual(r.status_code, 403)
+
+    def test_parallel_hashing_and_role_permissions(self):
+        from django.contrib.auth.hashers import check_password
+        from core.utils.examiner_import import PARALLEL_HASH_MIN, grant_role_permissions, hash_passwords
+        with self.settings(PASSWORD_HASH_WORKERS=2), \
+                mock.patch('core.utils.examiner_import.ProcessPoolExecutor') as process_pool:
+            hashes = hash_passwords(['secret'] * PARALLEL_HASH_MIN)
+        # Inline (web worker) imports never fork
+        process_pool.assert_not_called()
+        self.assertEqual(len(set(hashes)), PARALLEL_HASH_MIN)
+        self.assertTrue(check_password('secret', hashes[-1]))
+
+        head = Examiner(username='head', full_name='Head', role='coordinator',
+                        coordinator_position='head', department=self.dept)
+        organizer = Examiner(username='org', full_name='Org', role='coordinator',
+                             coordinator_position='organizer', department=self.dept)
+        Examiner.objects.bulk_create([head, organizer])
+        self.assertEqual(grant_role_permissions([head, organizer]), 3)
+        self.assertTrue(head.has_perm('core.can_view_student_list'))
+        self.assertFalse(organizer.has_perm('core.can_view_student_list'))
+        self.assertTrue(organizer.has_perm('core.can_open_dry_grading'))
+
+
+class SessionDetailTests(CreatorTestBase):
+    """Test the session detail page: cached aggregates, page-scoped scores."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('creator:session_detail', args=[self.session.id])
+
+    def _add_students(self, count, submitted=True):
+        students = [
+            SessionStudent.objects.create(
+                session=self.session, student_number=f'9{i:04d}',
+                full_name=f'Student {i}', path=self.path,
+            )
+            for i in range(count)
+        ]
+        if submitted:
+            for student in students:
+                StationScore.objects.create(
+                    session_student=student, station=self.station,
+                    examiner=self.examiner, status='submitted',
+                )
+        return students
+
+    def test_path_aggregates_and_completion(self):
+        StationScore.objects.create(
+            session_student=self.student, station=self.station,
+            examiner=self.examiner, status='submitted',
+        )
+        r = self.client.get(self.url)
+        self.assertEqual(r.status_code, 200)
+        path = r.context['paths'][0]
+        self.assertEqual((path.station_count, path.total_marks, path.student_count), (1, 5, 1))
+        self.assertEqual(path.unassigned_count, 0)
+        self.assertEqual(r.context['session_metrics']['station_display'], '1')
+        self.assertEqual(r.context['truly_completed_student_ids'], {str(self.student.id)})
+
+    def test_submitted_scores_limited_to_page(self):
+        self._add_students(60)
+        r = self.client.get(self.url)
+        page_ids = {s.id for s in r.context['students']}
+        self.assertEqual(len(page_ids), 50)
+        scores = r.context['submitted_scores']
+        self.assertEqual(len(scores), 49)   # 50 on the page, '12345' has no score
+        self.assertTrue(all(sc.session_student_id in page_ids for sc in scores))
+        self.assertEqual(len(r.context['truly_completed_student_ids']), 49)
+
+        r = self.client.get(self.url, {'page': 2})
+        self.assertEqual(len(r.context['submitted_scores']), 11)
+
+    def test_query_count_independent_of_session_size(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        self._add_students(80)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        sql = ' '.join(q['sql'] for q in large.captured_queries)
+        self.assertNotIn('checklist_items', sql)   # aggregates served from cache
+
+    def test_aggregates_invalidated_on_layout_change(self):
+        self.assertEqual(self.client.get(self.url).context['total_unassigned'], 0)
+
+        self.assignment.delete()
+        r = self.client.get(self.url)
+        self.assertEqual(r.context['total_unassigned'], 1)
+        self.assertEqual(r.context['paths'][0].unassigned_stations, [
+            {'id': self.station.id, 'name': 'Station 1'},
+        ])
+
+        # Checklist edits invalidate once per station, when the edit commits
+        from django.db import transaction
+        from core.utils import cache_utils
+        with mock.patch.object(
+            cache_utils, 'invalidate_session_detail', wraps=cache_utils.invalidate_session_detail,
+        ) as invalidate, self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for n in (2, 3):
+                    ChecklistItem.objects.create(
+                        station=self.station, ilo=self.ilo, item_number=n,
+                        description=f'Check {n}', points=3,
+                    )
+                invalidate.assert_not_called()
+        invalidate.assert_called_once_with(self.session.id)
+        self.assertEqual(self.client.get(self.url).context['paths'][0].total_marks, 11)
+
+        Path.objects.create(session=self.session, name='Path 2')
+        self.assertEqual(len(self.client.get(self.url).context['paths']), 2)
+
+
+class ScoresheetBuilderTests(CreatorTestBase):
+    """Test the batch score sheet builder behind the score sheet reports."""
+
+    def _submit(self, student, examiner, total, comments=''):
+        StationScore.objects.bulk_create([StationScore(
+            session_student=student, station=self.station, examiner=examiner,
+            total_score=total, max_score=5, status='submitted', comments=comments,
+        )])
+        FinalStationResult.refresh(student.id, self.station.id)
+
+    def test_sheet_averages_examiners_and_lists_comments(self):
+        from core.utils.scoresheets import build_scoresheets
+        self._submit(self.student, self.examiner, 4, comments='Good history')
+        self._submit(self.student, self.user, 3)
+
+        sheet, = build_scoresheets(self.session, [self.student])
+        row, = sheet['station_rows']
+        self.assertEqual((row['score'], row['max_score'], row['marked']), (3.5, 5, True))
+        self.assertEqual(row['comment'], 'Good history')
+        self.assertEqual(len(sheet['scores'][self.station.id]), 2)
+        self.assertEqual(sheet['comments_with_examiner'][0]['examiner_name'], 'Test Examiner')
+        self.assertEqual(sheet['comments_with_examiner'][0]['station']['name'], 'Station 1')
+        self.assertEqual((sheet['total_score'], sheet['percentage_display']), (3.5, 70.0))
+        self.assertTrue(sheet['passed'])
+
+    def test_query_count_independent_of_students(self):
+        from core.utils.scoresheets import build_scoresheets
+        from core.utils.station_catalog import StationCatalog
+        students = [
+            SessionStudent(session=self.session, student_number=f'9{i:04d}',
+                           full_name=f'Student {i}', path=self.path)
+            for i in range(30)
+        ]
+        SessionStudent.objects.bulk_create(students)
+        for student in students:
+            self._submit(student, self.examiner, 5, comments='Fine')
+        StationCatalog.path_stations(self.path.id)
+
+        # submitted scores + examiners, aggregated finals
+        with self.assertNumQueries(2):
+            sheets = build_scoresheets(self.session, [self.student] + students)
+        self.assertEqual(len(sheets), 31)
+        self.assertEqual(sum(1 for sheet in sheets if sheet['comments_with_examiner']), 30)
+
+    def test_scoresheets_page_renders(self):
+        self._submit(self.student, self.examiner, 4)
+        ExamSession.objects.filter(pk=self.session.pk).update(status='completed')
+        r = self.client.get(reverse('creator:reports_student_scoresheet', args=[self.student.id]))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['student_info']['station_rows'][0]['score'], 4.0)
+
+
+@override_settings(CELERY_BROKER_URL='')
+class ExportJobTests(CreatorTestBase):
+    """Test background export jobs (run inline without a Celery broker)."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.url = reverse('creator_api:create_export')
+
+    def _request(self, kind='students_csv', **extra):
+        return self.client.post(
+            self.url, data=json.dumps(dict(kind=kind, session_id=str(self.session.id), **extra)),
+            content_type='application/json',
+        )
+
+    def test_job_runs_inline_and_downloads(self):
+        r = self._request()
+        self.assertEqual(r.status_code, 202)
+        job = json.loads(r.content)['job']
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['progress'], 100)
+
+        r = self.client.get(job['download_url'])
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(b''.join(r.streaming_content).startswith(b'Student Number,Full Name'))
+
+    def test_identical_requests_share_a_job(self):
+        first = json.loads(self._request().content)
+        second = json.loads(self._request().content)
+        self.assertFalse(second['created'])
+        self.assertEqual(second['job']['id'], first['job']['id'])
+
+        fresh = json.loads(self._request(fresh=True).content)
+        self.assertTrue(fresh['created'])
+        self.assertNotEqual(fresh['job']['id'], first['job']['id'])
+
+    def test_expired_artifact_is_removed(self):
+        from core.models import ExportJob
+        from core.utils.export_jobs import cleanup_expired_exports
+        job_id = json.loads(self._request(kind='raw_csv').content)['job']['id']
+        job = ExportJob.objects.get(pk=job_id)
+        path = job.file.path
+        ExportJob.objects.filter(pk=job_id).update(expires_at=0)
+
+        self.assertEqual(cleanup_expired_exports(), (1, 0))
+        self.assertFalse(os.path.exists(path))
+        r = self.client.get(reverse('creator_api:download_export', args=[job_id]))
+        self.assertEqual(r.status_code, 410)
+
+    def test_completed_only_kinds_are_refused(self):
+        r = self._request(kind='ilo_xlsx')
+        self.assertEqual(r.status_code, 403)
+
+    def test_scoresheets_zip_has_one_sheet_per_student(self):
+        import zipfile
+        from io import BytesIO
+        ExamSession.objects.filter(pk=self.session.pk).update(status='completed')
+        job = json.loads(self._request(kind='scoresheets').content)['job']
+        self.assertEqual(job['status'], 'done')
+        r = self.client.get(job['download_url'])
+        names = zipfile.ZipFile(BytesIO(b''.join(r.streaming_content))).namelist()
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].startswith(self.student.student_number))
+
+    def test_scoresheets_pdf(self):
+        ExamSession.objects.filter(pk=self.session.pk).update(status='completed')
+        job = json.loads(self._request(kind='scoresheets_pdf').content)['job']
+        self.assertEqual(job['status'], 'done')
+        r = self.client.get(job['download_url'])
+        self.assertTrue(b''.join(r.streaming_content).startswith(b'%PDF'))
+
+
+class LiveProgressTests(CreatorTestBase):
+    """Test the cache-backed live progress feed (long-poll + SSE fallback)."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('creator_api:session_live_progress', args=[self.session.id])
+
+    def _submit_as_examiner(self):
+        score = StationScore.objects.create(
+            session_student=self.student, station=self.station,
+            examiner=self.examiner, status='in_progress',
+        )
+        examiner_client = Client()
+        examiner_client.force_login(self.examiner)
+        r = examiner_client.post(
+            reverse('examiner_api:submit_score', args=[score.id]),
+            data='{}', content_type='application/json',
+        )
+        self.assertEqual(r.status_code, 200)
+        return score, examiner_client
+
+    def test_snapshot_then_submission_delta(self):
+        data = json.loads(self.client.get(self.url).content)
+        self.assertTrue(data['full'])
+        self.assertEqual(data['stations'][0]['completed'], 0)
+        self.assertEqual(data['paths'][0]['total_students'], 1)
+        self.assertEqual([e['name'] for e in data['idle_examiners']], ['Test Examiner'])
+
+        self._submit_as_examiner()
+        delta = json.loads(self.client.get(self.url, {'since': data['version']}).content)
+        self.assertFalse(delta['full'])
+        self.assertEqual(len(delta['events']), 1)
+        event = delta['events'][0]
+        self.assertEqual(event['station'], {'id': str(self.station.id), 'completed': 1})
+        self.assertEqual(event['path'], {'id': str(self.path.id), 'completed': 1})
+        self.assertEqual(delta['idle_examiners'], [])
+
+    def test_undo_decrements_station_count(self):
+        score, examiner_client = self._submit_as_examiner()
+        version = json.loads(self.client.get(self.url).content)['version']
+        examiner_client.post(reverse('examiner_api:undo_submit', args=[score.id]))
+        delta = json.loads(self.client.get(self.url, {'since': version}).content)
+        self.assertEqual(delta['events'][-1]['station']['completed'], 0)
+
+    def test_poll_does_not_query_scores(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        version = json.loads(self.client.get(self.url).content)['version']
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(self.url, {'since': version})
+        self.assertEqual(json.loads(r.content)['events'], [])
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertNotIn('station_scores', sql)
+        self.assertNotIn('session_students', sql)
+
+    def test_stream_falls_back_to_long_poll_under_wsgi(self):
+        r = self.client.get(reverse('creator_api:session_live_stream', args=[self.session.id]))
+        self.assertEqual(json.loads(r.content)['fallback_url'], self.url)
+
 
 # ── Security header tests ────────────────────────────────────────────────
 
@@ -31,7 +31,7 @@ def dashboard(request):
     all_sessions = scope_queryset(
         request.user,
         ExamSession.objects.filter(exam__is_deleted=False),
-        dept_field='exam__course__department',
+        dept_field='department',
     )
 
     stats = {
@@ -448,118 +448,52 @@ def examiner_download_template(request):
 
 @login_required
 def examiner_bulk_upload(request):
-    """Handle XLSX upload for bulk examiner creation with department validation."""
+    """
+    Handle XLSX upload for bulk examiner creation (core.utils.examiner_import).
+
+    Answers the upload modal with JSON: ``{task_id}`` when the import is
+    handed to the ``core.bulk_import_examiners`` Celery task, otherwise the
+    finished ``{status: 'done', success_count, error_count, errors}``.
+    """
+    import uuid
+    from django.core.files.storage import default_storage
+    from django.http import JsonResponse
+    from core.utils.examiner_import import (
+        ExaminerImportError, provision_examiners, read_examiner_rows,
+        set_bulk_import_status,
+    )
+
     if not request.user.is_superuser:
-        messages.error(request, 'You do not have permission to upload examiners.')
-        return redirect('creator:examiner_list')
-    
-    import openpyxl
-    from core.models import Department
+        return JsonResponse({'error': 'You do not have permission to upload examiners.'}, status=403)
 
     if request.method != 'POST' or 'file' not in request.FILES:
-        messages.error(request, 'No file uploaded')
-        return redirect('creator:examiner_list')
+        return JsonResponse({'error': 'No file uploaded'}, status=400)
 
     f = request.FILES['file']
     if not f.name.endswith('.xlsx'):
-        messages.error(request, 'Please upload an .xlsx file')
-        return redirect('creator:examiner_list')
+        return JsonResponse({'error': 'Please upload an .xlsx file'}, status=400)
 
     # File size validation (5 MB max)
     max_size = 5 * 1024 * 1024
     if f.size > max_size:
-        messages.error(request, 'File too large. Maximum size is 5 MB.')
-        return redirect('creator:examiner_list')
+        return JsonResponse({'error': 'File too large. Maximum size is 5 MB.'}, status=400)
 
-    try:
-        # Get valid departments
-        valid_departments = set(Department.objects.values_list('name', flat=True))
-        
-        wb = openpyxl.load_workbook(f)
-        ws = wb.active
-
-        headers = [str(c.value).strip().lower() for c in ws[1] if c.value]
-        required = ['full_name', 'username']
-        for field in required:
-            if field not in headers:
-                messages.error(request, f'Missing required column: {field}')
-                return redirect('creator:examiner_list')
-
-        idx = {h: i for i, h in enumerate(headers)}
-        success_count = 0
-        errors_list = []
-
-        for row_num, row in enumerate(ws.iter_rows(min_row=3, values_only=True), 3):
-            if not any(row):
-                continue
-            try:
-                username = str(row[idx['username']]).strip().lower()
-                email = str(row[idx['email']]).strip().lower() if 'email' in idx and row[idx['email']] else ''
-                full_name = str(row[idx['full_name']]).strip()
-                title = str(row[idx.get('title', -1)]).strip() if 'title' in idx and row[idx['title']] else ''
-                department = str(row[idx.get('department', -1)]).strip() if 'department' in idx and row[idx['department']] else ''
-
-                if not all([username, full_name]):
-                    errors_list.append(f'Row {row_num}: Missing required data')
-                    continue
-
-                # Validate department
-                if department and department not in valid_departments:
-                    errors_list.append(
-                        f"Row {row_num}: Department '{department}' does not exist."
-                    )
-                    continue
-
-                if Examiner.objects.filter(username=username).exists():
-                    errors_list.append(f"Row {row_num}: Username '{username}' already exists")
-                    continue
-                if email and Examiner.objects.filter(email=email).exists():
-                    errors_list.append(f"Row {row_num}: Email '{email}' already exists")
-                    continue
-
-                # Look up department FK
-                dept_obj = None
-                if department:
-                    try:
-                        dept_obj = Department.objects.get(name=department)
-                    except Department.DoesNotExist:
-                        pass
-                new_examiner = Examiner(
-                    username=username,
-                    email=email,
-                    full_name=full_name,
-                    title=title,
-                    department=dept_obj,
-                    is_active=True,
-                )
-                # Password is set automatically by the post_save signal
-                new_examiner.save()
-                success_count += 1
-            except Exception as e:
-                errors_list.append(f'Row {row_num}: {e}')
-
-        if success_count:
-            invalidate_examiner_list()
-            messages.success(request, f'Successfully imported {success_count} examiners.')
-
-            AuditLogService.log(
-                action='EXAMINER_BULK_IMPORT',
-                request=request,
-                resource_type='Examiner',
-                description=f'Bulk imported {success_count} examiners from XLSX',
-                extra={'success_count': success_count, 'error_count': len(errors_list)},
-            )
-        if errors_list:
-            messages.warning(request, f'Failed to import {len(errors_list)} rows.')
-            for err in errors_list[:5]:
-                messages.error(request, err)
-            if len(errors_list) > 5:
-                messages.error(request, f'...and {len(errors_list) - 5} more errors.')
+    if getattr(settings, 'CELERY_BROKER_URL', ''):
+        from core.tasks import bulk_import_examiners
 
-    except Exception as e:
-        messages.error(request, f'Error processing file: {e}')
+        task_id = str(uuid.uuid4())
+        file_name = default_storage.save(f'imports/examiners/{task_id}.xlsx', f)
+        set_bulk_import_status(task_id, {'status': 'pending', 'progress': 0})
+        bulk_import_examiners.apply_async(args=[file_name, request.user.pk], task_id=task_id)
+        return JsonResponse({'task_id': task_id})
 
-    return redirect('creator:examiner_list')
+    try:
+        rows, errors = read_examiner_rows(f)
+        result = provision_examiners(rows, errors, request=request)
+    except ExaminerImportError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    result['errors'] = result['errors'][:20]
+    return JsonResponse(dict(result, status='done'))
 
 
 @login_required
@@ -571,6 +505,7 @@ def bulk_import_status(request):
     """
     from django.core.cache import cache
     from django.http import JsonResponse
+    from core.utils.examiner_import import get_bulk_import_cache_key
 
     if not request.user.is_superuser:
         return JsonResponse({'status': 'error', 'message': 'Forbidden'}, status=403)
@@ -579,7 +514,7 @@ def bulk_import_status(request):
     if not task_id:
         return JsonResponse({'status': 'error', 'message': 'Missing task_id'}, status=400)
 
-    result = cache.get(f'osce:bulk_import:{task_id}')
+    result = cache.get(get_bulk_import_cache_key(task_id))
     if result is None:
         return JsonResponse({'status': 'pending'})
     return JsonResponse(result)
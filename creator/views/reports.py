@@ -5,14 +5,15 @@ from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse, HttpResponseForbidden
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Sum, F
-from collections import defaultdict
+from django.db.models import F
 
 from core.models import (
-    Course, Exam, ExamSession, SessionStudent, Station, ChecklistItem,
-    StationScore, ItemScore, ILO,
+    Course, Exam, ExamSession, SessionStudent,
 )
+from core.utils.exports import xlsx_response
+from core.utils.ilo_attainment import build_ilo_attainment
 from core.utils.roles import scope_queryset, check_session_department
+from core.utils.scoresheets import build_scoresheets
 
 
 @login_required
@@ -24,7 +25,7 @@ def reports_index(request):
     ).select_related('exam', 'exam__course')
     
     # Department scoping
-    sessions_qs = scope_queryset(request.user, sessions_qs, dept_field='exam__course__department')
+    sessions_qs = scope_queryset(request.user, sessions_qs, dept_field='department')
     
     # Permission-based filtering
     if not request.user.is_superuser:
@@ -96,70 +97,7 @@ def reports_scoresheets(request, session_id):
     except (PageNotAnInteger, EmptyPage):
         students_page = paginator.page(1)
 
-    students = students_page.object_list
-
-    student_data = []
-    for student in students:
-        if student.path_id:
-            student_stations = Station.objects.filter(
-                path_id=student.path_id, active=True,
-            ).order_by('station_number')
-        else:
-            student_stations = Station.objects.none()
-
-        # Only count submitted scores, ignore abandoned/in-progress evaluations
-        scores_qs = StationScore.objects.filter(
-            session_student=student,
-            status='submitted'
-        ).exclude(
-            total_score__isnull=True
-        ).select_related('examiner')
-        # Map all scores by station (not just one per station)
-        score_map_all = {}
-        for score in scores_qs:
-            if score.station_id not in score_map_all:
-                score_map_all[score.station_id] = []
-            score_map_all[score.station_id].append(score)
-
-        max_possible = 0
-        for st in student_stations:
-            st_max = ChecklistItem.objects.filter(station=st).aggregate(
-                total=Sum('points')
-            )['total'] or 0
-            max_possible += st_max
-
-        # Calculate total using average for multiple examiners per station
-        total_score = 0
-        for station_id, scores_list in score_map_all.items():
-            if scores_list:
-                # Use average if multiple scores, otherwise use single score
-                avg_score = sum(s.total_score or 0 for s in scores_list) / len(scores_list)
-                total_score += avg_score
-        
-        percentage = (total_score / max_possible * 100) if max_possible > 0 else 0
-        
-        # Build comments with examiner names
-        comments_with_examiner = []
-        for score in scores_qs:
-            if score.comments and score.comments.strip():
-                examiner_name = score.examiner.full_name if score.examiner else "Unknown Examiner"
-                comments_with_examiner.append({
-                    'station': Station.objects.filter(pk=score.station_id).first(),
-                    'examiner_name': examiner_name,
-                    'comment_text': score.comments,
-                    'formatted': f"{examiner_name}:\n{score.comments}"
-                })
-        
-        student_data.append({
-            'student': student,
-            'stations': student_stations,
-            'scores': score_map_all,
-            'total_score': round(total_score, 2),
-            'max_score': max_possible,
-            'percentage_display': round(percentage, 2),
-            'passed': percentage >= 60,
-            'comments_with_examiner': comments_with_examiner,
-        })
+    student_data = build_scoresheets(session, students_page.object_list)
 
     return render(request, 'creator/reports/scoresheets.html', {
         'session': session,
@@ -188,113 +126,17 @@ def reports_student_scoresheet(request, student_id):
             "Only superusers can view non-completed sessions."
         )
 
-    if student.path_id:
-        student_stations = Station.objects.filter(
-            path_id=student.path_id, active=True,
-        ).order_by('station_number')
-    else:
-        student_stations = Station.objects.none()
-
-    # Only count submitted scores, ignore abandoned/in-progress evaluations
-    scores_qs = StationScore.objects.filter(
-        session_student=student,
-        status='submitted'
-    ).exclude(
-        total_score__isnull=True
-    ).select_related('examiner')
-    # Map all scores by station (not just one per station)
-    score_map_all = {}
-    for score in scores_qs:
-        if score.station_id not in score_map_all:
-            score_map_all[score.station_id] = []
-        score_map_all[score.station_id].append(score)
-
-    max_possible = 0
-    for st in student_stations:
-        st_max = ChecklistItem.objects.filter(station=st).aggregate(
-            total=Sum('points')
-        )['total'] or 0
-        max_possible += st_max
-
-    # Calculate total using average for multiple examiners per station
-    _total = 0
-    for station_id, scores_list in score_map_all.items():
-        if scores_list:
-            # Use average if multiple scores, otherwise use single score
-            avg_score = sum(s.total_score or 0 for s in scores_list) / len(scores_list)
-            _total += avg_score
-    
-    _pct = (_total / max_possible * 100) if max_possible > 0 else 0
-    
-    # Build comments with examiner names
-    comments_with_examiner = []
-    for score in scores_qs:
-        if score.comments and score.comments.strip():
-            examiner_name = score.examiner.full_name if score.examiner else "Unknown Examiner"
-            comments_with_examiner.append({
-                'station': Station.objects.filter(pk=score.station_id).first(),
-                'examiner_name': examiner_name,
-                'comment_text': score.comments,
-                'formatted': f"{examiner_name}:\n{score.comments}"
-            })
-    
-    # Build per-station rows for the new print template
-    station_rows = []
-    for st in student_stations:
-        scores_for_station = score_map_all.get(st.id, [])
-        st_max = ChecklistItem.objects.filter(station=st).aggregate(
-            total=Sum('points')
-        )['total'] or 0
-
-        if scores_for_station:
-            # Average if multiple examiners
-            avg = sum(s.total_score or 0 for s in scores_for_station) / len(scores_for_station)
-            examiner_names = '\n'.join(
-                (s.examiner.full_name if s.examiner else 'Unknown') for s in scores_for_station
-            )
-            comment = ' | '.join(
-                s.comments.strip() for s in scores_for_station if s.comments and s.comments.strip()
-            ) or ''
-            station_rows.append({
-                'number': st.station_number,
-                'name': st.name,
-                'examiner': examiner_names,
-                'score': round(avg, 2),
-                'max_score': st_max,
-                'comment': comment,
-                'marked': True,
-            })
-        else:
-            station_rows.append({
-                'number': st.station_number,
-                'name': st.name,
-                'examiner': '—',
-                'score': None,
-                'max_score': st_max,
-                'comment': '',
-                'marked': False,
-            })
-
-    exam_weight = float(session.exam.exam_weight or 1)
-    weighted_score = round(_total / max_possible * exam_weight , 2) if exam_weight and max_possible else None
-
-    student_info = {
-        'student': student,
-        'station_rows': station_rows,
-        'total_score': round(_total, 2),
-        'max_score': max_possible,
-        'percentage_display': round(_pct, 2),
-        'passed': _pct >= 60,
-        'exam_weight': exam_weight,
-        'weighted_score': weighted_score,
-    }
-
     return render(request, 'creator/reports/student_scoresheet.html', {
         'session': session,
-        'student_info': student_info,
+        'student_info': student_scoresheet_info(session, student),
     })
 
 
+def student_scoresheet_info(session, student):
+    """Build the ``student_info`` context for student_scoresheet.html."""
+    return build_scoresheets(session, [student])[0]
+
+
 # ── XLSX Export: ILO Scores per Student ─────────────────────────────────
 
 @login_required
@@ -304,10 +146,6 @@ def export_ilo_scores_xlsx(request, session_id):
     Sheet layout — rows = students, columns = ILOs.
     Each cell = average of examiner scores for that student / ILO.
     """
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from openpyxl.utils import get_column_letter
-
     session = get_object_or_404(
         ExamSession.objects.select_related('exam', 'exam__course'),
         pk=session_id,
@@ -321,210 +159,141 @@ def export_ilo_scores_xlsx(request, session_id):
     if not request.user.is_superuser and session.status != 'completed':
         return HttpResponseForbidden("Only superusers can export non-completed sessions.")
 
+    wb = build_ilo_scores_workbook(session)
+    if wb is None:
+        return HttpResponse("No ILOs defined for this course.", status=400)
+
+    # ── Response ────────────────────────────────────────────────────────
+    filename = f'ILO_Scores_{session.exam.name}_{session.name}.xlsx'.replace(' ', '_')
+    return xlsx_response(wb, filename)
+
+
+def build_ilo_scores_workbook(session):
+    """
+    Build the write-only ILO score workbook for ``session``.
+    Returns None when the course has no ILOs.
+    """
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
+
     exam = session.exam
     course = exam.course
 
-    # ── Gather ILOs for this course ─────────────────────────────────────
-    ilos = list(ILO.objects.filter(course=course).order_by('number'))
+    # ── Dense students × ILOs matrix (examiner-averaged, summed over stations)
+    matrix = build_ilo_attainment(session)
+    ilos = matrix.ilos
     if not ilos:
-        return HttpResponse("No ILOs defined for this course.", status=400)
-
-    ilo_ids = [ilo.id for ilo in ilos]
-
-    # ── Gather students ─────────────────────────────────────────────────
-    students = list(
-        SessionStudent.objects.filter(session=session)
-        .order_by('full_name')
-    )
-    student_ids = [s.id for s in students]
-
-    # ── Fetch all submitted item-level scores in one query ──────────────
-    # Join: ItemScore → StationScore → SessionStudent
-    #        ItemScore → ChecklistItem (for ilo_id, points)
-    rows = (
-        ItemScore.objects
-        .filter(
-            station_score__session_student_id__in=student_ids,
-            station_score__status='submitted',
-            checklist_item__ilo_id__in=ilo_ids,
-        )
-        .values(
-            'station_score__session_student_id',
-            'station_score__station_id',
-            'station_score__examiner_id',
-            'checklist_item__ilo_id',
-        )
-        .annotate(
-            earned=Sum('score'),
-            possible=Sum('max_points'),
-        )
-    )
+        return None
+    students = matrix.students
 
-    # Structure:  student_id → ilo_id → list of (earned, possible) per examiner-station combo
-    # When multiple examiners score the same station we average their totals.
-    # raw_data[student_id][ilo_id][(station_id, examiner_id)] = (earned, possible)
-    raw_data = defaultdict(lambda: defaultdict(dict))
-    for r in rows:
-        sid = r['station_score__session_student_id']
-        ilo_id = r['checklist_item__ilo_id']
-        key = (r['station_score__station_id'], r['station_score__examiner_id'])
-        raw_data[sid][ilo_id][key] = (r['earned'] or 0, r['possible'] or 0)
-
-    # Collapse to averages per station, then sum across stations.
-    # Result: scores[student_id][ilo_id] = {'earned': float, 'possible': float}
-    scores = {}
-    for sid in student_ids:
-        scores[sid] = {}
-        for ilo in ilos:
-            examiner_station_data = raw_data[sid].get(ilo.id, {})
-            if not examiner_station_data:
-                scores[sid][ilo.id] = {'earned': 0, 'possible': 0}
-                continue
-
-            # Group by station, average examiners within each station
-            station_groups = defaultdict(list)
-            station_possible = {}
-            for (station_id, _examiner_id), (earned, possible) in examiner_station_data.items():
-                station_groups[station_id].append(earned)
-                station_possible[station_id] = possible  # same max for same station
-
-            total_earned = 0
-            total_possible = 0
-            for station_id, earned_list in station_groups.items():
-                total_earned += sum(earned_list) / len(earned_list)  # average across examiners
-                total_possible += station_possible[station_id]
-
-            scores[sid][ilo.id] = {
-                'earned': round(total_earned, 2),
-                'possible': round(total_possible, 2),
-            }
-
-    # ── Build workbook ──────────────────────────────────────────────────
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'ILO Scores'
+    # ── Build workbook (write-only: layout first, then rows in order) ──
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('ILO Scores')
 
     # Styles
     header_font = Font(bold=True, color='FFFFFF', size=11)
     header_fill = PatternFill(start_color='1A1A2E', end_color='1A1A2E', fill_type='solid')
+    total_fill = PatternFill(start_color='198754', end_color='198754', fill_type='solid')
+    even_fill = PatternFill(start_color='F8F9FA', end_color='F8F9FA', fill_type='solid')
     border = Border(
         left=Side(style='thin'), right=Side(style='thin'),
         top=Side(style='thin'), bottom=Side(style='thin'),
     )
     center = Alignment(horizontal='center', vertical='center', wrap_text=True)
     left_align = Alignment(horizontal='left', vertical='center')
+    bold = Font(bold=True)
+
+    def styled(value, font=None, fill=None, alignment=None, cell_border=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if alignment:
+            cell.alignment = alignment
+        if cell_border:
+            cell.border = cell_border
+        return cell
 
-    # ── Row 1: Title ────────────────────────────────────────────────────
-    total_cols = 3 + len(ilos) + 1  # fixed + 1 col per ILO + Total
-    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=total_cols)
-    title_cell = ws.cell(row=1, column=1,
-                         value=f'{exam.name} — {session.name} — ILO Score Report')
-    title_cell.font = Font(bold=True, size=14, color='1A1A2E')
-    title_cell.alignment = Alignment(horizontal='left', vertical='center')
+    fixed_headers = ['#', 'Student Number', 'Student Name']
+    total_cols = len(fixed_headers) + len(ilos) + 1  # fixed + 1 col per ILO + Total
+    start_row = 4
+    data_start = start_row + 1
+
+    ws.merged_cells.add(f'A1:{get_column_letter(total_cols)}1')
+    ws.merged_cells.add(f'A2:{get_column_letter(total_cols)}2')
     ws.row_dimensions[1].height = 30
+    ws.row_dimensions[2].height = 20
+
+    # ── Column widths ───────────────────────────────────────────────────
+    ws.column_dimensions['A'].width = 5
+    ws.column_dimensions['B'].width = 18
+    ws.column_dimensions['C'].width = 28
+    for ci in range(len(fixed_headers) + 1, total_cols + 1):
+        ws.column_dimensions[get_column_letter(ci)].width = 10
+
+    # ── Freeze panes ────────────────────────────────────────────────────
+    ws.freeze_panes = f'D{data_start}'
+
+    # ── Row 1: Title ────────────────────────────────────────────────────
+    ws.append([styled(
+        f'{exam.name} — {session.name} — ILO Score Report',
+        font=Font(bold=True, size=14, color='1A1A2E'),
+        alignment=Alignment(horizontal='left', vertical='center'),
+    )])
 
     # ── Row 2: Course info ──────────────────────────────────────────────
-    ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=total_cols)
-    info_cell = ws.cell(row=2, column=1,
-                        value=f'Course: {course.code} — {course.name}  |  Students: {len(students)}')
-    info_cell.font = Font(size=10, color='666666')
-    ws.row_dimensions[2].height = 20
+    ws.append([styled(
+        f'Course: {course.code} — {course.name}  |  Students: {len(students)}',
+        font=Font(size=10, color='666666'),
+    )])
 
     # ── Row 3: Empty spacer ─────────────────────────────────────────────
-    start_row = 4
-
-    # ── Row 4: Header ───────────────────────────────────────────────────
-    fixed_headers = ['#', 'Student Number', 'Student Name']
-    for ci, hdr in enumerate(fixed_headers, 1):
-        cell = ws.cell(row=start_row, column=ci, value=hdr)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = center
-        cell.border = border
-
-    # One column per ILO
-    col = len(fixed_headers) + 1
-    for ilo in ilos:
-        cell = ws.cell(row=start_row, column=col, value=f'ILO #{ilo.number}')
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = center
-        cell.border = border
-        col += 1
-
-    # Total column
-    total_col = col
-    total_hdr = ws.cell(row=start_row, column=total_col, value='TOTAL')
-    total_hdr.font = header_font
-    total_hdr.fill = PatternFill(start_color='198754', end_color='198754', fill_type='solid')
-    total_hdr.alignment = center
-    total_hdr.border = border
+    ws.append([])
+
+    # ── Row 4: Header (fixed, one column per ILO, Total) ────────────────
+    header_cells = [
+        styled(hdr, font=header_font, fill=header_fill, alignment=center, cell_border=border)
+        for hdr in fixed_headers + [f'ILO #{ilo.number}' for ilo in ilos]
+    ]
+    header_cells.append(
+        styled('TOTAL', font=header_font, fill=total_fill, alignment=center, cell_border=border)
+    )
+    ws.append(header_cells)
 
     # ── Data rows ───────────────────────────────────────────────────────
-    data_start = start_row + 1
-    even_fill = PatternFill(start_color='F8F9FA', end_color='F8F9FA', fill_type='solid')
-
-    for idx, student in enumerate(students):
-        row_num = data_start + idx
+    for idx, result in enumerate(matrix.rows()):
+        student = result['student']
         row_fill = even_fill if idx % 2 == 0 else None
 
         # Fixed columns
-        ws.cell(row=row_num, column=1, value=idx + 1).alignment = center
-        ws.cell(row=row_num, column=2, value=student.student_number).alignment = left_align
-        ws.cell(row=row_num, column=3, value=student.full_name).alignment = left_align
-
-        for ci in range(1, 4):
-            ws.cell(row=row_num, column=ci).border = border
-            if row_fill:
-                ws.cell(row=row_num, column=ci).fill = row_fill
+        cells = [
+            styled(idx + 1, alignment=center, fill=row_fill, cell_border=border),
+            styled(student.student_number, alignment=left_align, fill=row_fill, cell_border=border),
+            styled(student.full_name, alignment=left_align, fill=row_fill, cell_border=border),
+        ]
 
         # ILO score columns
-        col = len(fixed_headers) + 1
-        grand_earned = 0
-
-        for ilo in ilos:
-            s = scores.get(student.id, {}).get(ilo.id, {'earned': 0, 'possible': 0})
-            earned = s['earned']
-            grand_earned += earned
-
-            earned_cell = ws.cell(row=row_num, column=col, value=earned if earned else '')
-            earned_cell.alignment = center
-            earned_cell.border = border
-            if row_fill:
-                earned_cell.fill = row_fill
-            col += 1
+        for earned in result['earned']:
+            cells.append(styled(
+                earned if earned else '', alignment=center, fill=row_fill, cell_border=border,
+            ))
 
         # Total
-        total_cell = ws.cell(row=row_num, column=total_col, value=round(grand_earned, 2))
-        total_cell.font = Font(bold=True)
-        total_cell.alignment = center
-        total_cell.border = border
-        if row_fill:
-            total_cell.fill = row_fill
-
-    # ── ILO description row at the bottom ───────────────────────────────
-    desc_row = data_start + len(students) + 1
-    ws.cell(row=desc_row, column=1, value='ILO Descriptions:').font = Font(bold=True, size=10)
-    for i, ilo in enumerate(ilos):
-        ws.cell(row=desc_row + 1 + i, column=1,
-                value=f'ILO #{ilo.number}: {ilo.description} (Max: {ilo.osce_marks})')
-        ws.cell(row=desc_row + 1 + i, column=1).font = Font(size=9, color='555555')
-
-    # ── Column widths ───────────────────────────────────────────────────
-    ws.column_dimensions['A'].width = 5
-    ws.column_dimensions['B'].width = 18
-    ws.column_dimensions['C'].width = 28
-    for ci in range(len(fixed_headers) + 1, total_col + 1):
-        ws.column_dimensions[get_column_letter(ci)].width = 10
-
-    # ── Freeze panes ────────────────────────────────────────────────────
-    ws.freeze_panes = f'D{data_start}'
+        cells.append(styled(
+            result['total'], font=bold, alignment=center, fill=row_fill, cell_border=border,
+        ))
+        ws.append(cells)
+
+    # ── ILO description rows at the bottom ──────────────────────────────
+    ws.append([])
+    ws.append([styled('ILO Descriptions:', font=Font(bold=True, size=10))])
+    desc_font = Font(size=9, color='555555')
+    for ilo in ilos:
+        ws.append([styled(
+            f'ILO #{ilo.number}: {ilo.description} (Max: {ilo.osce_marks})', font=desc_font,
+        )])
 
-    # ── Response ────────────────────────────────────────────────────────
-    filename = f'ILO_Scores_{exam.name}_{session.name}.xlsx'.replace(' ', '_')
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
+    return wb
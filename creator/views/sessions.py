@@ -5,19 +5,21 @@ import os
 from collections import defaultdict
 from datetime import datetime, time
 from io import BytesIO
+from types import SimpleNamespace
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from core.models.mixins import TimestampMixin
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.db.models import Count
 from django.urls import reverse
 from django.views.decorators.http import require_POST
 from creator.api.sessions import _sync_exam_status
 
 from core.models import (
     Exam, ExamSession, SessionStudent, Path, Station, ChecklistItem,
-    Examiner, ExaminerAssignment, StationScore, ItemScore,
+    Examiner, ExaminerAssignment, StationScore, ItemScore, FinalStationResult,
 )
 from core.utils.naming import generate_path_name
 from core.utils.cache_utils import (
@@ -27,6 +29,8 @@ from core.utils.cache_utils import (
     invalidate_exam_detail,
 )
 from core.utils.roles import check_exam_department, check_session_department
+from core.utils.session_detail import get_session_aggregates
+from core.utils.station_progress import invalidate_station_progress
 from core.utils.sanitize import strip_html
 
 
@@ -293,117 +297,60 @@ def session_detail(request, session_id):
         page_obj = paginator.page(page_num)
     except (PageNotAnInteger, EmptyPage):
         page_obj = paginator.page(1)
-    students = page_obj.object_list
+    students = list(page_obj.object_list)
     
-    paths = Path.objects.filter(session=session, is_deleted=False).order_by('name')
+    # Session-level aggregates (paths, unassigned stations, completion sets,
+    # metrics) are cached; see core.utils.session_detail.
+    aggregates = get_session_aggregates(session)
+    student_counts = dict(
+        SessionStudent.objects.filter(session=session, path__isnull=False)
+        .values('path_id').annotate(n=Count('id')).values_list('path_id', 'n')
+    )
+    paths = [
+        SimpleNamespace(
+            **p,
+            student_count=student_counts.get(p['id'], 0),
+            unassigned_count=len(p['unassigned_stations']),
+        )
+        for p in aggregates['paths']
+    ]
+    path_station_ids = {p.id: p.required_station_ids for p in paths}
+
     examiner_assignments = ExaminerAssignment.objects.filter(session=session).select_related(
         'examiner', 'station'
     )
-    all_examiners = Examiner.objects.filter(is_active=True, role='examiner').order_by('full_name')
-
-    # Session metrics
-    rotation_display = 'Not set'
-    rotation_detail = None
-
-    path_rotations = [(p.name, p.rotation_minutes) for p in paths if p.rotation_minutes]
-    if path_rotations:
-        rotation_values = {m for _, m in path_rotations if m}
-        if rotation_values:
-            if len(rotation_values) == 1:
-                rotation_display = f'{rotation_values.pop()} minutes'
-            else:
-                rotation_display = 'Varies by path'
-                rotation_detail = ', '.join(
-                    f'Path {n}: {m} min' for n, m in path_rotations if m
-                )
-    elif session.exam and session.exam.station_duration_minutes:
-        rotation_display = f'{session.exam.station_duration_minutes} minutes (exam default)'
-
-    total_station_count = sum(p.station_count for p in paths)
-    station_detail = None
-    if paths.exists():
-        station_detail = ', '.join(f'Path {p.name}: {p.station_count}' for p in paths)
-    station_display = str(total_station_count)
-    if total_station_count == 0 and session.exam and session.exam.number_of_stations:
-        station_display = f'{session.exam.number_of_stations} (exam default)'
-
-    session_metrics = {
-        'rotation_display': rotation_display,
-        'rotation_detail': rotation_detail,
-        'station_display': station_display,
-        'station_detail': station_detail,
-    }
-
-    # Calculate grace period status for each submitted score
+
+    # Score management panel: submitted scores of the students on this page only
+    page_student_ids = [s.id for s in students]
     submitted_scores_list = list(StationScore.objects.filter(
-        session_student__session=session,
+        session_student_id__in=page_student_ids,
         status='submitted',
     ).select_related('examiner', 'session_student', 'station').order_by(
         'session_student__student_number', 'station__station_number'
     ))
-    
+
     _now = TimestampMixin.utc_timestamp()
+    student_submitted_station_ids = defaultdict(set)
     for score in submitted_scores_list:
         score.within_undo_window = (
             score.completed_at is not None
             and (_now - score.completed_at) <= 300
         )
+        student_submitted_station_ids[score.session_student_id].add(score.station_id)
 
-    # Build per-path unassigned station counts in a single query pass
-    # Collect station IDs that DO have an assignment for this session
-    assigned_station_ids = set(
-        ExaminerAssignment.objects.filter(session=session)
-        .values_list('station_id', flat=True)
-    )
-
-    all_examiners_cached = None
     from django.core.cache import cache as _cache
-    all_examiners_cached = _cache.get(EXAMINER_LIST_KEY)
-    if all_examiners_cached is None:
-        all_examiners_cached = list(Examiner.objects.filter(is_active=True, role='examiner').order_by('full_name'))
-        _cache.set(EXAMINER_LIST_KEY, all_examiners_cached, EXAMINER_LIST_TTL)
-    all_examiners = all_examiners_cached
-
-    total_unassigned = 0
-    paths = list(paths)   # materialise so we can annotate
-    for path in paths:
-        unassigned = [
-            s for s in path.stations.filter(active=True, is_deleted=False)
-            if s.id not in assigned_station_ids
-        ]
-        path.unassigned_stations = unassigned      # attach to object
-        path.unassigned_count = len(unassigned)    # convenience count
-        total_unassigned += len(unassigned)
+    all_examiners = _cache.get(EXAMINER_LIST_KEY)
+    if all_examiners is None:
+        all_examiners = list(Examiner.objects.filter(is_active=True, role='examiner').order_by('full_name'))
+        _cache.set(EXAMINER_LIST_KEY, all_examiners, EXAMINER_LIST_TTL)
 
-    # ── Compute truly-completed student IDs ─────────────────────────────
+    # ── Compute truly-completed student IDs (current page) ──────────────
     # A student is "completed" only when every active, non-deleted station
     # in their path has at least one submitted score.
-    path_station_ids = {
-        p.id: frozenset(
-            p.stations.filter(active=True, is_deleted=False).values_list('id', flat=True)
-        )
-        for p in paths
-    }
-    # Submitted station IDs per student (scoped to their path's active stations)
-    student_submitted_station_ids: dict = {}
-    for row in (
-        StationScore.objects
-        .filter(session_student__session=session, status='submitted',
-                station__active=True, station__is_deleted=False)
-        .values('session_student_id', 'station_id', 'station__path_id')
-    ):
-        sid = row['session_student_id']
-        student_submitted_station_ids.setdefault(sid, set()).add(row['station_id'])
-
     truly_completed_student_ids = set()
-    for student_obj in students_qs:
-        if not student_obj.path_id:
-            continue
-        required = path_station_ids.get(student_obj.path_id, frozenset())
-        if not required:
-            continue
-        submitted = student_submitted_station_ids.get(student_obj.id, set())
-        if required.issubset(submitted):
+    for student_obj in students:
+        required = path_station_ids.get(student_obj.path_id)
+        if required and required <= student_submitted_station_ids[student_obj.id]:
             truly_completed_student_ids.add(str(student_obj.id))
 
     return render(request, 'creator/sessions/detail.html', {
@@ -412,13 +359,13 @@ def session_detail(request, session_id):
         'page_obj': page_obj,
         'paginator': paginator,
         'search_query': search_query,
-        'total_students': students_qs.count(),
+        'total_students': paginator.count,
         'paths': paths,
         'examiner_assignments': examiner_assignments,
         'all_examiners': all_examiners,
-        'session_metrics': session_metrics,
+        'session_metrics': aggregates['session_metrics'],
         'submitted_scores': submitted_scores_list,
-        'total_unassigned': total_unassigned,
+        'total_unassigned': aggregates['total_unassigned'],
         'truly_completed_student_ids': truly_completed_student_ids,
         'can_delete_sessions': request.user.is_superuser or request.user.has_perm('core.can_delete_session'),
     })
@@ -710,41 +657,46 @@ def download_student_paths_pdf(request, session_id):
 @login_required
 def request_pdf_async(request, session_id):
     """
-    Dispatch async PDF generation via Celery.
-    Returns JSON with either 'task_id' for async polling or 'fallback_url' for sync download.
+    Start (or reuse) a background export job for the student-paths PDF.
+    Returns JSON with 'task_id' (the export job id) for polling pdf-status.
     """
-    from django.conf import settings
-    from django.urls import reverse
-    session = get_object_or_404(ExamSession, pk=session_id)
+    from core.utils.export_jobs import request_export
+    from creator.api.exports import job_payload
 
-    broker = getattr(settings, 'CELERY_BROKER_URL', '')
-    if not broker:
-        # Celery not configured – return fallback URL for direct download
-        fallback_url = reverse('creator:download_student_paths_pdf', args=[session_id])
-        return JsonResponse({'fallback_url': fallback_url})
+    session = get_object_or_404(ExamSession, pk=session_id)
+    if not check_session_department(request.user, session):
+        return HttpResponseForbidden('You do not have access to this session.')
 
-    from core.tasks import generate_pdf_report
-    result = generate_pdf_report.delay(str(session_id))
-    return JsonResponse({'task_id': result.id})
+    job, _ = request_export('student_paths_pdf', session, request.user)
+    return JsonResponse(dict(job_payload(job), task_id=str(job.pk)))
 
 
 @login_required
 def pdf_report_status(request, session_id):
     """
-    Poll the status of a PDF generation task.
+    Poll the status of a student-paths PDF export job.
     GET /sessions/<id>/pdf-status/?task_id=<uuid>
-    Returns: {status: 'running'|'done'|'error', pdf_b64?: str, filename?: str, message?: str}
+    Returns: {status: 'pending'|'running'|'done'|'error', progress, download_url?, message?}
     """
-    from django.core.cache import cache
+    from django.core.exceptions import ValidationError
+    from core.models import ExportJob
+    from creator.api.exports import job_payload
+
     task_id = request.GET.get('task_id', '')
     if not task_id:
         return JsonResponse({'status': 'error', 'message': 'Missing task_id'}, status=400)
 
-    status_key = f'osce:pdf_status:{session_id}:{task_id}'
-    result = cache.get(status_key)
-    if result is None:
-        return JsonResponse({'status': 'pending'})
-    return JsonResponse(result)
+    session = get_object_or_404(ExamSession, pk=session_id)
+    if not check_session_department(request.user, session):
+        return HttpResponseForbidden('You do not have access to this session.')
+    try:
+        job = ExportJob.objects.get(pk=task_id, session=session, kind='student_paths_pdf')
+    except (ExportJob.DoesNotExist, ValueError, ValidationError):
+        return JsonResponse({'status': 'error', 'message': 'Unknown task_id'}, status=404)
+    payload = job_payload(job)
+    if job.error:
+        payload['message'] = job.error
+    return JsonResponse(payload)
 
 
 @login_required
@@ -1017,6 +969,10 @@ def session_dry_grading(request, session_id):
         for station_score in affected_station_scores.values():
             station_score.calculate_total()
             station_score.save(update_fields=['total_score', 'percentage', 'updated_at'])
+            FinalStationResult.refresh(station_score.session_student_id, station_score.station_id)
+        invalidate_station_progress(
+            session.id, *{s.station_id for s in affected_station_scores.values()}
+        )
 
         if updated:
             from core.utils.audit import log_action
@@ -1095,6 +1051,7 @@ def unlock_score_for_correction(request, score_id):
 
     score.unlocked_for_correction = True
     score.save(update_fields=['unlocked_for_correction'])
+    FinalStationResult.refresh(score.session_student_id, score.station_id)
 
     from core.utils.audit import log_action
     log_action(
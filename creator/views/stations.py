@@ -18,6 +18,7 @@ from core.models import ILO, Station, ChecklistItem, Path, Exam
 from core.utils.roles import check_path_department, check_station_department
 from core.utils.image_validators import validate_question_image, sanitize_image_filename
 from core.utils.sanitize import strip_html, html_safe_json
+from core.utils.station_catalog import invalidate_station_catalog
 
 
 def _get_dept_folder(exam):
@@ -94,19 +95,21 @@ def station_create(request, path_id):
                     'cancel_url': reverse('creator:path_detail', kwargs={'path_id': str(path_id)}),
                 })
 
-            item_count = 0
-            for item_data in checklist_items:
-                section = item_data.get('section')
-                ChecklistItem.objects.create(
-                    station=station,
-                    item_number=item_data.get('item_number', item_count + 1),
-                    description=strip_html(item_data.get('description', '')),
-                    points=float(item_data.get('points', 1)),
-                    rubric_type=item_data.get('scoring_type', 'binary'),
-                    category=section or '',
-                    ilo_id=int(item_data['ilo_id']) if item_data.get('ilo_id') else None,
-                )
-                item_count += 1
+            with transaction.atomic():
+                # One checklist rescore for the whole station (core.utils.rescoring)
+                item_count = 0
+                for item_data in checklist_items:
+                    section = item_data.get('section')
+                    ChecklistItem.objects.create(
+                        station=station,
+                        item_number=item_data.get('item_number', item_count + 1),
+                        description=strip_html(item_data.get('description', '')),
+                        points=float(item_data.get('points', 1)),
+                        rubric_type=item_data.get('scoring_type', 'binary'),
+                        category=section or '',
+                        ilo_id=int(item_data['ilo_id']) if item_data.get('ilo_id') else None,
+                    )
+                    item_count += 1
 
             messages.success(request, f'Station "{station.name}" created with {item_count} checklist items.')
             return redirect('creator:path_detail', path_id=str(path_id))
@@ -191,50 +194,52 @@ def station_create_dry(request, path_id):
                     'cancel_url': reverse('creator:path_detail', kwargs={'path_id': str(path_id)}),
                 })
 
-            item_count = 0
-            for item_data in checklist_items:
-                section = item_data.get('section')
-                scoring_type = item_data.get('scoring_type', 'mcq')
-                rubric_levels = None
-                expected_response = ''
-                if scoring_type == 'mcq':
-                    rubric_levels = {
-                        'options': item_data.get('mcq_options', []),
-                        'correct_index': int(item_data.get('correct_index', -1)),
-                    }
-                elif scoring_type == 'essay':
-                    expected_response = item_data.get('key_answer', '')
-                new_item = ChecklistItem.objects.create(
-                    station=station,
-                    item_number=item_data.get('item_number', item_count + 1),
-                    description=strip_html(item_data.get('description', '')),
-                    points=float(item_data.get('points', 1)),
-                    rubric_type=scoring_type,
-                    rubric_levels=rubric_levels,
-                    expected_response=strip_html(expected_response),
-                    category=section or '',
-                    ilo_id=int(item_data['ilo_id']) if item_data.get('ilo_id') else None,
-                )
-                # Handle optional image upload for this item
-                img_key = f'item_image_{item_data.get("item_id", "")}'
-                img_file = request.FILES.get(img_key)
-                if img_file:
-                    try:
-                        validate_question_image(img_file)
-                        filename = sanitize_image_filename(img_file.name)
-                        dept_folder = _get_dept_folder(exam)
-                        img_file.seek(0)
-                        saved_path = default_storage.save(
-                            f'question_images/{dept_folder}/{filename}', img_file
-                        )
-                        new_item.image = saved_path
-                        new_item.save()
-                    except ValidationError as ve:
-                        messages.warning(
-                            request,
-                            f'Image for item {item_count + 1} was skipped: {ve.message}'
-                        )
-                item_count += 1
+            with transaction.atomic():
+                # One checklist rescore for the whole station (core.utils.rescoring)
+                item_count = 0
+                for item_data in checklist_items:
+                    section = item_data.get('section')
+                    scoring_type = item_data.get('scoring_type', 'mcq')
+                    rubric_levels = None
+                    expected_response = ''
+                    if scoring_type == 'mcq':
+                        rubric_levels = {
+                            'options': item_data.get('mcq_options', []),
+                            'correct_index': int(item_data.get('correct_index', -1)),
+                        }
+                    elif scoring_type == 'essay':
+                        expected_response = item_data.get('key_answer', '')
+                    new_item = ChecklistItem.objects.create(
+                        station=station,
+                        item_number=item_data.get('item_number', item_count + 1),
+                        description=strip_html(item_data.get('description', '')),
+                        points=float(item_data.get('points', 1)),
+                        rubric_type=scoring_type,
+                        rubric_levels=rubric_levels,
+                        expected_response=strip_html(expected_response),
+                        category=section or '',
+                        ilo_id=int(item_data['ilo_id']) if item_data.get('ilo_id') else None,
+                    )
+                    # Handle optional image upload for this item
+                    img_key = f'item_image_{item_data.get("item_id", "")}'
+                    img_file = request.FILES.get(img_key)
+                    if img_file:
+                        try:
+                            validate_question_image(img_file)
+                            filename = sanitize_image_filename(img_file.name)
+                            dept_folder = _get_dept_folder(exam)
+                            img_file.seek(0)
+                            saved_path = default_storage.save(
+                                f'question_images/{dept_folder}/{filename}', img_file
+                            )
+                            new_item.image = saved_path
+                            new_item.save()
+                        except ValidationError as ve:
+                            messages.warning(
+                                request,
+                                f'Image for item {item_count + 1} was skipped: {ve.message}'
+                            )
+                    item_count += 1
 
             messages.success(request, f'Dry OSCE station "{station.name}" created with {item_count} checklist items.')
             return redirect('creator:path_detail', path_id=str(path_id))
@@ -384,6 +389,7 @@ def station_edit(request, station_id):
                     ChecklistItem.objects.filter(pk__in=surviving_pks).update(
                         item_number=F('item_number') + 10000
                     )
+                    invalidate_station_catalog()
 
                 item_count = 0
                 for item_data in checklist_items:
@@ -401,8 +407,8 @@ def station_edit(request, station_id):
                         item.category = section or ''
                         item.ilo_id = int(item_data['ilo_id']) if item_data.get('ilo_id') else None
                         item.save()
-                        # sync_station_max_score signal fires on item.save() above —
-                        # it handles proportional rescaling of ItemScore and StationScore.
+                        # sync_station_max_score marks the station dirty; ItemScore and
+                        # StationScore are rescaled once when this block commits.
                     else:
                         ChecklistItem.objects.create(
                             station=station,
@@ -566,6 +572,7 @@ def station_edit_dry(request, station_id):
                     ChecklistItem.objects.filter(pk__in=surviving_pks).update(
                         item_number=F('item_number') + 10000
                     )
+                    invalidate_station_catalog()
 
                 item_count = 0
                 for item_data in checklist_items:
@@ -1,6 +1,11 @@
 """
 Student management views – add from textarea and XLSX upload.
 """
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib import messages
@@ -13,13 +18,10 @@ from django.db.models import Q
 from core.models import Exam, ExamSession, SessionStudent, Path
 from core.utils.audit import AuditLogService
 from core.utils.roles import scope_queryset
-
-
-def validate_registration_number(number):
-    """Validate that registration number contains only digits."""
-    if not number.isdigit():
-        return False, 'Registration number must contain numbers only.'
-    return True, None
+from core.utils.student_import import (
+    RosterError, get_student_import_cache_key, import_students, read_roster,
+    set_student_import_status, validate_registration_number,
+)
 
 
 @login_required
@@ -122,11 +124,14 @@ def add_students(request, session_id):
 @login_required
 @require_POST
 def upload_students_xlsx(request, session_id):
-    """Upload students from XLSX file."""
-    import openpyxl
+    """
+    Upload students from XLSX file (see core.utils.student_import).
 
+    With a Celery broker the file is handed to the ``core.import_students``
+    task and ``{task_id}`` is returned for ``students_upload_status``;
+    otherwise the import runs inline.
+    """
     session = get_object_or_404(ExamSession, pk=session_id)
-    paths = list(Path.objects.filter(session=session, is_deleted=False).order_by('name'))
 
     if 'file' not in request.FILES:
         return JsonResponse({'success': False, 'message': 'No file uploaded.'})
@@ -145,118 +150,39 @@ def upload_students_xlsx(request, session_id):
     if path_id == 'auto':
         path_id = ''
 
-    try:
-        wb = openpyxl.load_workbook(f)
-        ws = wb.active
-
-        def _sanitize_cell(val):
-            """Strip formula-triggering prefixes from imported cell values."""
-            if not isinstance(val, str):
-                return val
-            if val and val[0] in ('=', '+', '@', '\t', '\r'):
-                return val.lstrip('=+@\t\r')
-            return val
-
-        students_to_add = []
-        first_row = True
-        validation_errors = []
-        row_num = 0
-        for row in ws.iter_rows(values_only=True):
-            row_num += 1
-            if not any(row):
-                continue
-            number = str(row[0]).strip() if row[0] is not None else ''
-            name = _sanitize_cell(str(row[1]).strip()) if len(row) > 1 and row[1] is not None else ''
-
-            if first_row:
-                if number.lower() in ('student_number', 'id', 'number', 'student_id'):
-                    first_row = False
-                    continue
-                first_row = False
-
-            if number and name:
-                # Validate registration number
-                is_valid, error_msg = validate_registration_number(number)
-                if not is_valid:
-                    validation_errors.append(f'Row {row_num}: {error_msg}')
-                    continue
-                students_to_add.append((number, name))
-        
-        # Return validation errors if any
-        if validation_errors:
-            return JsonResponse({
-                'success': False,
-                'message': 'Validation errors found in XLSX:',
-                'errors': validation_errors,
-            })
-
-        if not students_to_add:
-            error_msg = 'No valid student data found in XLSX.'
-            if validation_errors:
-                error_msg += ' Check registration numbers - they must contain only digits.'
-            return JsonResponse({'success': False, 'message': error_msg})
-
-        added = 0
-        skipped = 0
-        invalid_count = 0
-        for i, (number, name) in enumerate(students_to_add):
-            if SessionStudent.objects.filter(session=session, student_number=number).exists():
-                skipped += 1
-                continue
-            
-            assigned_path_id = None
-            if path_id:
-                assigned_path_id = path_id
-            elif paths:
-                assigned_path_id = str(paths[i % len(paths)].id)
-            
-            try:
-                SessionStudent.objects.create(
-                    session=session,
-                    student_number=number,
-                    full_name=name,
-                    path_id=assigned_path_id,
-                    status='registered',
-                )
-                added += 1
-            except ValidationError as ve:
-                invalid_count += 1
-                continue
-
-        if added > 0 and skipped > 0:
-            AuditLogService.log(
-                action='STUDENT_BULK_IMPORT',
-                resource=session,
-                request=request,
-                description=f'Uploaded {added} students from XLSX to session {session.name}, {skipped} skipped',
-                extra={'added': added, 'skipped': skipped, 'source': 'xlsx'},
-            )
-            return JsonResponse({
-                'success': True,
-                'message': f'Uploaded {added} students from XLSX.',
-                'warning': f'{skipped} duplicate(s) were skipped.',
-            })
-        elif added > 0:
-            AuditLogService.log(
-                action='STUDENT_BULK_IMPORT',
-                resource=session,
-                request=request,
-                description=f'Uploaded {added} students from XLSX to session {session.name}',
-                extra={'added': added, 'source': 'xlsx'},
-            )
-            return JsonResponse({'success': True, 'message': f'Uploaded {added} students from XLSX.'})
-        elif skipped > 0:
-            return JsonResponse({
-                'success': False,
-                'message': f'All {skipped} students were already in this session.',
-            })
-        return JsonResponse({'success': False, 'message': 'No students found in XLSX.'})
+    if getattr(settings, 'CELERY_BROKER_URL', ''):
+        from core.tasks import import_students as import_students_task
+
+        task_id = str(uuid.uuid4())
+        file_name = default_storage.save(f'imports/students/{task_id}.xlsx', f)
+        set_student_import_status(task_id, {'status': 'pending', 'progress': 0})
+        import_students_task.apply_async(
+            args=[file_name, str(session.pk), path_id, request.user.pk], task_id=task_id,
+        )
+        return JsonResponse({'success': True, 'task_id': task_id})
 
-    except Exception as e:
-        error_msg = str(e)
-        if 'Registration number must contain' in error_msg:
-            return JsonResponse({'success': False, 'message': error_msg})
-        return JsonResponse({'success': False, 'message': f'Error reading XLSX: {e}'})
+    try:
+        roster = read_roster(f)
+        summary = import_students(session, roster, path_id=path_id, request=request)
+    except RosterError as exc:
+        response = {'success': False, 'message': exc.message}
+        if exc.errors:
+            response['errors'] = exc.errors
+        return JsonResponse(response)
+
+    added, skipped = summary['added'], summary['skipped']
+    if added and skipped:
+        return JsonResponse({
+            'success': True,
+            'message': f'Uploaded {added} students from XLSX.',
+            'warning': f'{skipped} duplicate(s) were skipped.',
+        })
+    elif added:
+        return JsonResponse({'success': True, 'message': f'Uploaded {added} students from XLSX.'})
+    return JsonResponse({
+        'success': False,
+        'message': f'All {skipped} students were already in this session.',
+    })
 
 
 @login_required
@@ -265,15 +191,13 @@ def students_upload_status(request, session_id):
     """
     Poll the status of an async student import task.
     GET /sessions/<id>/students/upload-status/?task_id=<uuid>
-    Returns: {status: 'pending'|'done'|'error', ...}
+    Returns: {status: 'pending'|'running'|'done'|'error', progress: int, ...}
     """
-    from django.core.cache import cache
-
     task_id = request.GET.get('task_id', '')
     if not task_id:
         return JsonResponse({'status': 'error', 'message': 'Missing task_id'}, status=400)
 
-    result = cache.get(f'osce:students_import:{task_id}')
+    result = cache.get(get_student_import_cache_key(task_id))
     if result is None:
         return JsonResponse({'status': 'pending'})
     return JsonResponse(result)
@@ -323,14 +247,14 @@ def student_list(request):
     sessions_for_exam = []
     if valid_exam_id:
         sessions_qs = ExamSession.objects.filter(exam_id=valid_exam_id).order_by('session_date')
-        sessions_qs = scope_queryset(request.user, sessions_qs, dept_field='exam__course__department')
+        sessions_qs = scope_queryset(request.user, sessions_qs, dept_field='department')
         sessions_for_exam = sessions_qs
 
     # Build queryset — scoped to user's department
     qs = SessionStudent.objects.select_related(
         'session', 'session__exam', 'path'
     ).filter(session__exam__is_deleted=False)
-    qs = scope_queryset(request.user, qs, dept_field='session__exam__course__department')
+    qs = scope_queryset(request.user, qs, dept_field='department')
 
     # If exam_id is not selected (empty or "Select Exam" placeholder), return empty queryset
     # This ensures "Select Exam" shows no results instead of all students
@@ -7,12 +7,14 @@ app_name = 'examiner_api'
 urlpatterns = [
     path('session/<uuid:session_id>/students/', api.get_session_students, name='session_students'),
     path('station/<uuid:station_id>/checklist/', api.get_station_checklist, name='station_checklist'),
+    path('assignment/<uuid:assignment_id>/progress/', api.station_progress, name='station_progress'),
     path('score/start/', api.start_marking, name='start_marking'),
     path('score/<uuid:station_score_id>/item/', api.mark_item, name='mark_item'),
     path('score/<uuid:station_score_id>/items/', api.batch_mark_items, name='batch_mark_items'),
     path('score/<uuid:station_score_id>/submit/', api.submit_score, name='submit_score'),
     path('score/<uuid:station_score_id>/undo/', api.undo_submit, name='undo_submit'),
     path('sync/', api.sync_offline_data, name='sync'),
+    path('sync/v2/', api.sync_offline_data_v2, name='sync_v2'),
     path('sync/status/', api.sync_status, name='sync_status'),
     # Dry exam verification
     path('dry/verify-student-registration/', api.verify_student_registration, name='verify_student_reg'),
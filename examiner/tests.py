@@ -1,23 +1,29 @@
 """
 Examiner app tests – login, page views, and authentication requirements.
 """
+import json
+import uuid
 from datetime import date, time
 
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from core.models import (
     Course, Exam, ExamSession, Path, Station, ChecklistItem,
-    Examiner, ExaminerAssignment, SessionStudent, ILO,
+    Examiner, ExaminerAssignment, SessionStudent, ILO, FinalStationResult,
+    AuditLog, StationScore, ItemScore,
 )
 from core.models.user_profile import UserProfile
 
 
-class ExaminerTestBase(TestCase):
-    """Shared fixtures for examiner tests."""
+class ExaminerFixtures:
+    """Shared fixtures for examiner tests (TestCase and TransactionTestCase)."""
 
     @classmethod
-    def setUpTestData(cls):
+    def create_fixtures(cls):
         cls.course = Course.objects.create(
             code='MED101', name='Medicine 1', year_level=1,
         )
@@ -67,6 +73,14 @@ class ExaminerTestBase(TestCase):
         ).update(must_change_password=False)
 
 
+class ExaminerTestBase(ExaminerFixtures, TestCase):
+    """Shared fixtures for examiner tests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_fixtures()
+
+
 class ExaminerLoginTest(ExaminerTestBase):
     """Test the examiner login flow."""
 
@@ -133,3 +147,644 @@ class ExaminerAuthenticatedTest(ExaminerTestBase):
         c = Client()
         r = c.get(reverse('examiner:home'))
         self.assertEqual(r.status_code, 302)
+
+
+class ScoreSubmissionTest(ExaminerTestBase):
+    """Test the marking → submit → undo flow and its final-result store."""
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.examiner)
+
+    def _post(self, name, body, *args):
+        return self.client.post(
+            reverse(f'examiner_api:{name}', args=args),
+            data=json.dumps(body), content_type='application/json',
+        )
+
+    def _start_and_mark(self, points):
+        r = self._post('start_marking', {
+            'session_student_id': str(self.student.id),
+            'station_id': str(self.station.id),
+        })
+        score_id = json.loads(r.content)['id']
+        self._post('mark_item', {'checklist_item_id': self.item.id, 'score': points}, score_id)
+        return score_id
+
+    def test_submit_materializes_final_result(self):
+        score_id = self._start_and_mark(4)
+        r = self._post('submit_score', {'comments': ''}, score_id)
+        self.assertEqual(r.status_code, 200)
+
+        final = FinalStationResult.objects.get(
+            session_student=self.student, station=self.station,
+        )
+        self.assertEqual(final.final_score, 4.0)
+        self.assertEqual(final.examiner_count, 1)
+        self.assertFalse(final.both_submitted)
+        self.assertEqual(final.session_id, self.session.id)
+
+    def test_undo_removes_final_result(self):
+        score_id = self._start_and_mark(3)
+        self._post('submit_score', {}, score_id)
+        r = self._post('undo_submit', {}, score_id)
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(FinalStationResult.objects.filter(
+            session_student=self.student, station=self.station,
+        ).exists())
+
+
+class StationProgressCacheTest(ExaminerTestBase):
+    """Test the cached per-station progress behind the station dashboard."""
+
+    _post = ScoreSubmissionTest._post
+    _start_and_mark = ScoreSubmissionTest._start_and_mark
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.examiner)
+        self.co_examiner = Examiner.objects.create_user(
+            username='examiner2', password='ExamPass123!',
+            full_name='Co Examiner', email='ex2@osce.local',
+        )
+        UserProfile.objects.filter(user=self.co_examiner).update(must_change_password=False)
+        ExaminerAssignment.objects.create(
+            session=self.session, station=self.station, examiner=self.co_examiner,
+        )
+        self.progress_url = reverse('examiner_api:station_progress', args=[self.assignment.id])
+
+    def _progress(self):
+        return json.loads(self.client.get(self.progress_url).content)
+
+    def test_progress_built_in_one_query_and_cached(self):
+        from core.utils.station_progress import get_station_progress
+        with CaptureQueriesContext(connection) as ctx:
+            students = get_station_progress(self.session.id, self.station.id, self.path.id)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual([s['student_number'] for s in students], ['12345'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            get_station_progress(self.session.id, self.station.id, self.path.id)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_submit_and_undo_refresh_progress(self):
+        self.assertEqual(self._progress()['scored_count'], 0)
+        score_id = self._start_and_mark(4)
+        self._post('submit_score', {}, score_id)
+
+        data = self._progress()
+        self.assertEqual((data['scored_count'], data['remaining_count']), (1, 0))
+        self.assertEqual(data['students'][0]['my_score'], 4.0)
+        self.assertIsNone(data['students'][0]['final_score'])
+
+        self._post('undo_submit', {}, score_id)
+        data = self._progress()
+        self.assertEqual(data['scored_count'], 0)
+        self.assertIsNone(data['students'][0]['my_score'])
+
+    def test_student_changes_refresh_progress(self):
+        self.assertEqual(self._progress()['total_count'], 1)
+        student = SessionStudent.objects.create(
+            session=self.session, student_number='67890',
+            full_name='Second Student', path=self.path,
+        )
+        self.assertEqual(self._progress()['total_count'], 2)
+
+        other_path = Path.objects.create(session=self.session, name='Path 2')
+        student.path = other_path
+        student.save()
+        self.assertEqual(self._progress()['total_count'], 1)
+
+        student.path = self.path
+        student.save()
+        self.assertEqual(self._progress()['total_count'], 2)
+        student.delete()
+        self.assertEqual(self._progress()['total_count'], 1)
+
+    def test_dual_examiner_view(self):
+        score_id = self._start_and_mark(4)
+        self._post('submit_score', {}, score_id)
+        self.client.force_login(self.co_examiner)
+        score_id = self._start_and_mark(2)
+        self._post('submit_score', {}, score_id)
+
+        self.client.force_login(self.examiner)
+        r = self.client.get(reverse('examiner:station_dashboard', args=[self.assignment.id]))
+        entry = r.context['student_list'][0]
+        self.assertEqual((entry['my_score'], entry['other_examiner_score']), (4.0, 2.0))
+        self.assertTrue(entry['both_submitted'])
+        self.assertEqual(entry['final_score'], 3.0)
+
+    def test_progress_requires_own_assignment(self):
+        self.client.force_login(self.co_examiner)
+        self.assertEqual(self.client.get(self.progress_url).status_code, 403)
+
+
+class OfflineSyncV2Test(ExaminerTestBase):
+    """Test the bulk, idempotent v2 offline sync endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.examiner)
+        self.url = reverse('examiner_api:sync_v2')
+
+    def _record(self, local_uuid, ts, points, status='submitted', **extra):
+        record = {
+            'local_uuid': local_uuid,
+            'session_student_id': str(self.student.id),
+            'station_id': str(self.station.id),
+            'status': status,
+            'local_timestamp': ts,
+            'items': [{'checklist_item_id': self.item.id, 'score': points}],
+        }
+        record.update(extra)
+        return record
+
+    def _sync(self, *records):
+        r = self.client.post(self.url, data=json.dumps({'scores': list(records)}),
+                             content_type='application/json')
+        self.assertEqual(r.status_code, 200)
+        return json.loads(r.content)['results']
+
+    def test_creates_scores_with_items_and_is_retry_safe(self):
+        local_uuid = str(uuid.uuid4())
+        record = self._record(local_uuid, 100, 9)   # clamped to the item's 5 points
+        results = self._sync(record)
+        self.assertEqual(results[local_uuid]['status'], 'synced')
+        self.assertEqual(results[local_uuid]['total_score'], 5)
+
+        score = StationScore.objects.get(local_uuid=local_uuid)
+        self.assertEqual(score.item_scores.get().score, 5)
+        self.assertEqual(score.max_score, 5)
+        self.assertEqual(FinalStationResult.objects.get(station=self.station).final_score, 5)
+
+        # Replaying the same batch after a dropped response changes nothing
+        self.assertEqual(self._sync(record)[local_uuid]['status'], 'unchanged')
+        self.assertEqual(StationScore.objects.count(), 1)
+
+    def test_query_count_independent_of_batch_size(self):
+        students = SessionStudent.objects.bulk_create([
+            SessionStudent(session=self.session, student_number=f'8{i:04d}',
+                           full_name=f'Student {i}', path=self.path)
+            for i in range(21)
+        ])
+
+        def sync_batch(batch):
+            records = [
+                self._record(str(uuid.uuid4()), 100, 3, status='in_progress',
+                             session_student_id=str(s.id))
+                for s in batch
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                results = self._sync(*records)
+            self.assertEqual({r['status'] for r in results.values()}, {'synced'})
+            return len(ctx.captured_queries)
+
+        sync_batch(students[:1])   # warm-up: first request also touches session/profile
+        self.assertEqual(sync_batch(students[1:2]), sync_batch(students[2:]))
+        self.assertEqual(StationScore.objects.count(), 21)
+
+    def test_older_and_foreign_records_are_rejected(self):
+        local_uuid = str(uuid.uuid4())
+        self._sync(self._record(local_uuid, 200, 4, status='in_progress'))
+        stale = self._sync(self._record(local_uuid, 100, 1, status='in_progress'))
+        self.assertEqual(stale[local_uuid]['status'], 'conflict')
+        self.assertEqual(stale[local_uuid]['server_timestamp'], 200)
+
+        other_station = Station.objects.create(
+            exam=self.exam, path=self.path, station_number=2, name='Station 2',
+        )
+        foreign_uuid = str(uuid.uuid4())
+        foreign = self._sync(self._record(foreign_uuid, 100, 1, station_id=str(other_station.id)))
+        self.assertEqual(foreign[foreign_uuid], {'status': 'error', 'error': 'Not assigned'})
+
+    def test_bad_fields_reject_only_their_record(self):
+        good = str(uuid.uuid4())
+        bad = {
+            'client': self._record(str(uuid.uuid4()), 100, 1, client_id=None),
+            'timestamp': self._record(str(uuid.uuid4()), 'soon', 1),
+            'notes': self._record(str(uuid.uuid4()), 100, 1, items=[
+                {'checklist_item_id': self.item.id, 'score': 1, 'notes': None},
+            ]),
+        }
+        other = SessionStudent.objects.bulk_create([
+            SessionStudent(session=self.session, student_number=f'7{i:04d}',
+                           full_name=f'Student {i}', path=self.path)
+            for i in range(len(bad) + 1)
+        ])
+        records = [self._record(good, 100, 4, session_student_id=str(other[0].id))]
+        for student, record in zip(other[1:], bad.values()):
+            record['session_student_id'] = str(student.id)
+            records.append(record)
+        records += [self._record('not-a-uuid', 100, 1), {'status': 'submitted'}]
+
+        results = self._sync(*records)
+        self.assertEqual(results[good]['status'], 'synced')
+        self.assertEqual(results[bad['client']['local_uuid']]['status'], 'synced')
+        self.assertEqual(results[bad['notes']['local_uuid']]['status'], 'synced')
+        self.assertEqual(
+            results[bad['timestamp']['local_uuid']],
+            {'status': 'error', 'error': 'Invalid local_timestamp'},
+        )
+        self.assertEqual(results['not-a-uuid'], {'status': 'error', 'error': 'Invalid local_uuid'})
+        self.assertEqual(results['#5'], {'status': 'error', 'error': 'Invalid local_uuid'})
+
+    def test_submitted_record_completes_student(self):
+        self._sync(self._record(str(uuid.uuid4()), 100, 4))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.status, 'completed')
+        self.assertIsNotNone(self.student.completed_at)
+
+    def test_submitted_score_is_not_reopened(self):
+        local_uuid = str(uuid.uuid4())
+        self._sync(self._record(local_uuid, 100, 4))
+        later = self._sync(self._record(local_uuid, 200, 1, status='in_progress'))
+        self.assertEqual(later[local_uuid]['status'], 'conflict')
+        self.assertEqual(StationScore.objects.get(local_uuid=local_uuid).status, 'submitted')
+
+
+class StationChecklistCacheTest(ExaminerTestBase):
+    """Test the compiled checklist payload cache and its ETag revalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.examiner)
+        self.url = reverse('examiner_api:station_checklist', args=[self.station.id])
+
+    def test_if_none_match_returns_304_without_rebuilding(self):
+        r = self.client.get(self.url)
+        self.assertEqual(r.status_code, 200)
+        etag = r['ETag']
+        self.assertEqual(json.loads(r.content)['station']['max_score'], 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r['ETag'], etag)
+        self.assertFalse(any('checklist_items' in q['sql'] for q in ctx.captured_queries))
+
+    def test_item_change_invalidates_payload(self):
+        etag = self.client.get(self.url)['ETag']
+        self.item.points = 7
+        self.item.save()
+
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r['ETag'], etag)
+        self.assertEqual(json.loads(r.content)['station']['max_score'], 7)
+
+
+class RLSContextCacheTest(ExaminerTestBase):
+    """Test the per-user RLS context cache in RLSSessionMiddleware."""
+
+    def setUp(self):
+        from core.middleware import RLSSessionMiddleware
+        from django.test import RequestFactory
+        cache.clear()
+        self.middleware = RLSSessionMiddleware(lambda request: None)
+        self.request = RequestFactory().get('/')
+        self.request.user = self.examiner
+
+    def _station_ids(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('app.station_ids', true)")
+            return cursor.fetchone()[0]
+
+    def test_warm_request_skips_assignment_lookup(self):
+        self.middleware._set_session_vars(self.request)
+        self.assertEqual(self._station_ids(), str(self.station.id))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.middleware._set_session_vars(self.request)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('set_config', ctx.captured_queries[0]['sql'])
+        self.assertEqual(self._station_ids(), str(self.station.id))
+
+    def test_completed_session_stations_excluded(self):
+        self.session.status = 'completed'
+        self.session.save()
+        self.middleware._set_session_vars(self.request)
+        self.assertEqual(self._station_ids(), '')
+
+    def test_assignment_change_invalidates_context(self):
+        self.middleware._set_session_vars(self.request)
+        self.assignment.delete()
+        self.middleware._set_session_vars(self.request)
+        self.assertEqual(self._station_ids(), '')
+
+
+class ExaminerHomeSnapshotTest(ExaminerTestBase):
+    """Test the cached per-examiner home snapshot (core.utils.examiner_home)."""
+
+    def setUp(self):
+        cache.clear()
+        self.today = date.today()
+        ExamSession.objects.filter(pk=self.session.pk).update(session_date=self.today)
+        self.client = Client()
+        self.client.force_login(self.examiner)
+
+    def test_warm_home_is_one_status_query(self):
+        from core.utils.examiner_home import get_examiner_home
+        get_examiner_home(self.examiner.id, self.today)
+
+        with CaptureQueriesContext(connection) as ctx:
+            running, upcoming = get_examiner_home(self.examiner.id, self.today)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(running), 1)
+        self.assertEqual(upcoming, [])
+        card = running[0]
+        self.assertEqual(card['assignment']['id'], self.assignment.id)
+        self.assertEqual(card['total_students'], 1)
+        self.assertEqual(card['path_name'], 'Path 1')
+        self.assertEqual(card['session']['exam']['name'], 'Test Exam')
+
+    def test_status_is_read_live(self):
+        from core.utils.examiner_home import get_examiner_home
+        get_examiner_home(self.examiner.id, self.today)
+        ExamSession.objects.filter(pk=self.session.pk).update(status='scheduled')
+
+        running, upcoming = get_examiner_home(self.examiner.id, self.today)
+        self.assertEqual(running, [])
+        self.assertEqual([c['assignment_id'] for c in upcoming], [str(self.assignment.id)])
+
+    def test_activation_rebuilds_and_student_change_invalidates(self):
+        from core.utils.cache_utils import get_examiner_home_cache_key, invalidate_session_detail
+        from core.utils.examiner_home import rebuild_session_examiner_homes
+        key = get_examiner_home_cache_key(self.examiner.id, self.today)
+
+        rebuild_session_examiner_homes(self.session.id, self.today)
+        self.assertEqual(cache.get(key)[0]['total_students'], 1)
+
+        SessionStudent.objects.create(
+            session=self.session, student_number='67890',
+            full_name='Second Student', path=self.path,
+        )
+        self.assertIsNone(cache.get(key))
+
+        r = self.client.get(reverse('examiner:home'))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['assignments'][0]['total_students'], 2)
+
+        SessionStudent.objects.filter(student_number='67890').delete()
+        r = self.client.get(reverse('examiner:home'))
+        self.assertEqual(r.context['assignments'][0]['total_students'], 1)
+
+        invalidate_session_detail(self.session.id)
+        self.assertIsNone(cache.get(key))
+
+    def test_assignment_delete_invalidates_snapshot(self):
+        r = self.client.get(reverse('examiner:home'))
+        self.assertEqual(len(r.context['assignments']), 1)
+        self.assignment.delete()
+
+        r = self.client.get(reverse('examiner:home'))
+        self.assertEqual(r.context['assignments'], [])
+
+
+class MarkItemQueryBenchmarkTest(ExaminerFixtures, TransactionTestCase):
+    """
+    Queries per mark_item with the legacy per-save audit path vs the
+    request-scoped buffer.  Needs real commits so on_commit flushes run.
+    """
+
+    serialized_rollback = True
+    MARKS = 5
+
+    def setUp(self):
+        self.create_fixtures()
+        self.items = [self.item] + [
+            ChecklistItem.objects.create(
+                station=self.station, ilo=self.ilo,
+                item_number=n, description=f'Item {n}', points=2,
+            )
+            for n in range(2, self.MARKS + 1)
+        ]
+        self.client = Client()
+        self.client.force_login(self.examiner)
+        r = self.client.post(
+            reverse('examiner_api:start_marking'),
+            data=json.dumps({
+                'session_student_id': str(self.student.id),
+                'station_id': str(self.station.id),
+            }),
+            content_type='application/json',
+        )
+        self.score_id = json.loads(r.content)['id']
+        # Warm up: create the ItemScore rows so every measured call is an update
+        self._queries_per_mark(0)
+
+    def _queries_per_mark(self, score):
+        url = reverse('examiner_api:mark_item', args=[self.score_id])
+        with CaptureQueriesContext(connection) as ctx:
+            for item in self.items:
+                r = self.client.post(
+                    url, data=json.dumps({'checklist_item_id': item.id, 'score': score}),
+                    content_type='application/json',
+                )
+                self.assertEqual(r.status_code, 200)
+        return len(ctx.captured_queries) / len(self.items)
+
+    def test_buffered_audit_uses_fewer_queries(self):
+        with override_settings(AUDIT_BUFFER_SIGNALS=False):
+            before = self._queries_per_mark(1)
+            # No load-time snapshot either: pre_save reads the row instead
+            self.assertFalse(hasattr(ItemScore.objects.first(), '_audit_snapshot'))
+        logs_before = AuditLog.objects.count()
+        with override_settings(AUDIT_BUFFER_SIGNALS=True):
+            after = self._queries_per_mark(2)
+
+        self.assertLess(after, before, f'queries/mark_item: legacy={before:.1f} buffered={after:.1f}')
+        # Same audit coverage: one ItemScore + one StationScore entry per mark
+        self.assertEqual(AuditLog.objects.count() - logs_before, 2 * self.MARKS)
+
+
+class SubmitScoreFixtures(ExaminerFixtures):
+    """
+    Scores to submit with the previous per-save flow (reproduced in
+    ``_legacy_submit``) and with ``submit_station_score``.
+    """
+
+    STUDENTS = 2
+    STATIONS = 4
+
+    @classmethod
+    def create_stations(cls):
+        cls.stations = [cls.station] + [
+            Station.objects.create(
+                exam=cls.exam, path=cls.path, station_number=n, name=f'Station {n}',
+            )
+            for n in range(2, cls.STATIONS + 1)
+        ]
+        for station in cls.stations[1:]:
+            ChecklistItem.objects.create(
+                station=station, ilo=cls.ilo, item_number=1, description='Item', points=5,
+            )
+
+    def _make_scores(self, prefix):
+        students = [
+            SessionStudent.objects.create(
+                session=self.session, student_number=f'{prefix}{n:03d}',
+                full_name=f'Student {n}', path=self.path,
+            )
+            for n in range(self.STUDENTS)
+        ]
+        # Station-major, like a rotation
+        score_ids = []
+        for station in self.stations:
+            for student in students:
+                score = StationScore.objects.create(
+                    session_student=student, station=station, examiner=self.examiner,
+                    max_score=5, status='in_progress',
+                )
+                ItemScore.objects.create(
+                    station_score=score, checklist_item=station.checklist_items.first(),
+                    score=3, max_points=5,
+                )
+                score_ids.append(score.id)
+        return students, score_ids
+
+    @staticmethod
+    def _legacy_submit(score_id):
+        score = StationScore.objects.get(pk=score_id)
+        StationScore.objects.filter(
+            session_student_id=score.session_student_id, station_id=score.station_id,
+            status='submitted',
+        ).exclude(pk=score.pk).exists()
+        score.calculate_total()
+        score.status = 'submitted'
+        score.save()
+        FinalStationResult.refresh(score.session_student_id, score.station_id)
+        student = score.session_student
+        path = Path.objects.get(pk=student.path_id)
+        total_stations = path.stations.filter(active=True, is_deleted=False).count()
+        done = (
+            student.station_scores
+            .filter(status='submitted', station__path_id=student.path_id,
+                    station__active=True, station__is_deleted=False)
+            .values('station_id').distinct().count()
+        )
+        student.status = 'completed' if done >= total_stations else 'in_progress'
+        student.save()
+
+    @staticmethod
+    def _submit(score_id):
+        from core.utils.score_submission import submit_station_score
+        score = StationScore.objects.select_related('session_student__session').get(pk=score_id)
+        submit_station_score(score)
+
+    def assertSubmitted(self, students, score_ids):
+        self.assertEqual(
+            set(SessionStudent.objects.filter(pk__in=[s.pk for s in students])
+                .values_list('status', flat=True)),
+            {'completed'},
+        )
+        self.assertEqual(
+            StationScore.objects.filter(pk__in=score_ids, status='submitted', total_score=3).count(),
+            len(score_ids),
+        )
+
+
+class SubmitScoreQueryCountTest(SubmitScoreFixtures, TestCase):
+    """Queries per submission: legacy flow vs ``submit_station_score``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_fixtures()
+        cls.create_stations()
+
+    def setUp(self):
+        cache.clear()
+
+    def _queries(self, fn, score_ids):
+        """Queries of each submission in ``score_ids``."""
+        counts = []
+        for score_id in score_ids:
+            with CaptureQueriesContext(connection) as ctx:
+                fn(score_id)
+            counts.append(len(ctx.captured_queries))
+        return counts
+
+    def test_submit_uses_fewer_queries(self):
+        new_students, new_ids = self._make_scores('N')
+        _, legacy_ids = self._make_scores('L')
+        self._submit(new_ids[0])  # builds the cached session aggregates
+
+        # Fixed per submission, whether or not it completes the student
+        for score_id in new_ids[1:]:
+            with self.assertNumQueries(12):
+                self._submit(score_id)
+        legacy = self._queries(self._legacy_submit, legacy_ids)
+        self.assertLess(12, min(legacy), f'queries/submit: legacy={legacy}')
+
+        self.assertSubmitted(new_students, new_ids)
+
+
+class SubmitScoreLatencyBenchmarkTest(SubmitScoreFixtures, TransactionTestCase):
+    """
+    p95 latency of concurrent submissions, legacy flow vs
+    ``submit_station_score``.  Each worker thread has its own connection and
+    every submission commits, so the row locks are really contended.
+
+    Each flow runs ROUNDS times, alternating, and the best p95 of each is
+    compared: a single wall-clock sample is too noisy on a loaded machine.
+    """
+
+    serialized_rollback = True
+    STUDENTS = 8
+    WORKERS = 8
+    ROUNDS = 3
+
+    def setUp(self):
+        self.create_fixtures()
+        self.create_stations()
+        cache.clear()
+
+    def _p95(self, fn, score_ids):
+        import statistics
+        import threading
+        import time
+
+        latencies = []
+        errors = []
+
+        def worker(ids):
+            try:
+                for score_id in ids:
+                    started = time.perf_counter()
+                    fn(score_id)
+                    latencies.append(time.perf_counter() - started)
+            except Exception as exc:  # surfaced below; a thread can't fail the test
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(score_ids[n::self.WORKERS],))
+            for n in range(self.WORKERS)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(latencies), len(score_ids))
+        return statistics.quantiles(latencies, n=20)[18]
+
+    def test_concurrent_submit_p95_drops(self):
+        self._submit(self._make_scores('W')[1][0])  # builds the cached session aggregates
+
+        new_p95, legacy_p95 = [], []
+        for n in range(self.ROUNDS):
+            new_students, new_ids = self._make_scores(f'N{n}')
+            _, legacy_ids = self._make_scores(f'L{n}')
+            new_p95.append(self._p95(self._submit, new_ids))
+            legacy_p95.append(self._p95(self._legacy_submit, legacy_ids))
+            # Row locking means concurrent stations never lose the completion
+            self.assertSubmitted(new_students, new_ids)
+
+        self.assertLess(
+            min(new_p95), min(legacy_p95),
+            f'p95: legacy={min(legacy_p95) * 1000:.1f}ms atomic={min(new_p95) * 1000:.1f}ms',
+        )
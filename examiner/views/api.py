@@ -9,17 +9,25 @@ from datetime import datetime, timedelta, timezone
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError, transaction
-from django.http import JsonResponse
+from django.db.models import Sum
+from django.http import HttpResponseNotModified, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.http import parse_etags
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST, require_GET
 
 from core.models import (
     SessionStudent, Station, ChecklistItem, ExaminerAssignment,
-    StationScore, ItemScore, Path,
+    StationScore, ItemScore, FinalStationResult,
 )
 from core.models.mixins import TimestampMixin
+from core.utils import live_progress
+from core.utils.station_progress import (
+    examiner_progress, get_station_progress, invalidate_scores_progress, invalidate_station_progress,
+)
+from core.utils.score_submission import refresh_student_statuses, submit_station_score
+from core.utils.checklist_cache import get_station_checklist as get_station_checklist_payload
 from core.utils.audit import log_action, AuditLogService
 
 
@@ -82,74 +90,24 @@ def get_station_checklist(request, station_id):
         if not has_assignment:
             return JsonResponse({'error': 'Not assigned to this station'}, status=403)
 
-    items = ChecklistItem.objects.filter(
-        station_id=station_id,
-    ).select_related('ilo', 'ilo__theme').order_by('item_number')
-
-    def build_item_response(item):
-        try:
-            image_url = request.build_absolute_uri(item.image.url) if item.image and item.image.name else None
-        except Exception:
-            image_url = None
-        response = {
-            'id': item.id,
-            'item_number': item.item_number,
-            'description': item.description,
-            'points': item.points,
-            'category': item.category or 'General',
-            'expected_response': item.expected_response,
-            'rubric_type': item.rubric_type or 'binary',
-            'rubric_levels': None,
-            'ilo_name': item.ilo.theme_name if item.ilo else None,
-            'ilo_number': item.ilo.number if item.ilo else None,
-            'image_url': image_url,
-        }
-
-        # Parse rubric levels
-        if item.rubric_levels:
-            if isinstance(item.rubric_levels, (list, dict)):
-                # JSONField already deserialized to Python object
-                response['rubric_levels'] = item.rubric_levels
-            else:
-                try:
-                    response['rubric_levels'] = json.loads(item.rubric_levels)
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-        # Generate defaults based on type
-        if not response['rubric_levels']:
-            rubric_type = response['rubric_type']
-            max_pts = item.points
-            if rubric_type == 'binary':
-                response['rubric_levels'] = [
-                    {'score': 0, 'label': 'Not Done', 'color': 'danger'},
-                    {'score': max_pts, 'label': 'Done', 'color': 'success'},
-                ]
-            elif rubric_type == 'partial':
-                response['rubric_levels'] = [
-                    {'score': 0, 'label': 'Not Done', 'color': 'danger'},
-                    {'score': max_pts * 0.5, 'label': 'Partial', 'color': 'warning'},
-                    {'score': max_pts, 'label': 'Complete', 'color': 'success'},
-                ]
-            elif rubric_type == 'scale':
-                response['rubric_levels'] = [
-                    {'score': i, 'label': str(i), 'color': 'secondary'}
-                    for i in range(max_pts + 1)
-                ]
-
-        return response
-
-    return JsonResponse({
-        'station': {
-            'id': str(station.id),
-            'name': station.name,
-            'scenario': station.scenario,
-            'instructions': station.instructions,
-            'duration_minutes': station.duration_minutes,
-            'max_score': station.get_max_score(),
-        },
-        'items': [build_item_response(item) for item in items],
-    })
+    # Compiled once per station content; revalidation costs no rebuild
+    etag, payload = get_station_checklist_payload(station)
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        items = payload['items']
+        if any(item['image_url'] for item in items):
+            items = [
+                dict(item, image_url=request.build_absolute_uri(item['image_url']))
+                if item['image_url'] else item
+                for item in items
+            ]
+        response = JsonResponse(dict(payload, items=items))
+    response['ETag'] = etag
+    # Revalidate on every use; the private HTTP cache / service worker keep the body
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 # ── Scoring endpoints ─────────────────────────────────────────────
@@ -236,6 +194,7 @@ def start_marking(request):
 
     log_action(request, 'CREATE', 'StationScore', str(score.id),
                f'Started marking student {session_student_id} at station {station_id}')
+    live_progress.touch_examiner(student.session_id, request.user.id)
 
     return JsonResponse({
         'id': str(score.id),
@@ -425,60 +384,27 @@ def submit_score(request, station_score_id):
     if err:
         return err
 
-    score = get_object_or_404(StationScore, pk=station_score_id)
+    score = get_object_or_404(
+        StationScore.objects.select_related('session_student__session'), pk=station_score_id,
+    )
 
     if score.examiner_id != request.user.id:
         return JsonResponse({'error': 'Unauthorized'}, status=403)
 
     is_correction = score.unlocked_for_correction  # capture before clearing
     old_score = score.total_score                  # capture before recalculation
+    first_for_station, student_completed = submit_station_score(
+        score, global_rating=data.get('global_rating'), comments=data.get('comments', ''),
+    )
 
-    score.calculate_total()
-    score.global_rating = data.get('global_rating')
-    score.comments = data.get('comments', '')
-    score.completed_at = utc_timestamp()
-    score.status = 'submitted'
-    score.unlocked_for_correction = False  # clear any coordinator unlock on re-submit
-    score.updated_at = utc_timestamp()
-    score.save()
-
-    # Update student status
     student = score.session_student
-
-    if student.path_id:
-        try:
-            path = Path.objects.get(pk=student.path_id)
-            # Count distinct stations (active & not deleted) in the student's path
-            total_stations = path.stations.filter(active=True, is_deleted=False).count()
-            # Count distinct path stations that have at least one submitted score
-            completed_station_count = (
-                student.station_scores
-                .filter(
-                    status='submitted',
-                    station__path_id=student.path_id,
-                    station__active=True,
-                    station__is_deleted=False,
-                )
-                .values('station_id')
-                .distinct()
-                .count()
-            )
-            if total_stations > 0 and completed_station_count >= total_stations:
-                student.status = 'completed'
-                student.completed_at = utc_timestamp()
-            elif completed_station_count > 0:
-                student.status = 'in_progress'
-        except Path.DoesNotExist:
-            # Path gone – fall back to raw submitted count
-            fallback = student.station_scores.filter(status='submitted').values('station_id').distinct().count()
-            if fallback > 0:
-                student.status = 'in_progress'
-    else:
-        # No path assigned – just track progress
-        fallback = student.station_scores.filter(status='submitted').values('station_id').distinct().count()
-        if fallback > 0:
-            student.status = 'in_progress'
-    student.save()
+    invalidate_station_progress(student.session_id, score.station_id)
+    live_progress.record_submission(
+        student.session_id, score.station_id, request.user.id,
+        path_id=student.path_id,
+        first_for_station=first_for_station,
+        student_completed=student_completed,
+    )
 
     if is_correction:
         from core.models.audit import SCORE_AMENDED
@@ -542,6 +468,13 @@ def undo_submit(request, station_score_id):
     score.completed_at = None
     score.updated_at = utc_timestamp()
     score.save()
+    remaining = FinalStationResult.refresh(score.session_student_id, score.station_id)
+    session_id = score.session_student.session_id
+    invalidate_station_progress(session_id, score.station_id)
+    live_progress.record_undo(
+        session_id, score.station_id, request.user.id,
+        station_cleared=not remaining,
+    )
 
     from core.models.audit import SCORE_UPDATED
     AuditLogService.log(
@@ -557,6 +490,47 @@ def undo_submit(request, station_score_id):
     return JsonResponse({'success': True, 'message': 'Score reopened for editing'})
 
 
+@login_required
+@require_GET
+def station_progress(request, assignment_id):
+    """
+    Marking progress for one assignment (partial refresh of the station
+    dashboard): counts plus per-student my / other / final scores.
+    """
+    assignment = get_object_or_404(
+        ExaminerAssignment.objects.select_related('station'), pk=assignment_id,
+    )
+    if assignment.examiner_id != request.user.id:
+        return JsonResponse({'error': 'Not assigned to this station'}, status=403)
+    station = assignment.station
+    if not station or not station.path_id:
+        return JsonResponse({'error': 'Station or path not configured'}, status=400)
+
+    progress = examiner_progress(
+        get_station_progress(assignment.session_id, station.id, station.path_id),
+        request.user.id,
+    )
+    return JsonResponse({
+        'scored_count': progress['scored_count'],
+        'remaining_count': progress['remaining_count'],
+        'total_count': progress['total_count'],
+        'progress_pct': progress['progress_pct'],
+        'students': [
+            {
+                'id': str(entry['student']['id']),
+                'full_name': entry['student']['full_name'],
+                'student_number': entry['student']['student_number'],
+                'my_score': entry['my_score'],
+                'other_examiner_score': entry['other_examiner_score'],
+                'final_score': entry['final_score'],
+                'both_submitted': entry['both_submitted'],
+                'is_scored': entry['is_scored'],
+            }
+            for entry in progress['student_list']
+        ],
+    })
+
+
 # ── Offline sync endpoints ─────────────────────────────────────────
 
 @login_required
@@ -569,6 +543,7 @@ def sync_offline_data(request):
         return err
 
     synced = []
+    refreshed = []
     conflicts = []
     errors = []
 
@@ -611,6 +586,8 @@ def sync_offline_data(request):
                 existing.local_timestamp = record.get('local_timestamp')
                 existing.synced_at = utc_timestamp()
                 existing.save()
+                FinalStationResult.refresh(existing.session_student_id, existing.station_id)
+                refreshed.append((existing.session_student_id, existing.station_id))
                 synced.append(local_uuid)
             else:
                 conflicts.append({
@@ -633,8 +610,12 @@ def sync_offline_data(request):
                 sync_status='synced',
             )
             score.save()
+            if score.status == 'submitted':
+                FinalStationResult.refresh(score.session_student_id, score.station_id)
+                refreshed.append((score.session_student_id, score.station_id))
             synced.append(local_uuid)
 
+    invalidate_scores_progress(refreshed)
     log_action(request, 'SYNC', 'StationScore', '',
                f'Synced {len(synced)} scores, {len(conflicts)} conflicts, {len(errors)} rejected')
 
@@ -647,6 +628,335 @@ def sync_offline_data(request):
     })
 
 
+def _parse_sync_record(record):
+    """
+    Validate one v2 sync record; return ``(local_uuid, record, error)``,
+    ``record`` being a copy with its optional fields converted to the
+    column types (missing / null → defaults).
+    """
+    if not isinstance(record, dict):
+        return None, None, 'Invalid record'
+    try:
+        local_uuid = uuid.UUID(str(record.get('local_uuid')))
+    except (TypeError, ValueError):
+        return None, None, 'Invalid local_uuid'
+    try:
+        uuid.UUID(str(record.get('session_student_id')))
+        uuid.UUID(str(record.get('station_id')))
+    except (TypeError, ValueError):
+        return local_uuid, None, 'Invalid session_student_id or station_id'
+    if record.get('status', 'in_progress') not in ('in_progress', 'submitted'):
+        return local_uuid, None, 'Invalid status'
+    items = record.get('items') or []
+    if not isinstance(items, list):
+        return local_uuid, None, 'Invalid items'
+    try:
+        local_timestamp = int(record.get('local_timestamp') or 0)
+    except (TypeError, ValueError, OverflowError):
+        return local_uuid, None, 'Invalid local_timestamp'
+    if not -2**31 <= local_timestamp < 2**31:   # IntegerField
+        return local_uuid, None, 'Invalid local_timestamp'
+    global_rating = record.get('global_rating')
+    if global_rating is not None:
+        try:
+            global_rating = int(global_rating)
+        except (TypeError, ValueError, OverflowError):
+            return local_uuid, None, 'Invalid global_rating'
+    comments = record.get('comments')
+    if comments is not None and not isinstance(comments, str):
+        return local_uuid, None, 'Invalid comments'
+    client_id = record.get('client_id')
+    return local_uuid, dict(
+        record,
+        status=record.get('status', 'in_progress'),
+        local_timestamp=local_timestamp,
+        global_rating=global_rating,
+        comments=comments or '',
+        client_id=str(client_id)[:50] if client_id is not None else '',
+        items=[
+            dict(item, notes='' if item.get('notes') is None else str(item['notes']))
+            for item in items if isinstance(item, dict)
+        ],
+    ), None
+
+
+@login_required
+@csrf_exempt
+@require_POST
+def sync_offline_data_v2(request):
+    """
+    Bulk, idempotent offline sync (v2).
+
+    Accepts JSON body:
+        {"scores": [{
+            "local_uuid": "…", "session_student_id": "…", "station_id": "…",
+            "status": "in_progress" | "submitted", "comments": "", "global_rating": null,
+            "local_timestamp": 1700000000, "client_id": "…",
+            "items": [{"checklist_item_id": 1, "score": 2.0, "notes": ""}, ...]
+        }, ...]}
+
+    Students, assignments, existing scores and checklist items are resolved
+    with one set query each, then station scores and item scores are written
+    with ``bulk_create(update_conflicts=True)``.  Returns one result per record
+    keyed by ``local_uuid`` (records without a valid one by the value sent,
+    or ``#<index>`` when it is missing):
+
+        synced     written (created or updated)
+        unchanged  already applied — a retry of the same record
+        conflict   the server copy is newer (``server_timestamp``)
+        error      rejected (``error``)
+    """
+    from django.conf import settings
+
+    data, err = _parse_json_body(request)
+    if err:
+        return err
+    records = data.get('scores') if isinstance(data, dict) else None
+    if not isinstance(records, list):
+        return JsonResponse({'error': 'Missing or invalid "scores" array'}, status=400)
+    max_batch = getattr(settings, 'MAX_OFFLINE_QUEUE', 100)
+    if len(records) > max_batch:
+        return JsonResponse({'error': f'At most {max_batch} records per batch'}, status=400)
+
+    results = {}
+    latest = {}   # local_uuid -> record; a client may queue the same score twice
+    for index, raw in enumerate(records):
+        local_uuid, record, error = _parse_sync_record(raw)
+        if local_uuid is None:
+            sent = raw.get('local_uuid') if isinstance(raw, dict) else None
+            results[str(sent) if sent not in (None, '') else f'#{index}'] = {
+                'status': 'error', 'error': error,
+            }
+            continue
+        if error:
+            results[str(local_uuid)] = {'status': 'error', 'error': error}
+            continue
+        prev = latest.get(local_uuid)
+        if prev is None or record['local_timestamp'] >= prev['local_timestamp']:
+            latest[local_uuid] = record
+    valid = list(latest.items())
+
+    student_ids = {r['session_student_id'] for _, r in valid}
+    station_ids = {r['station_id'] for _, r in valid}
+
+    # ── Set lookups: one query each ───────────────────────────────────────
+    student_sessions = {
+        str(pk): (session_id, department_id)
+        for pk, session_id, department_id in SessionStudent.objects.filter(pk__in=student_ids)
+        .values_list('id', 'session_id', 'department_id')
+    }
+    assignment_keys = None
+    if not request.user.is_superuser:
+        assignment_keys = {
+            (str(session_id), str(station_id))
+            for session_id, station_id in ExaminerAssignment.objects.filter(
+                examiner=request.user, station_id__in=station_ids,
+            ).values_list('session_id', 'station_id')
+        }
+    existing_by_uuid = {
+        s.local_uuid: s
+        for s in StationScore.objects.filter(local_uuid__in=[u for u, _ in valid])
+    }
+    # Scores started online before the outage carry a server-side local_uuid
+    existing_by_slot = {
+        (str(s.session_student_id), str(s.station_id)): s
+        for s in StationScore.objects.filter(
+            examiner=request.user,
+            session_student_id__in=student_ids,
+            station_id__in=station_ids,
+        )
+    }
+    checklist = {}   # station_id -> {item_id: (points, is_dry_essay)}
+    for item_id, station_id, points, rubric_type, is_dry in ChecklistItem.objects.filter(
+        station_id__in=station_ids,
+    ).values_list('id', 'station_id', 'points', 'rubric_type', 'station__is_dry'):
+        checklist.setdefault(str(station_id), {})[item_id] = (
+            points, bool(is_dry) and rubric_type == 'essay',
+        )
+
+    # ── Resolve each record ───────────────────────────────────────────────
+    now = utc_timestamp()
+    to_write = []    # (client local_uuid, StationScore, items)
+    slots = set()
+    for local_uuid, record in valid:
+        key = str(local_uuid)
+        student_id = str(record['session_student_id'])
+        station_id = str(record['station_id'])
+        session_id, department_id = student_sessions.get(student_id, (None, None))
+        if session_id is None:
+            results[key] = {'status': 'error', 'error': 'Student not found'}
+            continue
+        if assignment_keys is not None and (str(session_id), station_id) not in assignment_keys:
+            results[key] = {'status': 'error', 'error': 'Not assigned'}
+            continue
+        if (student_id, station_id) in slots:
+            results[key] = {'status': 'error', 'error': 'Duplicate student/station in batch'}
+            continue
+
+        existing = existing_by_uuid.get(local_uuid) or existing_by_slot.get((student_id, station_id))
+        client_ts = record['local_timestamp']
+        if existing is not None:
+            if existing.examiner_id != request.user.id:
+                results[key] = {'status': 'error', 'error': 'Unauthorized'}
+                continue
+            server_ts = existing.local_timestamp or 0
+            if client_ts == server_ts and existing.local_uuid == local_uuid:
+                results[key] = {'status': 'unchanged', 'id': str(existing.id)}
+                continue
+            if client_ts <= server_ts:
+                results[key] = {
+                    'status': 'conflict', 'id': str(existing.id),
+                    'server_timestamp': server_ts, 'client_timestamp': client_ts,
+                }
+                continue
+            if existing.status == 'submitted' and not existing.unlocked_for_correction:
+                # A submission is only reopened by undo_submit or a coordinator unlock
+                results[key] = {
+                    'status': 'conflict', 'id': str(existing.id),
+                    'error': 'Score already submitted',
+                }
+                continue
+
+        station_items = checklist.get(station_id, {})
+        items = []
+        for item in record['items']:
+            cid = item.get('checklist_item_id')
+            if cid not in station_items:
+                continue
+            points, is_dry_essay = station_items[cid]
+            try:
+                value = float(item.get('score', 0))
+            except (TypeError, ValueError):
+                value = 0
+            items.append(ItemScore(
+                checklist_item_id=cid,
+                score=max(0, min(value, points)),
+                notes=item['notes'],
+                max_points=points,
+                marked_at=None if is_dry_essay else now,
+            ))
+
+        score = StationScore(
+            id=existing.id if existing else uuid.uuid4(),
+            session_student_id=student_id,
+            station_id=station_id,
+            department_id=department_id,   # bulk_create skips the pre_save fill
+            examiner=request.user,
+            local_uuid=existing.local_uuid if existing else local_uuid,
+            status=record['status'],
+            comments=record['comments'],
+            global_rating=record['global_rating'],
+            client_id=record['client_id'],
+            local_timestamp=client_ts,
+            synced_at=now,
+            sync_status='synced',
+            started_at=existing.started_at if existing else now,
+            completed_at=now if record['status'] == 'submitted' else None,
+            max_score=sum(p for p, _ in station_items.values()) or None,
+            unlocked_for_correction=(
+                bool(existing and existing.unlocked_for_correction)
+                and record['status'] != 'submitted'
+            ),
+            created_at=existing.created_at if existing else now,
+            updated_at=now,
+        )
+        slots.add((student_id, station_id))
+        to_write.append((key, score, items))
+
+    # ── Upsert ─────────────────────────────────────────────────────────────
+    if to_write:
+        with transaction.atomic():
+            StationScore.objects.bulk_create(
+                [s for _, s, _ in to_write],
+                update_conflicts=True,
+                unique_fields=['local_uuid'],
+                update_fields=[
+                    'status', 'comments', 'global_rating', 'client_id',
+                    'local_timestamp', 'synced_at', 'sync_status',
+                    'completed_at', 'max_score', 'unlocked_for_correction', 'updated_at',
+                ],
+            )
+            item_rows = []
+            for _, score, items in to_write:
+                for item in items:
+                    item.station_score_id = score.id
+                    item_rows.append(item)
+            for rows, fields in (
+                ([i for i in item_rows if i.marked_at is not None],
+                 ['score', 'notes', 'max_points', 'marked_at']),
+                ([i for i in item_rows if i.marked_at is None],
+                 ['score', 'notes', 'max_points']),   # dry essays keep marked_at unset
+            ):
+                if rows:
+                    ItemScore.objects.bulk_create(
+                        rows,
+                        update_conflicts=True,
+                        unique_fields=['station_score', 'checklist_item'],
+                        update_fields=fields,
+                    )
+
+            # Totals from the stored item scores (items synced earlier count too)
+            totals = dict(
+                ItemScore.objects.filter(station_score_id__in=[s.id for _, s, _ in to_write])
+                .values('station_score_id')
+                .annotate(total=Sum('score'))
+                .values_list('station_score_id', 'total')
+            )
+            for _, score, _ in to_write:
+                score.total_score = round(totals.get(score.id) or 0, 2)
+                score.percentage = (
+                    round(score.total_score / score.max_score * 100, 2) if score.max_score else None
+                )
+            StationScore.objects.bulk_update(
+                [s for _, s, _ in to_write], ['total_score', 'percentage'],
+            )
+            FinalStationResult.refresh_many(
+                (s.session_student_id, s.station_id) for _, s, _ in to_write
+            )
+            # Submitted records move their students on, as submit_score does
+            refresh_student_statuses(
+                {s.session_student_id for _, s, _ in to_write if s.status == 'submitted'}, now,
+            )
+
+            from core.models.audit import SCORE_SUBMITTED
+            for _, score, _ in to_write:
+                if score.status == 'submitted':
+                    AuditLogService.log_deferred(
+                        action=SCORE_SUBMITTED,
+                        user=request.user,
+                        request=request,
+                        resource=score,
+                        new_value={'total_score': score.total_score, 'max_score': score.max_score},
+                        description=f'Submitted score {score.total_score}/{score.max_score} (offline sync)',
+                    )
+
+        for key, score, _ in to_write:
+            results[key] = {
+                'status': 'synced',
+                'id': str(score.id),
+                'local_uuid': str(score.local_uuid),
+                'total_score': score.total_score,
+            }
+        touched = {}    # session_id -> station ids written
+        for _, score, _ in to_write:
+            session_id = student_sessions[str(score.session_student_id)][0]
+            touched.setdefault(session_id, set()).add(score.station_id)
+        for session_id, station_ids in touched.items():
+            live_progress.invalidate_live_progress(session_id)
+            invalidate_station_progress(session_id, *station_ids)
+
+    log_action(request, 'SYNC', 'StationScore', '',
+               f'Synced {len(to_write)} scores (v2), '
+               f'{sum(1 for r in results.values() if r["status"] == "conflict")} conflicts, '
+               f'{sum(1 for r in results.values() if r["status"] == "error")} rejected')
+
+    return JsonResponse({
+        'results': results,
+        'synced_count': len(to_write),
+        'server_time': utc_timestamp(),
+    })
+
+
 @login_required
 @require_GET
 def sync_status(request):
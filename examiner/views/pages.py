@@ -17,6 +17,8 @@ from core.models import (
 )
 from core.models.mixins import TimestampMixin
 from core.utils.audit import log_action, AuditLogService
+from core.utils.examiner_home import get_examiner_home
+from core.utils.station_progress import examiner_progress, get_station_progress
 from core.utils.sanitize import html_safe_json
 
 
@@ -48,65 +50,14 @@ def logout_view(request):
     return redirect('/login/')
 
 
-# ── helpers ────────────────────────────────────────────────────────
-
-def _build_assignment_cards(assignments):
-    """
-    Build one card per assignment. Each assignment maps to one station
-    on one path, so the examiner sees a separate card per path.
-    """
-    cards = []
-    for a in assignments:
-        if not a.station:
-            continue
-
-        student_count = 0
-        if a.station.path_id:
-            student_count = SessionStudent.objects.filter(
-                session_id=a.session_id,
-                path_id=a.station.path_id,
-            ).count()
-
-        cards.append({
-            'assignment': a,
-            'assignment_id': str(a.id),
-            'station_number': a.station.station_number,
-            'station_name': a.station.name if a.station else 'Unknown',
-            'station_duration': a.station.duration_minutes if a.station else 8,
-            'station_max_score': a.station.get_max_score() if a.station else 0,
-            'session': a.session,
-            'total_students': student_count,
-            'path_name': a.station.path.name if a.station.path else '',
-        })
-
-    return cards
-
-
 @login_required
 def home(request):
-    """Examiner home – today's stations, recent and upcoming sessions."""
+    """
+    Examiner home – today's stations and upcoming sessions, served from
+    the cached assignment snapshot (core.utils.examiner_home).
+    """
     today = datetime.now().date()
-
-    # Running Stations — only in_progress sessions for today
-    today_raw = list(
-        ExaminerAssignment.objects.filter(
-            examiner=request.user,
-            session__status='in_progress',
-            session__session_date=today,
-        ).select_related('station', 'session', 'station__path')
-    )
-    today_assignments = _build_assignment_cards(today_raw)
-
-    # Upcoming — scheduled sessions: today (not yet activated) + future dates
-    upcoming_raw = list(
-        ExaminerAssignment.objects.filter(
-            examiner=request.user,
-            session__session_date__gte=today,
-            session__status='scheduled',
-        ).select_related('station', 'session', 'station__path')
-        .order_by('session__session_date')
-    )
-    upcoming_assignments = _build_assignment_cards(upcoming_raw)
+    today_assignments, upcoming_assignments = get_examiner_home(request.user.id, today)
 
     return render(request, 'examiner/station_home.html', {
         'assignments': today_assignments,
@@ -120,7 +71,7 @@ def all_sessions(request):
     """View all sessions the examiner has been assigned to."""
     assignments = ExaminerAssignment.objects.filter(
         examiner=request.user,
-    ).select_related('station', 'session').order_by('-session__session_date')
+    ).select_related('station', 'session', 'session__exam').order_by('-session__session_date')
 
     return render(request, 'examiner/all_sessions.html', {
         'assignments': list(assignments),
@@ -156,62 +107,12 @@ def station_dashboard(request, assignment_id):
         messages.error(request, 'Station or path not configured.')
         return redirect('examiner:home')
 
-    students = SessionStudent.objects.filter(
-        session_id=assignment.session_id,
-        path_id=station.path_id,
-    ).order_by('sequence_number', 'student_number')
-
-    # Scored students by this examiner
-    scored_student_ids = set(
-        StationScore.objects.filter(
-            station_id=assignment.station_id,
-            examiner=request.user,
-            status='submitted',
-        ).values_list('session_student_id', flat=True)
+    # Per-student marking state, shared with the co-examiner and cached
+    progress = examiner_progress(
+        get_station_progress(assignment.session_id, station.id, station.path_id),
+        request.user.id,
     )
-
-    # All scores for dual-examiner view - only submitted scores
-    all_scores = StationScore.objects.filter(
-        station_id=assignment.station_id,
-        status='submitted'
-    ).select_related('examiner')
-
-    student_scores = {}
-    for score in all_scores:
-        sid = str(score.session_student_id)
-        if sid not in student_scores:
-            student_scores[sid] = {
-                'my_score': None,
-                'other_examiner_score': None,
-                'max_score': score.max_score or 0,
-                'final_score': None,
-                'both_submitted': False,
-            }
-        if score.examiner_id == request.user.id:
-            student_scores[sid]['my_score'] = score.total_score
-        else:
-            student_scores[sid]['other_examiner_score'] = score.total_score
-
-    for sid, data in student_scores.items():
-        if data['my_score'] is not None and data['other_examiner_score'] is not None:
-            data['both_submitted'] = True
-            data['final_score'] = round(
-                (data['my_score'] + data['other_examiner_score']) / 2, 2
-            )
-
-    # Build student list with score data for template
-    student_list = []
-    for s in students:
-        sid = str(s.id)
-        score_data = student_scores.get(sid, {})
-        student_list.append({
-            'student': s,
-            'my_score': score_data.get('my_score'),
-            'other_examiner_score': score_data.get('other_examiner_score'),
-            'both_submitted': score_data.get('both_submitted', False),
-            'final_score': score_data.get('final_score'),
-            'is_scored': s.id in scored_student_ids,
-        })
+    student_list = progress['student_list']
 
     # For dry stations only: sort non-submitted students before submitted ones,
     # preserving sequence_number order within each group.
@@ -219,15 +120,10 @@ def station_dashboard(request, assignment_id):
         student_list.sort(
             key=lambda x: (
                 1 if x['is_scored'] else 0,
-                x['student'].sequence_number or 0,
+                x['student']['sequence_number'] or 0,
             )
         )
 
-    scored_count = len(scored_student_ids)
-    total_count = students.count()
-    remaining_count = total_count - scored_count
-    progress_pct = round((scored_count / total_count * 100), 2) if total_count else 0
-
     # Find co-examiners assigned to the same station+session
     co_examiners = list(
         ExaminerAssignment.objects.filter(
@@ -243,10 +139,10 @@ def station_dashboard(request, assignment_id):
     return render(request, 'examiner/station_dashboard.html', {
         'assignment': assignment,
         'student_list': student_list,
-        'scored_count': scored_count,
-        'remaining_count': remaining_count,
-        'total_count': total_count,
-        'progress_pct': progress_pct,
+        'scored_count': progress['scored_count'],
+        'remaining_count': progress['remaining_count'],
+        'total_count': progress['total_count'],
+        'progress_pct': progress['progress_pct'],
         'co_examiner': co_examiner,
         'is_dual_examiner': is_dual_examiner,
     })
@@ -3,6 +3,11 @@ ASGI config for osce_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Required for the coordinator live progress stream (creator/api/live.py);
+under the default gthread WSGI workers that endpoint falls back to
+long-polling.  Serve it with e.g.
+``gunicorn osce_project.asgi:application -k uvicorn.workers.UvicornWorker``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -125,6 +125,10 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
 ]
 
+# Bulk examiner import (core/utils/examiner_import.py) hashes default
+# passwords in this many threads (worker processes in the Celery task).
+PASSWORD_HASH_WORKERS = env.int('PASSWORD_HASH_WORKERS', default=min(4, os.cpu_count() or 1))
+
 # Login URL
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/examiner/home/'
@@ -178,6 +182,21 @@ DEFAULT_ROTATION_MINUTES = 8
 AUTOSAVE_INTERVAL = 30
 MAX_OFFLINE_QUEUE = 100
 
+# Live progress feed (creator/api/live.py): an assigned examiner with no
+# marking activity for this long is reported as idle.
+LIVE_PROGRESS_IDLE_SECONDS = env.int('LIVE_PROGRESS_IDLE_SECONDS', default=60 * 15)
+
+# Background export jobs (core/utils/export_jobs.py): artifacts are kept in
+# file storage for EXPORT_ARTIFACT_TTL seconds; an identical request within
+# EXPORT_JOB_REUSE_SECONDS of a finished job gets the same artifact.
+EXPORT_ARTIFACT_TTL = env.int('EXPORT_ARTIFACT_TTL', default=60 * 60 * 24)
+EXPORT_JOB_REUSE_SECONDS = env.int('EXPORT_JOB_REUSE_SECONDS', default=60 * 5)
+
+# Checklist rescoring (core/utils/rescoring.py): stations with at least this
+# many StationScores are rescored in a Celery task when a broker is set
+# (0 = always inline).
+RESCORE_ASYNC_MIN_SCORES = env.int('RESCORE_ASYNC_MIN_SCORES', default=500)
+
 ILO_THEMES = {
     1: {'name': 'Medical Knowledge', 'color': '#6f42c1', 'icon': 'bi-book-half'},
     2: {'name': 'Diagnosis', 'color': '#0d6efd', 'icon': 'bi-clipboard2-pulse'},
@@ -236,11 +255,50 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': _archive_schedule,
         'kwargs': {'days': 90, 'batch_size': 2000},
     },
+    # Pre-create upcoming monthly audit partitions (no-op when unpartitioned)
+    'ensure-audit-partitions': {
+        'task': 'core.ensure_audit_partitions',
+        'schedule': 86400,  # daily
+    },
+    # Write coalesced AuditTrailMiddleware entries once their window closes
+    'flush-coalesced-audit': {
+        'task': 'core.flush_coalesced_audit',
+        'schedule': 60,  # every minute
+    },
+    'cleanup-expired-exports': {
+        'task': 'core.cleanup_expired_exports',
+        'schedule': 3600,  # hourly
+    },
 }
 
 # ==========================================================================
 # AUDIT LOGGING
 # ==========================================================================
+# Model-signal audit entries are buffered per request and written in one
+# bulk insert after commit.  Set False to write each entry immediately.
+AUDIT_BUFFER_SIGNALS = env.bool('AUDIT_BUFFER_SIGNALS', default=True)
+
+# PostgreSQL only: partition audit_logs / audit_logs_archive by month
+# (applied by migration 0069, or later with `manage.py audit_partitions
+# --convert`).  Archival then moves whole monthly partitions.
+AUDIT_LOG_PARTITIONING = env.bool('AUDIT_LOG_PARTITIONING', default=False)
+AUDIT_PARTITION_MONTHS_AHEAD = env.int('AUDIT_PARTITION_MONTHS_AHEAD', default=3)
+
+# Policies for AuditTrailMiddleware's HTTP-level entries (requests no view or
+# signal audited): (path regex, rule) pairs, first match wins.  Rules:
+# 'always', 'never', 'sample:<percent>', 'coalesce:<seconds>' (one entry per
+# user, method and path per window, with a request count).
+# See core.utils.audit_policy.
+AUDIT_HTTP_POLICIES = [
+    (r'^/api/score/[^/]+/items?/$', 'coalesce:60'),   # per-tap item marking / autosave
+]
+AUDIT_HTTP_DEFAULT_POLICY = env('AUDIT_HTTP_DEFAULT_POLICY', default='always')
+# Inline flush interval of coalesced entries when Celery Beat is not running
+AUDIT_COALESCE_FLUSH_INTERVAL = 60
+# Coalescing needs a shared cache (Redis); on LocMem coalesce rules log
+# every request unless this is set (single-process development only)
+AUDIT_COALESCE_ON_LOCAL_CACHE = env.bool('AUDIT_COALESCE_ON_LOCAL_CACHE', default=False)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -27,6 +27,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 import django
 django.setup()
 
+from django.db import transaction
 from core.models import (
     Course, ILO, Exam, ExamSession, Path, Station, ChecklistItem,
     SessionStudent, Department,
@@ -595,32 +596,34 @@ def seed_all():
         print(f'  ✓ {len(path_objects)} paths created')
 
         # ── Create Stations + Checklist Items (4 per path, identical) ─
-        for session, path in path_objects:
-            for stn_idx, stn_def in enumerate(station_defs, start=1):
-                station = Station.objects.create(
-                    path=path,
-                    exam=exam,
-                    station_number=stn_idx,
-                    name=stn_def['name'],
-                    scenario=stn_def['scenario'],
-                    instructions=stn_def['instructions'],
-                    duration_minutes=STATION_DURATION,
-                    active=True,
-                    is_deleted=False,
-                )
-                total_stations += 1
-
-                for item_idx, item_def in enumerate(stn_def['items'], start=1):
-                    ChecklistItem.objects.create(
-                        station=station,
-                        ilo_id=ilo_id_for(course_id, item_def['theme']),
-                        item_number=item_idx,
-                        description=item_def['desc'],
-                        points=item_def['pts'],
-                        category=item_def['cat'],
-                        rubric_type=item_def['rubric'],
+        # One transaction → one checklist rescore per station at commit
+        with transaction.atomic():
+            for session, path in path_objects:
+                for stn_idx, stn_def in enumerate(station_defs, start=1):
+                    station = Station.objects.create(
+                        path=path,
+                        exam=exam,
+                        station_number=stn_idx,
+                        name=stn_def['name'],
+                        scenario=stn_def['scenario'],
+                        instructions=stn_def['instructions'],
+                        duration_minutes=STATION_DURATION,
+                        active=True,
+                        is_deleted=False,
                     )
-                    total_items += 1
+                    total_stations += 1
+
+                    for item_idx, item_def in enumerate(stn_def['items'], start=1):
+                        ChecklistItem.objects.create(
+                            station=station,
+                            ilo_id=ilo_id_for(course_id, item_def['theme']),
+                            item_number=item_idx,
+                            description=item_def['desc'],
+                            points=item_def['pts'],
+                            category=item_def['cat'],
+                            rubric_type=item_def['rubric'],
+                        )
+                        total_items += 1
 
         print(f'  ✓ {total_stations} stations + {total_items} checklist items (so far)')
 
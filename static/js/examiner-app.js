@@ -111,6 +111,12 @@ const ExaminerApp = {
         try {
             // Get pending scores from offline storage
             if (window.offlineStorage) {
+                // Station scores with their item scores — one bulk request per 100
+                const queueResult = await window.offlineStorage.syncQueuedScores();
+                if (queueResult.queued > 0) {
+                    console.log(`ExaminerApp: Bulk-synced ${queueResult.synced}/${queueResult.queued} station scores`);
+                }
+
                 const unsyncedScores = await window.offlineStorage.getUnsyncedScores();
                 
                 if (unsyncedScores.length > 0) {
@@ -5,6 +5,7 @@
  * - Caching checklist data
  * - Storing scores locally when offline
  * - Queue management for syncing
+ * - Station score queue for the bulk v2 sync endpoint (/api/sync/v2/)
  * 
  * This module wraps the core ExaminerDB functionality
  * and provides a simple API for other modules.
@@ -17,7 +18,7 @@
 class OfflineStorage {
     constructor() {
         this.dbName = 'OSCEOfflineStorage';
-        this.dbVersion = 1;
+        this.dbVersion = 2;
         this.db = null;
         this.isReady = false;
     }
@@ -72,6 +73,12 @@ class OfflineStorage {
                     submissionsStore.createIndex('timestamp', 'timestamp', { unique: false });
                 }
 
+                // Station scores (with item scores) queued for /api/sync/v2/
+                if (!db.objectStoreNames.contains('syncQueue')) {
+                    const queueStore = db.createObjectStore('syncQueue', { keyPath: 'local_uuid' });
+                    queueStore.createIndex('state', 'state', { unique: false });
+                }
+
                 console.log('OfflineStorage: Database schema created/upgraded');
             };
         });
@@ -257,13 +264,127 @@ class OfflineStorage {
         });
     }
 
+    /**
+     * Queue a station score (and its item scores) for the v2 sync endpoint.
+     * Re-queueing the same local_uuid merges item scores and bumps the
+     * local timestamp, so the server keeps only the newest copy.
+     */
+    async queueStationScore(record) {
+        if (!this.isReady) await this.init();
+
+        const tx = this.db.transaction('syncQueue', 'readwrite');
+        const store = tx.objectStore('syncQueue');
+
+        return new Promise((resolve, reject) => {
+            const getRequest = store.get(record.local_uuid);
+            getRequest.onsuccess = () => {
+                const existing = getRequest.result;
+                const items = {};
+                (existing ? existing.items : []).concat(record.items || []).forEach(item => {
+                    items[item.checklist_item_id] = item;
+                });
+                const merged = Object.assign({}, existing || {}, record, {
+                    items: Object.values(items),
+                    local_timestamp: Math.floor(Date.now() / 1000),
+                    state: 'pending'
+                });
+                const putRequest = store.put(merged);
+                putRequest.onsuccess = () => resolve(merged);
+                putRequest.onerror = () => reject(putRequest.error);
+            };
+            getRequest.onerror = () => reject(getRequest.error);
+        });
+    }
+
+    /**
+     * Get queued station scores that still need syncing
+     */
+    async getSyncQueue() {
+        if (!this.isReady) await this.init();
+
+        const tx = this.db.transaction('syncQueue', 'readonly');
+        const index = tx.objectStore('syncQueue').index('state');
+
+        return new Promise((resolve, reject) => {
+            const request = index.getAll(IDBKeyRange.only('pending'));
+            request.onsuccess = () => resolve(request.result || []);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    /**
+     * Apply per-record results from /api/sync/v2/: synced and unchanged
+     * records leave the queue, conflicts and errors are kept (flagged) so
+     * they are not retried in a loop.
+     */
+    async applySyncResults(results) {
+        if (!this.isReady) await this.init();
+
+        const tx = this.db.transaction('syncQueue', 'readwrite');
+        const store = tx.objectStore('syncQueue');
+
+        const promises = Object.entries(results).map(([localUuid, result]) => {
+            return new Promise((resolve, reject) => {
+                if (result.status === 'synced' || result.status === 'unchanged') {
+                    const request = store.delete(localUuid);
+                    request.onsuccess = () => resolve();
+                    request.onerror = () => reject(request.error);
+                    return;
+                }
+                const getRequest = store.get(localUuid);
+                getRequest.onsuccess = () => {
+                    const record = getRequest.result;
+                    if (!record) return resolve();
+                    record.state = result.status;
+                    record.server_message = result.error || null;
+                    const putRequest = store.put(record);
+                    putRequest.onsuccess = () => resolve();
+                    putRequest.onerror = () => reject(putRequest.error);
+                };
+                getRequest.onerror = () => reject(getRequest.error);
+            });
+        });
+
+        return Promise.all(promises);
+    }
+
+    /**
+     * Push the queue to /api/sync/v2/ in batches.  Safe to call repeatedly:
+     * the endpoint is idempotent per local_uuid.
+     */
+    async syncQueuedScores(batchSize = 100) {
+        const queue = await this.getSyncQueue();
+        let synced = 0;
+
+        for (let i = 0; i < queue.length; i += batchSize) {
+            const batch = queue.slice(i, i + batchSize).map(record => {
+                const { state, server_message, ...payload } = record;
+                return payload;
+            });
+            const response = await fetch('/api/sync/v2/', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                credentials: 'same-origin',
+                body: JSON.stringify({ scores: batch })
+            });
+            if (!response.ok) {
+                throw new Error(`Sync failed with status ${response.status}`);
+            }
+            const data = await response.json();
+            await this.applySyncResults(data.results || {});
+            synced += data.synced_count || 0;
+        }
+
+        return { queued: queue.length, synced };
+    }
+
     /**
      * Clear all cached data (useful for logout)
      */
     async clearAll() {
         if (!this.isReady) await this.init();
 
-        const stores = ['apiCache', 'offlineScores', 'pendingSubmissions'];
+        const stores = ['apiCache', 'offlineScores', 'pendingSubmissions', 'syncQueue'];
         
         for (const storeName of stores) {
             const tx = this.db.transaction(storeName, 'readwrite');
@@ -287,11 +408,12 @@ class OfflineStorage {
         const stats = {
             cachedResponses: 0,
             offlineScores: 0,
-            pendingSubmissions: 0
+            pendingSubmissions: 0,
+            queuedStationScores: 0
         };
 
-        const stores = ['apiCache', 'offlineScores', 'pendingSubmissions'];
-        const keys = ['cachedResponses', 'offlineScores', 'pendingSubmissions'];
+        const stores = ['apiCache', 'offlineScores', 'pendingSubmissions', 'syncQueue'];
+        const keys = ['cachedResponses', 'offlineScores', 'pendingSubmissions', 'queuedStationScores'];
 
         for (let i = 0; i < stores.length; i++) {
             const tx = this.db.transaction(stores[i], 'readonly');
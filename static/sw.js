@@ -10,7 +10,7 @@
  * - Sync data when back online
  */
 
-const CACHE_VERSION = 'osce-examiner-v2';
+const CACHE_VERSION = 'osce-examiner-v3';
 const STATIC_CACHE = `${CACHE_VERSION}-static`;
 const DATA_CACHE = `${CACHE_VERSION}-data`;
 
@@ -152,8 +152,20 @@ async function handleApiRequest(request) {
     
     // For GET requests, try network first, fall back to cache
     if (request.method === 'GET') {
+        // Revalidate with the cached ETag; a 304 reuses the cached body
+        const cachedCopy = await caches.match(request);
+        const etag = cachedCopy && cachedCopy.headers.get('ETag');
+        const networkRequest = etag
+            ? new Request(request, { headers: Object.assign(
+                Object.fromEntries(request.headers.entries()), { 'If-None-Match': etag }) })
+            : request;
+
         try {
-            const networkResponse = await fetch(request);
+            const networkResponse = await fetch(networkRequest);
+
+            if (networkResponse.status === 304 && cachedCopy) {
+                return cachedCopy;
+            }
             
             if (networkResponse.ok) {
                 // Cache the response
@@ -213,12 +225,87 @@ self.addEventListener('sync', (event) => {
     }
 });
 
+// Same database/store as OfflineStorage (static/js/offline-storage.js)
+const OFFLINE_DB_NAME = 'OSCEOfflineStorage';
+const OFFLINE_DB_VERSION = 2;
+const SYNC_QUEUE_STORE = 'syncQueue';
+const SYNC_BATCH_SIZE = 100;
+
+function openOfflineDb() {
+    return new Promise((resolve, reject) => {
+        const request = indexedDB.open(OFFLINE_DB_NAME, OFFLINE_DB_VERSION);
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+        // Schema is owned by the page; if it has never run there is nothing to sync
+        request.onupgradeneeded = () => request.transaction.abort();
+    });
+}
+
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+async function syncQueuedScores() {
+    let db;
+    try {
+        db = await openOfflineDb();
+    } catch (error) {
+        return 0;
+    }
+    if (!db.objectStoreNames.contains(SYNC_QUEUE_STORE)) return 0;
+
+    const queue = await idbRequest(
+        db.transaction(SYNC_QUEUE_STORE, 'readonly')
+            .objectStore(SYNC_QUEUE_STORE).index('state').getAll(IDBKeyRange.only('pending'))
+    );
+
+    let synced = 0;
+    for (let i = 0; i < queue.length; i += SYNC_BATCH_SIZE) {
+        const batch = queue.slice(i, i + SYNC_BATCH_SIZE).map(record => {
+            const { state, server_message, ...payload } = record;
+            return payload;
+        });
+        const response = await fetch('/api/sync/v2/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify({ scores: batch })
+        });
+        // Throwing lets the browser retry the background sync later
+        if (!response.ok) throw new Error(`Sync failed with status ${response.status}`);
+        const data = await response.json();
+
+        const store = db.transaction(SYNC_QUEUE_STORE, 'readwrite').objectStore(SYNC_QUEUE_STORE);
+        for (const [localUuid, result] of Object.entries(data.results || {})) {
+            if (result.status === 'synced' || result.status === 'unchanged') {
+                await idbRequest(store.delete(localUuid));
+            } else {
+                const record = await idbRequest(store.get(localUuid));
+                if (record) {
+                    record.state = result.status;
+                    record.server_message = result.error || null;
+                    await idbRequest(store.put(record));
+                }
+            }
+        }
+        synced += data.synced_count || 0;
+    }
+    return synced;
+}
+
 async function syncScores() {
-    // Notify all clients to sync their IndexedDB data
+    // Push queued station scores straight from IndexedDB (works with no page open)
+    const synced = await syncQueuedScores();
+
+    // Then let open pages sync anything they still hold in memory
     const clients = await self.clients.matchAll();
     clients.forEach(client => {
         client.postMessage({
             type: 'SYNC_REQUEST',
+            synced,
             timestamp: Date.now()
         });
     });